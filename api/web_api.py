@@ -12,7 +12,7 @@ Provides RESTful endpoints for:
 
 from flask import Flask, jsonify, request, render_template
 from flask_cors import CORS
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import psycopg2
 from psycopg2.extras import RealDictCursor
 import sys
@@ -27,6 +27,7 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from config.settings import DATABASE, WEB_API
 from engine.pump_detection_engine import PumpDetectionEngine
+from engine.analysis_snapshots import snapshot_history
 from engine.database_helper import PumpDatabaseHelper
 
 # Configure Flask app
@@ -50,6 +51,7 @@ def init_engine():
     try:
         db_helper = PumpDatabaseHelper(DATABASE)
         db_helper.connect()
+        db_helper.listen_config_changes()
         detection_engine = PumpDetectionEngine(db_helper)
         app.logger.info("Detection engine initialized successfully")
     except Exception as e:
@@ -132,6 +134,7 @@ def candidate_details(symbol):
                     COUNT(*) as signal_count
                 FROM pump.raw_signals
                 WHERE pair_symbol = %s
+                  AND interval = '4h'
             """, (symbol,))
 
             pattern_info = cur.fetchone()
@@ -152,6 +155,7 @@ def candidate_details(symbol):
                     spike_ratio_30d
                 FROM pump.raw_signals
                 WHERE pair_symbol = %s
+                  AND interval = '4h'
                 ORDER BY signal_timestamp DESC
             """, (symbol,))
 
@@ -767,6 +771,7 @@ def get_candidate_details(symbol):
                     price_at_signal
                 FROM pump.raw_signals
                 WHERE pair_symbol = %s
+                  AND interval = '4h'
                   AND signal_timestamp >= NOW() - INTERVAL '7 days'
                 ORDER BY signal_timestamp DESC
             """, (symbol,))
@@ -825,6 +830,67 @@ def get_candidate_details(symbol):
             'error': str(e)
         }), 500
 
+
+@app.route('/api/v2/candidates/<symbol>/history', methods=['GET'])
+def get_candidate_history(symbol):
+    """
+    Get the analysis history of a candidate (deduplicated snapshots)
+
+    Query params:
+    - candidate_id: specific candidate (default: the latest one for the symbol)
+    - hours: only the last N hours (default: full history)
+
+    Each entry is valid from valid_from until valid_until (null for the current one)
+    """
+    try:
+        symbol = symbol.upper()
+        candidate_id = request.args.get('candidate_id', type=int)
+        hours = request.args.get('hours', type=int)
+
+        conn = get_db_connection()
+        try:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT id, status, first_detected_at
+                    FROM pump.pump_candidates
+                    WHERE pair_symbol = %s
+                      AND (%s::integer IS NULL OR id = %s)
+                    ORDER BY first_detected_at DESC
+                    LIMIT 1
+                """, (symbol, candidate_id, candidate_id))
+                candidate = cur.fetchone()
+
+            if not candidate:
+                return jsonify({
+                    'success': False,
+                    'error': f'No candidate found for {symbol}'
+                }), 404
+
+            since = datetime.now(timezone.utc) - timedelta(hours=hours) if hours else None
+            history = snapshot_history(conn, candidate['id'], since)
+        finally:
+            conn.close()
+
+        return jsonify({
+            'success': True,
+            'symbol': symbol,
+            'candidate_id': candidate['id'],
+            'status': candidate['status'],
+            'first_detected_at': candidate['first_detected_at'].isoformat() if candidate['first_detected_at'] else None,
+            'history': [{
+                'valid_from': item['valid_from'].isoformat(),
+                'valid_until': item['valid_until'].isoformat() if item['valid_until'] else None,
+                'analysis': item['analysis']
+            } for item in history]
+        })
+
+    except Exception as e:
+        app.logger.error(f"Error fetching candidate history for {symbol}: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 # =============================================================================
 # API V2.0 ENDPOINTS - BACKTEST METRICS
 # =============================================================================
@@ -1100,6 +1166,7 @@ def get_recent_signals():
     Query Parameters:
     - symbol: Filter by symbol
     - signal_type: Filter by signal type
+    - interval: Candle interval (4h, 1h, all) - default: 4h
     - hours: Lookback period in hours - default: 24
     - limit: Max results - default: 100
 
@@ -1109,6 +1176,7 @@ def get_recent_signals():
     try:
         symbol = request.args.get('symbol', '').upper()
         signal_type = request.args.get('signal_type', '').upper()
+        interval = request.args.get('interval', '4h').lower()
         hours = int(request.args.get('hours', 24))
         limit = int(request.args.get('limit', 100))
 
@@ -1118,6 +1186,7 @@ def get_recent_signals():
                 SELECT
                     pair_symbol,
                     signal_type,
+                    interval,
                     signal_timestamp,
                     spike_ratio_7d,
                     signal_strength,
@@ -1139,6 +1208,10 @@ def get_recent_signals():
                 query += " AND signal_type = %s"
                 params.append(signal_type)
 
+            if interval != 'all':
+                query += " AND interval = %s"
+                params.append(interval)
+
             query += " ORDER BY signal_timestamp DESC"
             query += f" LIMIT {limit}"
 
@@ -1153,6 +1226,7 @@ def get_recent_signals():
             signal_list.append({
                 'symbol': row['pair_symbol'],
                 'type': row['signal_type'],
+                'interval': row['interval'],
                 'timestamp': row['signal_timestamp'].isoformat(),
                 'spike_ratio': float(row['spike_ratio_7d']) if row['spike_ratio_7d'] else 0,
                 'strength': row['signal_strength'],
@@ -1170,6 +1244,7 @@ def get_recent_signals():
             'filters': {
                 'symbol': symbol or 'all',
                 'signal_type': signal_type or 'all',
+                'interval': interval,
                 'hours': hours,
                 'limit': limit
             }
@@ -1197,6 +1272,8 @@ def get_config():
     try:
         if detection_engine is None:
             init_engine()
+        else:
+            detection_engine.refresh_config()
 
         config = {
             'version': '2.0',
@@ -1248,6 +1325,7 @@ def health_check():
                     MAX(signal_timestamp) as latest_signal
                 FROM pump.raw_signals
                 WHERE signal_timestamp >= NOW() - INTERVAL '24 hours'
+                  AND interval = '4h'
             """)
             signals_stats = cur.fetchone()
 
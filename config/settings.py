@@ -26,8 +26,23 @@ DETECTION = {
     'strong_spike_ratio': 2.0,      # Strong signal threshold (research: ≥2.0x)
     'medium_spike_ratio': 1.5,      # Medium signal threshold (research: ≥1.5x)
     'timeframe': '4h',              # Primary timeframe
+    'intervals': ['4h'],            # Detector intervals per cycle (pump.raw_signals.interval), e.g. ['4h', '1h']
+                                    # or --intervals 4h,1h; engine, runner and monitors read only '4h'
     'pump_threshold_pct': 10,       # % gain to confirm pump
     'monitoring_hours': 168,        # Monitor signals for 7 days
+    'backend': None,                # Monitoring cycles: 'incremental' / 'numpy' / 'sql' (None: by incremental_baselines)
+    'incremental_baselines': True,  # Keep 7d/14d/30d baselines in pump.detector_baseline_state
+    'eligible_pairs_max_age_hours': 24,  # Rebuild pump.eligible_pairs if older (CMC refresh is daily)
+    'skip_without_new_candles': True,  # Skip cycles when no pair has a closed candle past pump.detector_watermarks
+    'listen_debounce_seconds': 5,   # --listen: run detection after candle_closed notifications go quiet
+    'listen_max_wait_seconds': 60,  # --listen: ...or at most this long after the first notification
+    'backfill_workers': 4,          # --from/--to backfill: worker processes (one connection each)
+    'backfill_chunk_hours': 48,     # --from/--to backfill: time window per chunk
+    'backfill_partitions': 4,       # --from/--to backfill: trading_pair_id % N partitions per window
+    'robust_baselines': False,      # Also compute median/MAD baselines (pump.raw_signals.median_*/mad_*)
+    'robust_min_spike_ratio': None, # With robust_baselines: volume / median_7d also qualifies (incremental/numpy)
+    'shadow': None,                 # Shadow variant next to production, e.g. {'name': 'strict', 'min_spike_ratio': 2.0}
+                                    # (pump.shadow_signals + reports/shadow/*.jsonl; incremental/numpy backends)
 }
 
 # Scoring Weights (will be calibrated)
@@ -49,6 +64,20 @@ TELEGRAM = {
         'all': os.getenv('TELEGRAM_CHANNEL_ALL', '')          # All signals
     },
     'min_confidence_for_alert': 40,  # Minimum confidence to send alert
+    'api_url': os.getenv('TELEGRAM_API_URL', 'https://api.telegram.org'),
+}
+
+# Alert outbox delivery (engine/alert_outbox.py, daemons/alert_delivery_worker.py)
+ALERT_OUTBOX = {
+    'notify_channel': 'alert_outbox',  # NOTIFY on new outbox rows (migrations/021)
+    'batch_size': 50,                  # Rows claimed per delivery batch
+    'workers': 4,                      # Concurrent chats per batch
+    'per_chat_interval_seconds': 1.0,  # Telegram: ~1 message/second per chat
+    'request_timeout_seconds': 10,
+    'max_attempts': 8,                 # Then status FAILED
+    'backoff_base_seconds': 5,         # 5s, 10s, 20s, ... (429 uses retry_after)
+    'backoff_max_seconds': 900,
+    'poll_seconds': 30,                # Fallback poll when no NOTIFY arrives
 }
 
 # Logging Configuration
@@ -60,6 +89,34 @@ LOGGING = {
     'format': '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 }
 
+# Cycle metrics (engine/cycle_metrics.py): per-stage timings in Prometheus text format
+METRICS = {
+    'enabled': os.getenv('PUMP_METRICS_ENABLED', 'true').lower() == 'true',
+    'dir': Path(os.getenv('PUMP_METRICS_DIR', str(BASE_DIR / 'metrics'))),  # <dir>/<daemon>.prom
+    'stale_after_hours': 6,  # health_check: last cycle older than this is reported as stale
+}
+
+# pump.detector_config cache (engine/database_helper.py): one query for all keys
+ENGINE_CONFIG = {
+    'cache_ttl_seconds': 300,                  # Reload all keys at most this often
+    'notify_channel': 'detector_config_changed',  # ...or right after this NOTIFY (migrations/018)
+    'compact_rows': True,  # analysis runner: tuple records + NUMERIC as float (scripts/measure_compact_rows.py)
+    'analysis_cache': True,  # analysis runner: skip symbols whose signal-set fingerprint is unchanged
+    'analysis_workers': 1,   # analysis runner: worker processes for analyze_symbols (--workers)
+}
+
+# Analysis snapshot history (engine/analysis_snapshots.py, scripts/snapshot_retention.py)
+SNAPSHOT_CONFIG = {
+    'partitions_ahead': 2,     # Monthly partitions created in advance
+    'rollup_after_days': 30,   # Older snapshots are thinned to the last one per candidate per day
+    'retention_months': 6,     # Partitions older than this many full months are dropped
+}
+
+# In-process detector -> analysis -> alert pipeline (daemons/pipeline_daemon.py)
+PIPELINE = {
+    'max_connections': 4,  # One pool per process: detector, analysis/writes, LISTEN candle_closed, reconnect spare
+}
+
 # System Configuration
 SYSTEM = {
     'enabled': True,
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Alert Delivery Worker - отправка Telegram alerts из pump.alert_outbox
+Продюсеры (analysis runner, pump start monitor, extreme alert monitor) только
+пишут alerts в outbox; этот воркер отправляет их (engine/alert_outbox.py):
+keep-alive соединения, чаты параллельно, повторы с backoff, лимит на чат.
+Просыпается по NOTIFY alert_outbox (migrations/021) или раз в poll_seconds.
+Работает один экземпляр (advisory lock): второй постоянный воркер ждет
+в резерве, запуск --once при работающем воркере сразу завершается.
+"""
+
+import time
+import logging
+import select
+import signal
+import argparse
+import sys
+import os
+from dotenv import load_dotenv
+
+# Load .env file
+load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env'))
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import ALERT_OUTBOX, DATABASE, TELEGRAM
+from engine.alert_outbox import AlertDelivery, claim_alerts, mark_results, try_delivery_lock
+from engine.cycle_metrics import CycleMetrics
+from engine.database_helper import PumpDatabaseHelper
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler('/home/elcrypto/pump_detector/logs/alert_delivery_worker.log'),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger(__name__)
+
+
+class AlertDeliveryWorker:
+    """
+    Alert Delivery Worker
+
+    Цикл: claim пачки (FOR UPDATE SKIP LOCKED) -> отправка -> статусы одним UPDATE -> commit.
+    Пока есть готовые alerts - пачки подряд, затем ожидание NOTIFY.
+    """
+
+    def __init__(self, once_mode=False, config=None):
+        self.config = dict(ALERT_OUTBOX, **(config or {}))
+        self.db = None
+        self.running = True
+        self.once_mode = once_mode
+
+        bot_token = os.getenv('TELEGRAM_BOT_TOKEN', '') or TELEGRAM['bot_token']
+        if not bot_token:
+            raise ValueError("TELEGRAM_BOT_TOKEN is not configured")
+        self.delivery = AlertDelivery.for_telegram(
+            bot_token, TELEGRAM['api_url'],
+            workers=self.config['workers'],
+            per_chat_interval=self.config['per_chat_interval_seconds'],
+            timeout=self.config['request_timeout_seconds'])
+
+        # Per-stage timings of delivery batches (<METRICS['dir']>/alert_delivery_worker.prom)
+        self.metrics = CycleMetrics('alert_delivery_worker')
+
+        # Signal handling for graceful shutdown
+        signal.signal(signal.SIGINT, self.handle_shutdown)
+        signal.signal(signal.SIGTERM, self.handle_shutdown)
+
+    def handle_shutdown(self, signum, frame):
+        """Handle shutdown signals gracefully"""
+        logger.info(f"Received signal {signum}, shutting down...")
+        self.running = False
+
+    def connect(self):
+        """Connect to database and LISTEN for new outbox rows"""
+        try:
+            self.db = PumpDatabaseHelper(DATABASE)
+            self.db.connect()
+            with self.db.conn.cursor() as cur:
+                cur.execute(f"LISTEN {self.config['notify_channel']}")
+            self.db.conn.commit()
+            logger.info(f"Alert Delivery Worker initialized "
+                        f"(listening on '{self.config['notify_channel']}')")
+        except Exception as e:
+            logger.error(f"Initialization failed: {e}")
+            raise
+
+    def acquire_delivery_lock(self):
+        """
+        Стать единственным воркером доставки
+
+        Returns:
+            True если lock получен; False - в --once режиме при работающем воркере или при остановке
+        """
+        while self.running:
+            if try_delivery_lock(self.db.conn):
+                logger.info("Delivery lock acquired")
+                return True
+            if self.once_mode:
+                logger.info("Another alert delivery worker is running, nothing to do")
+                return False
+
+            logger.info(f"Another alert delivery worker is running, standby for {self.config['poll_seconds']}s")
+            for _ in range(int(self.config['poll_seconds'])):
+                if not self.running:
+                    break
+                time.sleep(1)
+        return False
+
+    def deliver_batch(self):
+        """
+        Отправить одну пачку готовых alerts
+
+        Returns:
+            Число claimed alerts (0 - очередь пуста)
+        """
+        self.metrics.start_cycle()
+        try:
+            with self.metrics.stage('query'):
+                rows = claim_alerts(self.db.conn, self.config['batch_size'])
+            if not rows:
+                self.db.conn.commit()
+                return 0
+
+            with self.metrics.stage('alert'):
+                delivered = self.delivery.deliver(rows)
+            self.metrics.count('alert', rows=len(delivered))
+
+            with self.metrics.stage('write'):
+                counts = mark_results(self.db.conn, delivered,
+                                      max_attempts=self.config['max_attempts'],
+                                      backoff_base=self.config['backoff_base_seconds'],
+                                      backoff_max=self.config['backoff_max_seconds'])
+            with self.metrics.stage('commit'):
+                self.db.conn.commit()
+
+            logger.info(f"Alerts: {counts.get('SENT', 0)} sent, {counts.get('PENDING', 0)} to retry, "
+                        f"{counts.get('FAILED', 0)} failed, {len(rows) - len(delivered)} deferred")
+            return len(rows)
+
+        except Exception:
+            self.metrics.record_error()
+            self.db.conn.rollback()
+            raise
+        finally:
+            self.metrics.finish_cycle()
+
+    def wait_for_alerts(self, timeout):
+        """Дождаться NOTIFY alert_outbox (или timeout секунд)"""
+        conn = self.db.conn
+        deadline = time.monotonic() + timeout
+        while self.running:
+            conn.poll()
+            if conn.notifies:
+                conn.notifies.clear()
+                return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            # Короткие ожидания - чтобы заметить SIGTERM
+            select.select([conn], [], [], min(remaining, 1.0))
+
+    def run(self):
+        """Main worker loop"""
+
+        mode_str = "ONCE MODE" if self.once_mode else "CONTINUOUS MODE"
+
+        logger.info("="*60)
+        logger.info(f"Alert Delivery Worker [{mode_str}]")
+        logger.info(f"Workers: {self.config['workers']}, "
+                    f"per-chat interval: {self.config['per_chat_interval_seconds']}s")
+        logger.info("="*60)
+
+        self.connect()
+        if not self.acquire_delivery_lock():
+            self.running = False
+
+        while self.running:
+            try:
+                claimed = self.deliver_batch()
+                if claimed:
+                    continue
+
+                if self.once_mode:
+                    logger.info("Once mode: outbox drained")
+                    break
+
+                self.wait_for_alerts(self.config['poll_seconds'])
+
+            except Exception as e:
+                logger.error(f"Error in delivery batch: {e}")
+                time.sleep(10)
+
+                # Reconnect if needed
+                try:
+                    with self.db.conn.cursor() as cur:
+                        cur.execute("SELECT 1")
+                    self.db.conn.commit()
+                except:
+                    logger.info("Database connection lost, reconnecting...")
+                    try:
+                        self.db.close()
+                    except:
+                        pass
+                    self.connect()
+                    # Lock ушел вместе со старым соединением
+                    if not self.acquire_delivery_lock():
+                        break
+
+        # Cleanup
+        self.delivery.close()
+        if self.db:
+            self.db.close()
+        logger.info("Alert Delivery Worker stopped")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Alert Delivery Worker')
+    parser.add_argument('--once', action='store_true',
+                       help='Deliver due alerts and exit (for cron scheduling)')
+    parser.add_argument('--workers', type=int, default=None,
+                       help=f"Chats delivered concurrently (default: {ALERT_OUTBOX['workers']})")
+    args = parser.parse_args()
+
+    config = {'workers': args.workers} if args.workers else None
+    worker = AlertDeliveryWorker(once_mode=args.once, config=config)
+
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        logger.info("Received keyboard interrupt")
+    except Exception as e:
+        logger.error(f"Fatal error: {e}")
+    finally:
+        logger.info("Worker terminated")
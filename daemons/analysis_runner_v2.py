@@ -9,7 +9,7 @@ import time
 import logging
 import psycopg2
 from psycopg2.extras import RealDictCursor
-from datetime import datetime
+from datetime import datetime, timezone
 import sys
 import os
 import signal
@@ -18,7 +18,10 @@ import argparse
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from config.settings import DATABASE
+from config.settings import DATABASE, ENGINE_CONFIG
+from engine.analysis_cache import AnalysisCache
+from engine.analysis_pool import AnalysisPool
+from engine.cycle_metrics import CycleMetrics
 from engine.database_helper import PumpDatabaseHelper
 from engine.pump_detection_engine import PumpDetectionEngine
 from engine.telegram_alerts import TelegramAlerter
@@ -41,25 +44,45 @@ class AnalysisRunner:
 
     Периодически:
     1. Получает список активных торговых пар с достаточным количеством сигналов
-    2. Запускает PumpDetectionEngine.analyze_symbol() для каждой
+    2. Запускает PumpDetectionEngine.analyze_symbols() на весь набор
     3. Создает/обновляет записи в pump.pump_candidates
     4. Сохраняет analysis snapshots
     5. Связывает кандидаты с сигналами через pump.candidate_signals
+    6. Ставит Telegram alerts actionable кандидатов в pump.alert_outbox
+       (отправляет daemons/alert_delivery_worker.py)
+
+    Символы, у которых отпечаток набора сигналов не изменился с прошлого цикла
+    (engine/analysis_cache.py), пропускают шаги 2-5.
+
+    С workers > 1 шаг 2 выполняется пулом процессов (engine/analysis_pool.py),
+    шаги 3-5 - одной транзакцией в основном процессе.
     """
 
-    def __init__(self, interval_minutes=30, once_mode=False):
+    def __init__(self, interval_minutes=30, once_mode=False, use_cache=None, workers=None, pool=None):
         self.db_config = DATABASE
+        self.db_pool = pool  # psycopg2 pool процесса (daemons/pipeline_daemon.py)
         self.db = None
         self.engine = None
+        self.pool = None
+        self.analyzer = None  # engine или pool: analyze_symbols(symbols, current_time)
+        self.workers = ENGINE_CONFIG.get('analysis_workers', 1) if workers is None else workers
         self.running = True
         self.interval_minutes = interval_minutes
         self.once_mode = once_mode
 
-        # Telegram alerter
+        # Результаты прошлых циклов по отпечатку набора сигналов символа
+        if use_cache is None:
+            use_cache = ENGINE_CONFIG.get('analysis_cache', True)
+        self.cache = AnalysisCache() if use_cache else None
+
+        # Telegram alerter: форматирование сообщений и chat_id для pump.alert_outbox
         telegram_bot_token = os.getenv('TELEGRAM_BOT_TOKEN', '')
         telegram_chat_id = os.getenv('TELEGRAM_CHAT_ID', '')
         self.telegram = TelegramAlerter(telegram_bot_token, telegram_chat_id)
 
+        # Per-stage timings of analysis cycles (<METRICS['dir']>/analysis_runner_v2.prom)
+        self.metrics = CycleMetrics('analysis_runner_v2')
+
         # Signal handling for graceful shutdown
         signal.signal(signal.SIGINT, self.handle_shutdown)
         signal.signal(signal.SIGTERM, self.handle_shutdown)
@@ -72,11 +95,20 @@ class AnalysisRunner:
     def connect(self):
         """Connect to database and initialize engine"""
         try:
-            self.db = PumpDatabaseHelper(DATABASE)
+            self.db = PumpDatabaseHelper(DATABASE, compact_rows=ENGINE_CONFIG['compact_rows'],
+                                         pool=self.db_pool)
             self.db.connect()
+            # Новые пороги/веса из pump.detector_config подхватываются без перезапуска
+            self.db.listen_config_changes()
 
             self.engine = PumpDetectionEngine(self.db)
 
+            # Воркеры со своими соединениями; пул переживает переподключения основного процесса
+            if self.workers > 1 and self.pool is None:
+                self.pool = AnalysisPool.for_database(self.workers, DATABASE,
+                                                      compact_rows=ENGINE_CONFIG['compact_rows'])
+            self.analyzer = self.pool or self.engine
+
             logger.info("Analysis Runner V2.0 initialized")
             logger.info(f"Engine config: min_signals={self.engine.min_signal_count}, "
                        f"HIGH≥{self.engine.high_conf_threshold}, "
@@ -91,31 +123,49 @@ class AnalysisRunner:
 
         Критерии:
         - Есть хотя бы 10 сигналов за последние 7 дней
-        - Символ активен (is_active = true)
+        - Пара в снимке pump.eligible_pairs (активна и проходит фильтры детектора)
+
+        max_signal_id и последний памп (last_pump_id, last_pump_start) -
+        для отпечатка AnalysisCache
 
         Returns:
             List of (pair_symbol, signal_count, trading_pair_id)
         """
         try:
             query = """
-            SELECT
-                rs.pair_symbol,
-                MIN(rs.trading_pair_id) as trading_pair_id,
-                COUNT(*) as signal_count,
-                COUNT(*) FILTER (WHERE rs.signal_strength = 'EXTREME') as extreme_count,
-                MAX(rs.signal_timestamp) as latest_signal
-            FROM pump.raw_signals rs
-            INNER JOIN trading_pairs tp ON rs.trading_pair_id = tp.id
-            WHERE rs.signal_timestamp >= NOW() - INTERVAL '7 days'
-              AND tp.is_active = true
-            GROUP BY rs.pair_symbol
-            HAVING COUNT(*) >= %s
-            ORDER BY extreme_count DESC, signal_count DESC
+            WITH symbols AS (
+                SELECT
+                    rs.pair_symbol,
+                    MIN(rs.trading_pair_id) as trading_pair_id,
+                    COUNT(*) as signal_count,
+                    COUNT(*) FILTER (WHERE rs.signal_strength = 'EXTREME') as extreme_count,
+                    MAX(rs.signal_timestamp) as latest_signal,
+                    MAX(rs.id) as max_signal_id
+                FROM pump.raw_signals rs
+                INNER JOIN pump.eligible_pairs ep ON rs.trading_pair_id = ep.trading_pair_id
+                    AND ep.is_eligible
+                WHERE rs.signal_timestamp >= NOW() - INTERVAL '7 days'
+                  AND rs.interval = '4h'
+                GROUP BY rs.pair_symbol
+                HAVING COUNT(*) >= %s
+            )
+            SELECT s.*, kp.id as last_pump_id, kp.pump_start as last_pump_start
+            FROM symbols s
+            LEFT JOIN LATERAL (
+                SELECT id, pump_start
+                FROM pump.known_pump_events
+                WHERE pair_symbol = s.pair_symbol
+                  AND pump_start <= NOW()
+                ORDER BY pump_start DESC
+                LIMIT 1
+            ) kp ON true
+            ORDER BY s.extreme_count DESC, s.signal_count DESC
             """
 
             with self.db.conn.cursor() as cur:
-                cur.execute(query, (self.engine.min_signal_count,))
-                symbols = cur.fetchall()
+                with self.metrics.stage('query'):
+                    cur.execute(query, (self.engine.min_signal_count,))
+                symbols = self.metrics.fetchall(cur)
 
             logger.info(f"Found {len(symbols)} symbols with ≥{self.engine.min_signal_count} signals")
             return symbols
@@ -124,114 +174,149 @@ class AnalysisRunner:
             logger.error(f"Error getting symbols to analyze: {e}")
             return []
 
-    def process_detection(self, detection_result, trading_pair_id):
+    def candidate_data(self, detection_result, trading_pair_id):
         """
-        Обработать результат детектирования
-
-        1. Создать/обновить pump.pump_candidates
-        2. Сохранить analysis snapshot
-        3. Связать кандидата с сигналами
+        Строка pump.pump_candidates из результата детектирования
 
         Args:
-            detection_result: Dict from PumpDetectionEngine.analyze_symbol()
+            detection_result: Dict from PumpDetectionEngine.analyze_symbols()
             trading_pair_id: ID торговой пары
-
-        Returns:
-            candidate_id or None
         """
-        try:
-            symbol = detection_result['pair_symbol']
+        return {
+            'pair_symbol': detection_result['pair_symbol'],
+            'trading_pair_id': trading_pair_id,
+            'confidence': detection_result['confidence'],
+            'score': detection_result['score'],
+            'pattern_type': detection_result['pattern_type'],
+            'total_signals': detection_result['total_signals'],
+            'extreme_signals': detection_result['extreme_signals'],
+            'critical_window_signals': detection_result['critical_window_signals'],
+            'eta_hours': detection_result['eta_hours'],
+            'is_actionable': detection_result['is_actionable'],
+            'pump_phase': detection_result.get('pump_phase', 'UNKNOWN'),
+            'price_change_from_first': detection_result.get('price_change_from_first', 0.0),
+            'price_change_24h': detection_result.get('price_change_24h', 0.0),
+            'hours_since_last_pump': detection_result.get('hours_since_last_pump')
+        }
+
+    def link_candidate_signals(self, links):
+        """
+        Связать кандидатов цикла с их сигналами (в транзакции write_detections)
 
-            # Проверяем наличие сигналов
-            if not detection_result['signals']:
-                logger.warning(f"{symbol}: No signals in detection result")
-                return None
-
-            # 1. Создать/обновить candidate
-            candidate_data = {
-                'pair_symbol': symbol,
-                'trading_pair_id': trading_pair_id,
-                'confidence': detection_result['confidence'],
-                'score': detection_result['score'],
-                'pattern_type': detection_result['pattern_type'],
-                'total_signals': detection_result['total_signals'],
-                'extreme_signals': detection_result['extreme_signals'],
-                'critical_window_signals': detection_result['critical_window_signals'],
-                'eta_hours': detection_result['eta_hours'],
-                'is_actionable': detection_result['is_actionable'],
-                'pump_phase': detection_result.get('pump_phase', 'UNKNOWN'),
-                'price_change_from_first': detection_result.get('price_change_from_first', 0.0),
-                'price_change_24h': detection_result.get('price_change_24h', 0.0),
-                'hours_since_last_pump': detection_result.get('hours_since_last_pump')
-            }
-
-            candidate_id = self.db.create_or_update_candidate(candidate_data)
+        Пишется только разница с уже записанными связями (PumpDatabaseHelper.sync_candidate_signals)
 
-            if not candidate_id:
-                logger.error(f"{symbol}: Failed to create/update candidate")
-                return None
+        Args:
+            links: Dict {candidate_id: List of signal dicts}
+        """
+        with self.metrics.stage('write'):
+            added, removed = self.db.sync_candidate_signals(links, commit=False)
+        self.metrics.count('write', rows=added + removed)
+        logger.debug(f"Candidate signals: +{added} -{removed} links for {len(links)} candidates")
 
-            logger.info(f"{symbol}: Candidate created/updated (id={candidate_id}, "
-                       f"confidence={detection_result['confidence']}, "
-                       f"score={detection_result['score']:.2f}, "
-                       f"actionable={detection_result['is_actionable']})")
+    def candidate_alert(self, detection_result):
+        """
+        Строка pump.alert_outbox для actionable кандидата
 
-            # 2. Сохранить analysis snapshot
-            self.db.save_analysis_snapshot(candidate_id, detection_result['analysis_details'])
-            logger.debug(f"{symbol}: Analysis snapshot saved")
+        Args:
+            detection_result: Dict from PumpDetectionEngine.analyze_symbols()
+        """
+        candidate_data = {
+            'pair_symbol': detection_result['pair_symbol'],
+            'confidence': detection_result['confidence'],
+            'score': detection_result['score'],
+            'pattern_type': detection_result['pattern_type'],
+            'total_signals': detection_result['total_signals'],
+            'extreme_signals': detection_result['extreme_signals'],
+            'critical_window_signals': detection_result['critical_window_signals'],
+            'eta_hours': detection_result['eta_hours']
+        }
+        return {
+            'source': 'analysis_runner',
+            'chat_id': self.telegram.chat_id,
+            'message': self.telegram.format_candidate_message(candidate_data),
+        }
+
+    def write_detections(self, detections, alerts=None):
+        """
+        Записать все детектирования цикла одной транзакцией
 
-            # 3. Связать кандидата с сигналами
-            self.link_candidate_signals(candidate_id, detection_result['signals'])
-            logger.debug(f"{symbol}: Linked {len(detection_result['signals'])} signals")
+        1. Создать/обновить pump.pump_candidates - один INSERT ... ON CONFLICT на цикл
+        2. Сохранить analysis snapshots - только изменившиеся, одним INSERT
+        3. Связать кандидатов с сигналами - только изменения, bulk на цикл
+        4. Alerts actionable кандидатов - в pump.alert_outbox (без сетевых вызовов)
 
-            return candidate_id
+        Все записи фиксируются вместе: API не видит цикл записанным наполовину.
+        При ошибке откатывается весь цикл и исключение пробрасывается - символы
+        не попадают в AnalysisCache, alerts (Double EXTREME) не отмечаются
+        отправленными: все повторяется в следующем цикле.
 
-        except Exception as e:
-            logger.error(f"Error processing detection for {detection_result.get('pair_symbol', 'UNKNOWN')}: {e}")
-            return None
+        Args:
+            detections: List of (detection_result, trading_pair_id)
+            alerts: Другие alerts для pump.alert_outbox в той же транзакции
+                    (конвейер: double EXTREME)
 
-    def link_candidate_signals(self, candidate_id, signals):
+        Returns:
+            Dict {pair_symbol: candidate_id}
         """
-        Связать кандидата с его сигналами
+        written = []
+        for result, trading_pair_id in detections:
+            # Проверяем наличие сигналов
+            if not result['signals']:
+                logger.warning(f"{result['pair_symbol']}: No signals in detection result")
+                continue
+            written.append((result, trading_pair_id))
 
-        Args:
-            candidate_id: ID кандидата
-            signals: List of signal dicts
-        """
-        try:
-            # Очистить старые связи для этого кандидата
-            with self.db.conn.cursor() as cur:
-                cur.execute("""
-                    DELETE FROM pump.candidate_signals
-                    WHERE candidate_id = %s
-                """, (candidate_id,))
-
-                # Вставить новые связи
-                for signal in signals:
-                    # Рассчитать hours_before_detection (пока не используется, но для будущего)
-                    insert_query = """
-                    INSERT INTO pump.candidate_signals (
-                        candidate_id, signal_id, relevance_score
-                    ) VALUES (%s, %s, %s)
-                    ON CONFLICT (candidate_id, signal_id) DO NOTHING
-                    """
-
-                    # Relevance score на основе силы сигнала
-                    relevance = {
-                        'EXTREME': 1.0,
-                        'VERY_STRONG': 0.8,
-                        'STRONG': 0.6,
-                        'MEDIUM': 0.4,
-                        'WEAK': 0.2
-                    }.get(signal['signal_strength'], 0.5)
-
-                    cur.execute(insert_query, (candidate_id, signal['id'], relevance))
+        if not written and not alerts:
+            return {}
 
+        try:
+            # 1. Кандидаты всего цикла
+            with self.metrics.stage('write'):
+                candidate_ids = self.db.upsert_candidates(
+                    [self.candidate_data(result, trading_pair_id) for result, trading_pair_id in written],
+                    commit=False)
+            self.metrics.count('write', rows=len(candidate_ids))
+
+            links, snapshots, alerts = {}, {}, list(alerts or [])
+            for result, _ in written:
+                symbol = result['pair_symbol']
+                candidate_id = candidate_ids.get(symbol)
+                if not candidate_id:
+                    logger.error(f"{symbol}: Failed to create/update candidate")
+                    continue
+
+                logger.info(f"{symbol}: Candidate created/updated (id={candidate_id}, "
+                           f"confidence={result['confidence']}, "
+                           f"score={result['score']:.2f}, "
+                           f"actionable={result['is_actionable']})")
+
+                snapshots[candidate_id] = result['analysis_details']
+                links[candidate_id] = result['signals']
+                if result['is_actionable'] and self.telegram.enabled:
+                    alerts.append(self.candidate_alert(result))
+
+            # 2. Сохранить analysis snapshots (только изменившиеся)
+            with self.metrics.stage('write'):
+                saved = self.db.save_analysis_snapshots(snapshots, commit=False)
+            self.metrics.count('write', rows=saved)
+            logger.debug(f"Analysis snapshots: {saved} of {len(snapshots)} changed")
+
+            # 3. Связать кандидатов с сигналами
+            self.link_candidate_signals(links)
+
+            # 4. Alerts - в той же транзакции, что и кандидаты
+            with self.metrics.stage('alert'):
+                queued = self.db.enqueue_alerts(alerts, commit=False)
+            self.metrics.count('alert', rows=queued)
+
+            with self.metrics.stage('commit'):
                 self.db.conn.commit()
+            return candidate_ids
 
         except Exception as e:
-            logger.error(f"Error linking candidate signals: {e}")
+            logger.error(f"Error writing {len(written)} detections, cycle rolled back: {e}")
             self.db.conn.rollback()
+            raise
 
     def run_analysis_cycle(self):
         """
@@ -255,60 +340,89 @@ class AnalysisRunner:
         detections = []
         actionable = []
 
+        # Одно время на цикл: от него зависят и отпечатки, и окна engine
+        cycle_time = datetime.now(timezone.utc)
+        keys, cached = {}, {}
+        if self.cache is not None:
+            self.engine.refresh_config()
+            self.cache.start_cycle()
+            self.cache.retain(s['pair_symbol'] for s in symbols)
+            for symbol_data in symbols:
+                symbol = symbol_data['pair_symbol']
+                keys[symbol] = self.cache.fingerprint(symbol_data, self.engine.config_version, cycle_time)
+                hit, result = self.cache.lookup(symbol, keys[symbol])
+                if hit:
+                    cached[symbol] = result
+            self.metrics.count('cache_hit', rows=self.cache.hits)
+            self.metrics.count('cache_miss', rows=self.cache.misses)
+            logger.info(f"Analysis cache: {self.cache.hits}/{len(symbols)} symbols unchanged "
+                        f"(hit ratio {self.cache.hit_ratio:.0%})")
+
+        # Запустить engine (или пул воркеров) на изменившиеся символы: сигналы и последние
+        # пампы одним запросом каждые (запросы engine к БД входят в стадию classify).
+        # Ошибка чтения пробрасывается и завершает цикл до записи результатов в кэш
+        to_analyze = [s['pair_symbol'] for s in symbols if s['pair_symbol'] not in cached]
+        logger.info(f"Analyzing {len(to_analyze)} symbols"
+                    f"{f' in {self.workers} workers' if self.pool else ''}...")
+        results = {}
+        if to_analyze:
+            with self.metrics.stage('classify'):
+                results = self.analyzer.analyze_symbols(to_analyze, current_time=cycle_time)
+
+        pending = []  # (result, trading_pair_id) для записи одной транзакцией
         for symbol_data in symbols:
             symbol = symbol_data['pair_symbol']
-            trading_pair_id = symbol_data['trading_pair_id']
             signal_count = symbol_data['signal_count']
 
-            try:
-                logger.info(f"Analyzing {symbol} ({signal_count} signals)...")
+            if symbol in cached:
+                # Кандидат, snapshot и связи уже записаны в прошлом цикле с тем же результатом
+                total_analyzed += 1
+                if cached[symbol]:
+                    detections.append(cached[symbol])
+                continue
 
-                # Запустить engine
-                result = self.engine.analyze_symbol(symbol)
+            if symbol not in results:
+                continue
 
-                total_analyzed += 1
+            logger.debug(f"Analyzed {symbol} ({signal_count} signals)")
+            result = results[symbol]
+            total_analyzed += 1
 
-                if result:
-                    # Pump pattern detected!
-                    detections.append(result)
-
-                    logger.info(f"  ✅ DETECTED: {result['confidence']} confidence, "
-                               f"score={result['score']:.2f}, "
-                               f"pattern={result['pattern_type']}, "
-                               f"actionable={result['is_actionable']}")
-
-                    # Обработать детектирование
-                    candidate_id = self.process_detection(result, trading_pair_id)
-
-                    if result['is_actionable'] and candidate_id:
-                        actionable.append({
-                            'candidate_id': candidate_id,
-                            'symbol': symbol,
-                            'result': result
-                        })
-
-                        # Отправить Telegram alert для actionable кандидата
-                        try:
-                            candidate_data = {
-                                'pair_symbol': result['pair_symbol'],
-                                'confidence': result['confidence'],
-                                'score': result['score'],
-                                'pattern_type': result['pattern_type'],
-                                'total_signals': result['total_signals'],
-                                'extreme_signals': result['extreme_signals'],
-                                'critical_window_signals': result['critical_window_signals'],
-                                'eta_hours': result['eta_hours']
-                            }
-                            self.telegram.send_candidate_alert(candidate_data)
-                        except Exception as e:
-                            logger.error(f"Error sending Telegram alert: {e}")
-                else:
-                    logger.debug(f"  ❌ No pattern for {symbol}")
+            if not result:
+                logger.debug(f"  ❌ No pattern for {symbol}")
+                if self.cache is not None:
+                    self.cache.store(symbol, keys[symbol], result)
+                continue
 
-            except Exception as e:
-                logger.error(f"Error analyzing {symbol}: {e}")
+            # Pump pattern detected!
+            detections.append(result)
+            logger.info(f"  ✅ DETECTED {symbol}: {result['confidence']} confidence, "
+                       f"score={result['score']:.2f}, "
+                       f"pattern={result['pattern_type']}, "
+                       f"actionable={result['is_actionable']}")
+            pending.append((result, symbol_data['trading_pair_id']))
+
+        # Обработать детектирования: кандидаты, snapshots, связи
+        candidate_ids = self.write_detections(pending)
+
+        for result, _ in pending:
+            symbol = result['pair_symbol']
+            candidate_id = candidate_ids.get(symbol)
+            if not candidate_id:
                 continue
 
+            # Только после успешной записи - иначе повторить в следующем цикле
+            if self.cache is not None:
+                self.cache.store(symbol, keys[symbol], result)
+
+            if result['is_actionable']:
+                # Telegram alert уже в pump.alert_outbox (write_detections)
+                actionable.append({
+                    'candidate_id': candidate_id,
+                    'symbol': symbol,
+                    'result': result
+                })
+
         # Статистика цикла
         logger.info("="*60)
         logger.info(f"Analysis cycle complete:")
@@ -336,18 +450,24 @@ class AnalysisRunner:
         """
         try:
             with self.db.conn.cursor() as cur:
-                cur.execute("""
-                    UPDATE pump.pump_candidates
-                    SET status = 'EXPIRED'
-                    WHERE status = 'ACTIVE'
-                      AND first_detected_at < NOW() - INTERVAL '7 days'
-                    RETURNING id, pair_symbol
-                """)
-
-                expired = cur.fetchall()
-                self.db.conn.commit()
+                with self.metrics.stage('write'):
+                    cur.execute("""
+                        UPDATE pump.pump_candidates
+                        SET status = 'EXPIRED'
+                        WHERE status = 'ACTIVE'
+                          AND first_detected_at < NOW() - INTERVAL '7 days'
+                        RETURNING id, pair_symbol
+                    """)
+                    expired = cur.fetchall()
+                self.metrics.count('write', rows=len(expired))
+
+                with self.metrics.stage('commit'):
+                    self.db.conn.commit()
 
                 if expired:
+                    # Активного кандидата для этих символов больше нет - создать заново
+                    if self.cache is not None:
+                        self.cache.invalidate(exp['pair_symbol'] for exp in expired)
                     logger.info(f"Expired {len(expired)} old candidates")
                     for exp in expired:
                         logger.debug(f"  Expired: {exp['pair_symbol']} (id={exp['id']})")
@@ -373,12 +493,14 @@ class AnalysisRunner:
         while self.running:
             try:
                 cycle_count += 1
+                self.metrics.start_cycle()
 
                 # Expire old candidates
                 self.expire_old_candidates()
 
                 # Run analysis cycle
                 analyzed, detected, actionable = self.run_analysis_cycle()
+                self.metrics.finish_cycle()
 
                 # In once mode, exit after first cycle
                 if self.once_mode:
@@ -397,6 +519,8 @@ class AnalysisRunner:
 
             except Exception as e:
                 logger.error(f"Error in analysis cycle: {e}")
+                self.metrics.record_error()
+                self.metrics.finish_cycle()
                 time.sleep(60)  # Wait 1 minute before retry
 
                 # Reconnect if needed
@@ -412,6 +536,8 @@ class AnalysisRunner:
                     self.connect()
 
         # Cleanup
+        if self.pool:
+            self.pool.close()
         if self.db:
             self.db.close()
         logger.info("Analysis Runner V2.0 stopped")
@@ -423,9 +549,15 @@ if __name__ == "__main__":
                        help='Analysis interval in minutes (default: 30)')
     parser.add_argument('--once', action='store_true',
                        help='Run once and exit (for cron scheduling)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Re-analyze every symbol each cycle (disable the analysis cache)')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Analyze symbols in N worker processes '
+                            f"(default: {ENGINE_CONFIG.get('analysis_workers', 1)})")
     args = parser.parse_args()
 
-    runner = AnalysisRunner(interval_minutes=args.interval, once_mode=args.once)
+    runner = AnalysisRunner(interval_minutes=args.interval, once_mode=args.once,
+                            use_cache=False if args.no_cache else None, workers=args.workers)
 
     try:
         runner.run()
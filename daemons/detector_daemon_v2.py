@@ -8,7 +8,7 @@ Changes from V1:
 - Removed confidence scoring (now done by PumpDetectionEngine)
 - Simplified to focus on signal detection only
 
-Filters Applied:
+Filters Applied (materialized daily in pump.eligible_pairs):
 - Excludes meme coins (using public.is_meme_coin)
 - Excludes stablecoins (using public.is_stablecoin_pair)
 - Excludes tokens with market cap < $100M
@@ -17,8 +17,9 @@ Filters Applied:
 import time
 import logging
 import psycopg2
-from psycopg2.extras import RealDictCursor
-from datetime import datetime, timedelta
+from psycopg2.extras import RealDictCursor, execute_values
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
 import sys
 import os
 import signal
@@ -27,7 +28,20 @@ import argparse
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from config.settings import DATABASE, DETECTION
+from config.settings import DATABASE, DETECTION, PATHS
+from engine.baseline_state import BaselineStateStore, MAX_HISTORY_MS, baseline_windows
+from engine.robust_baselines import ROBUST_FIELDS
+from engine.eligible_universe import rebuild_eligible_pairs, get_snapshot_age_hours
+from engine.candle_access import (open_time_predicate, window_bounds_ms, ms_ago, now_ms, from_ms, DAY_MS,
+                                  INTERVAL_MS, INTERVAL_IDS, INTERVAL_NAMES)
+from engine.candle_watermarks import find_advanced_pairs, save_watermarks
+from engine.candle_listener import CandleListener
+from engine.cycle_metrics import CycleMetrics
+from engine.shadow_detector import (shadow_config, parse_overrides, diff_signals, format_summary,
+                                    save_shadow_signals, write_report)
+from engine.vectorized_detector import load_candle_matrices, detect_matrix, attach_robust_baselines
+from engine.backfill import (make_run_key, plan_chunks, pending_chunks, load_completed_chunks,
+                             mark_chunk, BackfillProgress)
 
 # Setup logging
 logging.basicConfig(
@@ -44,13 +58,45 @@ logger = logging.getLogger(__name__)
 class PumpDetectorDaemon:
     """V2.0 daemon for detecting volume anomalies"""
 
-    def __init__(self, historical_mode=False, once_mode=False):
+    def __init__(self, historical_mode=False, once_mode=False, full_scan=False, listen_mode=False,
+                 backend=None, intervals=None, shadow=None, pool=None):
         self.db_config = DATABASE
         self.conn = None
+        self.pool = pool  # psycopg2 pool of the process (daemons/pipeline_daemon.py), None: own connections
         self.running = True
         self.detection_config = DETECTION
         self.historical_mode = historical_mode
         self.once_mode = once_mode
+        self.full_scan = full_scan
+        self.listen_mode = listen_mode
+        self.backend = backend
+
+        # Candle intervals of monitoring cycles, e.g. ['4h', '1h'] -> interval_ids [4, 3]
+        interval_names = intervals or self.detection_config.get('intervals', ['4h'])
+        unknown = [name for name in interval_names if name not in INTERVAL_IDS]
+        if unknown:
+            raise ValueError(f"Unknown intervals {unknown}, supported: {', '.join(INTERVAL_IDS)}")
+        self.intervals = [INTERVAL_IDS[name] for name in interval_names]
+
+        # Incremental 7d/14d/30d baselines per interval_id (loaded lazily from pump.detector_baseline_state)
+        self.baseline_stores = {}
+
+        # Cycles that ran detection vs cycles skipped because no pair got a new closed candle
+        self.cycle_stats = {'executed': 0, 'skipped': 0}
+        self.last_cycle_skipped = False
+
+        # Signals inserted and committed by the last relative lookback cycle (anomaly dicts
+        # with 'signal_id'), handed in memory to the analysis step by daemons/pipeline_daemon.py
+        self.last_signals = []
+        self._cycle_signals = None  # collected only during relative lookback cycles (not backfill)
+
+        # Per-stage timings of monitoring cycles (<METRICS['dir']>/detector_daemon_v2.prom)
+        self.metrics = CycleMetrics('detector_daemon_v2')
+
+        # Shadow variant evaluated on the same candles: (name, DETECTION with overrides) or None
+        self.shadow = shadow_config(self.detection_config,
+                                    shadow if shadow is not None else self.detection_config.get('shadow'))
+        self.shadow_report_dir = PATHS['reports'] / 'shadow'
 
         # Set lookback period based on mode
         # Historical mode: 30 days (720 hours) for initial load
@@ -66,33 +112,51 @@ class PumpDetectorDaemon:
         logger.info(f"Received signal {signum}, shutting down...")
         self.running = False
 
+    def connection_params(self):
+        """psycopg2.connect() arguments for the configured database"""
+        # Use peer authentication if no password
+        if not self.db_config.get('password'):
+            return {
+                'dbname': self.db_config['dbname'],
+                'cursor_factory': RealDictCursor
+            }
+
+        return {
+            'dbname': self.db_config['dbname'],
+            'user': self.db_config.get('user'),
+            'password': self.db_config.get('password'),
+            'host': self.db_config.get('host', 'localhost'),
+            'port': self.db_config.get('port', 5432),
+            'cursor_factory': RealDictCursor
+        }
+
     def connect(self):
         """Connect to database"""
         try:
-            # Use peer authentication if no password
-            if not self.db_config.get('password'):
-                conn_params = {
-                    'dbname': self.db_config['dbname'],
-                    'cursor_factory': RealDictCursor
-                }
+            if self.pool is not None:
+                self.conn = self.pool.getconn()
             else:
-                conn_params = {
-                    'dbname': self.db_config['dbname'],
-                    'user': self.db_config.get('user'),
-                    'password': self.db_config.get('password'),
-                    'host': self.db_config.get('host', 'localhost'),
-                    'port': self.db_config.get('port', 5432),
-                    'cursor_factory': RealDictCursor
-                }
-
-            self.conn = psycopg2.connect(**conn_params)
+                self.conn = psycopg2.connect(**self.connection_params())
             self.conn.autocommit = False
             logger.info("Database connection established (V2.0)")
         except Exception as e:
             logger.error(f"Database connection failed: {e}")
             raise
 
-    def classify_signal_strength(self, spike_ratio_7d, spike_ratio_14d):
+    def disconnect(self):
+        """Close the connection (a pooled one goes back to the pool closed)"""
+        if not self.conn:
+            return
+        try:
+            if self.pool is not None:
+                self.pool.putconn(self.conn, close=True)
+            else:
+                self.conn.close()
+        except Exception:
+            pass
+        self.conn = None
+
+    def classify_signal_strength(self, spike_ratio_7d, spike_ratio_14d, config=None):
         """
         Classify signal strength based on spike ratios
 
@@ -101,96 +165,120 @@ class PumpDetectorDaemon:
         - VERY_STRONG: ≥3.0x
         - STRONG: ≥2.0x
         - MEDIUM: ≥1.5x
+
+        Thresholds come from config (default: DETECTION; the shadow variant passes its own).
         """
+        config = config or self.detection_config
         max_spike = max(spike_ratio_7d or 0, spike_ratio_14d or 0)
 
-        if max_spike >= self.detection_config.get('extreme_spike_ratio', 5.0):
+        if max_spike >= config.get('extreme_spike_ratio', 5.0):
             return 'EXTREME'
-        elif max_spike >= self.detection_config.get('very_strong_spike_ratio', 3.0):
+        elif max_spike >= config.get('very_strong_spike_ratio', 3.0):
             return 'VERY_STRONG'
-        elif max_spike >= self.detection_config.get('strong_spike_ratio', 2.0):
+        elif max_spike >= config.get('strong_spike_ratio', 2.0):
             return 'STRONG'
-        elif max_spike >= self.detection_config.get('medium_spike_ratio', 1.5):
+        elif max_spike >= config.get('medium_spike_ratio', 1.5):
             return 'MEDIUM'
         else:
             return 'WEAK'
 
-    def detect_futures_anomalies(self, time_start=None, time_end=None):
-        """Detect FUTURES volume anomalies
+    def build_combined_query(self, time_start=None, time_end=None, partition=None, pair_ids=None,
+                             interval_id=4):
+        """Build the single-pass FUTURES+SPOT detection query for one candle interval
+
+        All time predicates are on raw open_time milliseconds so the planner can
+        use the (trading_pair_id, interval_id, open_time) index.
 
         Args:
             time_start: Start of time window (datetime) - for batch processing
             time_end: End of time window (datetime) - for batch processing
+            partition: Optional (index, count) - only pairs with trading_pair_id % count = index
+            pair_ids: Optional list of trading_pair_id to restrict the scan
+            interval_id: Candle interval (4 = 4h, 3 = 1h); windows cover 7/14/30 days of it
+
+        Returns:
+            (query, params)
         """
+        windows = baseline_windows(INTERVAL_MS[interval_id])
+        history_condition, history_params = "", []
+        partition_condition, partition_params = "", []
+
+        if partition:
+            partition_condition = "AND c.trading_pair_id %% %s = %s"
+            partition_params = [partition[1], partition[0]]
+
+        # Baseline windows are per pair, so restricting pairs does not change results
+        if pair_ids:
+            partition_condition += "\n              AND c.trading_pair_id = ANY(%s)"
+            partition_params.append(list(pair_ids))
 
         # Build time window conditions
         if time_start and time_end:
-            # Batch mode: specific time window
-            # We need to load candles from 30 days BEFORE batch start (for baselines)
-            # up to batch end (for signals in this batch)
-            from datetime import timedelta
-            baseline_start = time_start - timedelta(days=30)
-
-            time_window_condition = """
-              AND to_timestamp(c.open_time / 1000) >= %s
-              AND to_timestamp(c.open_time / 1000) < %s
-            """
-            signal_time_filter = "AND candle_time >= %s AND candle_time < %s"
-            query_params = [baseline_start, time_end, time_start, time_end,
-                           self.detection_config.get('min_spike_ratio', 1.5)]
+            # Batch mode: load 30 days of baseline candles before the batch start
+            # up to batch end, report signals inside the batch only
+            # (the window is relative to the batch, so any historical range works)
+            batch_start_ms, batch_end_ms = window_bounds_ms(time_start, time_end)
+            time_window_condition, window_params = open_time_predicate(
+                'c', start_ms=batch_start_ms - 30 * DAY_MS, end_ms=batch_end_ms
+            )
+            signal_time_filter, signal_params = open_time_predicate(
+                'recent_candles', start_ms=batch_start_ms, end_ms=batch_end_ms
+            )
         else:
-            # Normal mode: relative lookback
-            time_window_condition = ""
-            signal_time_filter = "AND candle_time >= NOW() - INTERVAL '%s hours'"
-            query_params = [self.detection_config.get('min_spike_ratio', 1.5)]
+            # Normal mode: relative lookback, candles older than 30 days never enter the baselines
+            history_condition, history_params = open_time_predicate('c', start_ms=ms_ago(days=30))
+            time_window_condition, window_params = "", []
+            signal_time_filter, signal_params = open_time_predicate(
+                'recent_candles', start_ms=ms_ago(hours=self.lookback_hours)
+            )
+
+        query_params = (history_params + window_params + partition_params + signal_params +
+                        [self.detection_config.get('min_spike_ratio', 1.5)])
 
         query = """
         WITH recent_candles AS (
             SELECT
                 c.trading_pair_id,
                 tp.pair_symbol,
+                CASE WHEN tp.contract_type_id = 1 THEN 'FUTURES' ELSE 'SPOT' END as signal_type,
+                c.open_time,
                 to_timestamp(c.open_time / 1000) as candle_time,
                 c.close_price,
                 c.quote_asset_volume as volume,
-                -- 7-day baseline (42 candles for 4h)
+                -- 7-day baseline (42 candles for 4h, 168 for 1h)
                 AVG(c.quote_asset_volume) OVER (
-                    PARTITION BY c.trading_pair_id
+                    PARTITION BY tp.contract_type_id, c.trading_pair_id
                     ORDER BY c.open_time
-                    ROWS BETWEEN 42 PRECEDING AND 1 PRECEDING
+                    ROWS BETWEEN {window_7d} PRECEDING AND 1 PRECEDING
                 ) as baseline_7d,
                 -- 14-day baseline
                 AVG(c.quote_asset_volume) OVER (
-                    PARTITION BY c.trading_pair_id
+                    PARTITION BY tp.contract_type_id, c.trading_pair_id
                     ORDER BY c.open_time
-                    ROWS BETWEEN 84 PRECEDING AND 1 PRECEDING
+                    ROWS BETWEEN {window_14d} PRECEDING AND 1 PRECEDING
                 ) as baseline_14d,
                 -- 30-day baseline
                 AVG(c.quote_asset_volume) OVER (
-                    PARTITION BY c.trading_pair_id
+                    PARTITION BY tp.contract_type_id, c.trading_pair_id
                     ORDER BY c.open_time
-                    ROWS BETWEEN 180 PRECEDING AND 1 PRECEDING
+                    ROWS BETWEEN {window_30d} PRECEDING AND 1 PRECEDING
                 ) as baseline_30d
             FROM public.candles c
-            INNER JOIN public.trading_pairs tp ON c.trading_pair_id = tp.id
-            WHERE tp.exchange_id = 1  -- Binance
-              AND tp.is_active = true
-              AND tp.contract_type_id = 1  -- Futures
-              AND c.interval_id = 4  -- 4h
-              AND to_timestamp(c.open_time / 1000) >= NOW() - INTERVAL '30 days'
-              -- FILTERS: Exclude meme coins, stablecoins and low market cap
-              AND NOT public.is_meme_coin(tp.id)
-              AND NOT public.is_stablecoin_pair(tp.id)
-              AND EXISTS (
-                  SELECT 1 FROM public.tokens t
-                  JOIN public.cmc_crypto cmc ON t.cmc_token_id = cmc.cmc_token_id
-                  WHERE t.id = tp.token_id AND cmc.market_cap >= 100000000  -- >= $100M
-              )
+            -- FILTERS: eligible universe snapshot (no meme coins, stablecoins, market cap < $100M)
+            INNER JOIN pump.eligible_pairs tp ON tp.trading_pair_id = c.trading_pair_id
+                AND tp.is_eligible
+            WHERE tp.contract_type_id IN (1, 2)  -- Futures, Spot
+              AND c.interval_id = {interval_id}
+              {history}
               {time_window}
+              {partition}
         ),
         spike_data AS (
             SELECT
                 trading_pair_id,
                 pair_symbol,
+                signal_type,
+                open_time,
                 candle_time,
                 close_price,
                 volume,
@@ -207,241 +295,663 @@ class PumpDetectorDaemon:
         SELECT *
         FROM spike_data
         WHERE spike_ratio_7d >= %s  -- Minimum threshold
-          AND NOT EXISTS (
-              -- Check if signal already exists
-              SELECT 1 FROM pump.raw_signals s
-              WHERE s.trading_pair_id = spike_data.trading_pair_id
-              AND s.signal_timestamp = spike_data.candle_time
-              AND s.signal_type = 'FUTURES'
-          )
+        -- Existing signals are skipped by ON CONFLICT in save_raw_signals_bulk
         ORDER BY spike_ratio_7d DESC
-        """
+        """.format(history=history_condition, time_window=time_window_condition,
+                   partition=partition_condition, signal_filter=signal_time_filter,
+                   interval_id=int(interval_id), window_7d=windows['7d'],
+                   window_14d=windows['14d'], window_30d=windows['30d'])
 
-        # Format query based on mode
-        if time_start and time_end:
-            query = query.format(
-                time_window=time_window_condition,
-                signal_filter=signal_time_filter
-            )
-        else:
-            query = query.format(
-                time_window=time_window_condition,
-                signal_filter=signal_time_filter % self.lookback_hours
-            )
+        return query, query_params
 
-        try:
-            with self.conn.cursor() as cur:
-                if time_start and time_end:
-                    cur.execute(query, query_params)
-                else:
-                    cur.execute(query, query_params)
+    def detect_combined_anomalies(self, time_start=None, time_end=None, partition=None, pair_ids=None,
+                                  interval_id=4):
+        """Detect FUTURES and SPOT volume anomalies in a single pass
+
+        Both contract types are scanned by one query (windows partitioned by
+        contract type and pair) and returned in one result set with signal_type.
+        Candles that already have a signal are returned too; the unique key on
+        pump.raw_signals drops them at write time.
+
+        Args:
+            time_start: Start of time window (datetime) - for batch processing
+            time_end: End of time window (datetime) - for batch processing
+            partition: Optional (index, count) pair partition - for parallel backfill
+            pair_ids: Optional list of trading_pair_id to restrict the scan
+            interval_id: Candle interval (4 = 4h, 3 = 1h)
 
-                anomalies = cur.fetchall()
+        Returns:
+            List of anomaly rows (with 'signal_type' and 'interval'), ordered by spike_ratio_7d DESC
+        """
+        query, query_params = self.build_combined_query(time_start, time_end, partition, pair_ids,
+                                                        interval_id)
 
-                futures_count = 0
-                if anomalies:
-                    logger.info(f"Found {len(anomalies)} new FUTURES anomalies (memes, stablecoins, low-cap filtered)")
+        with self.conn.cursor() as cur:
+            with self.metrics.stage('query'):
+                cur.execute(query, query_params)
+            anomalies = self.metrics.fetchall(cur)
 
-                    for anomaly in anomalies:
-                        # Classify signal strength
-                        signal_strength = self.classify_signal_strength(
-                            anomaly['spike_ratio_7d'],
-                            anomaly['spike_ratio_14d']
-                        )
+        for anomaly in anomalies:
+            anomaly['interval'] = INTERVAL_NAMES[interval_id]
 
-                        signal_id = self.save_raw_signal(anomaly, signal_type='FUTURES',
-                                                        signal_strength=signal_strength)
-                        if signal_id:
-                            logger.info(f"FUTURES signal saved: {anomaly['pair_symbol']} - "
-                                      f"{anomaly['spike_ratio_7d']:.1f}x spike - {signal_strength}")
-                            futures_count += 1
+        if anomalies and self.use_robust_baselines():
+            self.attach_robust_baselines(anomalies, time_start, time_end, interval_id)
 
-                return futures_count
+        if anomalies:
+            logger.info(f"Found {len(anomalies)} anomalies (memes, stablecoins, low-cap filtered)")
 
-        except Exception as e:
-            logger.error(f"Error detecting FUTURES anomalies: {e}")
-            return 0
+        return anomalies
 
-    def detect_spot_anomalies(self, time_start=None, time_end=None):
-        """Detect SPOT volume anomalies
+    def attach_robust_baselines(self, anomalies, time_start=None, time_end=None, interval_id=4):
+        """Add median/MAD baselines to SQL path anomalies
 
-        Args:
-            time_start: Start of time window (datetime) - for batch processing
-            time_end: End of time window (datetime) - for batch processing
+        Postgres has no windowed median, so the history of the anomaly pairs is
+        loaded with the same bounds as the SQL window and evaluated with numpy.
         """
-
-        # Build time window conditions
         if time_start and time_end:
-            # Batch mode: specific time window
-            # We need to load candles from 30 days BEFORE batch start (for baselines)
-            # up to batch end (for signals in this batch)
-            from datetime import timedelta
-            baseline_start = time_start - timedelta(days=30)
-
-            time_window_condition = """
-              AND to_timestamp(c.open_time / 1000) >= %s
-              AND to_timestamp(c.open_time / 1000) < %s
-            """
-            signal_time_filter = "AND candle_time >= %s AND candle_time < %s"
-            query_params = [baseline_start, time_end, time_start, time_end,
-                           self.detection_config.get('min_spike_ratio', 1.5)]
+            batch_start_ms, batch_end_ms = window_bounds_ms(time_start, time_end)
+            since_ms, end_ms = batch_start_ms - 30 * DAY_MS, batch_end_ms
         else:
-            # Normal mode: relative lookback
-            time_window_condition = ""
-            signal_time_filter = "AND candle_time >= NOW() - INTERVAL '%s hours'"
-            query_params = [self.detection_config.get('min_spike_ratio', 1.5)]
+            since_ms, end_ms = ms_ago(days=30), None
 
-        query = """
-        WITH recent_candles AS (
-            SELECT
-                c.trading_pair_id,
-                tp.pair_symbol,
-                to_timestamp(c.open_time / 1000) as candle_time,
-                c.close_price,
-                c.quote_asset_volume as volume,
-                -- 7-day baseline (42 candles for 4h)
-                AVG(c.quote_asset_volume) OVER (
-                    PARTITION BY c.trading_pair_id
-                    ORDER BY c.open_time
-                    ROWS BETWEEN 42 PRECEDING AND 1 PRECEDING
-                ) as baseline_7d,
-                -- 14-day baseline
-                AVG(c.quote_asset_volume) OVER (
-                    PARTITION BY c.trading_pair_id
-                    ORDER BY c.open_time
-                    ROWS BETWEEN 84 PRECEDING AND 1 PRECEDING
-                ) as baseline_14d,
-                -- 30-day baseline
-                AVG(c.quote_asset_volume) OVER (
-                    PARTITION BY c.trading_pair_id
-                    ORDER BY c.open_time
-                    ROWS BETWEEN 180 PRECEDING AND 1 PRECEDING
-                ) as baseline_30d
-            FROM public.candles c
-            INNER JOIN public.trading_pairs tp ON c.trading_pair_id = tp.id
-            WHERE tp.exchange_id = 1  -- Binance
-              AND tp.is_active = true
-              AND tp.contract_type_id = 2  -- Spot
-              AND c.interval_id = 4  -- 4h
-              AND to_timestamp(c.open_time / 1000) >= NOW() - INTERVAL '30 days'
-              -- FILTERS: Exclude meme coins, stablecoins and low market cap
-              AND NOT public.is_meme_coin(tp.id)
-              AND NOT public.is_stablecoin_pair(tp.id)
-              AND EXISTS (
-                  SELECT 1 FROM public.tokens t
-                  JOIN public.cmc_crypto cmc ON t.cmc_token_id = cmc.cmc_token_id
-                  WHERE t.id = tp.token_id AND cmc.market_cap >= 100000000  -- >= $100M
-              )
-              {time_window}
-        ),
-        spike_data AS (
-            SELECT
-                trading_pair_id,
-                pair_symbol,
-                candle_time,
-                close_price,
-                volume,
-                baseline_7d,
-                baseline_14d,
-                baseline_30d,
-                CASE WHEN baseline_7d > 0 THEN volume / baseline_7d ELSE 0 END as spike_ratio_7d,
-                CASE WHEN baseline_14d > 0 THEN volume / baseline_14d ELSE 0 END as spike_ratio_14d,
-                CASE WHEN baseline_30d > 0 THEN volume / baseline_30d ELSE 0 END as spike_ratio_30d
-            FROM recent_candles
-            WHERE baseline_7d IS NOT NULL
-              {signal_filter}
-        )
-        SELECT *
-        FROM spike_data
-        WHERE spike_ratio_7d >= %s  -- Minimum threshold
-          AND NOT EXISTS (
-              -- Check if signal already exists
-              SELECT 1 FROM pump.raw_signals s
-              WHERE s.trading_pair_id = spike_data.trading_pair_id
-              AND s.signal_timestamp = spike_data.candle_time
-              AND s.signal_type = 'SPOT'
-          )
-        ORDER BY spike_ratio_7d DESC
+        pair_ids = sorted({a['trading_pair_id'] for a in anomalies})
+        with self.metrics.stage('fetch'):
+            matrices = load_candle_matrices(self.conn, since_ms, [interval_id], pair_ids, end_ms=end_ms)
+        if interval_id in matrices:
+            self.metrics.count('fetch', rows=int(matrices[interval_id].present.sum()))
+            with self.metrics.stage('classify'):
+                attach_robust_baselines(matrices[interval_id], anomalies,
+                                        baseline_windows(INTERVAL_MS[interval_id]))
+
+    def save_anomalies(self, anomalies):
+        """Classify and save anomalies to pump.raw_signals
+
+        Args:
+            anomalies: Rows with 'signal_type' (from detect_combined_anomalies
+                       or the incremental path)
+
+        Returns:
+            Dict of saved signal counts by type: {'FUTURES': n, 'SPOT': m}
         """
+        counts = {'FUTURES': 0, 'SPOT': 0}
+
+        with self.metrics.stage('classify'):
+            for anomaly in anomalies:
+                # Classify signal strength (the numpy backend classifies in bulk)
+                if 'signal_strength' not in anomaly:
+                    anomaly['signal_strength'] = self.classify_signal_strength(
+                        anomaly['spike_ratio_7d'],
+                        anomaly['spike_ratio_14d']
+                    )
+
+        with self.metrics.stage('write'):
+            inserted = self.save_raw_signals_bulk(anomalies)
+        self.metrics.count('write', rows=len(inserted))
+
+        for anomaly in anomalies:
+            key = (anomaly['trading_pair_id'], anomaly['candle_time'], anomaly['signal_type'],
+                   anomaly.get('interval', '4h'))
+            if key in inserted:
+                anomaly['signal_id'] = inserted[key]
+                if self._cycle_signals is not None:
+                    self._cycle_signals.append(anomaly)
+                logger.info(f"{anomaly['signal_type']} {anomaly.get('interval', '4h')} signal saved: {anomaly['pair_symbol']} - "
+                          f"{anomaly['spike_ratio_7d']:.1f}x spike - {anomaly['signal_strength']}")
+                counts[anomaly['signal_type']] += 1
+
+        return counts
+
+    def detect_anomalies(self, time_start=None, time_end=None, notified=None):
+        """Detect both FUTURES and SPOT anomalies
 
-        # Format query based on mode
+        Relative lookback cycles cover every configured interval (DETECTION['intervals']);
+        batch windows (historical load, backfill) cover 4h candles.
+        Relative lookback cycles are recorded in the cycle metrics file.
+
+        Args:
+            time_start: Start of time window (datetime) - for batch processing
+            time_end: End of time window (datetime) - for batch processing
+            notified: Optional {interval_id: pair ids} to check (listen mode: pairs with new closed candles)
+        """
         if time_start and time_end:
-            query = query.format(
-                time_window=time_window_condition,
-                signal_filter=signal_time_filter
-            )
-        else:
-            query = query.format(
-                time_window=time_window_condition,
-                signal_filter=signal_time_filter % self.lookback_hours
-            )
+            return self.run_detection(time_start, time_end)
 
+        self.metrics.start_cycle()
+        self._cycle_signals = []
+        self.last_signals = []
         try:
-            with self.conn.cursor() as cur:
-                if time_start and time_end:
-                    cur.execute(query, query_params)
-                else:
-                    cur.execute(query, query_params)
+            new_signals = self.run_detection(notified=notified)
+            # A positive count means the signals were committed (errors roll back and return 0)
+            if new_signals:
+                self.last_signals = self._cycle_signals
+            return new_signals
+        except Exception:
+            self.metrics.record_error()
+            raise
+        finally:
+            self._cycle_signals = None
+            self.metrics.finish_cycle('skipped' if self.last_cycle_skipped else 'ok')
 
-                anomalies = cur.fetchall()
+    def run_detection(self, time_start=None, time_end=None, notified=None):
+        """One detection pass (see detect_anomalies)"""
 
-                spot_count = 0
-                if anomalies:
-                    logger.info(f"Found {len(anomalies)} new SPOT anomalies (memes, stablecoins, low-cap filtered)")
+        # Ensure we have a database connection
+        if not self.conn:
+            self.connect()
 
-                    for anomaly in anomalies:
-                        # Classify signal strength
-                        signal_strength = self.classify_signal_strength(
-                            anomaly['spike_ratio_7d'],
-                            anomaly['spike_ratio_14d']
-                        )
+        self.ensure_eligible_pairs()
+
+        # Relative lookback: skip the cycle unless some pair has a new closed candle
+        advanced = None
+        if not (time_start and time_end):
+            advanced = self.find_advanced_pairs(notified)
+            self.last_cycle_skipped = advanced is not None and not any(advanced.values())
+            if self.last_cycle_skipped:
+                self.cycle_stats['skipped'] += 1
+                logger.info(f"No new closed candles since last cycle, detection skipped "
+                           f"(executed: {self.cycle_stats['executed']}, skipped: {self.cycle_stats['skipped']})")
+                return 0
+            self.cycle_stats['executed'] += 1
+            if advanced:
+                logger.info("Pairs with new closed candles: " + ", ".join(
+                    f"{INTERVAL_NAMES[interval_id]}: {len(pairs)}" for interval_id, pairs in advanced.items()))
+
+        # Relative lookback uses the incremental baseline state or the numpy backend
+        # instead of the SQL window scan, unless configured otherwise
+        if not (time_start and time_end):
+            backend = self.detection_backend()
+            if backend == 'incremental':
+                return self.detect_anomalies_incremental(advanced)
+            if backend == 'numpy':
+                return self.detect_anomalies_vectorized(advanced)
+
+        if self.shadow and not (time_start and time_end):
+            logger.warning("Shadow mode needs the incremental or numpy backend, skipped for the SQL scan")
 
-                        signal_id = self.save_raw_signal(anomaly, signal_type='SPOT',
-                                                        signal_strength=signal_strength)
-                        if signal_id:
-                            logger.info(f"SPOT signal saved: {anomaly['pair_symbol']} - "
-                                      f"{anomaly['spike_ratio_7d']:.1f}x spike - {signal_strength}")
-                            spot_count += 1
+        try:
+            # One candle scan, filter evaluation and anti-join for both contract types
+            # (per interval: the ROWS window lengths differ)
+            anomalies = []
+            for interval_id in ([4] if time_start and time_end else self.intervals):
+                interval_advanced = advanced.get(interval_id) if advanced is not None else None
+                if advanced is not None and not interval_advanced:
+                    continue
+                anomalies.extend(self.detect_combined_anomalies(
+                    time_start, time_end, pair_ids=interval_advanced, interval_id=interval_id))
+            counts = self.save_anomalies(anomalies)
+
+            futures_count = counts['FUTURES']
+            spot_count = counts['SPOT']
+            total_count = futures_count + spot_count
 
-                return spot_count
+            if total_count > 0:
+                logger.info(f"Total new signals: {total_count} (FUTURES: {futures_count}, SPOT: {spot_count})")
+
+            # Watermarks move in the same transaction as the signals they produced
+            self.save_watermarks(advanced)
+
+            if total_count > 0 or advanced:
+                with self.metrics.stage('commit'):
+                    self.conn.commit()
+
+            return total_count
 
         except Exception as e:
-            logger.error(f"Error detecting SPOT anomalies: {e}")
+            logger.error(f"Error in detect_anomalies: {e}")
+            self.metrics.record_error()
+            if self.conn:
+                self.conn.rollback()
             return 0
 
-    def detect_anomalies(self, time_start=None, time_end=None):
-        """Detect both FUTURES and SPOT anomalies
+    def ensure_eligible_pairs(self):
+        """Rebuild pump.eligible_pairs if the snapshot is empty or older than the max age
+
+        Normally rebuilt by scripts/rebuild_eligible_pairs.py after the CMC refresh;
+        this keeps the detector working if that cron run was missed.
+        """
+        max_age = self.detection_config.get('eligible_pairs_max_age_hours', 24)
+
+        try:
+            age_hours = get_snapshot_age_hours(self.conn)
+            self.conn.rollback()  # end the read-only transaction
+
+            if age_hours is None or age_hours > max_age:
+                logger.info(f"Eligible pairs snapshot is "
+                           f"{'empty' if age_hours is None else f'{age_hours:.1f}h old'}, rebuilding...")
+                rebuild_eligible_pairs(self.conn)
+        except Exception as e:
+            logger.error(f"Error refreshing eligible pairs snapshot: {e}")
+            self.conn.rollback()
+
+    def find_advanced_pairs(self, notified=None):
+        """Pairs whose last closed candle is newer than the detector watermark, per interval
 
         Args:
-            time_start: Start of time window (datetime) - for batch processing
-            time_end: End of time window (datetime) - for batch processing
+            notified: Optional {interval_id: pair ids} to check (default: all eligible pairs)
+
+        Returns:
+            {interval_id: {trading_pair_id: open_time}} (all empty -> nothing to do),
+            or None when the check is disabled or failed (run a full cycle)
         """
+        if not self.detection_config.get('skip_without_new_candles', True):
+            return None
 
-        # Ensure we have a database connection
-        if not self.conn:
-            self.connect()
+        since_ms = ms_ago(hours=self.lookback_hours)
+        advanced = {}
 
         try:
-            # Detect FUTURES anomalies
-            futures_count = self.detect_futures_anomalies(time_start, time_end)
+            for interval_id in self.intervals:
+                if notified is not None and not notified.get(interval_id):
+                    continue
+                pair_ids = notified[interval_id] if notified is not None else None
+                with self.metrics.stage('fetch'):
+                    pairs = find_advanced_pairs(self.conn, interval_id, since_ms, pair_ids)
+                self.metrics.count('fetch', rows=len(pairs))
+                if pairs:
+                    advanced[interval_id] = pairs
+            return advanced
+        except Exception as e:
+            logger.error(f"Error checking candle watermarks: {e}")
+            self.metrics.record_error()
+            self.conn.rollback()
+            return None
 
-            # Detect SPOT anomalies
-            spot_count = self.detect_spot_anomalies(time_start, time_end)
+    def save_watermarks(self, advanced):
+        """Move watermarks of the pairs processed this cycle (no commit)"""
+        with self.metrics.stage('write'):
+            for interval_id, pairs in (advanced or {}).items():
+                save_watermarks(self.conn, interval_id, pairs)
 
-            total_count = futures_count + spot_count
+    def detection_backend(self):
+        """Backend of monitoring/once cycles: 'incremental', 'numpy' or 'sql'
 
+        --full-scan forces the SQL window scan; otherwise --backend, then
+        DETECTION['backend'], then DETECTION['incremental_baselines'].
+        """
+        if self.full_scan:
+            return 'sql'
+        backend = self.backend or self.detection_config.get('backend')
+        if backend:
+            return backend
+        return 'incremental' if self.detection_config.get('incremental_baselines', True) else 'sql'
+
+    def use_incremental_baselines(self):
+        """Whether monitoring/once cycles use the incremental baseline state"""
+        return self.detection_backend() == 'incremental'
+
+    def use_robust_baselines(self):
+        """Whether median/MAD baselines are computed and stored (DETECTION['robust_baselines'])"""
+        return bool(self.detection_config.get('robust_baselines', False))
+
+    def qualifies(self, spike_ratio_7d, volume, median_7d=None, config=None):
+        """Whether a candle is an anomaly
+
+        Mean spike ratio above min_spike_ratio, or - with robust baselines and
+        DETECTION['robust_min_spike_ratio'] set - volume / median_7d above it
+        (catches spikes hidden by earlier spikes inflating the mean).
+        """
+        config = config or self.detection_config
+        if spike_ratio_7d >= config.get('min_spike_ratio', 1.5):
+            return True
+        robust_min = config.get('robust_min_spike_ratio')
+        return bool(robust_min is not None and median_7d and median_7d > 0
+                    and volume / median_7d >= robust_min)
+
+    def active_intervals(self, advanced):
+        """Configured interval_ids to process this cycle (all if the watermark check is off)"""
+        if advanced is None:
+            return list(self.intervals)
+        return [interval_id for interval_id in self.intervals if advanced.get(interval_id)]
+
+    @staticmethod
+    def advanced_pair_ids(advanced):
+        """Union of advanced pairs over intervals (None: no restriction)"""
+        if advanced is None:
+            return None
+        return sorted({pair_id for pairs in advanced.values() for pair_id in pairs})
+
+    def detect_anomalies_vectorized(self, advanced=None):
+        """Detect FUTURES and SPOT anomalies with the NumPy backend
+
+        Loads the 30-day candle history of all eligible pairs (or only the pairs
+        that advanced) for every configured interval with one query into
+        pairs x time matrices and computes baselines, spike ratios and strength
+        classes in vectorized form. Results match the SQL window path
+        (see tests/test_vectorized_detector.py).
+        """
+        try:
+            current_ms = now_ms()
+            interval_ids = self.active_intervals(advanced)
+
+            started = time.time()
+            with self.metrics.stage('fetch'):
+                matrices = load_candle_matrices(self.conn, ms_ago(days=30, now=current_ms), interval_ids,
+                                                pair_ids=self.advanced_pair_ids(advanced))
+            self.metrics.count('fetch', rows=sum(int(m.present.sum()) for m in matrices.values()))
+            loaded = time.time()
+
+            anomalies = []
+            with self.metrics.stage('classify'):
+                for interval_id, matrix in matrices.items():
+                    interval_anomalies = detect_matrix(
+                        matrix, ms_ago(hours=self.lookback_hours, now=current_ms), self.detection_config,
+                        windows=baseline_windows(INTERVAL_MS[interval_id]),
+                        robust=self.use_robust_baselines())
+                    for anomaly in interval_anomalies:
+                        anomaly['interval'] = INTERVAL_NAMES[interval_id]
+                    anomalies.extend(interval_anomalies)
+                anomalies.sort(key=lambda a: a['spike_ratio_7d'], reverse=True)
+
+                # Shadow variant on the same matrices: no extra query
+                shadow_anomalies = []
+                if self.shadow:
+                    shadow_cfg = self.shadow[1]
+                    for interval_id, matrix in matrices.items():
+                        interval_anomalies = detect_matrix(
+                            matrix, ms_ago(hours=self.lookback_hours, now=current_ms), shadow_cfg,
+                            windows=baseline_windows(INTERVAL_MS[interval_id]),
+                            robust=bool(shadow_cfg.get('robust_baselines')))
+                        for anomaly in interval_anomalies:
+                            anomaly['interval'] = INTERVAL_NAMES[interval_id]
+                        shadow_anomalies.extend(interval_anomalies)
+            computed = time.time()
+
+            counts = self.save_anomalies(anomalies)
+            if self.shadow:
+                self.run_shadow(anomalies, shadow_anomalies)
+            self.save_watermarks(advanced)
+            with self.metrics.stage('commit'):
+                self.conn.commit()
+
+            shapes = ", ".join(f"{INTERVAL_NAMES[i]}: {m.shape[0]} pairs x {m.shape[1]} candles"
+                               for i, m in matrices.items())
+            logger.info(f"Vectorized detection: {shapes or 'no candles'}, "
+                       f"load {loaded - started:.2f}s, compute {computed - loaded:.3f}s, "
+                       f"{len(anomalies)} anomalies")
+
+            total_count = counts['FUTURES'] + counts['SPOT']
             if total_count > 0:
-                logger.info(f"Total new signals: {total_count} (FUTURES: {futures_count}, SPOT: {spot_count})")
+                logger.info(f"Total new signals: {total_count} "
+                           f"(FUTURES: {counts['FUTURES']}, SPOT: {counts['SPOT']})")
+
+            return total_count
+
+        except Exception as e:
+            logger.error(f"Error in vectorized detection: {e}")
+            self.metrics.record_error()
+            if self.conn:
+                self.conn.rollback()
+            return 0
+
+    def build_closed_candles_query(self, since_ms, pair_ids=None, interval_ids=(4,)):
+        """Build the closed candles query of the incremental path
+
+        Returns:
+            (query, params)
+        """
+        time_condition, params = open_time_predicate('c', start_ms=since_ms)
+        pair_filter = "AND c.trading_pair_id = ANY(%s)" if pair_ids else ""
+        if pair_ids:
+            params.append(list(pair_ids))
+
+        query = """
+        SELECT
+            c.interval_id,
+            c.trading_pair_id,
+            tp.pair_symbol,
+            CASE WHEN tp.contract_type_id = 1 THEN 'FUTURES' ELSE 'SPOT' END as signal_type,
+            c.open_time,
+            to_timestamp(c.open_time / 1000) as candle_time,
+            c.close_price,
+            c.quote_asset_volume as volume
+        FROM public.candles c
+        -- FILTERS: eligible universe snapshot (no meme coins, stablecoins, market cap < $100M)
+        INNER JOIN pump.eligible_pairs tp ON tp.trading_pair_id = c.trading_pair_id
+            AND tp.is_eligible
+        WHERE tp.contract_type_id IN (1, 2)  -- Futures, Spot
+          AND c.interval_id = ANY(%s)
+          AND c.is_closed = true
+          {time_condition}
+          {pair_filter}
+        ORDER BY c.interval_id, c.trading_pair_id, c.open_time
+        """.format(time_condition=time_condition, pair_filter=pair_filter)
+
+        return query, [list(interval_ids)] + params
+
+    def fetch_closed_candles(self, since_ms, pair_ids=None, interval_ids=(4,)):
+        """Fetch closed candles of eligible SPOT and FUTURES pairs
+
+        Args:
+            since_ms: Only candles with open_time >= since_ms (milliseconds)
+            pair_ids: Optional list of trading_pair_id to restrict the fetch
+            interval_ids: Candle intervals to fetch in the same query
+        """
+        query, params = self.build_closed_candles_query(since_ms, pair_ids, interval_ids)
+
+        with self.conn.cursor() as cur:
+            with self.metrics.stage('query'):
+                cur.execute(query, params)
+            return self.metrics.fetchall(cur)
+
+    def get_baseline_store(self, interval_id):
+        """Baseline state of one interval, loaded from pump.detector_baseline_state on first use"""
+        store = self.baseline_stores.get(interval_id)
+        if store is None:
+            # Median/MAD are kept if production or the shadow variant uses them
+            robust = self.use_robust_baselines() or bool(self.shadow and self.shadow[1].get('robust_baselines'))
+            store = BaselineStateStore.for_interval(interval_id, INTERVAL_MS[interval_id], robust=robust)
+            with self.metrics.stage('fetch'):
+                self.metrics.count('fetch', rows=store.load(self.conn))
+            self.baseline_stores[interval_id] = store
+        return store
+
+    def detect_anomalies_incremental(self, advanced=None):
+        """Detect FUTURES and SPOT anomalies from the incremental baseline state
+
+        Only candles closed after each pair's watermark are folded into the
+        state, so a cycle costs O(new candles) instead of a 30-day window scan.
+        New candles of all configured intervals are fetched by one query.
+        Pairs without state (first run, newly listed) are seeded from their
+        30-day history.
+
+        Only closed candles (is_closed) are folded: a forming candle would move
+        the pair's watermark past itself. The SQL (build_combined_query) and NumPy
+        paths do not filter on is_closed and can also report the forming candle
+        with its partial volume; here it is reported once it has closed. Baselines
+        of closed candles are the same on all paths - the windows only cover
+        preceding candles, and the forming candle is always the last one.
+
+        Args:
+            advanced: Optional {interval_id: {trading_pair_id: open_time}} from
+                      find_advanced_pairs - only these pairs are fetched and their
+                      watermarks moved
+        """
+        try:
+            current_ms = now_ms()
+            since_ms = ms_ago(hours=self.lookback_hours, now=current_ms)
+            interval_ids = self.active_intervals(advanced)
+
+            fetched = self.fetch_closed_candles(since_ms, pair_ids=self.advanced_pair_ids(advanced),
+                                                interval_ids=interval_ids)
+
+            anomalies = []
+            shadow_anomalies = []
+            folded = 0
+            saved_pairs = 0
+
+            for interval_id in interval_ids:
+                store = self.get_baseline_store(interval_id)
+                candles = [c for c in fetched if c['interval_id'] == interval_id]
+                candidates, interval_folded = self.fold_closed_candles(
+                    store, candles, since_ms, current_ms)
+                anomalies.extend(self.select_anomalies(candidates))
+                if self.shadow:
+                    # Shadow variant: same candles and baselines, its own thresholds
+                    shadow_anomalies.extend(self.select_anomalies(candidates, self.shadow[1]))
+                folded += interval_folded
+
+            anomalies.sort(key=lambda a: a['spike_ratio_7d'], reverse=True)
+
+            counts = self.save_anomalies(anomalies)
+            if self.shadow:
+                self.run_shadow(anomalies, shadow_anomalies)
+
+            # State snapshot goes into the same transaction as the signals
+            with self.metrics.stage('write'):
+                for interval_id in interval_ids:
+                    saved_pairs += self.baseline_stores[interval_id].save(self.conn)
+            self.save_watermarks(advanced)
+            with self.metrics.stage('commit'):
                 self.conn.commit()
 
+            total_count = counts['FUTURES'] + counts['SPOT']
+            logger.info(f"Incremental baselines: {folded} new closed candles folded, "
+                       f"{saved_pairs} pairs updated")
+            if total_count > 0:
+                logger.info(f"Total new signals: {total_count} "
+                           f"(FUTURES: {counts['FUTURES']}, SPOT: {counts['SPOT']})")
+
             return total_count
 
         except Exception as e:
-            logger.error(f"Error in detect_anomalies: {e}")
+            logger.error(f"Error in incremental detection: {e}")
+            self.metrics.record_error()
             if self.conn:
                 self.conn.rollback()
+            # In-memory state may be ahead of the snapshot - reload next cycle
+            self.baseline_stores = {}
             return 0
 
+    def fold_closed_candles(self, store, candles, since_ms, current_ms):
+        """Fold new closed candles of one interval into its baseline state
+
+        Returns:
+            (candidate rows: candles inside the lookback window that have a 7d
+             baseline, with baselines and spike ratios - see select_anomalies;
+             number of candles folded)
+        """
+        interval_id = store.interval_id
+
+        # Pairs whose state has a gap before the fetched candles (daemon was down
+        # longer than the lookback) are re-seeded like pairs without state
+        first_open = {}
+        for c in candles:
+            first_open.setdefault(c['trading_pair_id'], c['open_time'])
+        stale = {pair_id for pair_id, open_time in first_open.items()
+                 if pair_id in store
+                 and open_time > store.last_open_time(pair_id) + store.interval_ms}
+        store.drop(stale)
+
+        # Seed pairs we have no state for from their full 30-day history
+        unknown = {c['trading_pair_id'] for c in candles} - set(store.pairs)
+        if unknown:
+            logger.info(f"Seeding {INTERVAL_NAMES[interval_id]} baseline state for {len(unknown)} pairs "
+                       f"from 30-day history")
+            candles = [c for c in candles if c['trading_pair_id'] not in unknown]
+            candles.extend(self.fetch_closed_candles(current_ms - MAX_HISTORY_MS, pair_ids=unknown,
+                                                     interval_ids=[interval_id]))
+            candles.sort(key=lambda c: (c['trading_pair_id'], c['open_time']))
+
+        anomalies = []
+        folded = 0
+
+        with self.metrics.stage('classify'):
+            for candle in candles:
+                baselines = store.update(candle['trading_pair_id'], candle['open_time'], candle['volume'])
+                if baselines is None:
+                    continue
+                folded += 1
+
+                if baselines['7d'] is None or candle['open_time'] < since_ms:
+                    continue
+
+                volume = float(candle['volume'] or 0)
+                ratios = {name: (volume / baselines[name] if baselines[name] and baselines[name] > 0 else 0)
+                          for name in store.windows}
+
+                anomaly = {
+                    'trading_pair_id': candle['trading_pair_id'],
+                    'pair_symbol': candle['pair_symbol'],
+                    'signal_type': candle['signal_type'],
+                    'interval': INTERVAL_NAMES[interval_id],
+                    'candle_time': candle['candle_time'],
+                    'close_price': candle['close_price'],
+                    'volume': volume,
+                    'baseline_7d': baselines['7d'],
+                    'baseline_14d': baselines['14d'],
+                    'baseline_30d': baselines['30d'],
+                    'spike_ratio_7d': ratios['7d'],
+                    'spike_ratio_14d': ratios['14d'],
+                    'spike_ratio_30d': ratios['30d'],
+                }
+                if store.robust:
+                    anomaly.update({field: baselines[field] for field in ROBUST_FIELDS})
+                anomalies.append(anomaly)
+
+        return anomalies, folded
+
+    def select_anomalies(self, candidates, config=None):
+        """Candidate rows of fold_closed_candles that qualify under config (default: DETECTION)
+
+        Median/MAD fields are kept only if the config has robust_baselines on.
+        """
+        config = config or self.detection_config
+        robust = bool(config.get('robust_baselines'))
+        selected = []
+        with self.metrics.stage('classify'):
+            for candidate in candidates:
+                if not self.qualifies(candidate['spike_ratio_7d'], candidate['volume'],
+                                      candidate.get('median_7d'), config):
+                    continue
+                anomaly = dict(candidate)
+                if not robust:
+                    for field in ROBUST_FIELDS:
+                        anomaly.pop(field, None)
+                selected.append(anomaly)
+        return selected
+
+    def run_shadow(self, production, shadow_anomalies):
+        """Store and diff the shadow variant's signals of this cycle (no commit)
+
+        Shadow rows go to pump.shadow_signals inside a savepoint, so a failure
+        there never rolls back the production signals of the cycle. The diff
+        (added/removed/changed signals per pair, ratio deltas) is appended to
+        reports/shadow/shadow_<variant>_<date>.jsonl and logged.
+
+        Args:
+            production: Production anomalies of the cycle (classified by save_anomalies)
+            shadow_anomalies: Anomalies of the shadow variant
+        """
+        variant, config = self.shadow
+
+        with self.metrics.stage('classify'):
+            for anomaly in shadow_anomalies:
+                if 'signal_strength' not in anomaly:
+                    anomaly['signal_strength'] = self.classify_signal_strength(
+                        anomaly['spike_ratio_7d'], anomaly['spike_ratio_14d'], config)
+            diff = diff_signals(production, shadow_anomalies)
+
+        with self.conn.cursor() as cur:
+            cur.execute("SAVEPOINT shadow_signals")
+        try:
+            with self.metrics.stage('write'):
+                saved = save_shadow_signals(self.conn, variant, shadow_anomalies)
+            self.metrics.count('write', rows=saved)
+            with self.conn.cursor() as cur:
+                cur.execute("RELEASE SAVEPOINT shadow_signals")
+        except psycopg2.Error as e:
+            logger.error(f"Error saving shadow signals: {e}")
+            with self.conn.cursor() as cur:
+                cur.execute("ROLLBACK TO SAVEPOINT shadow_signals")
+
+        try:
+            write_report(self.shadow_report_dir, variant, diff)
+        except OSError as e:
+            logger.warning(f"Failed to write shadow report: {e}")
+
+        logger.info(format_summary(variant, diff))
+        return diff
+
     def run_batched_historical_load(self):
         """
         Run historical data load in batches to prevent PostgreSQL from hanging
@@ -511,15 +1021,222 @@ class PumpDetectorDaemon:
 
         return total_signals
 
-    def save_raw_signal(self, anomaly, signal_type='FUTURES', signal_strength='MEDIUM'):
+    def count_chunk_candles(self, start_ms, end_ms, partition=None):
+        """Count eligible 4h candles in [start_ms, end_ms) - backfill throughput metric"""
+        time_condition, params = open_time_predicate('c', start_ms=start_ms, end_ms=end_ms)
+        partition_condition = ""
+        if partition:
+            partition_condition = "AND c.trading_pair_id %% %s = %s"
+            params += [partition[1], partition[0]]
+
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                SELECT COUNT(*) as candles
+                FROM public.candles c
+                INNER JOIN pump.eligible_pairs tp ON tp.trading_pair_id = c.trading_pair_id
+                    AND tp.is_eligible
+                WHERE tp.contract_type_id IN (1, 2)
+                  AND c.interval_id = 4
+                  {time_condition}
+                  {partition_condition}
+            """.format(time_condition=time_condition, partition_condition=partition_condition), params)
+            return cur.fetchone()['candles']
+
+    def process_backfill_chunk(self, run_key, chunk):
+        """
+        Detect and save anomalies of one backfill chunk
+
+        Signals and the DONE checkpoint are committed in one transaction,
+        so a chunk is either fully recorded or retried on resume.
+
+        Returns:
+            {'chunk': chunk, 'candles': int, 'signals': int, 'seconds': float, 'error': str or None}
+        """
+        if not self.conn:
+            self.connect()
+
+        started = time.time()
+        partition = (chunk['partition'], chunk['partitions'])
+
+        try:
+            anomalies = self.detect_combined_anomalies(
+                from_ms(chunk['chunk_start_ms']), from_ms(chunk['chunk_end_ms']), partition
+            )
+            counts = self.save_anomalies(anomalies)
+            signals = counts['FUTURES'] + counts['SPOT']
+            candles = self.count_chunk_candles(chunk['chunk_start_ms'], chunk['chunk_end_ms'], partition)
+
+            seconds = time.time() - started
+            mark_chunk(self.conn, run_key, chunk, 'DONE', candles, signals, seconds)
+            self.conn.commit()
+
+            return {'chunk': chunk, 'candles': candles, 'signals': signals,
+                    'seconds': seconds, 'error': None}
+
+        except Exception as e:
+            logger.error(f"Error in backfill chunk {chunk}: {e}")
+            self.conn.rollback()
+            try:
+                mark_chunk(self.conn, run_key, chunk, 'FAILED',
+                           seconds=time.time() - started, error=str(e)[:1000])
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+            return {'chunk': chunk, 'candles': 0, 'signals': 0,
+                    'seconds': time.time() - started, 'error': str(e)}
+
+    def run_backfill(self, time_from, time_to, workers=None, chunk_hours=None, partitions=None):
+        """
+        Parallel, resumable historical backfill for an arbitrary [time_from, time_to) range
+
+        The range is split into chunk_hours windows x pair partitions. Chunks run
+        in a process pool with one database connection per worker; completed
+        chunks are checkpointed in pump.detector_backfill_chunks, so re-running
+        the same command after a crash only processes the remaining chunks.
+        The range end is not part of the checkpoint key: a re-run without --to
+        (up to now) resumes too, and extends the last window of the earlier run.
+
+        Args:
+            time_from: Range start (datetime)
+            time_to: Range end (datetime)
+            workers: Worker processes (default DETECTION['backfill_workers'])
+            chunk_hours: Window size per chunk (default DETECTION['backfill_chunk_hours'])
+            partitions: Pair partitions per window (default DETECTION['backfill_partitions'])
+
+        Returns:
+            Total signals inserted by this run
         """
-        Save detected signal to pump.raw_signals
+        workers = workers or self.detection_config.get('backfill_workers', 4)
+        chunk_hours = chunk_hours or self.detection_config.get('backfill_chunk_hours', 48)
+        partitions = partitions or self.detection_config.get('backfill_partitions', workers)
+
+        start_ms, end_ms = window_bounds_ms(time_from, time_to)
+        run_key = make_run_key(start_ms, chunk_hours, partitions)
+        chunks = plan_chunks(start_ms, end_ms, chunk_hours, partitions)
+
+        if not self.conn:
+            self.connect()
+        self.ensure_eligible_pairs()
+
+        pending = pending_chunks(chunks, load_completed_chunks(self.conn, run_key))
+
+        logger.info("="*70)
+        logger.info("PARALLEL BACKFILL")
+        logger.info(f"Range: {from_ms(start_ms):%Y-%m-%d %H:%M} to {from_ms(end_ms):%Y-%m-%d %H:%M} UTC")
+        logger.info(f"Chunks: {len(chunks)} ({chunk_hours}h windows x {partitions} pair partitions)")
+        logger.info(f"Already completed: {len(chunks) - len(pending)} | Pending: {len(pending)} | Workers: {workers}")
+        logger.info(f"Checkpoint key: {run_key}")
+        logger.info("="*70)
+
+        progress = BackfillProgress(len(chunks), len(chunks) - len(pending), time.time())
+
+        if pending:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_backfill_worker,
+                                     initargs=(self.full_scan,)) as pool:
+                futures = [pool.submit(_run_backfill_chunk, run_key, chunk) for chunk in pending]
 
-        V2.0 Changes:
-        - Writes to pump.raw_signals instead of pump.signals
-        - No confidence calculation (done separately by PumpDetectionEngine)
-        - Simplified schema
+                for future in as_completed(futures):
+                    result = future.result()
+                    progress.add(result)
+                    chunk = result['chunk']
+                    window = f"{from_ms(chunk['chunk_start_ms']):%Y-%m-%d %H:%M}"
+                    status = f"✗ {result['error']}" if result['error'] else \
+                        f"✓ {result['candles']} candles, {result['signals']} signals in {result['seconds']:.1f}s"
+                    logger.info(f"  [{window} p{chunk['partition']}] {status}")
+                    logger.info(f"  Progress: {progress.format(time.time())}")
+
+        rates = progress.rates(time.time())
+        logger.info("="*70)
+        logger.info("BACKFILL COMPLETE" if not progress.failed else
+                    f"BACKFILL FINISHED WITH {progress.failed} FAILED CHUNKS (re-run to retry)")
+        logger.info(f"Signals inserted: {progress.signals} | Candles scanned: {progress.candles}")
+        logger.info(f"Throughput: {rates['candles_per_sec']:.0f} candles/sec, "
+                    f"{rates['signals_per_sec']:.2f} signals/sec over {rates['elapsed']:.1f}s")
+        logger.info("="*70)
+
+        return progress.signals
+
+    def run_event_driven(self, cycle=None):
         """
+        Listen mode: run detection when closed candles land in public.candles
+
+        Waits on the candle_closed channel (migration 014), debounces the burst
+        of notifications the collector produces and runs detection only for the
+        pairs that received a new closed candle of a configured interval. If nothing arrives within
+        interval_minutes, a regular watermark-checked cycle runs as a safety net
+        (e.g. for notifications missed while reconnecting).
+
+        Args:
+            cycle: Callable(notified=None) -> new signal count run per batch
+                   (default: detect_anomalies; the pipeline daemon adds analysis and alerts)
+        """
+        cycle = cycle or self.detect_anomalies
+        listener = CandleListener(
+            self.connection_params(),
+            debounce_seconds=self.detection_config.get('listen_debounce_seconds', 5),
+            max_wait_seconds=self.detection_config.get('listen_max_wait_seconds', 60),
+            pool=self.pool,
+        )
+        fallback_seconds = self.detection_config.get('interval_minutes', 5) * 60
+        cycle_count = 0
+
+        # Catch up on candles closed while the daemon was down
+        listener.connect()
+        cycle()
+
+        while self.running:
+            try:
+                batch = listener.wait(fallback_seconds, should_continue=lambda: self.running)
+                if not self.running:
+                    break
+
+                cycle_count += 1
+                notified = {interval_id: pairs for interval_id, pairs in batch.items()
+                            if interval_id in self.intervals}
+                if batch and not notified:
+                    continue  # only intervals this detector does not handle
+
+                if notified:
+                    logger.info(f"Cycle #{cycle_count}: new closed candles - " + ", ".join(
+                        f"{INTERVAL_NAMES[i]}: {len(p)} pairs" for i, p in notified.items()))
+                else:
+                    logger.debug(f"Cycle #{cycle_count}: no notifications for {fallback_seconds}s, safety check")
+
+                new_signals = cycle(notified=notified or None)
+                if new_signals > 0:
+                    logger.info(f"Cycle #{cycle_count} complete: {new_signals} new signals detected")
+
+            except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+                logger.error(f"Database connection lost in listen mode: {e}, reconnecting...")
+                time.sleep(10)
+                listener.close()
+                self.disconnect()
+                try:
+                    self.connect()
+                    listener.connect()
+                    # Notifications sent while disconnected are lost - sweep all pairs
+                    cycle()
+                except Exception as e:
+                    logger.error(f"Reconnect failed: {e}")
+
+        listener.close()
+
+    def save_raw_signals_bulk(self, anomalies):
+        """
+        Save classified anomalies to pump.raw_signals in one statement
+
+        Relies on the unique key (trading_pair_id, signal_timestamp, signal_type, interval):
+        rows that already exist are skipped by ON CONFLICT DO NOTHING, so the
+        detection query does not need a NOT EXISTS anti-join.
+
+        Args:
+            anomalies: Rows with 'signal_type' and 'signal_strength'
+
+        Returns:
+            Dict {(trading_pair_id, signal_timestamp, signal_type, interval): id} of inserted rows
+        """
+        if not anomalies:
+            return {}
 
         insert_query = """
         INSERT INTO pump.raw_signals (
@@ -537,43 +1254,54 @@ class PumpDetectorDaemon:
             spike_ratio_30d,
             signal_strength,
             price_at_signal,
-            detector_version
-        ) VALUES (
-            %s, %s, %s, NOW(), %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, '2.0'
-        )
-        RETURNING id
+            detector_version,
+            interval,
+            median_7d,
+            median_14d,
+            median_30d,
+            mad_7d,
+            mad_14d,
+            mad_30d
+        ) VALUES %s
+        ON CONFLICT (trading_pair_id, signal_timestamp, signal_type, interval) DO NOTHING
+        RETURNING id, trading_pair_id, signal_timestamp, signal_type, interval
         """
 
-        try:
-            with self.conn.cursor() as cur:
-                cur.execute(insert_query, (
-                    anomaly['trading_pair_id'],
-                    anomaly['pair_symbol'],
-                    anomaly['candle_time'],
-                    signal_type,
-                    anomaly['volume'],
-                    anomaly['baseline_7d'],
-                    anomaly['baseline_14d'],
-                    anomaly['baseline_30d'],
-                    anomaly['spike_ratio_7d'],
-                    anomaly['spike_ratio_14d'],
-                    anomaly['spike_ratio_30d'],
-                    signal_strength,
-                    anomaly['close_price']
-                ))
-
-                result = cur.fetchone()
-                return result['id'] if result else None
-
-        except Exception as e:
-            logger.error(f"Error saving {signal_type} signal: {e}")
-            return None
+        template = ("(%s, %s, %s, NOW(), %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, '2.0', %s, "
+                    "%s, %s, %s, %s, %s, %s)")
+
+        rows = [(
+            anomaly['trading_pair_id'],
+            anomaly['pair_symbol'],
+            anomaly['candle_time'],
+            anomaly['signal_type'],
+            anomaly['volume'],
+            anomaly['baseline_7d'],
+            anomaly['baseline_14d'],
+            anomaly['baseline_30d'],
+            anomaly['spike_ratio_7d'],
+            anomaly['spike_ratio_14d'],
+            anomaly['spike_ratio_30d'],
+            anomaly['signal_strength'],
+            anomaly['close_price'],
+            anomaly.get('interval', '4h'),
+            *(anomaly.get(field) for field in ROBUST_FIELDS)
+        ) for anomaly in anomalies]
+
+        with self.conn.cursor() as cur:
+            inserted = execute_values(cur, insert_query, rows, template=template,
+                                      page_size=1000, fetch=True)
+
+        return {(r['trading_pair_id'], r['signal_timestamp'], r['signal_type'], r['interval']): r['id']
+                for r in inserted}
 
     def run(self):
         """Main daemon loop"""
 
         if self.historical_mode:
             mode_str = "HISTORICAL MODE (V2.0) - BATCHED"
+        elif self.listen_mode:
+            mode_str = "LISTEN MODE (candle_closed notifications) (V2.0)"
         elif self.once_mode:
             mode_str = "ONCE MODE (cron) (V2.0)"
         else:
@@ -583,9 +1311,15 @@ class PumpDetectorDaemon:
         logger.info(f"Lookback period: {self.lookback_hours} hours ({self.lookback_hours/24:.1f} days)")
         logger.info(f"Min spike ratio: {self.detection_config.get('min_spike_ratio', 1.5)}x")
         logger.info(f"Writing to: pump.raw_signals")
-        logger.info(f"Filters enabled: meme coins, stablecoins, market cap < $100M")
-
-        if not self.historical_mode and not self.once_mode:
+        logger.info(f"Filters enabled: meme coins, stablecoins, market cap < $100M (pump.eligible_pairs)")
+        if not self.historical_mode:
+            logger.info(f"Detection backend: {self.detection_backend()}")
+            logger.info(f"Intervals: {', '.join(INTERVAL_NAMES[i] for i in self.intervals)}")
+
+        if self.listen_mode:
+            logger.info(f"Debounce: {self.detection_config.get('listen_debounce_seconds', 5)}s, "
+                       f"safety check every {self.detection_config.get('interval_minutes', 5)} minutes")
+        elif not self.historical_mode and not self.once_mode:
             logger.info(f"Detection interval: {self.detection_config.get('interval_minutes', 5)} minutes")
 
         self.connect()
@@ -607,6 +1341,18 @@ class PumpDetectorDaemon:
                     self.conn.close()
                 logger.info("Pump Detector Daemon V2.0 stopped")
 
+        # Event-driven mode (LISTEN candle_closed)
+        if self.listen_mode:
+            try:
+                self.run_event_driven()
+            finally:
+                if self.conn:
+                    self.conn.close()
+                logger.info(f"Detection cycles executed: {self.cycle_stats['executed']}, "
+                           f"skipped (no new candles): {self.cycle_stats['skipped']}")
+                logger.info("Pump Detector Daemon V2.0 stopped")
+            return
+
         # Normal monitoring and once modes
         while self.running:
             try:
@@ -616,7 +1362,9 @@ class PumpDetectorDaemon:
                 # Detect anomalies
                 new_signals = self.detect_anomalies()
 
-                if new_signals > 0:
+                if self.last_cycle_skipped:
+                    logger.debug(f"Cycle #{cycle_count} skipped: no new closed candles")
+                elif new_signals > 0:
                     logger.info(f"Cycle #{cycle_count} complete: {new_signals} new signals detected")
                 else:
                     logger.debug(f"Cycle #{cycle_count} complete: No new signals")
@@ -655,21 +1403,80 @@ class PumpDetectorDaemon:
         # Cleanup
         if self.conn:
             self.conn.close()
+        logger.info(f"Detection cycles executed: {self.cycle_stats['executed']}, "
+                   f"skipped (no new candles): {self.cycle_stats['skipped']}")
         logger.info("Pump Detector Daemon V2.0 stopped")
 
 
+# Backfill worker process state: one daemon (and one connection) per process
+_backfill_daemon = None
+
+
+def _init_backfill_worker(full_scan=False):
+    """Process pool initializer - open this worker's own connection"""
+    global _backfill_daemon
+    _backfill_daemon = PumpDetectorDaemon(historical_mode=True, full_scan=full_scan)
+    # Ctrl+C is handled by the parent; workers finish their current chunk
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _backfill_daemon.connect()
+
+
+def _run_backfill_chunk(run_key, chunk):
+    return _backfill_daemon.process_backfill_chunk(run_key, chunk)
+
+
+def parse_time_arg(value):
+    """Parse --from/--to: 'YYYY-MM-DD' or 'YYYY-MM-DD HH:MM' (UTC)"""
+    for fmt in ('%Y-%m-%d %H:%M', '%Y-%m-%dT%H:%M', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(value, fmt).replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+    raise argparse.ArgumentTypeError(f"Invalid time '{value}', expected YYYY-MM-DD [HH:MM]")
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Pump Detector Daemon V2.0')
     parser.add_argument('--historical', action='store_true',
                        help='Run in historical mode (load 30 days of signals, then exit)')
     parser.add_argument('--once', action='store_true',
                        help='Run once and exit (for cron scheduling)')
+    parser.add_argument('--listen', action='store_true',
+                       help='Run detection on candle_closed notifications instead of a fixed interval')
+    parser.add_argument('--backend', choices=['incremental', 'numpy', 'sql'],
+                       help='Detection backend for monitoring/once cycles (default: DETECTION backend)')
+    parser.add_argument('--intervals', type=lambda v: [i.strip() for i in v.split(',') if i.strip()],
+                       help=f"Comma-separated candle intervals ({', '.join(INTERVAL_IDS)}), default: DETECTION intervals")
+    parser.add_argument('--full-scan', action='store_true',
+                       help='Recompute baselines with the 30-day SQL window scan instead of the incremental state')
+    parser.add_argument('--from', dest='time_from', type=parse_time_arg,
+                       help='Backfill range start (UTC, YYYY-MM-DD [HH:MM]); resumes from checkpoints')
+    parser.add_argument('--to', dest='time_to', type=parse_time_arg,
+                       help='Backfill range end (UTC, default: now; a re-run may use a later end)')
+    parser.add_argument('--workers', type=int,
+                       help='Backfill worker processes (default: DETECTION backfill_workers)')
+    parser.add_argument('--chunk-hours', type=int,
+                       help='Backfill window size in hours (default: DETECTION backfill_chunk_hours)')
+    parser.add_argument('--partitions', type=int,
+                       help='Backfill pair partitions per window (default: DETECTION backfill_partitions)')
+    parser.add_argument('--shadow', action='append', metavar='KEY=VALUE',
+                       help='Run a shadow variant with this DETECTION override next to production '
+                            '(repeatable, e.g. --shadow name=strict --shadow min_spike_ratio=2.0)')
     args = parser.parse_args()
 
-    daemon = PumpDetectorDaemon(historical_mode=args.historical, once_mode=args.once)
+    daemon = PumpDetectorDaemon(historical_mode=args.historical or bool(args.time_from),
+                                once_mode=args.once, full_scan=args.full_scan,
+                                listen_mode=args.listen, backend=args.backend,
+                                intervals=args.intervals,
+                                shadow=parse_overrides(args.shadow) if args.shadow else None)
 
     try:
-        daemon.run()
+        if args.time_from:
+            daemon.run_backfill(args.time_from, args.time_to or datetime.now(timezone.utc),
+                                workers=args.workers, chunk_hours=args.chunk_hours,
+                                partitions=args.partitions)
+        else:
+            daemon.run()
     except KeyboardInterrupt:
         logger.info("Received keyboard interrupt")
     except Exception as e:
@@ -21,6 +21,7 @@ load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file_
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.settings import DATABASE
+from engine.cycle_metrics import CycleMetrics
 from engine.database_helper import PumpDatabaseHelper
 from engine.telegram_alerts import TelegramAlerter
 
@@ -53,6 +54,9 @@ class ExtremeAlertMonitor:
         telegram_chat_id = os.getenv('TELEGRAM_CHAT_ID', '')
         self.telegram = TelegramAlerter(telegram_bot_token, telegram_chat_id)
 
+        # Per-stage timings of the run (<METRICS['dir']>/extreme_alert_monitor.prom)
+        self.metrics = CycleMetrics('extreme_alert_monitor')
+
         # Signal handling
         signal.signal(signal.SIGINT, self.handle_shutdown)
         signal.signal(signal.SIGTERM, self.handle_shutdown)
@@ -86,6 +90,7 @@ class ExtremeAlertMonitor:
                     SELECT MAX(signal_timestamp) as last_candle_time
                     FROM pump.raw_signals
                     WHERE detected_at >= NOW() - INTERVAL '%s minutes'
+                      AND interval = '4h'
                 )
                 SELECT
                     s_spot.pair_symbol,
@@ -100,18 +105,21 @@ class ExtremeAlertMonitor:
                 JOIN pump.raw_signals s_futures 
                     ON s_spot.pair_symbol = s_futures.pair_symbol 
                     AND s_spot.signal_timestamp = s_futures.signal_timestamp
+                    AND s_spot.interval = s_futures.interval
                 CROSS JOIN latest_candle lc
                 WHERE s_spot.signal_type = 'SPOT'
                   AND s_futures.signal_type = 'FUTURES'
                   AND s_spot.signal_strength = 'EXTREME'
                   AND s_futures.signal_strength = 'EXTREME'
+                  AND s_spot.interval = '4h'
                   -- Only check the LAST 4h candle
                   AND s_spot.signal_timestamp = lc.last_candle_time
             """
             
             with self.db.conn.cursor() as cur:
-                cur.execute(query, (self.lookback_minutes,))
-                results = cur.fetchall()
+                with self.metrics.stage('query'):
+                    cur.execute(query, (self.lookback_minutes,))
+                results = self.metrics.fetchall(cur)
 
             if results:
                 logger.info(f"Found {len(results)} Double EXTREME signals on LAST 4h candle")
@@ -121,6 +129,7 @@ class ExtremeAlertMonitor:
 
         except Exception as e:
             logger.error(f"Error searching for signals: {e}")
+            self.metrics.record_error()
             return []
 
     def is_alert_already_sent(self, symbol: str, timestamp: datetime) -> bool:
@@ -138,13 +147,12 @@ class ExtremeAlertMonitor:
         # we shouldn't get duplicates unless the script is run multiple times manually.
         return False
 
-    def send_alert(self, signal_data: Dict):
-        """Send Telegram alert"""
-        try:
-            symbol = signal_data['pair_symbol']
-            candle_time = signal_data['signal_timestamp'].strftime('%Y-%m-%d %H:%M UTC')
-            
-            message = f"""
+    def format_alert(self, signal_data: Dict) -> str:
+        """Telegram message for a Double EXTREME row (find_double_extreme_signals / engine/extreme_pairs.py)"""
+        symbol = signal_data['pair_symbol']
+        candle_time = signal_data['signal_timestamp'].strftime('%Y-%m-%d %H:%M UTC')
+
+        return f"""
 🔥🔥🔥 DOUBLE EXTREME DETECTED! 🔥🔥🔥
 
 🚀 **{symbol}** shows MASSIVE volume spikes on both markets!
@@ -161,16 +169,37 @@ class ExtremeAlertMonitor:
 
 ⚠️ High probability of volatility!
 """
+
+    def alert_row(self, signal_data: Dict) -> Dict:
+        """
+        pump.alert_outbox row for a Double EXTREME.
+        The dedup key (symbol + candle) keeps repeated runs from alerting twice.
+        """
+        return {
+            'source': 'extreme_alert_monitor',
+            'chat_id': self.telegram.chat_id,
+            'message': self.format_alert(signal_data),
+            'dedup_key': f"double_extreme:{signal_data['pair_symbol']}:{signal_data['signal_timestamp'].isoformat()}",
+        }
+
+    def send_alert(self, signal_data: Dict):
+        """Queue Telegram alert in pump.alert_outbox (sent by daemons/alert_delivery_worker.py)"""
+        try:
+            symbol = signal_data['pair_symbol']
+            message = self.format_alert(signal_data)
             if self.dry_run:
                 logger.info(f"[DRY RUN] Would send alert for {symbol}:\n{message}")
+            elif not self.telegram.enabled:
+                logger.debug(f"Telegram alerts disabled, skipping alert for {symbol}")
             else:
-                if self.telegram.send_message(message):
-                    logger.info(f"✅ Alert sent for {symbol}")
+                queued = self.db.enqueue_alerts([self.alert_row(signal_data)])
+                if queued:
+                    logger.info(f"✅ Alert queued for {symbol}")
                 else:
-                    logger.error(f"❌ Failed to send alert for {symbol}")
+                    logger.info(f"Alert for {symbol} already queued for this candle")
 
         except Exception as e:
-            logger.error(f"Error sending alert: {e}")
+            logger.error(f"Error queueing alert: {e}")
 
     def run(self):
         """Main execution"""
@@ -179,6 +208,7 @@ class ExtremeAlertMonitor:
         logger.info("="*60)
 
         self.connect()
+        self.metrics.start_cycle()
 
         try:
             signals = self.find_double_extreme_signals()
@@ -187,12 +217,16 @@ class ExtremeAlertMonitor:
                 logger.info("No new Double EXTREME signals found.")
             
             for sig in signals:
-                self.send_alert(sig)
+                with self.metrics.stage('alert'):
+                    self.send_alert(sig)
+            self.metrics.count('alert', rows=len(signals))
 
         except Exception as e:
             logger.error(f"Fatal error: {e}")
+            self.metrics.record_error()
             sys.exit(1)
         finally:
+            self.metrics.finish_cycle()
             if self.db:
                 self.db.close()
             logger.info("Monitor finished")
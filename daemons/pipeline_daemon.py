@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Pump Pipeline Daemon - detector -> analysis -> alerts in one process
+
+Replaces the cron chain detector_daemon_v2.py -> analysis_runner_v2.py ->
+extreme_alert_monitor.py, where every step reconnected and re-read from
+Postgres what the previous step had just written. Per detection cycle:
+
+1. PumpDetectorDaemon detects and commits new signals (listen mode: right
+   after candle_closed notifications)
+2. The committed signals are handed over in memory:
+   - Double EXTREME check on them (engine/extreme_pairs.py), no raw_signals re-read
+   - PumpDetectionEngine.analyze_symbols for the affected symbols only
+     (one read of their 7-day signals, one of their last pumps)
+3. Candidates, snapshots, signal links and alerts (pump.alert_outbox) are
+   written in one transaction (AnalysisRunner.write_detections)
+
+All components take their connections from one psycopg2 pool
+(PIPELINE['max_connections']). Delivery stays in daemons/alert_delivery_worker.py.
+analysis_runner_v2.py can keep running on a longer interval to re-score
+symbols without new signals (their scores decay with time).
+"""
+
+import time
+import logging
+import signal
+import argparse
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+
+from psycopg2.pool import SimpleConnectionPool
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import DETECTION, PIPELINE
+from daemons.analysis_runner_v2 import AnalysisRunner
+from daemons.detector_daemon_v2 import PumpDetectorDaemon
+from daemons.extreme_alert_monitor import ExtremeAlertMonitor
+from engine.candle_access import INTERVAL_IDS, INTERVAL_MS
+from engine.cycle_metrics import CycleMetrics
+from engine.extreme_pairs import ExtremePairTracker
+
+# Setup logging (the component modules configured their own files on import)
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler('/home/elcrypto/pump_detector/logs/pipeline_daemon.log'),
+        logging.StreamHandler()
+    ],
+    force=True
+)
+logger = logging.getLogger(__name__)
+
+# Interval scored by PumpDetectionEngine and checked for Double EXTREME
+ANALYSIS_INTERVAL = '4h'
+
+
+class PumpPipeline:
+    """Detector, engine and alert producers sharing one process and one connection pool"""
+
+    def __init__(self, once_mode=False, listen_mode=False, backend=None, intervals=None):
+        self.once_mode = once_mode
+        self.listen_mode = listen_mode
+        self.running = True
+        self.pool = None
+
+        self.detector = PumpDetectorDaemon(once_mode=once_mode, listen_mode=listen_mode,
+                                           backend=backend, intervals=intervals)
+        # Only affected symbols are analyzed: their fingerprints changed, no cache needed
+        self.runner = AnalysisRunner(once_mode=True, use_cache=False, workers=1)
+        self.extreme = ExtremeAlertMonitor()
+        self.tracker = ExtremePairTracker(ANALYSIS_INTERVAL)
+
+        # Per-stage timings of analysis/write/alert steps (<METRICS['dir']>/pipeline_daemon.prom);
+        # detection keeps its own detector_daemon_v2.prom
+        self.metrics = CycleMetrics('pipeline_daemon')
+        self.runner.metrics = self.metrics
+
+        # Replaces the handlers the components installed
+        signal.signal(signal.SIGINT, self.handle_shutdown)
+        signal.signal(signal.SIGTERM, self.handle_shutdown)
+
+    def handle_shutdown(self, signum, frame):
+        """Handle shutdown signals gracefully"""
+        logger.info(f"Received signal {signum}, shutting down...")
+        self.running = False
+        self.detector.running = False
+
+    def connect(self):
+        """Create the connection pool and connect all components from it"""
+        if self.pool is None:
+            self.pool = SimpleConnectionPool(1, PIPELINE['max_connections'],
+                                             **self.detector.connection_params())
+        self.detector.pool = self.pool
+        self.runner.db_pool = self.pool
+
+        self.detector.connect()
+        self.runner.connect()
+        logger.info(f"Pump Pipeline initialized (pool of up to {PIPELINE['max_connections']} connections)")
+
+    def reconnect_runner(self):
+        """Reconnect the analysis/write connection after it was lost"""
+        logger.info("Analysis connection lost, reconnecting...")
+        try:
+            self.runner.db.close()
+        except Exception:
+            pass
+        self.runner.connect()
+
+    def run_cycle(self, notified=None):
+        """
+        Detection, then analysis and alerts for the signals it committed
+
+        Args:
+            notified: {interval_id: pair ids} from candle_closed (listen mode) or None
+
+        Returns:
+            Number of new signals
+        """
+        new_signals = self.detector.detect_anomalies(notified=notified)
+        signals = self.detector.last_signals
+        # Without new signals only to retry Double EXTREME whose write failed
+        if not signals and not self.tracker.pending():
+            return new_signals
+
+        self.metrics.start_cycle()
+        try:
+            # Upserts must not land on candidates older than 7 days
+            self.runner.expire_old_candidates()
+            self.process_signals(signals)
+        except Exception as e:
+            logger.error(f"Error processing {len(signals)} new signals: {e}")
+            self.metrics.record_error()
+            if self.runner.db.conn is None or self.runner.db.conn.closed:
+                self.reconnect_runner()
+        finally:
+            self.metrics.finish_cycle()
+
+        return new_signals
+
+    def process_signals(self, signals):
+        """
+        Double EXTREME check and analysis of the affected symbols, one write transaction
+
+        Args:
+            signals: Anomaly dicts committed by the detector (PumpDetectorDaemon.last_signals)
+
+        Returns:
+            (analyzed, detected, alerts) counts
+        """
+        cycle_time = datetime.now(timezone.utc)
+
+        # 1. Double EXTREME from the new signals and the earlier ones of the same candle
+        with self.metrics.stage('extreme'):
+            doubles = self.tracker.add(signals)
+        alerts = []
+        if self.extreme.telegram.enabled:
+            alerts = [self.extreme.alert_row(row) for row in doubles]
+
+        # 2. Engine on affected symbols only; trading_pair_id of new candidates as in the runner (MIN)
+        pair_ids = {}
+        for s in signals:
+            if s.get('interval', '4h') == ANALYSIS_INTERVAL:
+                symbol = s['pair_symbol']
+                pair_ids[symbol] = min(pair_ids.get(symbol, s['trading_pair_id']), s['trading_pair_id'])
+
+        results = {}
+        if pair_ids:
+            with self.metrics.stage('classify'):
+                results = self.runner.engine.analyze_symbols(sorted(pair_ids), current_time=cycle_time)
+
+        pending = []
+        for symbol, result in results.items():
+            if not result:
+                continue
+            logger.info(f"  ✅ DETECTED {symbol}: {result['confidence']} confidence, "
+                        f"score={result['score']:.2f}, "
+                        f"pattern={result['pattern_type']}, "
+                        f"actionable={result['is_actionable']}")
+            pending.append((result, pair_ids[symbol]))
+
+        # 3. Candidates, snapshots, links and all alerts together; raises after rollback
+        if pending or alerts:
+            self.runner.write_detections(pending, alerts=alerts)
+
+        # Only after the commit: a failed analysis or write reports the pair again next cycle
+        self.tracker.mark_reported(doubles)
+
+        latency = ""
+        if signals:
+            newest = max(s['candle_time'] + timedelta(milliseconds=INTERVAL_MS[INTERVAL_IDS[s.get('interval', '4h')]])
+                         for s in signals)
+            latency = f"; {(datetime.now(timezone.utc) - newest).total_seconds():.1f}s after candle close"
+        logger.info(f"Pipeline: {len(signals)} new signals -> {len(pair_ids)} symbols analyzed, "
+                    f"{len(pending)} detections, {len(doubles)} Double EXTREME{latency}")
+
+        return len(results), len(pending), len(alerts)
+
+    def run(self):
+        """Main pipeline loop"""
+
+        if self.listen_mode:
+            mode_str = "LISTEN MODE (candle_closed notifications)"
+        elif self.once_mode:
+            mode_str = "ONCE MODE"
+        else:
+            mode_str = "MONITORING MODE"
+
+        logger.info("="*60)
+        logger.info(f"Pump Pipeline [{mode_str}]")
+        logger.info(f"Detection backend: {self.detector.detection_backend()}")
+        logger.info("="*60)
+
+        self.connect()
+
+        try:
+            if self.listen_mode:
+                self.detector.run_event_driven(cycle=self.run_cycle)
+                return
+
+            while self.running:
+                try:
+                    self.run_cycle()
+
+                    if self.once_mode:
+                        break
+
+                    # Use interruptible sleep
+                    for _ in range(DETECTION.get('interval_minutes', 5) * 60):
+                        if not self.running:
+                            break
+                        time.sleep(1)
+
+                except Exception as e:
+                    logger.error(f"Error in pipeline cycle: {e}")
+                    time.sleep(60)  # Wait 1 minute before retry
+
+                    # Reconnect if needed
+                    try:
+                        with self.detector.conn.cursor() as cur:
+                            cur.execute("SELECT 1")
+                        self.detector.conn.rollback()
+                    except Exception:
+                        logger.info("Database connection lost, reconnecting...")
+                        self.detector.disconnect()
+                        self.detector.connect()
+                        self.reconnect_runner()
+
+        finally:
+            # Cleanup
+            if self.runner.db:
+                self.runner.db.close()
+            self.detector.disconnect()
+            if self.pool:
+                self.pool.closeall()
+            logger.info("Pump Pipeline stopped")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Pump Pipeline: detector -> analysis -> alerts in one process')
+    parser.add_argument('--once', action='store_true',
+                       help='Run one cycle and exit')
+    parser.add_argument('--listen', action='store_true',
+                       help='Run cycles on candle_closed notifications instead of a fixed interval')
+    parser.add_argument('--backend', choices=['incremental', 'numpy', 'sql'],
+                       help='Detection backend (default: DETECTION backend)')
+    parser.add_argument('--intervals', type=lambda v: [i.strip() for i in v.split(',') if i.strip()],
+                       help='Comma-separated candle intervals, default: DETECTION intervals')
+    args = parser.parse_args()
+
+    pipeline = PumpPipeline(once_mode=args.once, listen_mode=args.listen,
+                            backend=args.backend, intervals=args.intervals)
+
+    try:
+        pipeline.run()
+    except KeyboardInterrupt:
+        logger.info("Received keyboard interrupt")
+    except Exception as e:
+        logger.error(f"Fatal error: {e}")
+    finally:
+        logger.info("Pipeline terminated")
@@ -23,6 +23,7 @@ from typing import Dict, List, Optional
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.settings import DATABASE
+from engine.cycle_metrics import CycleMetrics
 from engine.database_helper import PumpDatabaseHelper
 
 # Setup logging
@@ -50,6 +51,9 @@ class PriceUpdater:
         self.binance_api_base = "https://api.binance.com/api/v3"
         self.running = True
 
+        # Per-stage timings of the update run (<METRICS['dir']>/price_updater.prom)
+        self.metrics = CycleMetrics('price_updater')
+
         # Signal handling for graceful shutdown
         signal.signal(signal.SIGINT, self.handle_shutdown)
         signal.signal(signal.SIGTERM, self.handle_shutdown)
@@ -85,8 +89,9 @@ class PriceUpdater:
             """
 
             with self.db.conn.cursor() as cur:
-                cur.execute(query)
-                candidates = cur.fetchall()
+                with self.metrics.stage('query'):
+                    cur.execute(query)
+                candidates = self.metrics.fetchall(cur)
 
             logger.info(f"Found {len(candidates)} ACTIVE candidates")
             return candidates
@@ -114,10 +119,12 @@ class PriceUpdater:
 
             logger.info(f"Fetching prices from Binance for {len(symbols)} symbols...")
 
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-
-            all_tickers = response.json()
+            # Binance запрос - стадия fetch (байты - фактический размер ответа)
+            with self.metrics.stage('fetch'):
+                response = requests.get(url, timeout=10)
+                response.raise_for_status()
+                all_tickers = response.json()
+            self.metrics.count('fetch', rows=len(all_tickers), size=len(response.content))
 
             # Фильтруем только наши символы
             result = {}
@@ -160,10 +167,12 @@ class PriceUpdater:
                 WHERE id = %s
             """
 
-            with self.db.conn.cursor() as cur:
+            with self.db.conn.cursor() as cur, self.metrics.stage('write'):
                 cur.execute(query, (price, price_change_24h, candidate_id))
+            self.metrics.count('write', rows=1)
 
-            self.db.conn.commit()
+            with self.metrics.stage('commit'):
+                self.db.conn.commit()
 
             logger.debug(f"{symbol}: price={price:.8f}, 24h%={price_change_24h:+.2f}%")
 
@@ -237,12 +246,14 @@ class PriceUpdater:
         logger.info("=" * 60)
 
         self.connect()
+        self.metrics.start_cycle()
 
         try:
             total, updated, failed = self.run_update_cycle()
 
             if failed > 0:
                 logger.warning(f"Price update completed with {failed} failures")
+                self.metrics.record_error()
                 sys.exit(1)
             else:
                 logger.info("Price update completed successfully")
@@ -250,9 +261,11 @@ class PriceUpdater:
 
         except Exception as e:
             logger.error(f"Fatal error during price update: {e}")
+            self.metrics.record_error()
             sys.exit(1)
 
         finally:
+            self.metrics.finish_cycle()
             if self.db:
                 self.db.close()
             logger.info("Price Updater stopped")
@@ -22,6 +22,7 @@ load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file_
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.settings import DATABASE
+from engine.cycle_metrics import CycleMetrics
 from engine.database_helper import PumpDatabaseHelper
 from engine.telegram_alerts import TelegramAlerter
 
@@ -69,6 +70,9 @@ class PumpStartMonitor:
         self.last_alerts = {}
         self.alert_cooldown_hours = 6  # Не спамить одним символом чаще раза в 6 часов
 
+        # Per-stage timings of check cycles (<METRICS['dir']>/pump_start_monitor.prom)
+        self.metrics = CycleMetrics('pump_start_monitor')
+
         # Signal handling for graceful shutdown
         signal.signal(signal.SIGINT, self.handle_shutdown)
         signal.signal(signal.SIGTERM, self.handle_shutdown)
@@ -115,8 +119,9 @@ class PumpStartMonitor:
             """
 
             with self.db.conn.cursor() as cur:
-                cur.execute(query)
-                candidates = cur.fetchall()
+                with self.metrics.stage('query'):
+                    cur.execute(query)
+                candidates = self.metrics.fetchall(cur)
 
             logger.info(f"Found {len(candidates)} HIGH confidence candidates to monitor")
             return candidates
@@ -173,8 +178,9 @@ class PumpStartMonitor:
             """
 
             with self.db.conn.cursor() as cur:
-                cur.execute(query, (symbol,))
-                rows = cur.fetchall()
+                with self.metrics.stage('query'):
+                    cur.execute(query, (symbol,))
+                rows = self.metrics.fetchall(cur)
 
             if len(rows) < 4:
                 logger.warning(f"{symbol}: Insufficient candle data (got {len(rows)}, need 4)")
@@ -230,17 +236,18 @@ class PumpStartMonitor:
             return False
 
         # Рассчитать ratios
-        spot_current = candles['spot_current']['volume']
-        spot_previous = candles['spot_previous']['volume']
-        futures_current = candles['futures_current']['volume']
-        futures_previous = candles['futures_previous']['volume']
+        with self.metrics.stage('classify'):
+            spot_current = candles['spot_current']['volume']
+            spot_previous = candles['spot_previous']['volume']
+            futures_current = candles['futures_current']['volume']
+            futures_previous = candles['futures_previous']['volume']
 
-        spot_ratio = spot_current / spot_previous if spot_previous > 0 else 0
-        futures_ratio = futures_current / futures_previous if futures_previous > 0 else 0
+            spot_ratio = spot_current / spot_previous if spot_previous > 0 else 0
+            futures_ratio = futures_current / futures_previous if futures_previous > 0 else 0
 
-        # Проверка условий
-        spot_triggered = spot_ratio >= self.spot_threshold
-        futures_triggered = futures_ratio >= self.futures_threshold
+            # Проверка условий
+            spot_triggered = spot_ratio >= self.spot_threshold
+            futures_triggered = futures_ratio >= self.futures_threshold
 
         logger.info(f"{symbol}: SPOT {spot_ratio:.2f}x {'✅' if spot_triggered else '❌'}, "
                    f"FUTURES {futures_ratio:.2f}x {'✅' if futures_triggered else '❌'}")
@@ -252,8 +259,9 @@ class PumpStartMonitor:
             logger.info(f"  FUTURES: {futures_previous:,.0f} → {futures_current:,.0f} ({futures_ratio:.2f}x)")
             logger.info(f"  Candle time: {candles['spot_current']['candle_time']}")
 
-            # Отправить Telegram alert
-            self.send_pump_start_alert(candidate, candles, spot_ratio, futures_ratio)
+            # Поставить Telegram alert в pump.alert_outbox
+            with self.metrics.stage('alert'):
+                self.send_pump_start_alert(candidate, candles, spot_ratio, futures_ratio)
 
             # Запомнить время alert
             self.last_alerts[symbol] = datetime.now()
@@ -264,7 +272,9 @@ class PumpStartMonitor:
 
     def send_pump_start_alert(self, candidate: Dict, candles: Dict, spot_ratio: float, futures_ratio: float):
         """
-        Отправить Telegram alert о начале пампа
+        Поставить Telegram alert о начале пампа в pump.alert_outbox
+
+        Отправляет daemons/alert_delivery_worker.py; повтор для той же свечи не добавляется
 
         Args:
             candidate: Candidate dict
@@ -274,7 +284,8 @@ class PumpStartMonitor:
         """
         try:
             symbol = candidate['pair_symbol']
-            candle_time = candles['spot_current']['candle_time'].strftime('%H:%M UTC')
+            candle_start = candles['spot_current']['candle_time']
+            candle_time = candle_start.strftime('%H:%M UTC')
 
             message = f"""
 🚨🚨🚨 PUMP HAS STARTED! 🚨🚨🚨
@@ -297,13 +308,23 @@ class PumpStartMonitor:
 ⚡ ACTION REQUIRED! ⚡
 """
 
-            if self.telegram.send_message(message):
-                logger.info(f"✅ Telegram alert sent successfully for {symbol}")
+            if not self.telegram.enabled:
+                logger.debug(f"Telegram alerts disabled, skipping alert for {symbol}")
+                return
+
+            queued = self.db.enqueue_alerts([{
+                'source': 'pump_start_monitor',
+                'chat_id': self.telegram.chat_id,
+                'message': message,
+                'dedup_key': f"pump_start:{symbol}:{candle_start.isoformat()}",
+            }])
+            if queued:
+                logger.info(f"✅ Telegram alert queued for {symbol}")
             else:
-                logger.warning(f"❌ Failed to send Telegram alert for {symbol}")
+                logger.info(f"Telegram alert for {symbol} already queued for this candle")
 
         except Exception as e:
-            logger.error(f"Error sending Telegram alert: {e}")
+            logger.error(f"Error queueing Telegram alert: {e}")
 
     def run_check_cycle(self):
         """
@@ -371,7 +392,9 @@ class PumpStartMonitor:
                 cycle_count += 1
 
                 # Run check cycle
+                self.metrics.start_cycle()
                 checked, triggered = self.run_check_cycle()
+                self.metrics.finish_cycle()
 
                 # In once mode, exit after first cycle
                 if self.once_mode:
@@ -390,6 +413,8 @@ class PumpStartMonitor:
 
             except Exception as e:
                 logger.error(f"Error in check cycle: {e}")
+                self.metrics.record_error()
+                self.metrics.finish_cycle()
                 time.sleep(60)  # Wait 1 minute before retry
 
                 # Reconnect if needed
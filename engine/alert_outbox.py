@@ -0,0 +1,271 @@
+"""
+Alert Outbox для Pump Detection System V2.0
+Telegram alerts через pump.alert_outbox (migrations/021)
+
+Продюсеры (analysis runner, pump start monitor, extreme alert monitor) пишут alert
+в outbox в своей транзакции (enqueue_alerts) - без сетевых вызовов в цикле анализа.
+Доставка - daemons/alert_delivery_worker.py:
+
+    claim_alerts -> AlertDelivery.deliver -> mark_results -> commit
+
+- keep-alive соединения: requests.Session на поток
+- параллельно по чатам (ThreadPoolExecutor), внутри чата - по порядку id
+- лимит сообщений на чат (ChatRateLimiter)
+- повторы с экспоненциальным backoff; 429 - через retry_after из ответа Telegram
+- после неудачи остальные сообщения чата ждут ее повтора (порядок сохраняется)
+
+Воркер доставки один (session advisory lock, try_delivery_lock): порядок внутри
+чата и ChatRateLimiter держатся в одном процессе. Второй запуск (например, cron
+--once рядом с постоянным воркером) lock не получает и не отправляет ничего.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Tuple
+import logging
+import threading
+import time
+
+from psycopg2.extras import execute_values
+
+from engine.telegram_alerts import DeliveryResult, TelegramAlerter
+
+logger = logging.getLogger(__name__)
+
+# Имя session advisory lock единственного воркера доставки
+DELIVERY_LOCK = 'pump.alert_outbox delivery'
+
+
+def enqueue_alerts(conn, alerts: List[Dict]) -> int:
+    """
+    Добавить alerts в pump.alert_outbox (без commit - в транзакции продюсера)
+
+    Args:
+        conn: psycopg2 connection
+        alerts: List of {'source', 'chat_id', 'message', 'parse_mode' (HTML), 'dedup_key' (None)}
+                Без chat_id (Telegram не настроен) пропускаются; повтор dedup_key не добавляется
+
+    Returns:
+        Число добавленных строк
+    """
+    rows = [(a['source'], str(a['chat_id']), a['message'], a.get('parse_mode', 'HTML'), a.get('dedup_key'))
+            for a in alerts if a.get('chat_id')]
+    if not rows:
+        return 0
+
+    with conn.cursor() as cur:
+        inserted = execute_values(cur, """
+            INSERT INTO pump.alert_outbox (source, chat_id, message, parse_mode, dedup_key)
+            VALUES %s
+            ON CONFLICT (dedup_key) WHERE dedup_key IS NOT NULL DO NOTHING
+            RETURNING id
+        """, rows, page_size=len(rows), fetch=True)
+
+    return len(inserted)
+
+
+def try_delivery_lock(conn) -> bool:
+    """
+    Взять lock единственного воркера доставки (не ждет)
+
+    Session lock: commit его не снимает, освобождается при закрытии соединения.
+
+    Returns:
+        True если lock получен (или уже принадлежит этому соединению)
+    """
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_try_advisory_lock(hashtext(%s)) as locked", (DELIVERY_LOCK,))
+        locked = cur.fetchone()['locked']
+    conn.commit()
+    return locked
+
+
+def claim_alerts(conn, limit: int) -> List[Dict]:
+    """
+    Взять готовые к отправке alerts (FOR UPDATE SKIP LOCKED, до commit)
+
+    Сообщение чата не берется, пока более раннее сообщение того же чата ждет повтора.
+    Порядок чата гарантирован только при одном воркере (try_delivery_lock).
+
+    Returns:
+        List of {'id', 'chat_id', 'message', 'parse_mode', 'attempts'} по возрастанию id
+    """
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT o.id, o.chat_id, o.message, o.parse_mode, o.attempts
+            FROM pump.alert_outbox o
+            WHERE o.status = 'PENDING'
+              AND o.next_attempt_at <= NOW()
+              AND NOT EXISTS (
+                  SELECT 1
+                  FROM pump.alert_outbox e
+                  WHERE e.chat_id = o.chat_id
+                    AND e.status = 'PENDING'
+                    AND e.id < o.id
+                    AND e.next_attempt_at > NOW()
+              )
+            ORDER BY o.id
+            LIMIT %s
+            FOR UPDATE OF o SKIP LOCKED
+        """, (limit,))
+        return cur.fetchall()
+
+
+def retry_delay(attempts: int, base: float, maximum: float) -> float:
+    """Пауза перед повтором после attempts неудачных попыток: base, 2*base, 4*base, ... <= maximum"""
+    return min(base * 2 ** max(attempts - 1, 0), maximum)
+
+
+def outcome(attempts: int, result: DeliveryResult, now: datetime, max_attempts: int,
+            backoff_base: float, backoff_max: float) -> Tuple:
+    """
+    Новое состояние строки outbox после попытки отправки
+
+    - ok: SENT
+    - 429: PENDING через retry_after, попытка не считается (лимит, а не ошибка сообщения)
+    - иначе: PENDING через retry_delay, после max_attempts попыток - FAILED
+
+    Returns:
+        (status, attempts, next_attempt_at, last_error, sent_at)
+    """
+    if result.ok:
+        return 'SENT', attempts + 1, now, None, now
+
+    if result.retry_after is not None:
+        return 'PENDING', attempts, now + timedelta(seconds=result.retry_after), result.error, None
+
+    attempts += 1
+    if attempts >= max_attempts:
+        return 'FAILED', attempts, now, result.error, None
+    delay = retry_delay(attempts, backoff_base, backoff_max)
+    return 'PENDING', attempts, now + timedelta(seconds=delay), result.error, None
+
+
+def mark_results(conn, delivered: List[Tuple[Dict, DeliveryResult]], max_attempts: int,
+                 backoff_base: float, backoff_max: float, now: datetime = None) -> Dict[str, int]:
+    """
+    Записать результаты доставки одним UPDATE (без commit)
+
+    Args:
+        delivered: List of (claimed row, DeliveryResult) из AlertDelivery.deliver
+
+    Returns:
+        Dict {status: count}
+    """
+    if not delivered:
+        return {}
+
+    now = now or datetime.now(timezone.utc)
+    rows, counts = [], {}
+    for row, result in delivered:
+        state = outcome(row['attempts'], result, now, max_attempts, backoff_base, backoff_max)
+        rows.append((row['id'],) + state)
+        counts[state[0]] = counts.get(state[0], 0) + 1
+
+    with conn.cursor() as cur:
+        execute_values(cur, """
+            UPDATE pump.alert_outbox o
+            SET status = v.status,
+                attempts = v.attempts,
+                next_attempt_at = v.next_attempt_at,
+                last_error = v.last_error,
+                sent_at = v.sent_at
+            FROM (VALUES %s) AS v(id, status, attempts, next_attempt_at, last_error, sent_at)
+            WHERE o.id = v.id
+        """, rows, template="(%s::bigint, %s, %s::int, %s::timestamptz, %s, %s::timestamptz)",
+            page_size=len(rows))
+
+    return counts
+
+
+class ChatRateLimiter:
+    """
+    Не чаще одного сообщения в interval секунд на чат (потокобезопасно)
+
+    Слот резервируется под lock, ожидание - вне lock: разные чаты не ждут друг друга.
+    """
+
+    def __init__(self, interval: float, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.interval = interval
+        self.clock = clock
+        self.sleep = sleep
+        self._next = {}
+        self._lock = threading.Lock()
+
+    def wait(self, chat_id: str):
+        """Дождаться слота отправки в chat_id"""
+        with self._lock:
+            now = self.clock()
+            ready = max(now, self._next.get(chat_id, now))
+            self._next[chat_id] = ready + self.interval
+        if ready > now:
+            self.sleep(ready - now)
+
+
+class AlertDelivery:
+    """
+    Отправка пачки alerts: чаты параллельно (workers потоков), внутри чата - по порядку
+
+    Каждый поток держит свой TelegramAlerter (requests.Session, keep-alive).
+    После неудачи остальные сообщения чата в пачке не отправляются и остаются PENDING.
+    """
+
+    def __init__(self, alerter_factory: Callable[[], TelegramAlerter], workers: int = 4,
+                 per_chat_interval: float = 1.0):
+        self.alerter_factory = alerter_factory
+        self.limiter = ChatRateLimiter(per_chat_interval)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='alert-delivery')
+        self._local = threading.local()
+        self._alerters = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_telegram(cls, bot_token: str, api_url: str, workers: int = 4,
+                     per_chat_interval: float = 1.0, timeout: float = 10) -> 'AlertDelivery':
+        """Доставка через Telegram Bot API (api_url - заглушка в тестах)"""
+        return cls(lambda: TelegramAlerter(bot_token, None, api_url=api_url, timeout=timeout),
+                   workers=workers, per_chat_interval=per_chat_interval)
+
+    def _alerter(self) -> TelegramAlerter:
+        alerter = getattr(self._local, 'alerter', None)
+        if alerter is None:
+            alerter = self._local.alerter = self.alerter_factory()
+            with self._lock:
+                self._alerters.append(alerter)
+        return alerter
+
+    def _deliver_chat(self, chat_id: str, rows: List[Dict]) -> List[Tuple[Dict, DeliveryResult]]:
+        delivered = []
+        for row in rows:
+            self.limiter.wait(chat_id)
+            try:
+                result = self._alerter().post_message(row['message'], row['parse_mode'], chat_id=chat_id)
+            except Exception as e:
+                result = DeliveryResult(False, None, str(e))
+            delivered.append((row, result))
+            if not result.ok:
+                logger.warning(f"Alert {row['id']} to {chat_id} failed: {result.error}")
+                break
+        return delivered
+
+    def deliver(self, rows: List[Dict]) -> List[Tuple[Dict, DeliveryResult]]:
+        """
+        Отправить claimed строки
+
+        Returns:
+            List of (row, DeliveryResult) - только для строк, которые отправлялись
+        """
+        chats = {}
+        for row in rows:
+            chats.setdefault(row['chat_id'], []).append(row)
+
+        futures = [self.executor.submit(self._deliver_chat, chat_id, chat_rows)
+                   for chat_id, chat_rows in chats.items()]
+        return [item for future in futures for item in future.result()]
+
+    def close(self):
+        """Остановить потоки и закрыть HTTP-сессии"""
+        self.executor.shutdown(wait=True)
+        for alerter in self._alerters:
+            alerter.session.close()
@@ -0,0 +1,104 @@
+"""
+Analysis Cache для Pump Detection System V2.0
+Последний результат анализа символа по отпечатку его набора сигналов
+
+Analysis runner запускается каждые 30 минут, а сигналы 4h меняются только на
+границах свечей. Результат PumpDetectionEngine для символа зависит от:
+- набора сигналов в окне 7 дней - max(id) и число сигналов (строки
+  pump.raw_signals не обновляются, только добавляются);
+- последнего пампа - его id и целое число часов с его начала (hours_since_last_pump);
+- конфигурации движка - config_version;
+- положения current_time относительно сигналов: окна 24/48/72/96/120h, 24h
+  для цены и граница 7 дней. Сигналы стоят на сетке 4h свечей, поэтому состав
+  окон постоянен внутри интервала (k*4h, (k+1)*4h) и в самой точке k*4h
+  (границы окон включают точку сетки с разных сторон) - это time bucket.
+
+Если отпечаток не изменился, символ пропускает движок и записи кандидата,
+snapshot и связей с сигналами.
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from engine.scoring_core import US_PER_HOUR, to_epoch_us
+
+# Шаг сетки сигналов (4h свечи)
+BUCKET_HOURS = 4
+
+
+def window_bucket(current_time: datetime, hours: int = BUCKET_HOURS) -> int:
+    """Номер bucket для current_time: 2k - точка k*hours, 2k+1 - интервал (k*hours, (k+1)*hours)"""
+    k, rest = divmod(to_epoch_us(current_time), hours * US_PER_HOUR)
+    return 2 * k + (rest != 0)
+
+
+class AnalysisCache:
+    """
+    Результат analyze_symbols на символ + отпечаток, при котором он получен
+
+    Использование:
+        cache.start_cycle()
+        key = cache.fingerprint(symbol_row, engine.config_version, cycle_time)
+        hit, result = cache.lookup(symbol, key)
+        ...
+        cache.store(symbol, key, result)
+    """
+
+    def __init__(self):
+        self.entries: Dict[str, Tuple[Tuple, Optional[Dict]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def start_cycle(self):
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @staticmethod
+    def fingerprint(symbol_row: Dict, config_version, current_time: datetime) -> Tuple:
+        """
+        Args:
+            symbol_row: строка get_symbols_to_analyze (max_signal_id, signal_count,
+                last_pump_id, last_pump_start)
+        """
+        last_pump_start = symbol_row.get('last_pump_start')
+        hours_since_pump = (int((current_time - last_pump_start).total_seconds() / 3600)
+                            if last_pump_start is not None else None)
+        return (
+            symbol_row['max_signal_id'],
+            symbol_row['signal_count'],
+            symbol_row.get('last_pump_id'),
+            hours_since_pump,
+            config_version,
+            window_bucket(current_time),
+        )
+
+    def lookup(self, symbol: str, key: Tuple) -> Tuple[bool, Optional[Dict]]:
+        """(True, результат) если отпечаток символа не изменился"""
+        entry = self.entries.get(symbol)
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return True, entry[1]
+        self.misses += 1
+        return False, None
+
+    def store(self, symbol: str, key: Tuple, result: Optional[Dict]):
+        """Запомнить результат (без списка сигналов - он не нужен повторно)"""
+        if result is not None:
+            result = {k: v for k, v in result.items() if k != 'signals'}
+        self.entries[symbol] = (key, result)
+
+    def invalidate(self, symbols: Iterable[str]):
+        """Забыть символы (например, после EXPIRED кандидата - его нужно создать заново)"""
+        for symbol in symbols:
+            self.entries.pop(symbol, None)
+
+    def retain(self, symbols: Iterable[str]):
+        """Оставить только символы текущего цикла"""
+        keep = set(symbols)
+        for symbol in [s for s in self.entries if s not in keep]:
+            del self.entries[symbol]
@@ -0,0 +1,123 @@
+"""
+Analysis Pool для Pump Detection System V2.0
+Параллельный анализ символов цикла в процессах-воркерах
+
+Символы делятся на N частей (по кругу: список отсортирован по extreme_count,
+так тяжелые символы распределяются равномерно). Каждый воркер держит свое
+соединение с БД и PumpDetectionEngine и выполняет analyze_symbols для своей
+части - сигналы и пампы читаются одним bulk запросом на часть. Результаты
+возвращаются в основной процесс, который пишет кандидатов одной транзакцией.
+
+Процессы запускаются через spawn: воркеры не должны наследовать соединение
+psycopg2 основного процесса.
+"""
+
+import logging
+import multiprocessing
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from functools import partial
+from itertools import repeat
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Состояние процесса-воркера
+_engine_factory: Optional[Callable] = None
+_engine = None
+
+
+def connect_engine(db_config: Dict, compact_rows: bool = False):
+    """Движок воркера на собственном соединении (только чтение, autocommit)"""
+    from engine.database_helper import PumpDatabaseHelper
+    from engine.pump_detection_engine import PumpDetectionEngine
+
+    db = PumpDatabaseHelper(db_config, compact_rows=compact_rows)
+    db.connect()
+    # Воркер ничего не пишет: без открытой транзакции между циклами
+    db.conn.autocommit = True
+    return PumpDetectionEngine(db)
+
+
+def _init_worker(engine_factory: Callable):
+    global _engine_factory
+    # Ctrl+C получает вся группа процессов - останавливает пул основной процесс
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _engine_factory = engine_factory
+
+
+def _close_engine():
+    global _engine
+    try:
+        _engine.db.close()
+    except Exception:
+        pass
+    _engine = None
+
+
+def _analyze_partition(symbols: List[str], current_time: datetime) -> Dict[str, Optional[Dict]]:
+    global _engine
+    if _engine is None:
+        _engine = _engine_factory()
+    try:
+        # Конфигурация - как в БД на момент цикла, а не по TTL воркера:
+        # иначе результат попадет в AnalysisCache под чужой config_version
+        _engine.db.load_config()
+        return _engine.analyze_symbols(symbols, current_time=current_time)
+    except Exception:
+        # Соединение могло оборваться - пересоздать движок при следующем вызове
+        _close_engine()
+        raise
+
+
+class AnalysisPool:
+    """
+    Пул процессов с тем же интерфейсом, что PumpDetectionEngine.analyze_symbols
+
+    Args:
+        workers: число процессов
+        engine_factory: picklable функция без аргументов, создающая движок
+            в воркере (по умолчанию connect_engine)
+    """
+
+    def __init__(self, workers: int, engine_factory: Callable):
+        self.workers = workers
+        self.engine_factory = engine_factory
+        self.executor = self._new_executor()
+        logger.info(f"Analysis pool started: {workers} worker processes")
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(self.engine_factory,),
+        )
+
+    @classmethod
+    def for_database(cls, workers: int, db_config: Dict, compact_rows: bool = False) -> 'AnalysisPool':
+        return cls(workers, partial(connect_engine, db_config, compact_rows))
+
+    def analyze_symbols(self, symbols: List[str], current_time: datetime) -> Dict[str, Optional[Dict]]:
+        """
+        Returns:
+            Dict {symbol: result} как у PumpDetectionEngine.analyze_symbols
+            (исключение воркера пробрасывается - цикл завершается ошибкой)
+        """
+        partitions = [part for part in (symbols[i::self.workers] for i in range(self.workers)) if part]
+        results = {}
+        try:
+            for part in self.executor.map(_analyze_partition, partitions, repeat(current_time)):
+                results.update(part)
+        except BrokenProcessPool:
+            # Воркер завершился аварийно (OOM, kill) - новые процессы к следующему циклу
+            logger.error("Analysis pool broken, restarting workers")
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = self._new_executor()
+            raise
+        return results
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
@@ -0,0 +1,256 @@
+"""
+Analysis Snapshots для Pump Detection System V2.0
+История analysis_details кандидата без повторов (pump.analysis_snapshot_history, migrations/020)
+
+Analysis runner пишет snapshot каждые 30 минут, но содержимое меняется редко.
+Строка добавляется, только если content_hash отличается от последней строки
+кандидата; snapshot действует с created_at до created_at следующей строки.
+
+Компактная кодировка (JSONB) - фиксированные структуры как массивы:
+    {'v': 1,
+     's': score,
+     'c': [total_signals, extreme_count, very_strong_count, strong_count, critical_window_signals],
+     'f': factor_scores в порядке FACTORS,
+     'sd': strength_distribution в порядке STRENGTHS,
+     'td': signal_type_distribution в порядке SIGNAL_TYPES,
+     'x': остальное (новые ключи, неизвестные значения распределений) - только если есть}
+
+Хранение: помесячные партиции, rollup старых строк до одной в день
+и удаление старых месяцев - scripts/snapshot_retention.py (SNAPSHOT_CONFIG).
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, List
+import hashlib
+import json
+import logging
+import re
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+from engine.scoring_core import FACTORS
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 1
+COUNT_KEYS = ('total_signals', 'extreme_count', 'very_strong_count', 'strong_count', 'critical_window_signals')
+STRENGTHS = ('EXTREME', 'VERY_STRONG', 'STRONG', 'MEDIUM', 'WEAK')
+SIGNAL_TYPES = ('SPOT', 'FUTURES')
+DISTRIBUTIONS = (('strength_distribution', 'sd', STRENGTHS), ('signal_type_distribution', 'td', SIGNAL_TYPES))
+
+PARTITION_NAME = re.compile(r'^analysis_snapshot_history_(\d{4})(\d{2})$')
+
+
+def encode_analysis(analysis: Dict) -> Dict:
+    """analysis_details -> компактная кодировка (без потерь, см. decode_analysis)"""
+    rest = dict(analysis)
+    try:
+        encoded = {
+            'v': SNAPSHOT_FORMAT,
+            's': rest.pop('score'),
+            'c': [rest.pop(key) for key in COUNT_KEYS],
+        }
+        factors = dict(rest.pop('factor_scores'))
+        encoded['f'] = [factors.pop(name) for name in FACTORS]
+        distributions = [(key, short, names, dict(rest.pop(key))) for key, short, names in DISTRIBUTIONS]
+    except KeyError:
+        # Другая структура - хранится как есть
+        return {'v': SNAPSHOT_FORMAT, 'x': dict(analysis)}
+
+    extra = {}
+    if factors:
+        extra['factor_scores'] = factors
+    for key, short, names, counts in distributions:
+        encoded[short] = [counts.pop(name, 0) for name in names]
+        if counts:
+            extra[key] = counts
+    extra.update(rest)
+    if extra:
+        encoded['x'] = extra
+    return encoded
+
+
+def decode_analysis(data: Dict) -> Dict:
+    """Компактная кодировка -> analysis_details"""
+    if 's' not in data:
+        return dict(data.get('x', {}))
+
+    analysis = {'score': data['s'], **dict(zip(COUNT_KEYS, data['c']))}
+    analysis['factor_scores'] = dict(zip(FACTORS, data['f']))
+    for key, short, names in DISTRIBUTIONS:
+        analysis[key] = {name: count for name, count in zip(names, data[short]) if count}
+    for key, value in data.get('x', {}).items():
+        if key in analysis and isinstance(analysis[key], dict):
+            analysis[key].update(value)
+        else:
+            analysis[key] = value
+    return analysis
+
+
+def content_hash(encoded: Dict) -> bytes:
+    """md5 канонического JSON кодировки"""
+    return hashlib.md5(json.dumps(encoded, sort_keys=True, separators=(',', ':')).encode()).digest()
+
+
+def save_snapshots(conn, snapshots: Dict[int, Dict]) -> int:
+    """
+    Записать snapshots кандидатов, содержимое которых изменилось (без commit)
+
+    Args:
+        conn: psycopg2 connection
+        snapshots: Dict {candidate_id: analysis_details}
+
+    Returns:
+        Число записанных строк
+    """
+    if not snapshots:
+        return 0
+
+    rows = []
+    for candidate_id, analysis in snapshots.items():
+        encoded = encode_analysis(analysis)
+        data = json.dumps(encoded, separators=(',', ':'))
+        rows.append((candidate_id, psycopg2.Binary(content_hash(encoded)), data))
+
+    with conn.cursor() as cur:
+        inserted = execute_values(cur, """
+            INSERT INTO pump.analysis_snapshot_history (candidate_id, content_hash, data)
+            SELECT v.candidate_id, v.content_hash, v.data::jsonb
+            FROM (VALUES %s) AS v(candidate_id, content_hash, data)
+            WHERE v.content_hash IS DISTINCT FROM (
+                SELECT h.content_hash
+                FROM pump.analysis_snapshot_history h
+                WHERE h.candidate_id = v.candidate_id
+                ORDER BY h.created_at DESC
+                LIMIT 1
+            )
+            RETURNING candidate_id
+        """, rows, page_size=len(rows), fetch=True)
+
+    return len(inserted)
+
+
+def history_from_rows(rows: List[Dict]) -> List[Dict]:
+    """
+    Строки (created_at, data) по возрастанию created_at -> полная история
+
+    Returns:
+        List of {'valid_from', 'valid_until' (None для текущего), 'analysis'}
+    """
+    history = []
+    for i, row in enumerate(rows):
+        history.append({
+            'valid_from': row['created_at'],
+            'valid_until': rows[i + 1]['created_at'] if i + 1 < len(rows) else None,
+            'analysis': decode_analysis(row['data']),
+        })
+    return history
+
+
+def snapshot_history(conn, candidate_id: int, since: datetime = None) -> List[Dict]:
+    """
+    История analysis_details кандидата (см. history_from_rows)
+
+    since: только snapshots, действовавшие после since (включая действовавший на since)
+    """
+    params = {'candidate_id': candidate_id, 'since': since}
+    since_filter = ""
+    if since is not None:
+        since_filter = """
+              AND created_at >= COALESCE((
+                  SELECT MAX(created_at) FROM pump.analysis_snapshot_history
+                  WHERE candidate_id = %(candidate_id)s AND created_at <= %(since)s
+              ), %(since)s)"""
+
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            SELECT created_at, data
+            FROM pump.analysis_snapshot_history
+            WHERE candidate_id = %(candidate_id)s{since_filter}
+            ORDER BY created_at
+        """, params)
+        rows = cur.fetchall()
+
+    return history_from_rows(rows)
+
+
+def month_start(value: datetime, months: int = 0) -> datetime:
+    """Начало месяца value (UTC), сдвинутое на months"""
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def ensure_partitions(conn, months_ahead: int, now: datetime = None) -> List[str]:
+    """Партиции текущего месяца и months_ahead следующих (без commit)"""
+    now = now or datetime.now(timezone.utc)
+    names = []
+    with conn.cursor() as cur:
+        for months in range(months_ahead + 1):
+            cur.execute("SELECT pump.create_analysis_snapshot_partition(%s::date) as name",
+                        (month_start(now, months).date(),))
+            names.append(cur.fetchone()['name'])
+    return names
+
+
+def rollup_snapshots(conn, older_than: datetime) -> int:
+    """
+    Строки старше older_than: оставить последнюю на кандидата за день (UTC), без commit
+
+    Returns:
+        Число удаленных строк
+    """
+    with conn.cursor() as cur:
+        cur.execute("""
+            DELETE FROM pump.analysis_snapshot_history h
+            USING (
+                SELECT
+                    candidate_id,
+                    created_at,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY candidate_id, date_trunc('day', created_at AT TIME ZONE 'UTC')
+                        ORDER BY created_at DESC
+                    ) as rn
+                FROM pump.analysis_snapshot_history
+                WHERE created_at < %(older_than)s
+            ) d
+            WHERE h.candidate_id = d.candidate_id
+              AND h.created_at = d.created_at
+              AND h.created_at < %(older_than)s
+              AND d.rn > 1
+        """, {'older_than': older_than})
+        return cur.rowcount
+
+
+def drop_expired_partitions(conn, retention_months: int, now: datetime = None) -> List[str]:
+    """
+    Удалить партиции месяцев старше retention_months полных месяцев (без commit)
+
+    Returns:
+        Имена удаленных партиций
+    """
+    cutoff = month_start(now or datetime.now(timezone.utc), -retention_months)
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            JOIN pg_class p ON p.oid = i.inhparent
+            JOIN pg_namespace n ON n.oid = p.relnamespace
+            WHERE n.nspname = 'pump'
+              AND p.relname = 'analysis_snapshot_history'
+        """)
+        partitions = [row['relname'] for row in cur.fetchall()]
+
+        dropped = []
+        for name in sorted(partitions):
+            match = PARTITION_NAME.match(name)
+            if not match:
+                continue
+            if datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=timezone.utc) < cutoff:
+                cur.execute(f'DROP TABLE pump."{name}"')
+                dropped.append(name)
+
+    if dropped:
+        logger.info(f"Dropped analysis snapshot partitions: {', '.join(dropped)}")
+    return dropped
@@ -0,0 +1,161 @@
+"""
+Backfill для Pump Detection System V2.0
+Разбиение исторического диапазона на чанки и чекпоинты в pump.detector_backfill_chunks
+
+Чанк = (окно времени, партиция пар). Партиция пар - trading_pair_id % partitions,
+поэтому чанки независимы и обрабатываются параллельно, каждый своим соединением.
+Завершенный чанк записывается в той же транзакции, что и его сигналы:
+после падения повторный запуск с теми же --from, размером чанка и числом
+партиций пропускает готовые чанки. Конец диапазона в ключ запуска не входит:
+запуск без --to (до "сейчас") продолжает прошлый, а последний неполный
+чанк прошлого запуска пересчитывается до нового конца.
+"""
+
+from typing import Dict, List, Tuple
+import logging
+
+from engine.candle_access import HOUR_MS, INTERVAL_MS
+
+logger = logging.getLogger(__name__)
+
+
+def make_run_key(start_ms: int, chunk_hours: int, partitions: int, interval_id: int = 4) -> str:
+    """
+    Ключ запуска: одинаковые параметры -> та же сетка чанков и те же чекпоинты
+
+    Сетка окон зависит только от начала, размера чанка и интервала, поэтому
+    end_ms в ключ не входит (см. pending_chunks).
+    """
+    return f"i{interval_id}:{start_ms}:{chunk_hours}h:p{partitions}"
+
+
+def plan_chunks(start_ms: int, end_ms: int, chunk_hours: int, partitions: int,
+                interval_id: int = 4) -> List[Dict]:
+    """
+    Разбить [start_ms, end_ms) на чанки по времени и партициям пар
+
+    Границы окон выровнены по сетке свечей interval_id, чтобы свеча
+    не попадала в два соседних окна.
+
+    Returns:
+        Список {'chunk_start_ms', 'chunk_end_ms', 'partition', 'partitions'}
+        от старых окон к новым
+    """
+    if end_ms <= start_ms:
+        raise ValueError("Backfill range is empty: --to must be after --from")
+    if chunk_hours <= 0 or partitions <= 0:
+        raise ValueError("chunk_hours and partitions must be positive")
+
+    interval_ms = INTERVAL_MS.get(interval_id, HOUR_MS)
+    step = max(interval_ms, (chunk_hours * HOUR_MS // interval_ms) * interval_ms)
+
+    chunks = []
+    window_start = start_ms - start_ms % interval_ms
+    while window_start < end_ms:
+        window_end = min(window_start + step, end_ms)
+        for partition in range(partitions):
+            chunks.append({
+                'chunk_start_ms': window_start,
+                'chunk_end_ms': window_end,
+                'partition': partition,
+                'partitions': partitions,
+            })
+        window_start = window_end
+    return chunks
+
+
+def chunk_key(chunk: Dict) -> Tuple[int, int]:
+    return chunk['chunk_start_ms'], chunk['partition']
+
+
+def load_completed_chunks(conn, run_key: str) -> Dict[Tuple[int, int], int]:
+    """Завершенные чанки запуска: {(chunk_start_ms, partition): chunk_end_ms}"""
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT chunk_start_ms, partition_id
+            FROM pump.detector_backfill_chunks
+            WHERE run_key = %s AND status = 'DONE'
+        """, (run_key,))
+        rows = cur.fetchall()
+    conn.rollback()  # завершить читающую транзакцию
+    return {(r['chunk_start_ms'], r['partition_id']): r['chunk_end_ms'] for r in rows}
+
+
+def pending_chunks(chunks: List[Dict], completed: Dict[Tuple[int, int], int]) -> List[Dict]:
+    """
+    Чанки плана, которые еще нужно обработать
+
+    Чанк готов, если его окно и партиция завершены до chunk_end_ms или дальше.
+    Последнее окно прошлого запуска с более ранним концом обрабатывается заново.
+    """
+    return [c for c in chunks if completed.get(chunk_key(c), -1) < c['chunk_end_ms']]
+
+
+def mark_chunk(conn, run_key: str, chunk: Dict, status: str,
+               candles: int = 0, signals: int = 0, seconds: float = 0,
+               error: str = None):
+    """
+    Записать состояние чанка (без commit)
+
+    Для статуса DONE вызывается в транзакции с сигналами чанка.
+    """
+    with conn.cursor() as cur:
+        cur.execute("""
+            INSERT INTO pump.detector_backfill_chunks (
+                run_key, chunk_start_ms, chunk_end_ms, partition_id, partitions,
+                status, candles_scanned, signals_found, duration_seconds, error, updated_at
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())
+            ON CONFLICT (run_key, chunk_start_ms, partition_id) DO UPDATE SET
+                chunk_end_ms = EXCLUDED.chunk_end_ms,
+                status = EXCLUDED.status,
+                candles_scanned = EXCLUDED.candles_scanned,
+                signals_found = EXCLUDED.signals_found,
+                duration_seconds = EXCLUDED.duration_seconds,
+                error = EXCLUDED.error,
+                updated_at = NOW()
+        """, (
+            run_key, chunk['chunk_start_ms'], chunk['chunk_end_ms'],
+            chunk['partition'], chunk['partitions'], status,
+            candles, signals, round(seconds, 3), error
+        ))
+
+
+class BackfillProgress:
+    """Прогресс и пропускная способность backfill (candles/sec, signals/sec)"""
+
+    def __init__(self, total_chunks: int, skipped_chunks: int, started_at: float):
+        self.total_chunks = total_chunks
+        self.skipped_chunks = skipped_chunks
+        self.started_at = started_at
+        self.done = 0
+        self.failed = 0
+        self.candles = 0
+        self.signals = 0
+
+    def add(self, result: Dict):
+        if result.get('error'):
+            self.failed += 1
+            return
+        self.done += 1
+        self.candles += result['candles']
+        self.signals += result['signals']
+
+    def rates(self, now: float) -> Dict:
+        elapsed = max(now - self.started_at, 1e-9)
+        finished = self.done + self.failed
+        pending = self.total_chunks - self.skipped_chunks - finished
+        return {
+            'elapsed': elapsed,
+            'candles_per_sec': self.candles / elapsed,
+            'signals_per_sec': self.signals / elapsed,
+            'eta': elapsed / finished * pending if finished else None,
+        }
+
+    def format(self, now: float) -> str:
+        r = self.rates(now)
+        processed = self.skipped_chunks + self.done + self.failed
+        eta = f"{r['eta']:.0f}s" if r['eta'] is not None else "?"
+        return (f"{processed}/{self.total_chunks} chunks "
+                f"({self.failed} failed) | {self.candles} candles, {self.signals} signals | "
+                f"{r['candles_per_sec']:.0f} candles/s, {r['signals_per_sec']:.2f} signals/s | "
+                f"ETA {eta}")
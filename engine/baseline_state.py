@@ -0,0 +1,291 @@
+"""
+Baseline State Store для детектора объемных аномалий
+Инкрементальные скользящие baseline (7d/14d/30d) по trading_pair_id
+
+Вместо пересчета AVG() OVER (ROWS BETWEEN N PRECEDING AND 1 PRECEDING)
+по 30 дням свечей на каждом цикле держим для каждой пары последние
+180 объемов и текущие суммы по окнам. Новая закрытая свеча обновляет
+состояние за O(1), snapshot хранится в pump.detector_baseline_state.
+В состояние попадают только закрытые свечи (is_closed); SQL окно детектора
+видит и формирующуюся свечу, но она всегда последняя и в baseline
+других свечей не входит.
+С robust=True пара держит еще и отсортированные окна для медианы/MAD
+(engine/robust_baselines.py), вставка/удаление - bisect.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+import logging
+
+from psycopg2.extras import execute_values
+
+from engine.robust_baselines import SortedWindow
+
+logger = logging.getLogger(__name__)
+
+# Окна baseline в свечах (4h): 7d = 42, 14d = 84, 30d = 180
+BASELINE_WINDOWS = {'7d': 42, '14d': 84, '30d': 180}
+BASELINE_DAYS = {'7d': 7, '14d': 14, '30d': 30}
+
+# Детектор берет свечи только за последние 30 дней
+MAX_HISTORY_MS = 30 * 24 * 3600 * 1000
+
+# Длительность 4h свечи в миллисекундах
+INTERVAL_MS_4H = 4 * 3600 * 1000
+
+
+def baseline_windows(interval_ms: int) -> Dict[str, int]:
+    """Окна 7d/14d/30d в свечах интервала (4h: 42/84/180, 1h: 168/336/720)"""
+    day_ms = 24 * 3600 * 1000
+    return {name: days * day_ms // interval_ms for name, days in BASELINE_DAYS.items()}
+
+
+class PairBaseline:
+    """Скользящие суммы объема по окнам для одной торговой пары"""
+
+    __slots__ = ('windows', 'candles', 'sums', 'sorted_windows', 'last_open_time', '_pushes')
+
+    def __init__(self, windows: Dict[str, int], robust: bool = False):
+        self.windows = windows
+        self.candles = deque()  # (open_time_ms, volume)
+        self.sums = {name: 0.0 for name in windows}
+        # Отсортированные окна для медианы/MAD (только если включены robust baselines)
+        self.sorted_windows = {name: SortedWindow() for name in windows} if robust else None
+        self.last_open_time = None
+        self._pushes = 0
+
+    def baselines(self) -> Dict[str, Optional[float]]:
+        """
+        Baseline для следующей свечи (среднее по предыдущим N свечам)
+
+        Как и в SQL окне, если истории меньше N - среднее по тому, что есть;
+        если истории нет совсем - None.
+        """
+        size = len(self.candles)
+        result = {}
+        for name, length in self.windows.items():
+            count = min(size, length)
+            result[name] = self.sums[name] / count if count else None
+        if self.sorted_windows is not None:
+            for name, window in self.sorted_windows.items():
+                result[f'median_{name}'] = window.median()
+                result[f'mad_{name}'] = window.mad()
+        return result
+
+    def push(self, open_time: int, volume: float, interval_ms: int = INTERVAL_MS_4H):
+        """Добавить закрытую свечу и сдвинуть окна"""
+        self.candles.append((open_time, volume))
+        size = len(self.candles)
+
+        for name, length in self.windows.items():
+            self.sums[name] += volume
+            if size > length:
+                self.sums[name] -= self.candles[-length - 1][1]
+            if self.sorted_windows is not None:
+                self.sorted_windows[name].add(volume)
+                if size > length:
+                    self.sorted_windows[name].remove(self.candles[-length - 1][1])
+
+        max_length = max(self.windows.values())
+        while len(self.candles) > max_length:
+            self.candles.popleft()
+
+        self.evict_before(open_time + interval_ms - MAX_HISTORY_MS)
+        self.last_open_time = open_time
+
+        # Периодически пересчитываем суммы с нуля, чтобы не копить ошибку float
+        self._pushes += 1
+        if self._pushes >= max_length:
+            self.rebase()
+
+    def evict_before(self, cutoff: int):
+        """Убрать свечи с open_time < cutoff (вне 30-дневного окна SQL запроса)"""
+        while self.candles and self.candles[0][0] < cutoff:
+            size = len(self.candles)
+            _, volume = self.candles.popleft()
+            for name, length in self.windows.items():
+                if size <= length:
+                    self.sums[name] -= volume
+                    if self.sorted_windows is not None:
+                        self.sorted_windows[name].remove(volume)
+
+    def rebase(self):
+        """Точный пересчет сумм по текущему содержимому окон"""
+        volumes = [v for _, v in self.candles]
+        for name, length in self.windows.items():
+            self.sums[name] = float(sum(volumes[-length:]))
+            if self.sorted_windows is not None:
+                self.sorted_windows[name].values = sorted(volumes[-length:])
+        self._pushes = 0
+
+
+class BaselineStateStore:
+    """
+    Персистентное состояние baseline по всем парам одного интервала
+
+    Ключ - trading_pair_id (SPOT и FUTURES пары имеют разные id).
+    """
+
+    def __init__(self, interval_id: int = 4, windows: Dict[str, int] = None,
+                 interval_ms: int = INTERVAL_MS_4H, robust: bool = False):
+        self.interval_id = interval_id
+        self.windows = dict(windows or BASELINE_WINDOWS)
+        self.interval_ms = interval_ms
+        self.robust = robust
+        self.pairs: Dict[int, PairBaseline] = {}
+        self._dirty = set()
+
+    @classmethod
+    def for_interval(cls, interval_id: int, interval_ms: int, robust: bool = False) -> 'BaselineStateStore':
+        """Хранилище с окнами 7d/14d/30d в свечах данного интервала"""
+        return cls(interval_id=interval_id, windows=baseline_windows(interval_ms),
+                   interval_ms=interval_ms, robust=robust)
+
+    def __len__(self):
+        return len(self.pairs)
+
+    def __contains__(self, trading_pair_id):
+        return trading_pair_id in self.pairs
+
+    def last_open_time(self, trading_pair_id: int) -> Optional[int]:
+        pair = self.pairs.get(trading_pair_id)
+        return pair.last_open_time if pair else None
+
+    def update(self, trading_pair_id: int, open_time: int, volume) -> Optional[Dict[str, Optional[float]]]:
+        """
+        Обработать новую закрытую свечу
+
+        Returns:
+            Baseline для этой свечи (по предыдущим свечам): {'7d', '14d', '30d'}
+            и при robust - {'median_7d', 'mad_7d', ...}; None, если свеча уже
+            была учтена (open_time <= watermark пары)
+        """
+        pair = self.pairs.get(trading_pair_id)
+        if pair is None:
+            pair = PairBaseline(self.windows, self.robust)
+            self.pairs[trading_pair_id] = pair
+        elif pair.last_open_time is not None and open_time <= pair.last_open_time:
+            return None
+
+        # SQL окно видит только свечи за 30 дней до закрытия текущей свечи
+        pair.evict_before(open_time + self.interval_ms - MAX_HISTORY_MS)
+        baselines = pair.baselines()
+        pair.push(open_time, float(volume or 0), self.interval_ms)
+        self._dirty.add(trading_pair_id)
+        return baselines
+
+    def drop(self, pair_ids: Iterable[int]):
+        """Удалить состояние пар (будут заново загружены из свечей)"""
+        for pair_id in pair_ids:
+            self.pairs.pop(pair_id, None)
+            self._dirty.discard(pair_id)
+
+    def load(self, conn) -> int:
+        """Загрузить snapshot из pump.detector_baseline_state"""
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT trading_pair_id, open_times, volumes
+                FROM pump.detector_baseline_state
+                WHERE interval_id = %s
+            """, (self.interval_id,))
+            rows = cur.fetchall()
+
+        self.pairs = {}
+        for row in rows:
+            pair = PairBaseline(self.windows, self.robust)
+            for open_time, volume in zip(row['open_times'], row['volumes']):
+                pair.candles.append((int(open_time), float(volume)))
+            if pair.candles:
+                pair.last_open_time = pair.candles[-1][0]
+            pair.rebase()
+            self.pairs[row['trading_pair_id']] = pair
+
+        self._dirty = set()
+        logger.info(f"Baseline state loaded: {len(self.pairs)} pairs (interval_id={self.interval_id})")
+        return len(self.pairs)
+
+    def save(self, conn, all_pairs: bool = False) -> int:
+        """
+        Сохранить измененные пары в pump.detector_baseline_state
+
+        Коммит не выполняется - snapshot пишется в той же транзакции,
+        что и сигналы, чтобы состояние и raw_signals не расходились.
+        """
+        pair_ids = list(self.pairs) if all_pairs else list(self._dirty)
+        if not pair_ids:
+            return 0
+
+        rows = []
+        for pair_id in pair_ids:
+            pair = self.pairs[pair_id]
+            rows.append((
+                pair_id,
+                self.interval_id,
+                pair.last_open_time,
+                [t for t, _ in pair.candles],
+                [v for _, v in pair.candles],
+            ))
+
+        with conn.cursor() as cur:
+            execute_values(cur, """
+                INSERT INTO pump.detector_baseline_state (
+                    trading_pair_id, interval_id, last_open_time, open_times, volumes
+                ) VALUES %s
+                ON CONFLICT (trading_pair_id, interval_id) DO UPDATE SET
+                    last_open_time = EXCLUDED.last_open_time,
+                    open_times = EXCLUDED.open_times,
+                    volumes = EXCLUDED.volumes,
+                    updated_at = NOW()
+            """, rows)
+
+        self._dirty = set()
+        return len(rows)
+
+    def check_drift(self, reference: Dict[int, Dict], tolerance: float = 1e-6) -> List[Dict]:
+        """
+        Сравнить baseline из состояния с эталоном из SQL окна
+
+        Args:
+            reference: {trading_pair_id: {'last_open_time': int, 'baseline_7d': ..., ...}}
+                       SQL AVG по последним N свечам включая last_open_time
+            tolerance: Допустимое относительное отклонение
+
+        Returns:
+            Список расхождений (пустой если состояние совпадает с SQL)
+        """
+        drifts = []
+        for pair_id, expected in reference.items():
+            pair = self.pairs.get(pair_id)
+            if pair is None:
+                drifts.append({'trading_pair_id': pair_id, 'reason': 'missing'})
+                continue
+
+            if pair.last_open_time != expected['last_open_time']:
+                drifts.append({
+                    'trading_pair_id': pair_id,
+                    'reason': 'watermark',
+                    'state': pair.last_open_time,
+                    'sql': expected['last_open_time'],
+                })
+                continue
+
+            actual = pair.baselines()
+            for name in self.windows:
+                sql_value = expected.get(f'baseline_{name}')
+                state_value = actual[name]
+                if sql_value is None and state_value is None:
+                    continue
+                if sql_value is None or state_value is None:
+                    diff = float('inf')
+                else:
+                    sql_value = float(sql_value)
+                    diff = abs(state_value - sql_value) / max(abs(sql_value), 1e-9)
+                if diff > tolerance:
+                    drifts.append({
+                        'trading_pair_id': pair_id,
+                        'reason': f'baseline_{name}',
+                        'state': state_value,
+                        'sql': sql_value,
+                        'relative_diff': diff,
+                    })
+        return drifts
@@ -0,0 +1,108 @@
+"""
+Candle Access для Pump Detection System V2.0
+Индекс-дружественные условия на public.candles
+
+open_time хранится в миллисекундах. Условие вида
+to_timestamp(c.open_time / 1000) >= NOW() - INTERVAL '30 days'
+не может использовать индекс (trading_pair_id, interval_id, open_time),
+поэтому окна времени переводятся в миллисекунды на стороне Python
+и сравниваются с open_time напрямую.
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+import time
+
+# Длительность свечи по interval_id (мс)
+INTERVAL_MS = {
+    3: 3600 * 1000,        # 1h
+    4: 4 * 3600 * 1000,    # 4h
+}
+
+# Имя интервала (pump.raw_signals.interval, DETECTION['intervals']) -> interval_id.
+# Для 15m добавить interval_id из public.candles сюда и в INTERVAL_MS
+INTERVAL_IDS = {
+    '1h': 3,
+    '4h': 4,
+}
+INTERVAL_NAMES = {interval_id: name for name, interval_id in INTERVAL_IDS.items()}
+
+HOUR_MS = 3600 * 1000
+DAY_MS = 24 * HOUR_MS
+
+
+def to_ms(dt: datetime) -> int:
+    """datetime -> миллисекунды Unix (naive datetime считается локальным временем)"""
+    return int(dt.timestamp() * 1000)
+
+
+def from_ms(ms: int) -> datetime:
+    """Миллисекунды Unix -> datetime (UTC)"""
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc)
+
+
+def now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def ms_ago(hours: float = 0, days: float = 0, now: Optional[int] = None) -> int:
+    """Граница окна 'N часов/дней назад' в миллисекундах"""
+    if now is None:
+        now = now_ms()
+    return int(now - hours * HOUR_MS - days * DAY_MS)
+
+
+def window_bounds_ms(start: datetime, end: datetime) -> Tuple[int, int]:
+    """Окно [start, end) в миллисекундах"""
+    return to_ms(start), to_ms(end)
+
+
+def open_time_predicate(alias: str = 'c', start_ms: Optional[int] = None,
+                        end_ms: Optional[int] = None) -> Tuple[str, List[int]]:
+    """
+    Sargable условие на open_time
+
+    Returns:
+        (SQL фрагмент вида "AND c.open_time >= %s AND c.open_time < %s", параметры)
+    """
+    conditions = []
+    params = []
+    if start_ms is not None:
+        conditions.append(f"AND {alias}.open_time >= %s")
+        params.append(int(start_ms))
+    if end_ms is not None:
+        conditions.append(f"AND {alias}.open_time < %s")
+        params.append(int(end_ms))
+    return "\n".join(conditions), params
+
+
+def find_seq_scans(plan: Dict, relation: str = 'candles') -> List[Dict]:
+    """
+    Найти Seq Scan по таблице в плане EXPLAIN (FORMAT JSON)
+
+    Args:
+        plan: Корневой узел плана (результат EXPLAIN (FORMAT JSON) [0]['Plan'])
+        relation: Имя таблицы
+
+    Returns:
+        Список узлов Seq Scan по relation
+    """
+    found = []
+    stack = [plan]
+    while stack:
+        node = stack.pop()
+        if node.get('Node Type') == 'Seq Scan' and node.get('Relation Name') == relation:
+            found.append(node)
+        stack.extend(node.get('Plans', []))
+    return found
+
+
+def explain_plan(conn, query: str, params=None) -> Dict:
+    """EXPLAIN (FORMAT JSON) без выполнения запроса, возвращает корневой узел плана"""
+    with conn.cursor() as cur:
+        cur.execute("EXPLAIN (FORMAT JSON) " + query, params)
+        row = cur.fetchone()
+
+    # RealDictCursor возвращает dict, обычный курсор - tuple
+    result = row['QUERY PLAN'] if isinstance(row, dict) else row[0]
+    return result[0]['Plan']
@@ -0,0 +1,152 @@
+"""
+Candle Listener для Pump Detection System V2.0
+Ожидание закрытых свечей через LISTEN/NOTIFY (канал candle_closed)
+
+Триггеры на public.candles (migrations/014_candle_closed_notify.sql) отправляют
+payload "interval_id:trading_pair_id" при вставке закрытой свечи или при
+закрытии сформированной. Уведомления копятся и отдаются пачкой, когда поток
+затих на debounce_seconds (или прошло max_wait_seconds с первого уведомления):
+сборщик пишет свечи всех пар почти одновременно, и детекция запускается
+один раз на пачку, а не на каждую пару.
+"""
+
+from typing import Dict, Optional, Set
+import logging
+import select
+import time
+
+import psycopg2
+import psycopg2.extensions
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'candle_closed'
+
+
+def parse_payload(payload: str):
+    """'4:123' -> (4, 123); None для некорректного payload"""
+    try:
+        interval_id, pair_id = payload.split(':', 1)
+        return int(interval_id), int(pair_id)
+    except (AttributeError, ValueError):
+        return None
+
+
+class NotificationBatcher:
+    """Debounce уведомлений: {interval_id: {trading_pair_id}} после затишья"""
+
+    def __init__(self, debounce_seconds: float = 5.0, max_wait_seconds: float = 60.0):
+        self.debounce_seconds = debounce_seconds
+        self.max_wait_seconds = max_wait_seconds
+        self.pending: Dict[int, Set[int]] = {}
+        self.first_at: Optional[float] = None
+        self.last_at: Optional[float] = None
+
+    def add(self, payload: str, now: float) -> bool:
+        parsed = parse_payload(payload)
+        if parsed is None:
+            logger.warning(f"Ignoring malformed {CHANNEL} payload: {payload!r}")
+            return False
+
+        interval_id, pair_id = parsed
+        self.pending.setdefault(interval_id, set()).add(pair_id)
+        if self.first_at is None:
+            self.first_at = now
+        self.last_at = now
+        return True
+
+    def ready(self, now: float) -> bool:
+        if self.first_at is None:
+            return False
+        return (now - self.last_at >= self.debounce_seconds or
+                now - self.first_at >= self.max_wait_seconds)
+
+    def time_to_ready(self, now: float) -> Optional[float]:
+        """Секунд до готовности пачки (None если пачка пуста)"""
+        if self.first_at is None:
+            return None
+        return max(0.0, min(self.last_at + self.debounce_seconds,
+                            self.first_at + self.max_wait_seconds) - now)
+
+    def take(self) -> Dict[int, Set[int]]:
+        batch = self.pending
+        self.pending = {}
+        self.first_at = None
+        self.last_at = None
+        return batch
+
+
+class CandleListener:
+    """
+    LISTEN candle_closed на отдельном autocommit соединении
+
+    Использование:
+        listener = CandleListener(conn_params)
+        listener.connect()
+        batch = listener.wait(timeout=300)  # {4: {pair_id, ...}} или {} по таймауту
+    """
+
+    def __init__(self, conn_params: Dict, channel: str = CHANNEL,
+                 debounce_seconds: float = 5.0, max_wait_seconds: float = 60.0, pool=None):
+        self.conn_params = conn_params
+        self.pool = pool  # psycopg2 pool процесса (daemons/pipeline_daemon.py) вместо conn_params
+        self.channel = channel
+        self.batcher = NotificationBatcher(debounce_seconds, max_wait_seconds)
+        self.conn = None
+
+    def connect(self):
+        if self.pool is not None:
+            self.conn = self.pool.getconn()
+        else:
+            self.conn = psycopg2.connect(**self.conn_params)
+        self.conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with self.conn.cursor() as cur:
+            cur.execute(f"LISTEN {self.channel}")
+        logger.info(f"Listening on channel '{self.channel}'")
+
+    def close(self):
+        if self.conn:
+            try:
+                if self.pool is not None:
+                    self.pool.putconn(self.conn, close=True)
+                else:
+                    self.conn.close()
+            except Exception:
+                pass
+            self.conn = None
+
+    def drain(self, now: float):
+        """Забрать уведомления, уже полученные соединением"""
+        self.conn.poll()
+        while self.conn.notifies:
+            notify = self.conn.notifies.pop(0)
+            self.batcher.add(notify.payload, now)
+
+    def wait(self, timeout: float, should_continue=lambda: True) -> Dict[int, Set[int]]:
+        """
+        Дождаться пачки закрытых свечей
+
+        Args:
+            timeout: Максимум секунд ожидания первого уведомления
+            should_continue: Проверка флага остановки демона (опрашивается раз в секунду)
+
+        Returns:
+            {interval_id: {trading_pair_id}}; пустой dict по таймауту или остановке
+        """
+        deadline = time.time() + timeout
+
+        while should_continue():
+            now = time.time()
+            if self.batcher.ready(now):
+                return self.batcher.take()
+
+            to_ready = self.batcher.time_to_ready(now)
+            if to_ready is None:
+                if now >= deadline:
+                    return {}
+                to_ready = deadline - now
+
+            if select.select([self.conn], [], [], min(to_ready, 1.0)) != ([], [], []):
+                self.drain(time.time())
+
+        return self.batcher.take()
@@ -0,0 +1,101 @@
+"""
+Candle Watermarks для Pump Detection System V2.0
+Последний обработанный детектором закрытый open_time по паре и интервалу
+
+Дешевая проверка перед циклом детекции: для каждой eligible пары
+берется последняя закрытая свеча (один index-only probe по
+(trading_pair_id, interval_id, open_time)) и сравнивается с watermark.
+Если ни одна пара не продвинулась - тяжелый запрос детекции не нужен.
+"""
+
+from typing import Dict, Iterable
+import logging
+
+from psycopg2.extras import execute_values
+
+logger = logging.getLogger(__name__)
+
+
+ADVANCED_PAIRS_QUERY = """
+SELECT
+    tp.trading_pair_id,
+    lc.open_time
+FROM pump.eligible_pairs tp
+CROSS JOIN LATERAL (
+    SELECT c.open_time
+    FROM public.candles c
+    WHERE c.trading_pair_id = tp.trading_pair_id
+      AND c.interval_id = %(interval_id)s
+      AND c.is_closed = true
+      AND c.open_time >= %(since_ms)s
+    ORDER BY c.open_time DESC
+    LIMIT 1
+) lc
+LEFT JOIN pump.detector_watermarks w
+    ON w.trading_pair_id = tp.trading_pair_id
+    AND w.interval_id = %(interval_id)s
+WHERE tp.is_eligible
+  AND tp.contract_type_id IN (1, 2)  -- Futures, Spot
+  AND (w.last_open_time IS NULL OR lc.open_time > w.last_open_time)
+  {pair_filter}
+"""
+
+
+def find_advanced_pairs(conn, interval_id: int, since_ms: int,
+                        pair_ids: Iterable[int] = None) -> Dict[int, int]:
+    """
+    Пары с закрытыми свечами новее watermark
+
+    Args:
+        conn: psycopg2 connection (RealDictCursor)
+        interval_id: 4 = 4h, 3 = 1h
+        since_ms: Смотреть только свечи с open_time >= since_ms (окно lookback)
+        pair_ids: Проверять только эти пары (например, из уведомлений candle_closed)
+
+    Returns:
+        {trading_pair_id: open_time последней закрытой свечи}
+    """
+    params = {'interval_id': interval_id, 'since_ms': int(since_ms)}
+    pair_filter = ""
+    if pair_ids is not None:
+        pair_filter = "AND tp.trading_pair_id = ANY(%(pair_ids)s)"
+        params['pair_ids'] = list(pair_ids)
+
+    with conn.cursor() as cur:
+        cur.execute(ADVANCED_PAIRS_QUERY.format(pair_filter=pair_filter), params)
+        return {r['trading_pair_id']: r['open_time'] for r in cur.fetchall()}
+
+
+def save_watermarks(conn, interval_id: int, watermarks: Dict[int, int]) -> int:
+    """
+    Сдвинуть watermark пар (без commit - в транзакции с сигналами цикла)
+
+    Watermark только растет: более старое значение не перезаписывает новое.
+    """
+    if not watermarks:
+        return 0
+
+    rows = [(pair_id, interval_id, int(open_time)) for pair_id, open_time in watermarks.items()]
+
+    with conn.cursor() as cur:
+        execute_values(cur, """
+            INSERT INTO pump.detector_watermarks (trading_pair_id, interval_id, last_open_time)
+            VALUES %s
+            ON CONFLICT (trading_pair_id, interval_id) DO UPDATE SET
+                last_open_time = GREATEST(pump.detector_watermarks.last_open_time, EXCLUDED.last_open_time),
+                updated_at = NOW()
+        """, rows, page_size=1000)
+
+    return len(rows)
+
+
+def reset_watermarks(conn, interval_id: int, pair_ids: Iterable[int] = None):
+    """Удалить watermark (все пары интервала или только pair_ids), без commit"""
+    with conn.cursor() as cur:
+        if pair_ids is None:
+            cur.execute("DELETE FROM pump.detector_watermarks WHERE interval_id = %s", (interval_id,))
+        else:
+            cur.execute("""
+                DELETE FROM pump.detector_watermarks
+                WHERE interval_id = %s AND trading_pair_id = ANY(%s)
+            """, (interval_id, list(pair_ids)))
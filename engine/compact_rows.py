@@ -0,0 +1,101 @@
+"""
+Compact Rows для Pump Detection System V2.0
+Компактные строки результатов для горячих запросов PumpDatabaseHelper
+
+RealDictCursor строит на каждую строку dict, а NUMERIC колонки приходят как
+Decimal, которые движок затем переводит в float. Для горячих запросов
+(сигналы за 7 дней, чтение кандидатов) можно включить:
+- RecordCursor - строки-кортежи (namedtuple) с доступом и по имени колонки
+  (row['id'], row.get('price_at_signal')), и по атрибуту (row.id):
+  код, работающий со строками как со словарями, менять не нужно;
+- register_numeric_float - NUMERIC как float на уровне соединения.
+
+Измерение выигрыша: scripts/measure_compact_rows.py.
+"""
+
+from collections import namedtuple
+from functools import lru_cache
+from typing import Tuple
+
+import psycopg2.extensions
+
+# NUMERIC -> float (вместо Decimal) для всех запросов соединения
+NUMERIC_FLOAT = psycopg2.extensions.new_type(
+    psycopg2.extensions.DECIMAL.values,
+    'NUMERIC_FLOAT',
+    lambda value, cur: float(value) if value is not None else None,
+)
+
+
+def register_numeric_float(conn):
+    """NUMERIC колонки соединения conn приходят как float"""
+    psycopg2.extensions.register_type(NUMERIC_FLOAT, conn)
+
+
+class RecordMixin:
+    """Доступ к полям namedtuple как к ключам словаря"""
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        return tuple.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in self._fields else default
+
+    def keys(self):
+        return self._fields
+
+    def values(self):
+        return tuple(self)
+
+    def items(self):
+        return zip(self._fields, self)
+
+    def __reduce__(self):
+        # Класс строится на лету - pickle (результаты воркеров AnalysisPool) по набору колонок
+        return _make_record, (self._fields, tuple(self))
+
+
+@lru_cache(maxsize=64)
+def record_type(fields: Tuple[str, ...]):
+    """Класс строки для набора колонок (кэшируется по набору)"""
+    return type('Record', (RecordMixin, namedtuple('RecordBase', fields)), {'__slots__': ()})
+
+
+def _make_record(fields: Tuple[str, ...], values: tuple):
+    return record_type(fields)._make(values)
+
+
+class RecordCursor(psycopg2.extensions.cursor):
+    """Курсор, возвращающий строки record_type вместо dict"""
+
+    def execute(self, query, vars=None):
+        self._record = None
+        return super().execute(query, vars)
+
+    def _make(self):
+        if self._record is None:
+            self._record = record_type(tuple(column.name for column in self.description))._make
+        return self._record
+
+    def fetchone(self):
+        row = super().fetchone()
+        return None if row is None else self._make()(row)
+
+    def fetchmany(self, size=None):
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        return list(map(self._make(), rows)) if rows else rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        return list(map(self._make(), rows)) if rows else rows
+
+    def __iter__(self):
+        for row in super().__iter__():
+            yield self._make()(row)
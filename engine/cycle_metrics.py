@@ -0,0 +1,258 @@
+"""
+Cycle Metrics для демонов Pump Detection System V2.0
+Время по стадиям цикла (query, fetch, classify, write, commit, alert),
+число строк и объем полученных данных
+
+После каждого цикла метрики пишутся в текстовый формат Prometheus
+(<METRICS['dir']>/<daemon>.prom): файл читает scripts/health_check.py,
+его же может подхватить node_exporter (textfile collector).
+Запись атомарная (временный файл + os.replace).
+"""
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import logging
+import os
+import re
+import time
+
+from config.settings import METRICS
+
+logger = logging.getLogger(__name__)
+
+# Для оценки объема берем не больше стольких строк результата
+BYTES_SAMPLE_ROWS = 50
+
+_LINE_RE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})?\s+(\S+)$')
+_LABEL_RE = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def estimate_bytes(rows) -> int:
+    """
+    Приблизительный объем строк результата (текстовое представление значений)
+
+    Считается по первым BYTES_SAMPLE_ROWS строкам и масштабируется на все,
+    чтобы не обходить большие выборки целиком.
+    """
+    if not rows:
+        return 0
+    sample = rows[:BYTES_SAMPLE_ROWS]
+    size = 0
+    for row in sample:
+        values = row.values() if isinstance(row, dict) else row
+        size += sum(len(str(v)) for v in values if v is not None)
+    return size * len(rows) // len(sample)
+
+
+class StageStats:
+    """Счетчики одной стадии"""
+
+    __slots__ = ('seconds', 'calls', 'rows', 'bytes')
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.calls = 0
+        self.rows = 0
+        self.bytes = 0
+
+    def merge(self, other: 'StageStats'):
+        self.seconds += other.seconds
+        self.calls += other.calls
+        self.rows += other.rows
+        self.bytes += other.bytes
+
+
+class CycleMetrics:
+    """
+    Метрики циклов одного демона
+
+    Использование:
+        metrics.start_cycle()
+        with metrics.stage('query'):
+            cur.execute(...)
+        rows = metrics.fetchall(cur)
+        metrics.finish_cycle()
+    """
+
+    def __init__(self, daemon: str, metrics_dir=None, enabled: Optional[bool] = None):
+        self.daemon = daemon
+        self.metrics_dir = Path(metrics_dir or METRICS['dir'])
+        self.enabled = METRICS.get('enabled', True) if enabled is None else enabled
+
+        self.current: Dict[str, StageStats] = {}
+        self.totals: Dict[str, StageStats] = {}
+        self.cycles: Dict[str, int] = {}
+        self.errors = 0
+        self.cycle_started = None
+        self.last_duration = 0.0
+        self.last_status = None
+        self.last_finished = None
+
+    @property
+    def path(self) -> Path:
+        return self.metrics_dir / f'{self.daemon}.prom'
+
+    def start_cycle(self):
+        self.current = {}
+        self.errors = 0
+        self.cycle_started = time.time()
+
+    def _stats(self, name: str) -> StageStats:
+        stats = self.current.get(name)
+        if stats is None:
+            stats = self.current[name] = StageStats()
+        return stats
+
+    @contextmanager
+    def stage(self, name: str):
+        """Засечь время стадии (повторные входы в цикле суммируются)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            stats = self._stats(name)
+            stats.seconds += time.perf_counter() - started
+            stats.calls += 1
+
+    def count(self, name: str, rows: int = 0, size: int = 0):
+        """Добавить строки и байты к стадии"""
+        stats = self._stats(name)
+        stats.rows += rows
+        stats.bytes += size
+
+    def fetchall(self, cur, name: str = 'fetch') -> List:
+        """cur.fetchall() с учетом времени, строк и объема"""
+        with self.stage(name):
+            rows = cur.fetchall()
+        self.count(name, len(rows), estimate_bytes(rows))
+        return rows
+
+    def record_error(self):
+        """Цикл завершится со статусом error"""
+        self.errors += 1
+
+    def finish_cycle(self, status: str = 'ok'):
+        """Закрыть цикл и записать файл метрик"""
+        if self.cycle_started is None:
+            return
+        if self.errors:
+            status = 'error'
+
+        self.last_finished = time.time()
+        self.last_duration = self.last_finished - self.cycle_started
+        self.last_status = status
+        self.cycles[status] = self.cycles.get(status, 0) + 1
+        for name, stats in self.current.items():
+            self.totals.setdefault(name, StageStats()).merge(stats)
+        self.cycle_started = None
+
+        if self.enabled:
+            try:
+                self.write()
+            except OSError as e:
+                logger.warning(f"Failed to write metrics file {self.path}: {e}")
+
+        slowest = max(self.current.items(), key=lambda item: item[1].seconds, default=None)
+        if slowest:
+            logger.debug(f"Cycle {status} in {self.last_duration:.2f}s, "
+                         f"slowest stage: {slowest[0]} {slowest[1].seconds:.2f}s")
+
+    def render(self) -> str:
+        """Метрики в текстовом формате Prometheus"""
+        daemon = self.daemon
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, value in samples:
+                label_text = ','.join(f'{k}="{v}"' for k, v in [('daemon', daemon)] + labels)
+                lines.append(f'{name}{{{label_text}}} {value}')
+
+        stages = sorted(self.current)
+        totals = sorted(self.totals)
+
+        metric('pump_cycle_duration_seconds', 'gauge', 'Duration of the last cycle',
+               [([], f'{self.last_duration:.6f}')])
+        metric('pump_cycle_last_finished_timestamp_seconds', 'gauge', 'Unix time the last cycle finished',
+               [([], f'{self.last_finished or 0:.0f}')])
+        metric('pump_cycle_last_status', 'gauge', 'Status of the last cycle (1 for the current status)',
+               [([('status', self.last_status)], 1)] if self.last_status else [])
+        metric('pump_cycles_total', 'counter', 'Cycles since daemon start by status',
+               [([('status', status)], count) for status, count in sorted(self.cycles.items())])
+
+        metric('pump_cycle_stage_seconds', 'gauge', 'Time spent in a stage during the last cycle',
+               [([('stage', s)], f'{self.current[s].seconds:.6f}') for s in stages])
+        metric('pump_cycle_stage_rows', 'gauge', 'Rows handled by a stage during the last cycle',
+               [([('stage', s)], self.current[s].rows) for s in stages])
+        metric('pump_cycle_stage_bytes', 'gauge', 'Approximate bytes fetched by a stage during the last cycle',
+               [([('stage', s)], self.current[s].bytes) for s in stages])
+
+        metric('pump_cycle_stage_seconds_total', 'counter', 'Time spent in a stage since daemon start',
+               [([('stage', s)], f'{self.totals[s].seconds:.6f}') for s in totals])
+        metric('pump_cycle_stage_calls_total', 'counter', 'Stage entries since daemon start',
+               [([('stage', s)], self.totals[s].calls) for s in totals])
+        metric('pump_cycle_stage_rows_total', 'counter', 'Rows handled by a stage since daemon start',
+               [([('stage', s)], self.totals[s].rows) for s in totals])
+        metric('pump_cycle_stage_bytes_total', 'counter', 'Approximate bytes fetched by a stage since daemon start',
+               [([('stage', s)], self.totals[s].bytes) for s in totals])
+
+        return '\n'.join(lines) + '\n'
+
+    def write(self):
+        self.metrics_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f'.prom.{os.getpid()}.tmp')
+        tmp_path.write_text(self.render())
+        os.replace(tmp_path, self.path)
+
+
+def parse_metrics(text: str) -> List[Tuple[str, Dict[str, str], float]]:
+    """Разобрать текстовый формат Prometheus: [(name, labels, value)]"""
+    samples = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        match = _LINE_RE.match(line)
+        if not match:
+            continue
+        name, label_text, value = match.groups()
+        labels = dict(_LABEL_RE.findall(label_text or ''))
+        try:
+            samples.append((name, labels, float(value)))
+        except ValueError:
+            continue
+    return samples
+
+
+def read_metrics_dir(metrics_dir=None) -> Dict[str, Dict]:
+    """
+    Сводка последних циклов всех демонов из <METRICS['dir']>/*.prom
+
+    Returns:
+        {daemon: {'duration': s, 'finished': unix time, 'status': str,
+                  'stages': {stage: {'seconds', 'rows', 'bytes'}}}}
+    """
+    metrics_dir = Path(metrics_dir or METRICS['dir'])
+    summary = {}
+    if not metrics_dir.is_dir():
+        return summary
+
+    for path in sorted(metrics_dir.glob('*.prom')):
+        daemon = path.stem
+        info = {'duration': None, 'finished': None, 'status': None, 'stages': {}}
+        for name, labels, value in parse_metrics(path.read_text()):
+            stage = labels.get('stage')
+            if name == 'pump_cycle_duration_seconds':
+                info['duration'] = value
+            elif name == 'pump_cycle_last_finished_timestamp_seconds':
+                info['finished'] = value
+            elif name == 'pump_cycle_last_status':
+                info['status'] = labels.get('status')
+            elif stage and name in ('pump_cycle_stage_seconds', 'pump_cycle_stage_rows',
+                                    'pump_cycle_stage_bytes'):
+                key = name[len('pump_cycle_stage_'):]
+                info['stages'].setdefault(stage, {})[key] = value
+        summary[daemon] = info
+    return summary
@@ -4,25 +4,110 @@ Database Helper для Pump Detection System V2.0
 """
 
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import logging
+import time
+
+from config.settings import ENGINE_CONFIG
+from engine.alert_outbox import enqueue_alerts
+from engine.analysis_snapshots import save_snapshots, snapshot_history
+from engine.compact_rows import RecordCursor, register_numeric_float
 
 logger = logging.getLogger(__name__)
 
 
+def convert_config_value(value: str, value_type: str):
+    """Значение pump.detector_config в тип из value_type"""
+    if value_type == 'integer':
+        return int(value)
+    elif value_type == 'float':
+        return float(value)
+    elif value_type == 'boolean':
+        return value.lower() in ('true', '1', 'yes')
+    else:
+        return value
+
+
+def pump_info_from_row(row: Dict, current_time: datetime) -> Dict:
+    """pump_start, start_price, hours_since_pump из строки known_pump_events"""
+    pump_start = row['pump_start']
+    start_price = float(row['start_price']) if row['start_price'] else None
+    time_diff = current_time - pump_start
+    hours = int(time_diff.total_seconds() / 3600)
+
+    return {
+        'pump_start': pump_start,
+        'start_price': start_price,
+        'hours_since_pump': hours
+    }
+
+
+# relevance_score связи кандидат-сигнал по силе сигнала
+SIGNAL_RELEVANCE = {
+    'EXTREME': 1.0,
+    'VERY_STRONG': 0.8,
+    'STRONG': 0.6,
+    'MEDIUM': 0.4,
+    'WEAK': 0.2
+}
+
+
+def candidate_links_diff(existing, links: Dict[int, List]) -> Tuple[List[Tuple], List[Tuple]]:
+    """
+    Изменения pump.candidate_signals для кандидатов из links
+
+    Args:
+        existing: пары (candidate_id, signal_id), уже записанные для этих кандидатов
+        links: Dict {candidate_id: сигналы (id, signal_strength)} - нужное состояние
+
+    Returns:
+        (added, removed): [(candidate_id, signal_id, relevance_score)], [(candidate_id, signal_id)]
+    """
+    existing = set(existing)
+    desired = {}
+    for candidate_id, signals in links.items():
+        for signal in signals:
+            desired[(candidate_id, signal['id'])] = SIGNAL_RELEVANCE.get(signal['signal_strength'], 0.5)
+
+    added = [(c, s, relevance) for (c, s), relevance in desired.items() if (c, s) not in existing]
+    removed = sorted(pair for pair in existing if pair not in desired)
+    return added, removed
+
+
 class PumpDatabaseHelper:
     """Helper класс для работы с pump schema V2.0"""
 
-    def __init__(self, db_config: dict):
+    def __init__(self, db_config: dict, config_ttl: float = None, compact_rows: bool = False,
+                 pool=None):
+        """
+        Args:
+            db_config: DATABASE
+            config_ttl: TTL кэша pump.detector_config (по умолчанию ENGINE_CONFIG)
+            compact_rows: Горячие запросы (сигналы, кандидаты) возвращают компактные
+                строки-кортежи, NUMERIC соединения приходит как float (engine/compact_rows.py)
+            pool: psycopg2 pool процесса - соединение берется из него (daemons/pipeline_daemon.py)
+        """
         self.db_config = db_config
         self.conn = None
+        self.compact_rows = compact_rows
+        self.pool = pool
+
+        # Кэш pump.detector_config: все ключи одним запросом, обновление по TTL или NOTIFY
+        self.config_ttl = ENGINE_CONFIG['cache_ttl_seconds'] if config_ttl is None else config_ttl
+        self.config_channel = ENGINE_CONFIG['notify_channel']
+        self.config_version = 0  # растет, когда перезагруженные значения отличаются
+        self._config: Optional[Dict] = None
+        self._config_loaded_at = 0.0
+        self._config_listening = False
 
     def connect(self):
         """Подключение к БД"""
         try:
-            if not self.db_config.get('password'):
+            if self.pool is not None:
+                self.conn = self.pool.getconn()
+            elif not self.db_config.get('password'):
                 conn_params = {
                     'dbname': self.db_config['dbname'],
                     'cursor_factory': RealDictCursor
@@ -37,9 +122,18 @@ class PumpDatabaseHelper:
                     'cursor_factory': RealDictCursor
                 }
 
-            self.conn = psycopg2.connect(**conn_params)
+            if self.pool is None:
+                self.conn = psycopg2.connect(**conn_params)
             self.conn.autocommit = False
+            if self.compact_rows:
+                register_numeric_float(self.conn)
             logger.info("Database connection established")
+
+            if self._config_listening:
+                # Новое соединение: подписка и пропущенные изменения
+                self._config_listening = False
+                self.listen_config_changes()
+                self._config_loaded_at = 0.0
         except Exception as e:
             logger.error(f"Database connection failed: {e}")
             raise
@@ -47,40 +141,122 @@ class PumpDatabaseHelper:
     def close(self):
         """Закрыть соединение"""
         if self.conn:
-            self.conn.close()
+            if self.pool is not None:
+                # Соединение с register_numeric_float / LISTEN не возвращается в пул для других
+                self.pool.putconn(self.conn, close=True)
+            else:
+                self.conn.close()
             logger.info("Database connection closed")
 
     def get_config_value(self, key: str, default=None):
-        """Получить значение из pump.detector_config"""
+        """Получить значение из pump.detector_config (через кэш всех ключей)"""
+        config = self.get_config()
+        return config.get(key, default)
+
+    def get_config(self) -> Dict:
+        """
+        Все ключи pump.detector_config с приведенными типами
+
+        Кэш перезагружается, если прошло config_ttl секунд или пришел NOTIFY
+        на config_channel (после listen_config_changes). При ошибке загрузки
+        остаются прежние значения.
+        """
+        if self._config is None or self._config_stale():
+            self.load_config()
+        return self._config if self._config is not None else {}
+
+    def load_config(self) -> bool:
+        """
+        Загрузить все ключи pump.detector_config одним запросом
+
+        Returns:
+            True если значения изменились (config_version увеличен)
+        """
         try:
             with self.conn.cursor() as cur:
                 cur.execute("""
-                    SELECT value, value_type
+                    SELECT key, value, value_type
                     FROM pump.detector_config
-                    WHERE key = %s
-                """, (key,))
+                """)
+                rows = cur.fetchall()
+        except Exception as e:
+            logger.error(f"Error loading detector config: {e}")
+            self._config_loaded_at = time.monotonic()
+            return False
+
+        config = {}
+        for row in rows:
+            try:
+                config[row['key']] = convert_config_value(row['value'], row['value_type'])
+            except (AttributeError, ValueError) as e:
+                logger.error(f"Error converting config {row['key']}={row['value']!r}: {e}")
+
+        self._config_loaded_at = time.monotonic()
+        if config == self._config:
+            return False
+
+        if self._config is not None:
+            changed = sorted(k for k in config.keys() | self._config.keys()
+                             if config.get(k) != self._config.get(k))
+            logger.info(f"Detector config reloaded, changed: {', '.join(changed)}")
+        self._config = config
+        self.config_version += 1
+        return True
+
+    def refresh_config(self) -> bool:
+        """Перезагрузить кэш, если он устарел; True если значения изменились"""
+        if self._config is not None and not self._config_stale():
+            return False
+        return self.load_config()
+
+    def listen_config_changes(self):
+        """
+        LISTEN на config_channel: кэш перезагрузится при следующем обращении после NOTIFY
 
-                result = cur.fetchone()
-                if not result:
-                    return default
-
-                value, value_type = result['value'], result['value_type']
-
-                # Конвертация типа
-                if value_type == 'integer':
-                    return int(value)
-                elif value_type == 'float':
-                    return float(value)
-                elif value_type == 'boolean':
-                    return value.lower() in ('true', '1', 'yes')
-                else:
-                    return value
+        PostgreSQL доставляет уведомления между транзакциями, поэтому соединение
+        не должно надолго оставаться в открытой транзакции (демоны делают commit
+        каждый цикл).
+        """
+        if self._config_listening:
+            return
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute(f"LISTEN {self.config_channel}")
+            self.conn.commit()
+            self._config_listening = True
+            logger.info(f"Listening for detector config changes on '{self.config_channel}'")
+        except Exception as e:
+            logger.error(f"Error subscribing to {self.config_channel}: {e}")
+            self.conn.rollback()
+
+    def _config_stale(self) -> bool:
+        if time.monotonic() - self._config_loaded_at >= self.config_ttl:
+            return True
+        if not self._config_listening:
+            return False
+
+        try:
+            self.conn.poll()
         except Exception as e:
-            logger.error(f"Error getting config {key}: {e}")
-            return default
+            logger.warning(f"Error polling {self.config_channel} notifications: {e}")
+            return False
+
+        # Уведомления других каналов этого соединения не трогаем
+        notified = False
+        for notify in list(self.conn.notifies):
+            if notify.channel == self.config_channel:
+                self.conn.notifies.remove(notify)
+                notified = True
+        return notified
+
+    def _rows_cursor(self):
+        """Курсор горячих запросов: RecordCursor при compact_rows, иначе RealDictCursor соединения"""
+        if self.compact_rows:
+            return self.conn.cursor(cursor_factory=RecordCursor)
+        return self.conn.cursor()
 
     def get_signals_last_n_days(self, symbol: str, days: int = 7,
-                                 current_time: datetime = None) -> List[Dict]:
+                                 current_time: datetime = None, interval: str = '4h') -> List[Dict]:
         """
         Получить сигналы за последние N дней для символа
 
@@ -88,6 +264,7 @@ class PumpDatabaseHelper:
             symbol: Символ торговой пары (например, 'BTCUSDT')
             days: Количество дней назад
             current_time: Текущее время (для тестирования на исторических данных)
+            interval: Интервал свечей сигналов ('4h', '1h')
 
         Returns:
             List of signal dicts с полями:
@@ -100,7 +277,7 @@ class PumpDatabaseHelper:
         lookback_time = current_time - timedelta(days=days)
 
         try:
-            with self.conn.cursor() as cur:
+            with self._rows_cursor() as cur:
                 query = """
                     SELECT
                         id,
@@ -115,17 +292,75 @@ class PumpDatabaseHelper:
                         baseline_30d
                     FROM pump.raw_signals
                     WHERE pair_symbol = %s
+                      AND interval = %s
                       AND signal_timestamp >= %s
                       AND signal_timestamp <= %s
-                    ORDER BY signal_timestamp DESC
+                    ORDER BY signal_timestamp DESC, id DESC
                 """
 
-                cur.execute(query, (symbol, lookback_time, current_time))
+                cur.execute(query, (symbol, interval, lookback_time, current_time))
                 return cur.fetchall()
         except Exception as e:
             logger.error(f"Error getting signals for {symbol}: {e}")
             return []
 
+    def get_signals_last_n_days_bulk(self, symbols: List[str], days: int = 7,
+                                     current_time: datetime = None,
+                                     interval: str = '4h') -> Dict[str, List[Dict]]:
+        """
+        Сигналы за последние N дней для набора символов одним запросом
+
+        Порядок сигналов внутри символа тот же, что у get_signals_last_n_days.
+        Ошибка запроса пробрасывается после rollback: пустой результат означал бы
+        "нет сигналов" для всех символов, и такой анализ попал бы в кэш runner.
+
+        Returns:
+            {symbol: [signal dicts]} (символы без сигналов отсутствуют)
+        """
+        if current_time is None:
+            current_time = datetime.now()
+
+        lookback_time = current_time - timedelta(days=days)
+        grouped = {}
+        if not symbols:
+            return grouped
+
+        try:
+            with self._rows_cursor() as cur:
+                query = """
+                    SELECT
+                        pair_symbol,
+                        id,
+                        signal_type,
+                        signal_timestamp,
+                        spike_ratio_7d,
+                        signal_strength,
+                        volume,
+                        price_at_signal,
+                        baseline_7d,
+                        baseline_14d,
+                        baseline_30d
+                    FROM pump.raw_signals
+                    WHERE pair_symbol = ANY(%s)
+                      AND interval = %s
+                      AND signal_timestamp >= %s
+                      AND signal_timestamp <= %s
+                    ORDER BY pair_symbol, signal_timestamp DESC, id DESC
+                """
+
+                cur.execute(query, (list(symbols), interval, lookback_time, current_time))
+                for row in cur.fetchall():
+                    if self.compact_rows:
+                        # Кортеж неизменяем: pair_symbol остается полем строки
+                        grouped.setdefault(row.pair_symbol, []).append(row)
+                    else:
+                        grouped.setdefault(row.pop('pair_symbol'), []).append(row)
+                return grouped
+        except Exception as e:
+            logger.error(f"Error getting signals for {len(symbols)} symbols: {e}")
+            self.conn.rollback()
+            raise
+
     def insert_raw_signal(self, signal_data: Dict) -> Optional[int]:
         """
         Вставить сырой сигнал в pump.raw_signals
@@ -134,7 +369,7 @@ class PumpDatabaseHelper:
             signal_data: Dict с полями:
                 trading_pair_id, pair_symbol, signal_type, signal_timestamp,
                 volume, price_at_signal, baseline_7d, spike_ratio_7d,
-                signal_strength, [baseline_14d, baseline_30d, spike_ratio_14d, spike_ratio_30d]
+                signal_strength, [baseline_14d, baseline_30d, spike_ratio_14d, spike_ratio_30d, interval]
 
         Returns:
             ID вставленной записи или None при ошибке
@@ -147,13 +382,13 @@ class PumpDatabaseHelper:
                         signal_timestamp, volume, price_at_signal,
                         baseline_7d, baseline_14d, baseline_30d,
                         spike_ratio_7d, spike_ratio_14d, spike_ratio_30d,
-                        signal_strength, detector_version
+                        signal_strength, detector_version, interval
                     ) VALUES (
                         %(trading_pair_id)s, %(pair_symbol)s, %(signal_type)s,
                         %(signal_timestamp)s, %(volume)s, %(price_at_signal)s,
                         %(baseline_7d)s, %(baseline_14d)s, %(baseline_30d)s,
                         %(spike_ratio_7d)s, %(spike_ratio_14d)s, %(spike_ratio_30d)s,
-                        %(signal_strength)s, %(detector_version)s
+                        %(signal_strength)s, %(detector_version)s, %(interval)s
                     )
                     RETURNING id
                 """
@@ -164,6 +399,7 @@ class PumpDatabaseHelper:
                 signal_data.setdefault('baseline_30d', None)
                 signal_data.setdefault('spike_ratio_14d', None)
                 signal_data.setdefault('spike_ratio_30d', None)
+                signal_data.setdefault('interval', '4h')
 
                 cur.execute(query, signal_data)
                 result = cur.fetchone()
@@ -175,7 +411,7 @@ class PumpDatabaseHelper:
             self.conn.rollback()
             return None
 
-    def create_or_update_candidate(self, candidate_data: Dict) -> Optional[int]:
+    def create_or_update_candidate(self, candidate_data: Dict, commit: bool = True) -> Optional[int]:
         """
         Создать или обновить pump candidate
 
@@ -185,94 +421,203 @@ class PumpDatabaseHelper:
                 total_signals, extreme_signals, critical_window_signals,
                 eta_hours, is_actionable, pump_phase, price_change_from_first,
                 price_change_24h, hours_since_last_pump, [status]
+            commit: False - часть транзакции вызывающего (без commit,
+                ошибка пробрасывается для rollback всей транзакции)
 
         Returns:
             ID кандидата или None при ошибке
         """
+        return self.upsert_candidates([candidate_data], commit=commit).get(candidate_data['pair_symbol'])
+
+    def upsert_candidates(self, candidates: List[Dict], commit: bool = True) -> Dict[str, int]:
+        """
+        Создать или обновить pump candidates одним INSERT ... ON CONFLICT
+
+        ACTIVE кандидат символа один (частичный уникальный индекс
+        uq_pump_candidates_active_symbol, migrations/019): существующий
+        обновляется, first_detected_at и trading_pair_id сохраняются.
+
+        Args:
+            candidates: List of candidate_data (поля как в create_or_update_candidate);
+                при повторе символа используется последний
+            commit: как в create_or_update_candidate
+
+        Returns:
+            Dict {pair_symbol: candidate_id} ({} при ошибке)
+        """
+        by_symbol = {c['pair_symbol']: c for c in candidates}
+        if not by_symbol:
+            return {}
+
+        rows = [(
+            c['pair_symbol'], c['trading_pair_id'],
+            c['confidence'], c['score'], c['pattern_type'],
+            c['total_signals'], c['extreme_signals'], c['critical_window_signals'],
+            c['eta_hours'], c.get('status', 'ACTIVE'), c['is_actionable'],
+            c['pump_phase'], c['price_change_from_first'], c['price_change_24h'], c['hours_since_last_pump']
+        ) for c in by_symbol.values()]
+
+        try:
+            with self.conn.cursor() as cur:
+                inserted = execute_values(cur, """
+                    INSERT INTO pump.pump_candidates (
+                        pair_symbol, trading_pair_id, first_detected_at,
+                        confidence, score, pattern_type,
+                        total_signals, extreme_signals, critical_window_signals,
+                        eta_hours, status, is_actionable,
+                        pump_phase, price_change_from_first, price_change_24h, hours_since_last_pump
+                    ) VALUES %s
+                    ON CONFLICT (pair_symbol) WHERE status = 'ACTIVE' DO UPDATE SET
+                        last_updated_at = NOW(),
+                        confidence = EXCLUDED.confidence,
+                        score = EXCLUDED.score,
+                        pattern_type = EXCLUDED.pattern_type,
+                        total_signals = EXCLUDED.total_signals,
+                        extreme_signals = EXCLUDED.extreme_signals,
+                        critical_window_signals = EXCLUDED.critical_window_signals,
+                        eta_hours = EXCLUDED.eta_hours,
+                        is_actionable = EXCLUDED.is_actionable,
+                        pump_phase = EXCLUDED.pump_phase,
+                        price_change_from_first = EXCLUDED.price_change_from_first,
+                        price_change_24h = EXCLUDED.price_change_24h,
+                        hours_since_last_pump = EXCLUDED.hours_since_last_pump
+                    RETURNING id, pair_symbol
+                """, rows, template="(%s, %s, NOW(), %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
+                    page_size=len(rows), fetch=True)
+                if commit:
+                    self.conn.commit()
+
+                return {r['pair_symbol']: r['id'] for r in inserted}
+        except Exception as e:
+            logger.error(f"Error upserting {len(rows)} candidates: {e}")
+            if not commit:
+                raise
+            self.conn.rollback()
+            return {}
+
+    def sync_candidate_signals(self, links: Dict[int, List], commit: bool = True) -> Tuple[int, int]:
+        """
+        Привести связи pump.candidate_signals кандидатов к текущим наборам сигналов
+
+        Пишется только разница с уже записанными связями: один bulk INSERT
+        новых и один bulk DELETE выпавших из окна (вместо DELETE всех связей
+        кандидата и INSERT на каждый сигнал).
+
+        Args:
+            links: Dict {candidate_id: сигналы (id, signal_strength)}
+            commit: как в create_or_update_candidate
+
+        Returns:
+            (added, removed) - число вставленных и удаленных связей
+        """
+        if not links:
+            return 0, 0
+
         try:
             with self.conn.cursor() as cur:
-                # Проверяем, есть ли уже ACTIVE кандидат для этого символа
                 cur.execute("""
-                    SELECT id FROM pump.pump_candidates
-                    WHERE pair_symbol = %s AND status = 'ACTIVE'
-                    ORDER BY first_detected_at DESC
-                    LIMIT 1
-                """, (candidate_data['pair_symbol'],))
-
-                existing = cur.fetchone()
-
-                if existing:
-                    # Обновляем существующий
-                    query = """
-                        UPDATE pump.pump_candidates SET
-                            last_updated_at = NOW(),
-                            confidence = %(confidence)s,
-                            score = %(score)s,
-                            pattern_type = %(pattern_type)s,
-                            total_signals = %(total_signals)s,
-                            extreme_signals = %(extreme_signals)s,
-                            critical_window_signals = %(critical_window_signals)s,
-                            eta_hours = %(eta_hours)s,
-                            is_actionable = %(is_actionable)s,
-                            pump_phase = %(pump_phase)s,
-                            price_change_from_first = %(price_change_from_first)s,
-                            price_change_24h = %(price_change_24h)s,
-                            hours_since_last_pump = %(hours_since_last_pump)s
-                        WHERE id = %(id)s
-                        RETURNING id
-                    """
-                    candidate_data['id'] = existing['id']
-                else:
-                    # Создаем новый
-                    query = """
-                        INSERT INTO pump.pump_candidates (
-                            pair_symbol, trading_pair_id, first_detected_at,
-                            confidence, score, pattern_type,
-                            total_signals, extreme_signals, critical_window_signals,
-                            eta_hours, status, is_actionable,
-                            pump_phase, price_change_from_first, price_change_24h, hours_since_last_pump
-                        ) VALUES (
-                            %(pair_symbol)s, %(trading_pair_id)s, NOW(),
-                            %(confidence)s, %(score)s, %(pattern_type)s,
-                            %(total_signals)s, %(extreme_signals)s, %(critical_window_signals)s,
-                            %(eta_hours)s, %(status)s, %(is_actionable)s,
-                            %(pump_phase)s, %(price_change_from_first)s, %(price_change_24h)s, %(hours_since_last_pump)s
-                        )
-                        RETURNING id
-                    """
-                    candidate_data.setdefault('status', 'ACTIVE')
-
-                cur.execute(query, candidate_data)
-                result = cur.fetchone()
-                self.conn.commit()
+                    SELECT candidate_id, signal_id
+                    FROM pump.candidate_signals
+                    WHERE candidate_id = ANY(%s)
+                """, (list(links),))
+                existing = [(r['candidate_id'], r['signal_id']) for r in cur.fetchall()]
+
+                added, removed = candidate_links_diff(existing, links)
+
+                if added:
+                    execute_values(cur, """
+                        INSERT INTO pump.candidate_signals (candidate_id, signal_id, relevance_score)
+                        VALUES %s
+                        ON CONFLICT (candidate_id, signal_id) DO NOTHING
+                    """, added, page_size=len(added))
+                if removed:
+                    execute_values(cur, """
+                        DELETE FROM pump.candidate_signals
+                        WHERE (candidate_id, signal_id) IN (VALUES %s)
+                    """, removed, page_size=len(removed))
+
+                if commit:
+                    self.conn.commit()
+                return len(added), len(removed)
+        except Exception as e:
+            logger.error(f"Error syncing candidate signals: {e}")
+            if not commit:
+                raise
+            self.conn.rollback()
+            return 0, 0
 
-                return result['id'] if result else None
+    def save_analysis_snapshot(self, candidate_id: int, analysis_data: dict, commit: bool = True):
+        """Сохранить snapshot анализа (commit=False - как в create_or_update_candidate)"""
+        self.save_analysis_snapshots({candidate_id: analysis_data}, commit=commit)
+
+    def save_analysis_snapshots(self, snapshots: Dict[int, Dict], commit: bool = True) -> int:
+        """
+        Сохранить snapshots анализа кандидатов одним INSERT
+
+        Пишутся только изменившиеся (engine/analysis_snapshots.py)
+
+        Args:
+            snapshots: Dict {candidate_id: analysis_details}
+            commit: как в create_or_update_candidate
+
+        Returns:
+            Число записанных snapshots
+        """
+        try:
+            saved = save_snapshots(self.conn, snapshots)
+            if commit:
+                self.conn.commit()
+            return saved
         except Exception as e:
-            logger.error(f"Error creating/updating candidate: {e}")
+            logger.error(f"Error saving analysis snapshots: {e}")
+            if not commit:
+                raise
             self.conn.rollback()
-            return None
+            return 0
+
+    def get_snapshot_history(self, candidate_id: int, since: datetime = None) -> List[Dict]:
+        """
+        Полная история analysis_details кандидата из дедуплицированных строк
 
-    def save_analysis_snapshot(self, candidate_id: int, analysis_data: dict):
-        """Сохранить snapshot анализа в JSONB"""
+        Returns:
+            List of {'valid_from', 'valid_until', 'analysis'} по возрастанию времени
+        """
         try:
-            with self.conn.cursor() as cur:
-                query = """
-                    INSERT INTO pump.analysis_snapshots (
-                        candidate_id, analysis_data
-                    ) VALUES (%s, %s)
-                """
+            return snapshot_history(self.conn, candidate_id, since)
+        except Exception as e:
+            logger.error(f"Error reading snapshot history for candidate {candidate_id}: {e}")
+            self.conn.rollback()
+            return []
+
+    def enqueue_alerts(self, alerts: List[Dict], commit: bool = True) -> int:
+        """
+        Добавить Telegram alerts в pump.alert_outbox (engine/alert_outbox.py)
+
+        Отправляет daemons/alert_delivery_worker.py
+
+        Args:
+            alerts: List of {'source', 'chat_id', 'message', 'parse_mode', 'dedup_key'}
+            commit: как в create_or_update_candidate
 
-                import json
-                cur.execute(query, (candidate_id, json.dumps(analysis_data)))
+        Returns:
+            Число добавленных alerts
+        """
+        try:
+            added = enqueue_alerts(self.conn, alerts)
+            if commit:
                 self.conn.commit()
+            return added
         except Exception as e:
-            logger.error(f"Error saving analysis snapshot: {e}")
+            logger.error(f"Error enqueueing alerts: {e}")
+            if not commit:
+                raise
             self.conn.rollback()
+            return 0
 
     def get_active_candidates(self) -> List[Dict]:
         """Получить все активные кандидаты"""
         try:
-            with self.conn.cursor() as cur:
+            with self._rows_cursor() as cur:
                 query = """
                     SELECT * FROM pump.pump_candidates
                     WHERE status = 'ACTIVE'
@@ -353,16 +698,39 @@ class PumpDatabaseHelper:
                 if not result:
                     return None
 
-                pump_start = result['pump_start']
-                start_price = float(result['start_price']) if result['start_price'] else None
-                time_diff = current_time - pump_start
-                hours = int(time_diff.total_seconds() / 3600)
-
-                return {
-                    'pump_start': pump_start,
-                    'start_price': start_price,
-                    'hours_since_pump': hours
-                }
+                return pump_info_from_row(result, current_time)
         except Exception as e:
             logger.error(f"Error getting last pump info for {symbol}: {e}")
             return None
+
+    def get_last_pump_info_bulk(self, symbols: List[str], current_time: datetime = None) -> Dict[str, Dict]:
+        """
+        Последний памп для набора символов одним запросом (DISTINCT ON)
+
+        Ошибка запроса пробрасывается после rollback (как в get_signals_last_n_days_bulk).
+
+        Returns:
+            {symbol: dict как у get_last_pump_info} (символы без пампа отсутствуют)
+        """
+        if current_time is None:
+            current_time = datetime.now()
+        if not symbols:
+            return {}
+
+        try:
+            with self.conn.cursor() as cur:
+                query = """
+                    SELECT DISTINCT ON (pair_symbol)
+                        pair_symbol, pump_start, start_price
+                    FROM pump.known_pump_events
+                    WHERE pair_symbol = ANY(%s)
+                      AND pump_start <= %s
+                    ORDER BY pair_symbol, pump_start DESC
+                """
+                cur.execute(query, (list(symbols), current_time))
+                return {row['pair_symbol']: pump_info_from_row(row, current_time)
+                        for row in cur.fetchall()}
+        except Exception as e:
+            logger.error(f"Error getting last pump info for {len(symbols)} symbols: {e}")
+            self.conn.rollback()
+            raise
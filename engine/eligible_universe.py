@@ -0,0 +1,150 @@
+"""
+Eligible Universe для Pump Detection System V2.0
+Пересборка pump.eligible_pairs - снимка пар, прошедших фильтры детектора
+
+Фильтры (как в detector_daemon_v2):
+- Не мем-коин (public.is_meme_coin)
+- Не стейблкоин (public.is_stablecoin_pair)
+- Market cap >= $100M (public.tokens -> public.cmc_crypto)
+
+Функции фильтров вызываются один раз на пару при пересборке,
+а не на каждую свечу в 30-дневном окне.
+"""
+
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+MIN_MARKET_CAP = 100000000  # $100M
+
+
+REBUILD_QUERY = """
+CREATE TEMP TABLE eligible_pairs_new ON COMMIT DROP AS
+SELECT
+    tp.id as trading_pair_id,
+    tp.pair_symbol,
+    tp.contract_type_id,
+    tp.token_id,
+    mc.market_cap,
+    CASE
+        WHEN mc.market_cap IS NULL THEN 'UNKNOWN'
+        WHEN mc.market_cap >= 10000000000 THEN 'MEGA'   -- >= $10B
+        WHEN mc.market_cap >= 1000000000 THEN 'LARGE'   -- >= $1B
+        WHEN mc.market_cap >= %(min_market_cap)s THEN 'MID'
+        ELSE 'SMALL'
+    END as market_cap_tier,
+    ARRAY_REMOVE(ARRAY[
+        CASE WHEN public.is_meme_coin(tp.id) THEN 'meme' END,
+        CASE WHEN public.is_stablecoin_pair(tp.id) THEN 'stablecoin' END,
+        CASE
+            WHEN mc.market_cap IS NULL THEN 'no_market_cap'
+            WHEN mc.market_cap < %(min_market_cap)s THEN 'low_market_cap'
+        END
+    ], NULL) as filter_reasons
+FROM public.trading_pairs tp
+LEFT JOIN LATERAL (
+    SELECT MAX(cmc.market_cap) as market_cap
+    FROM public.tokens t
+    JOIN public.cmc_crypto cmc ON t.cmc_token_id = cmc.cmc_token_id
+    WHERE t.id = tp.token_id
+) mc ON true
+WHERE tp.exchange_id = 1  -- Binance
+  AND tp.is_active = true
+  AND tp.contract_type_id IN (1, 2)  -- Futures, Spot
+"""
+
+DIFF_QUERY = """
+SELECT
+    COALESCE(n.trading_pair_id, o.trading_pair_id) as trading_pair_id,
+    COALESCE(n.pair_symbol, o.pair_symbol) as pair_symbol,
+    COALESCE(n.contract_type_id, o.contract_type_id) as contract_type_id,
+    COALESCE(o.is_eligible, false) as was_eligible,
+    COALESCE(cardinality(n.filter_reasons) = 0, false) as is_eligible,
+    o.market_cap_tier as old_tier,
+    n.market_cap_tier as new_tier,
+    n.filter_reasons
+FROM eligible_pairs_new n
+FULL OUTER JOIN pump.eligible_pairs o ON o.trading_pair_id = n.trading_pair_id
+WHERE COALESCE(o.is_eligible, false) <> COALESCE(cardinality(n.filter_reasons) = 0, false)
+   OR (o.is_eligible AND o.market_cap_tier IS DISTINCT FROM n.market_cap_tier)
+ORDER BY 2
+"""
+
+
+def rebuild_eligible_pairs(conn, dry_run: bool = False) -> Dict:
+    """
+    Пересобрать pump.eligible_pairs и вернуть изменения
+
+    Снимок заменяется в одной транзакции: читатели видят старый
+    список до коммита.
+
+    Args:
+        conn: psycopg2 connection (RealDictCursor)
+        dry_run: Только посчитать изменения, не заменяя снимок
+
+    Returns:
+        {'total': int, 'eligible': int, 'added': [...], 'removed': [...], 'tier_changed': [...]}
+    """
+    try:
+        with conn.cursor() as cur:
+            cur.execute(REBUILD_QUERY, {'min_market_cap': MIN_MARKET_CAP})
+
+            cur.execute(DIFF_QUERY)
+            changes = cur.fetchall()
+
+            cur.execute("""
+                SELECT
+                    COUNT(*) as total,
+                    COUNT(*) FILTER (WHERE cardinality(filter_reasons) = 0) as eligible
+                FROM eligible_pairs_new
+            """)
+            stats = cur.fetchone()
+
+            if not dry_run:
+                cur.execute("DELETE FROM pump.eligible_pairs")
+                cur.execute("""
+                    INSERT INTO pump.eligible_pairs (
+                        trading_pair_id, pair_symbol, contract_type_id, token_id,
+                        market_cap, market_cap_tier, filter_reasons, is_eligible, built_at
+                    )
+                    SELECT
+                        trading_pair_id, pair_symbol, contract_type_id, token_id,
+                        market_cap, market_cap_tier, filter_reasons,
+                        cardinality(filter_reasons) = 0, NOW()
+                    FROM eligible_pairs_new
+                """)
+
+        if dry_run:
+            conn.rollback()
+        else:
+            conn.commit()
+
+    except Exception as e:
+        logger.error(f"Error rebuilding eligible pairs: {e}")
+        conn.rollback()
+        raise
+
+    result = {
+        'total': stats['total'],
+        'eligible': stats['eligible'],
+        'added': [c for c in changes if c['is_eligible'] and not c['was_eligible']],
+        'removed': [c for c in changes if c['was_eligible'] and not c['is_eligible']],
+        'tier_changed': [c for c in changes if c['was_eligible'] and c['is_eligible']],
+    }
+
+    logger.info(f"Eligible pairs {'checked' if dry_run else 'rebuilt'}: {result['eligible']}/{result['total']} eligible, "
+                f"+{len(result['added'])} / -{len(result['removed'])}, "
+                f"{len(result['tier_changed'])} tier changes")
+    return result
+
+
+def get_snapshot_age_hours(conn) -> Optional[float]:
+    """Возраст снимка pump.eligible_pairs в часах (None если снимок пуст)"""
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT EXTRACT(EPOCH FROM (NOW() - MAX(built_at))) / 3600 as age_hours
+            FROM pump.eligible_pairs
+        """)
+        row = cur.fetchone()
+    return float(row['age_hours']) if row and row['age_hours'] is not None else None
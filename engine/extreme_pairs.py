@@ -0,0 +1,90 @@
+"""
+Extreme Pairs для Pump Detection System V2.0
+Double EXTREME (SPOT и FUTURES EXTREME на одной 4h свече) по сигналам в памяти
+
+daemons/extreme_alert_monitor.py ищет пары запросом к pump.raw_signals
+("обнаружены за последние N минут"); конвейер (daemons/pipeline_daemon.py)
+получает свежие сигналы от детектора и проверяет их здесь, без повторного чтения.
+
+Как и у монитора, проверяется только последняя свеча: трекер помнит EXTREME
+сигналы последней свечи между циклами, поэтому пара находится и тогда, когда
+SPOT и FUTURES свечи пришли в разных пачках уведомлений. После перезапуска
+процесса память пуста - половина пары из прошлого запуска не учитывается.
+
+Пара считается отправленной только после mark_reported (после commit ее alert
+в pump.alert_outbox): при ошибке записи add вернет ее снова в следующем цикле.
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def double_extreme_row(spot: Dict, futures: Dict) -> Dict:
+    """Строка в формате ExtremeAlertMonitor.find_double_extreme_signals из двух сигналов детектора"""
+    return {
+        'pair_symbol': spot['pair_symbol'],
+        'signal_timestamp': spot['candle_time'],
+        'spot_spike': spot['spike_ratio_7d'],
+        'futures_spike': futures['spike_ratio_7d'],
+        'spot_volume': spot['volume'],
+        'futures_volume': futures['volume'],
+    }
+
+
+class ExtremePairTracker:
+    """
+    EXTREME сигналы последней свечи interval по символам
+
+    Использование:
+        tracker = ExtremePairTracker()
+        rows = tracker.add(detector.last_signals)  # Double EXTREME, еще не отправленные
+        ...  # alerts записаны и закоммичены
+        tracker.mark_reported(rows)
+    """
+
+    def __init__(self, interval: str = '4h'):
+        self.interval = interval
+        self.candle_time: Optional[datetime] = None
+        self.extremes: Dict[str, Dict[str, Dict]] = {}  # symbol -> {signal_type: signal}
+        self.reported = set()
+
+    def add(self, signals: Iterable[Dict]) -> List[Dict]:
+        """
+        Добавить сигналы цикла детектора
+
+        Returns:
+            Double EXTREME последней свечи, еще не отмеченные mark_reported
+        """
+        extremes = [s for s in signals
+                    if s.get('interval', '4h') == self.interval and s['signal_strength'] == 'EXTREME']
+        if extremes:
+            newest = max(s['candle_time'] for s in extremes)
+            if self.candle_time is None or newest > self.candle_time:
+                # Новая свеча: пары прошлой больше не проверяются
+                self.candle_time = newest
+                self.extremes = {}
+                self.reported = set()
+
+            for signal in extremes:
+                if signal['candle_time'] == self.candle_time:
+                    self.extremes.setdefault(signal['pair_symbol'], {})[signal['signal_type']] = signal
+
+        found = self.pending()
+        if found:
+            logger.info(f"Double EXTREME on {self.candle_time}: {', '.join(r['pair_symbol'] for r in found)}")
+        return found
+
+    def pending(self) -> List[Dict]:
+        """Double EXTREME последней свечи, еще не отмеченные mark_reported"""
+        return [double_extreme_row(pair['SPOT'], pair['FUTURES'])
+                for symbol, pair in self.extremes.items()
+                if symbol not in self.reported and 'SPOT' in pair and 'FUTURES' in pair]
+
+    def mark_reported(self, rows: Iterable[Dict]):
+        """Отметить Double EXTREME как отправленные (после commit их alerts)"""
+        for row in rows:
+            if row['signal_timestamp'] == self.candle_time:
+                self.reported.add(row['pair_symbol'])
@@ -10,24 +10,39 @@ Pump Detection Engine V2.0
 - Минимум 10 сигналов за 7 дней для надежного детектирования
 """
 
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 from typing import List, Dict, Optional, Tuple
-from collections import Counter
 import logging
+import math
+
+from engine.scoring_core import FACTORS, SignalColumns, price_points, score_batch
 
 logger = logging.getLogger(__name__)
 
+# pump_info для _score_symbol не передан (None - пампа не было)
+_NOT_LOADED = object()
+
 
 class PumpDetectionEngine:
     """Движок детектирования pump на основе сигналов"""
 
-    def __init__(self, db_helper):
+    def __init__(self, db_helper, signal_source=None):
         """
         Args:
             db_helper: PumpDatabaseHelper instance
+            signal_source: Источник сигналов и пампов (например SignalStore для бэктеста);
+                по умолчанию db_helper. Конфигурация всегда читается из db_helper.
         """
         self.db = db_helper
+        self.source = signal_source if signal_source is not None else db_helper
+        self.config_version = None
+
+        self._load_config()
 
+        logger.info("PumpDetectionEngine V2.0 initialized")
+
+    def _load_config(self):
+        """Пороги и веса из pump.detector_config (кэш PumpDatabaseHelper)"""
         # Загружаем конфигурацию из БД
         self.min_signal_count = self.db.get_config_value('min_signal_count', 10)
         self.high_conf_threshold = self.db.get_config_value('high_confidence_threshold', 75.0)
@@ -50,7 +65,26 @@ class PumpDetectionEngine:
         self.weight_escalation = self.db.get_config_value('weight_escalation', 0.10)
         self.weight_spot_futures = self.db.get_config_value('weight_spot_futures_balance', 0.05)
 
-        logger.info("PumpDetectionEngine V2.0 initialized")
+        self.config_version = self.db.config_version
+
+    def refresh_config(self) -> bool:
+        """
+        Подхватить новые пороги/веса без перезапуска демона
+
+        Кэш конфигурации перезагружается по TTL или NOTIFY (PumpDatabaseHelper.refresh_config);
+        атрибуты движка обновляются, только если значения изменились.
+
+        Returns:
+            True если конфигурация движка обновлена
+        """
+        self.db.refresh_config()
+        if self.db.config_version == self.config_version:
+            return False
+
+        self._load_config()
+        logger.info(f"Engine config reloaded: min_signals={self.min_signal_count}, "
+                    f"HIGH≥{self.high_conf_threshold}, MEDIUM≥{self.medium_conf_threshold}")
+        return True
 
     def analyze_symbol(self, symbol: str, current_time: datetime = None) -> Optional[Dict]:
         """
@@ -79,15 +113,69 @@ class PumpDetectionEngine:
         if current_time is None:
             current_time = datetime.now(timezone.utc)
 
+        self.refresh_config()
+
         # Получаем сигналы за последние 7 дней
-        signals = self.db.get_signals_last_n_days(symbol, days=7, current_time=current_time)
+        signals = self.source.get_signals_last_n_days(symbol, days=7, current_time=current_time)
+
+        return self._score_symbol(symbol, signals, current_time)
+
+    def analyze_symbols(self, symbols: List[str], current_time: datetime = None) -> Dict[str, Optional[Dict]]:
+        """
+        Анализировать набор символов: два запроса к БД на весь набор
+
+        Сигналы за 7 дней и последний памп загружаются сразу для всех символов,
+        дальше каждый символ оценивается так же, как в analyze_symbol.
+
+        Returns:
+            {symbol: результат analyze_symbol или None}; символы, на которых
+            анализ упал с ошибкой, отсутствуют. Ошибка чтения сигналов или пампов
+            пробрасывается: без данных результат None был бы ложным
+        """
+        if current_time is None:
+            current_time = datetime.now(timezone.utc)
+
+        self.refresh_config()
+
+        symbols = list(dict.fromkeys(symbols))
+        signals_by_symbol = self.source.get_signals_last_n_days_bulk(symbols, days=7, current_time=current_time)
+        pumps_by_symbol = self.source.get_last_pump_info_bulk(symbols, current_time)
+
+        # Многофакторный анализ всех символов с достаточным числом сигналов - одним вызовом scoring core
+        scored = [symbol for symbol in symbols
+                  if len(signals_by_symbol.get(symbol, [])) >= self.min_signal_count]
+        analyses, prices = self._score_batch([signals_by_symbol[symbol] for symbol in scored], current_time)
+        precomputed = {symbol: (analyses[i], prices[i]) for i, symbol in enumerate(scored)}
+
+        results = {}
+        for symbol in symbols:
+            analysis, symbol_prices = precomputed.get(symbol, (None, None))
+            try:
+                results[symbol] = self._score_symbol(
+                    symbol, signals_by_symbol.get(symbol, []), current_time,
+                    pump_info=pumps_by_symbol.get(symbol),
+                    analysis=analysis, prices=symbol_prices
+                )
+            except Exception as e:
+                logger.error(f"Error analyzing {symbol}: {e}")
+
+        return results
+
+    def _score_symbol(self, symbol: str, signals: List[Dict], current_time: datetime,
+                      pump_info=_NOT_LOADED, analysis: Dict = None, prices: Dict = None) -> Optional[Dict]:
+        """
+        Оценка символа по уже загруженным сигналам (общая часть analyze_symbol/analyze_symbols)
 
+        pump_info: результат get_last_pump_info; если не передан, загружается из БД
+        analysis, prices: результат _score_batch для символа, если уже посчитан
+        """
         if len(signals) < self.min_signal_count:
             logger.debug(f"{symbol}: Not enough signals ({len(signals)} < {self.min_signal_count})")
             return None
 
         # Выполняем многофакторный анализ
-        analysis = self._multi_factor_analysis(signals, current_time)
+        if analysis is None:
+            (analysis,), (prices,) = self._score_batch([signals], current_time)
 
         # Проверяем, есть ли pump паттерн
         if analysis['score'] < self.medium_conf_threshold:
@@ -115,7 +203,9 @@ class PumpDetectionEngine:
         )
 
         # Определяем фазу пампа (для отфильтровывания post-pump сигналов)
-        pump_phase, phase_metrics = self.calculate_pump_phase(symbol, signals, current_time)
+        if pump_info is _NOT_LOADED:
+            pump_info = self.source.get_last_pump_info(symbol, current_time)
+        pump_phase, phase_metrics = self._pump_phase(symbol, signals, current_time, pump_info, prices)
 
         result = {
             'pair_symbol': symbol,
@@ -144,8 +234,14 @@ class PumpDetectionEngine:
         return result
 
     def _multi_factor_analysis(self, signals: List[Dict], current_time: datetime) -> Dict:
+        """Многофакторный анализ сигналов одного символа (см. _score_batch)"""
+        (analysis,), _ = self._score_batch([signals], current_time)
+        return analysis
+
+    def _score_batch(self, signal_lists: List[List[Dict]],
+                     current_time: datetime) -> Tuple[List[Dict], List[Dict]]:
         """
-        Многофакторный анализ сигналов
+        Многофакторный анализ сигналов сразу для многих символов (engine/scoring_core.py)
 
         Факторы (веса на основе исследования):
         1. Количество сигналов (40%) - actionable имеют 3.7x больше
@@ -155,239 +251,39 @@ class PumpDetectionEngine:
         5. SPOT/FUTURES баланс (5%) - оба типа сигналов
 
         Returns:
-            Dict с детальной информацией по каждому фактору
+            (analyses, prices): на каждый список сигналов Dict с детальной информацией
+            по каждому фактору и цены для фазы пампа (first_price, current_price, price_ago)
         """
-        # Подготовка данных
-        signal_strengths = [s['signal_strength'] for s in signals]
-        signal_times = [s['signal_timestamp'] for s in signals]
-        signal_types = [s['signal_type'] for s in signals]
-
-        # Считаем категории сигналов
-        extreme_count = signal_strengths.count('EXTREME')
-        very_strong_count = signal_strengths.count('VERY_STRONG')
-        strong_count = signal_strengths.count('STRONG')
-
-        # ФАКТОР 1: Количество сигналов (40%)
-        # Research: actionable имеют avg 16.44 signals
-        signal_count_score = min(100, (len(signals) / 16.44) * 100)
-
-        # ФАКТОР 2: Временное распределение (25%)
-        # Ключевая находка: критическое окно 48-72h имеет 8x больше сигналов
-        time_dist_score, critical_window_signals = self._analyze_time_distribution(
-            signal_times, current_time
+        if not signal_lists:
+            return [], []
+
+        columns = SignalColumns.from_signals(signal_lists)
+        weights = (
+            self.weight_signal_count,
+            self.weight_time_distribution,
+            self.weight_signal_strength,
+            self.weight_escalation,
+            self.weight_spot_futures,
         )
-
-        # ФАКТОР 3: Сила сигналов (20%)
-        # Research: EXTREME signals presence rate 57.6% vs 24.7%
-        strength_score = self._analyze_signal_strength(
-            extreme_count, very_strong_count, strong_count, len(signals)
-        )
-
-        # ФАКТОР 4: Эскалация (10%)
-        # Нарастание активности во времени
-        escalation_score = self._analyze_escalation(signal_times, current_time)
-
-        # ФАКТОР 5: SPOT/FUTURES баланс (5%)
-        # Оба типа сигналов указывают на согласованность
-        balance_score = self._analyze_spot_futures_balance(signal_types)
-
-        # Итоговый взвешенный score
-        total_score = (
-            signal_count_score * self.weight_signal_count +
-            time_dist_score * self.weight_time_distribution +
-            strength_score * self.weight_signal_strength +
-            escalation_score * self.weight_escalation +
-            balance_score * self.weight_spot_futures
-        )
-
-        return {
-            'score': total_score,
-            'total_signals': len(signals),
-            'extreme_count': extreme_count,
-            'very_strong_count': very_strong_count,
-            'strong_count': strong_count,
-            'critical_window_signals': critical_window_signals,
-            'factor_scores': {
-                'signal_count': round(signal_count_score, 2),
-                'time_distribution': round(time_dist_score, 2),
-                'signal_strength': round(strength_score, 2),
-                'escalation': round(escalation_score, 2),
-                'spot_futures_balance': round(balance_score, 2)
-            },
-            'signal_type_distribution': dict(Counter(signal_types)),
-            'strength_distribution': dict(Counter(signal_strengths))
-        }
-
-    def _analyze_time_distribution(self, signal_times: List[datetime],
-                                   current_time: datetime) -> Tuple[float, int]:
-        """
-        Анализ временного распределения сигналов
-
-        Ключевая находка: критическое окно 48-72h показывает 8x больше сигналов
-
-        Returns:
-            (score 0-100, количество сигналов в критическом окне)
-        """
-        # Разбиваем на временные окна (часы назад от current_time)
-        windows = {
-            '0-24h': 0,
-            '24-48h': 0,
-            '48-72h': 0,  # критическое окно!
-            '72-96h': 0,
-            '96-120h': 0,
-            '120+h': 0
-        }
-
-        for sig_time in signal_times:
-            hours_ago = (current_time - sig_time).total_seconds() / 3600
-
-            if hours_ago <= 24:
-                windows['0-24h'] += 1
-            elif hours_ago <= 48:
-                windows['24-48h'] += 1
-            elif hours_ago <= 72:
-                windows['48-72h'] += 1  # критическое!
-            elif hours_ago <= 96:
-                windows['72-96h'] += 1
-            elif hours_ago <= 120:
-                windows['96-120h'] += 1
-            else:
-                windows['120+h'] += 1
-
-        critical_window_signals = windows['48-72h']
-
-        # Оценка: высокий score если много сигналов в критическом окне
-        # Research: actionable имеют avg 4.68 в критическом окне
-        if critical_window_signals >= 5:
-            score = 100
-        elif critical_window_signals >= 4:
-            score = 90
-        elif critical_window_signals >= 3:
-            score = 70
-        elif critical_window_signals >= 2:
-            score = 50
-        elif critical_window_signals >= 1:
-            score = 30
-        else:
-            # Даже если нет в критическом окне, смотрим на другие недавние
-            recent_signals = windows['0-24h'] + windows['24-48h']
-            score = min(40, recent_signals * 5)
-
-        return score, critical_window_signals
-
-    def _analyze_signal_strength(self, extreme_count: int, very_strong_count: int,
-                                 strong_count: int, total_signals: int) -> float:
-        """
-        Анализ силы сигналов
-
-        Research:
-        - EXTREME signals presence rate: 57.6% (actionable) vs 24.7% (non-actionable)
-        - Минимум 2 EXTREME сигнала для HIGH confidence
-
-        Returns:
-            Score 0-100
-        """
-        if total_signals == 0:
-            return 0
-
-        # Взвешенный score силы сигналов
-        # EXTREME = 3 points, VERY_STRONG = 2 points, STRONG = 1 point
-        weighted_strength = (extreme_count * 3) + (very_strong_count * 2) + strong_count
-        max_possible = total_signals * 3  # если все EXTREME
-
-        strength_ratio = weighted_strength / max_possible
-
-        # Базовый score
-        score = strength_ratio * 100
-
-        # Бонус за наличие EXTREME сигналов
-        if extreme_count >= 3:
-            score = min(100, score + 20)
-        elif extreme_count >= 2:
-            score = min(100, score + 10)
-
-        return score
-
-    def _analyze_escalation(self, signal_times: List[datetime],
-                           current_time: datetime) -> float:
-        """
-        Анализ эскалации (нарастания активности)
-
-        Если сигналы учащаются со временем - это признак приближающегося pump
-
-        Returns:
-            Score 0-100
-        """
-        if len(signal_times) < 3:
-            return 50  # недостаточно данных
-
-        # Сортируем по времени (от старых к новым)
-        sorted_times = sorted(signal_times)
-
-        # Разбиваем на 2 половины
-        mid_point = len(sorted_times) // 2
-        first_half = sorted_times[:mid_point]
-        second_half = sorted_times[mid_point:]
-
-        # Считаем плотность (signals per hour)
-        if len(first_half) > 0:
-            first_duration = (first_half[-1] - first_half[0]).total_seconds() / 3600
-            first_density = len(first_half) / max(first_duration, 1)
-        else:
-            first_density = 0
-
-        if len(second_half) > 0:
-            second_duration = (second_half[-1] - second_half[0]).total_seconds() / 3600
-            second_density = len(second_half) / max(second_duration, 1)
-        else:
-            second_density = 0
-
-        # Эскалация = вторая половина плотнее первой
-        if first_density > 0:
-            escalation_ratio = second_density / first_density
-        else:
-            escalation_ratio = 1.0
-
-        # Оценка
-        if escalation_ratio >= 2.0:
-            score = 100  # сильная эскалация
-        elif escalation_ratio >= 1.5:
-            score = 80
-        elif escalation_ratio >= 1.0:
-            score = 60
-        else:
-            score = 40  # активность снижается
-
-        return score
-
-    def _analyze_spot_futures_balance(self, signal_types: List[str]) -> float:
-        """
-        Анализ баланса SPOT/FUTURES сигналов
-
-        Наличие обоих типов указывает на согласованность паттерна
-
-        Returns:
-            Score 0-100
-        """
-        type_counts = Counter(signal_types)
-        spot_count = type_counts.get('SPOT', 0)
-        futures_count = type_counts.get('FUTURES', 0)
-
-        total = spot_count + futures_count
-        if total == 0:
-            return 0
-
-        # Идеальный баланс = оба типа присутствуют
-        if spot_count > 0 and futures_count > 0:
-            # Считаем, насколько сбалансированы
-            ratio = min(spot_count, futures_count) / max(spot_count, futures_count)
-            # ratio близкий к 1.0 = идеальный баланс
-            score = 50 + (ratio * 50)
-        else:
-            # Только один тип - ниже score
-            score = 30
-
-        return score
+        scores = score_batch(columns, current_time, weights)
+        points = price_points(columns, current_time)
+
+        analyses, prices = [], []
+        for i in range(len(columns)):
+            analyses.append({
+                'score': float(scores['score'][i]),
+                'total_signals': int(scores['total_signals'][i]),
+                'extreme_count': int(scores['extreme_count'][i]),
+                'very_strong_count': int(scores['very_strong_count'][i]),
+                'strong_count': int(scores['strong_count'][i]),
+                'critical_window_signals': int(scores['critical_window_signals'][i]),
+                'factor_scores': {name: round(float(scores[name][i]), 2) for name in FACTORS},
+                'signal_type_distribution': _distribution(columns.type_names, scores['type_counts'][i]),
+                'strength_distribution': _distribution(columns.strength_names, scores['strength_counts'][i])
+            })
+            prices.append({key: float(values[i]) for key, values in points.items()})
+
+        return analyses, prices
 
     def _determine_pattern_type(self, analysis: Dict) -> str:
         """
@@ -463,14 +359,24 @@ class PumpDetectionEngine:
             current_time = datetime.now(timezone.utc)
 
         # Получаем информацию о последнем пампе из БД
-        pump_info = self.db.get_last_pump_info(symbol, current_time)
+        pump_info = self.source.get_last_pump_info(symbol, current_time)
+        return self._pump_phase(symbol, signals, current_time, pump_info)
+
+    def _pump_phase(self, symbol: str, signals: List[Dict], current_time: datetime,
+                    pump_info: Optional[Dict], prices: Dict = None) -> Tuple[str, Dict]:
+        """
+        calculate_pump_phase по уже загруженному последнему пампу
+
+        prices: цены сигналов с ценой по времени (scoring_core.price_points), если уже посчитаны
+        """
         hours_since_last_pump = pump_info['hours_since_pump'] if pump_info else None
 
-        # Получаем цены из сигналов
-        prices_with_times = [(s['signal_timestamp'], s['price_at_signal'])
-                            for s in signals if s.get('price_at_signal')]
+        # Получаем цены из сигналов (первая, последняя и последняя не позже 24ч назад)
+        if prices is None:
+            points = price_points(SignalColumns.from_signals([signals]), current_time)
+            prices = {key: float(values[0]) for key, values in points.items()}
 
-        if not prices_with_times:
+        if math.isnan(prices['current_price']):
             # Нет ценовых данных - возвращаем EARLY_SIGNAL по умолчанию
             return 'EARLY_SIGNAL', {
                 'price_change_from_first': 0.0,
@@ -478,11 +384,8 @@ class PumpDetectionEngine:
                 'hours_since_last_pump': hours_since_last_pump
             }
 
-        # Сортируем по времени (от старых к новым)
-        prices_with_times.sort(key=lambda x: x[0])
-
-        # Текущая цена (конвертируем в float для расчетов)
-        current_price = float(prices_with_times[-1][1])
+        # Текущая цена - последний по времени сигнал
+        current_price = prices['current_price']
 
         # Определяем базовую цену для сравнения:
         # 1. Если есть pump event - используем start_price из него
@@ -491,7 +394,7 @@ class PumpDetectionEngine:
             base_price = float(pump_info['start_price'])
             logger.debug(f"{symbol}: Using pump start_price={base_price} as base")
         else:
-            base_price = float(prices_with_times[0][1])
+            base_price = prices['first_price']
             logger.debug(f"{symbol}: Using first signal price={base_price} as base")
 
         # % изменения от базовой цены (start_price пампа или первого сигнала)
@@ -501,13 +404,7 @@ class PumpDetectionEngine:
             price_change_from_first = 0.0
 
         # % изменения за последние 24ч
-        price_24h_ago = None
-        cutoff_24h = current_time - timedelta(hours=24)
-
-        for timestamp, price in reversed(prices_with_times):
-            if timestamp <= cutoff_24h:
-                price_24h_ago = float(price)
-                break
+        price_24h_ago = None if math.isnan(prices['price_ago']) else prices['price_ago']
 
         if price_24h_ago and price_24h_ago > 0:
             price_change_24h = ((current_price - price_24h_ago) / price_24h_ago) * 100
@@ -564,3 +461,8 @@ class PumpDetectionEngine:
 
         # EARLY SIGNAL: умеренный рост + нет недавнего пампа
         return 'EARLY_SIGNAL'
+
+
+def _distribution(names: List[str], counts) -> Dict[str, int]:
+    """{значение: число сигналов} без нулевых (как dict(Counter(...)))"""
+    return {name: int(count) for name, count in zip(names, counts) if count}
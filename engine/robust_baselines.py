@@ -0,0 +1,156 @@
+"""
+Robust Baselines для Pump Detection System V2.0
+Медиана и MAD объема по тем же окнам, что и средние baseline (7d/14d/30d)
+
+Среднее окна тянется вверх прошлыми спайками: после двух спайков за неделю
+третий может не пройти порог spike_ratio_7d. Медиана и MAD (median absolute
+deviation) к ним устойчивы.
+
+Две реализации с одинаковой семантикой (предыдущие k строк, NULL объемы не учитываются):
+- SortedWindow - отсортированное окно для инкрементального пути:
+  поиск позиции bisect O(log n), медиана O(1), MAD O(log n) через выбор
+  k-го элемента из двух отсортированных последовательностей отклонений
+- robust_baselines_at - векторно по матрице пары x время для нужных ячеек
+  (сортировка строк [ячейки x окно] в numpy, NaN в конце строки)
+
+MAD не масштабируется (без множителя 1.4826).
+"""
+
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional
+
+import numpy as np
+
+ROBUST_FIELDS = ('median_7d', 'median_14d', 'median_30d', 'mad_7d', 'mad_14d', 'mad_30d')
+
+
+def _kth_deviation(values: List[float], center: float, k: int) -> float:
+    """
+    k-е (с 0) по возрастанию значение |v - center| для отсортированного values
+
+    Отклонения слева от center (center - values[p-1], center - values[p-2], ...)
+    и справа (values[p] - center, ...) - две возрастающие последовательности;
+    k-й элемент их объединения находится бинарным поиском за O(log n).
+    """
+    p = bisect_left(values, center)
+    left_len, right_len = p, len(values) - p
+
+    def left(i):
+        return center - values[p - 1 - i]
+
+    def right(i):
+        return values[p + i] - center
+
+    # Сколько элементов взять слева: i in [max(0, k+1-right_len), min(k+1, left_len)]
+    lo, hi = max(0, k + 1 - right_len), min(k + 1, left_len)
+    while lo < hi:
+        i = (lo + hi) // 2
+        j = k + 1 - i  # берем i слева и j справа
+        if j > 0 and i < left_len and right(j - 1) > left(i):
+            lo = i + 1
+        else:
+            hi = i
+    i, j = lo, k + 1 - lo
+
+    candidates = []
+    if i > 0:
+        candidates.append(left(i - 1))
+    if j > 0:
+        candidates.append(right(j - 1))
+    return max(candidates)
+
+
+def median_of_sorted(values: List[float]) -> Optional[float]:
+    n = len(values)
+    if n == 0:
+        return None
+    mid = n // 2
+    if n % 2:
+        return values[mid]
+    return (values[mid - 1] + values[mid]) / 2.0
+
+
+def mad_of_sorted(values: List[float], median: Optional[float] = None) -> Optional[float]:
+    """MAD = median(|v - median(values)|) для отсортированного values"""
+    n = len(values)
+    if n == 0:
+        return None
+    if median is None:
+        median = median_of_sorted(values)
+    mid = n // 2
+    if n % 2:
+        return _kth_deviation(values, median, mid)
+    return (_kth_deviation(values, median, mid - 1) + _kth_deviation(values, median, mid)) / 2.0
+
+
+class SortedWindow:
+    """Отсортированное скользящее окно объемов"""
+
+    __slots__ = ('values',)
+
+    def __init__(self):
+        self.values: List[float] = []
+
+    def __len__(self):
+        return len(self.values)
+
+    def add(self, value: float):
+        insort(self.values, value)
+
+    def remove(self, value: float):
+        i = bisect_left(self.values, value)
+        if i < len(self.values) and self.values[i] == value:
+            del self.values[i]
+
+    def median(self) -> Optional[float]:
+        return median_of_sorted(self.values)
+
+    def mad(self) -> Optional[float]:
+        return mad_of_sorted(self.values)
+
+
+def _nanmedian_rows(values: np.ndarray) -> np.ndarray:
+    """
+    Медиана каждой строки без NaN (NaN - пустая строка)
+
+    np.sort ставит NaN в конец строки, поэтому медиана берется по индексам
+    из числа заполненных значений; быстрее np.nanmedian на строках с NaN.
+    """
+    counts = np.count_nonzero(~np.isnan(values), axis=1)
+    if values.size == 0:
+        return np.full(len(values), np.nan)
+    ordered = np.sort(values, axis=1)
+    index = np.arange(len(values))
+    lo = ordered[index, np.maximum(counts - 1, 0) // 2]
+    hi = ordered[index, counts // 2 - (counts == 0)]
+    return np.where(counts > 0, (lo + hi) / 2.0, np.nan)
+
+
+def robust_baselines_at(volumes: np.ndarray, present: np.ndarray, rows: np.ndarray,
+                        cols: np.ndarray, windows: Dict[str, int]) -> Dict[str, np.ndarray]:
+    """
+    Медиана и MAD предыдущих k строк для выбранных ячеек матрицы
+
+    Args:
+        volumes, present: Матрицы CandleMatrix [P, T] (выровнены по правому краю)
+        rows, cols: Индексы ячеек (свечи, для которых нужен baseline)
+        windows: {'7d': 42, '14d': 84, '30d': 180}
+
+    Returns:
+        {'median_7d': float64 [H], 'mad_7d': ..., ...} (NaN где окно пустое)
+    """
+    result = {}
+    for name, length in windows.items():
+        offsets = np.arange(-length, 0)
+        window_cols = cols[:, None] + offsets[None, :]          # [H, k]
+        valid = window_cols >= 0
+        safe_cols = np.where(valid, window_cols, 0)
+        values = volumes[rows[:, None], safe_cols]
+        values = np.where(valid & present[rows[:, None], safe_cols], values, np.nan)
+
+        median = _nanmedian_rows(values)
+        mad = _nanmedian_rows(np.abs(values - median[:, None]))
+
+        result[f'median_{name}'] = median
+        result[f'mad_{name}'] = mad
+    return result
@@ -0,0 +1,293 @@
+"""
+Scoring Core для Pump Detection System V2.0
+Многофакторная оценка сигналов PumpDetectionEngine на колоночных массивах NumPy
+
+Сигналы многих символов склеиваются в один набор массивов (SignalColumns):
+время, коды силы и типа сигнала, цены и offsets - границы символов.
+Окна времени считаются через searchsorted/bincount, сила и баланс SPOT/FUTURES -
+через bincount по кодам, эскалация - по отсортированным внутри символа временам.
+
+Формулы и порядок операций с плавающей точкой те же, что у прежней построчной
+реализации движка, поэтому оценки совпадают точно (tests/test_scoring_core.py,
+golden датасет tests/fixtures/engine_scoring_golden.json). Время хранится в
+целых микросекундах epoch: разности считаются так же точно, как timedelta.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+ONE_US = timedelta(microseconds=1)
+US_PER_SECOND = 10 ** 6
+US_PER_HOUR = 3600 * US_PER_SECOND
+
+# Окна времени (часы назад от current_time): 0-24h, 24-48h, 48-72h (критическое), 72-96h, 96-120h, 120+h
+WINDOW_EDGES_HOURS = np.array([24, 48, 72, 96, 120], dtype=np.float64)
+WINDOW_NAMES = ('0-24h', '24-48h', '48-72h', '72-96h', '96-120h', '120+h')
+CRITICAL_WINDOW = 2
+
+# Research: actionable pumps имеют в среднем 16.44 сигнала за 7 дней
+ACTIONABLE_AVG_SIGNALS = 16.44
+
+# Порядок весов score_batch
+FACTORS = ('signal_count', 'time_distribution', 'signal_strength', 'escalation', 'spot_futures_balance')
+
+
+def to_epoch_us(value: datetime) -> int:
+    """datetime -> целые микросекунды epoch (naive datetime считается UTC)"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - EPOCH) // ONE_US
+
+
+class SignalColumns:
+    """
+    Сигналы набора символов в колоночном виде
+
+    times: int64 [N] - signal_timestamp, микросекунды epoch
+    strengths, types: int64 [N] - коды signal_strength / signal_type
+    strength_names, type_names: код -> значение
+    prices: float64 [N] - price_at_signal (NaN если цены нет или она 0)
+    offsets: int64 [S+1] - сигналы символа i: [offsets[i], offsets[i+1])
+    """
+
+    __slots__ = ('times', 'strengths', 'strength_names', 'types', 'type_names', 'prices', 'offsets')
+
+    def __init__(self, times, strengths, strength_names, types, type_names, prices, offsets):
+        self.times = times
+        self.strengths = strengths
+        self.strength_names = strength_names
+        self.types = types
+        self.type_names = type_names
+        self.prices = prices
+        self.offsets = offsets
+
+    @classmethod
+    def from_signals(cls, signal_lists: Sequence[List[Dict]]) -> 'SignalColumns':
+        """Склеить списки сигналов (строки get_signals_last_n_days) по символам"""
+        strength_codes: Dict[str, int] = {}
+        type_codes: Dict[str, int] = {}
+        times, strengths, types, prices = [], [], [], []
+        offsets = [0]
+
+        for signals in signal_lists:
+            for s in signals:
+                times.append(to_epoch_us(s['signal_timestamp']))
+                strengths.append(strength_codes.setdefault(s['signal_strength'], len(strength_codes)))
+                types.append(type_codes.setdefault(s['signal_type'], len(type_codes)))
+                price = s.get('price_at_signal')
+                prices.append(float(price) if price else np.nan)
+            offsets.append(len(times))
+
+        return cls(
+            times=np.array(times, dtype=np.int64),
+            strengths=np.array(strengths, dtype=np.int64),
+            strength_names=list(strength_codes),
+            types=np.array(types, dtype=np.int64),
+            type_names=list(type_codes),
+            prices=np.array(prices, dtype=np.float64),
+            offsets=np.array(offsets, dtype=np.int64),
+        )
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def counts(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    @property
+    def segments(self) -> np.ndarray:
+        """Номер символа для каждого сигнала"""
+        return np.repeat(np.arange(len(self)), self.counts)
+
+    def code_counts(self, codes: np.ndarray, names: List[str]) -> np.ndarray:
+        """[S, len(names)] - число сигналов каждого кода у символа"""
+        width = max(len(names), 1)
+        flat = np.bincount(self.segments * width + codes, minlength=len(self) * width)
+        return flat.reshape(len(self), width)
+
+    def name_count(self, counts: np.ndarray, names: List[str], name: str) -> np.ndarray:
+        """Столбец code_counts для значения name (нули, если его нет в наборе)"""
+        if name not in names:
+            return np.zeros(len(self), dtype=np.int64)
+        return counts[:, names.index(name)]
+
+
+def window_histogram(columns: SignalColumns, current_us: int) -> np.ndarray:
+    """[S, 6] - число сигналов в окнах WINDOW_NAMES"""
+    hours_ago = (current_us - columns.times).astype(np.float64) / US_PER_SECOND / 3600
+    # side='left': граница окна входит в более раннее окно (hours_ago <= 24 -> 0-24h)
+    buckets = np.searchsorted(WINDOW_EDGES_HOURS, hours_ago, side='left')
+    width = len(WINDOW_NAMES)
+    flat = np.bincount(columns.segments * width + buckets, minlength=len(columns) * width)
+    return flat.reshape(len(columns), width)
+
+
+def time_distribution_scores(windows: np.ndarray) -> np.ndarray:
+    """
+    Оценка временного распределения (0-100)
+
+    Research: критическое окно 48-72h - 8x больше сигналов, у actionable в среднем 4.68
+    """
+    critical = windows[:, CRITICAL_WINDOW]
+    recent = windows[:, 0] + windows[:, 1]
+    return np.select(
+        [critical >= 5, critical >= 4, critical >= 3, critical >= 2, critical >= 1],
+        [100.0, 90.0, 70.0, 50.0, 30.0],
+        default=np.minimum(40, recent * 5).astype(np.float64),
+    )
+
+
+def strength_scores(extreme: np.ndarray, very_strong: np.ndarray, strong: np.ndarray,
+                    total: np.ndarray) -> np.ndarray:
+    """
+    Оценка силы сигналов (0-100): EXTREME = 3, VERY_STRONG = 2, STRONG = 1 балл
+
+    Research: EXTREME presence rate 57.6% (actionable) vs 24.7%; бонус за 2+ и 3+ EXTREME
+    """
+    weighted = extreme * 3 + very_strong * 2 + strong
+    max_possible = total * 3
+    with np.errstate(divide='ignore', invalid='ignore'):
+        score = weighted / max_possible * 100
+    score = np.where(extreme >= 3, np.minimum(100, score + 20),
+                     np.where(extreme >= 2, np.minimum(100, score + 10), score))
+    return np.where(total == 0, 0.0, score)
+
+
+def escalation_scores(columns: SignalColumns) -> np.ndarray:
+    """
+    Оценка эскалации (0-100): плотность сигналов второй половины vs первой
+
+    Половины - по отсортированным внутри символа временам; плотность = сигналы / max(часы, 1).
+    Меньше 3 сигналов - 50 (недостаточно данных).
+    """
+    counts = columns.counts
+    if len(columns.times) == 0:
+        return np.full(len(columns), 50.0)
+
+    order = np.lexsort((columns.times, columns.segments))
+    times = columns.times[order]
+    last = len(times) - 1
+
+    start = columns.offsets[:-1]
+    mid = counts // 2
+    first_lo = np.minimum(start, last)
+    first_hi = np.clip(start + mid - 1, 0, last)
+    second_lo = np.minimum(start + mid, last)
+    second_hi = np.clip(start + counts - 1, 0, last)
+
+    first_hours = (times[first_hi] - times[first_lo]).astype(np.float64) / US_PER_SECOND / 3600
+    second_hours = (times[second_hi] - times[second_lo]).astype(np.float64) / US_PER_SECOND / 3600
+    with np.errstate(divide='ignore', invalid='ignore'):
+        first_density = mid / np.maximum(first_hours, 1)
+        second_density = (counts - mid) / np.maximum(second_hours, 1)
+        ratio = np.where(first_density > 0, second_density / first_density, 1.0)
+
+    score = np.select([ratio >= 2.0, ratio >= 1.5, ratio >= 1.0], [100.0, 80.0, 60.0], default=40.0)
+    return np.where(counts < 3, 50.0, score)
+
+
+def balance_scores(spot: np.ndarray, futures: np.ndarray) -> np.ndarray:
+    """Оценка баланса SPOT/FUTURES (0-100): оба типа - 50..100 по соотношению, один - 30"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.minimum(spot, futures) / np.maximum(spot, futures)
+    score = np.where((spot > 0) & (futures > 0), 50 + ratio * 50, 30.0)
+    return np.where(spot + futures == 0, 0.0, score)
+
+
+def score_batch(columns: SignalColumns, current_time: datetime, weights: Sequence[float]) -> Dict[str, np.ndarray]:
+    """
+    Многофакторная оценка всех символов набора
+
+    Args:
+        columns: Сигналы символов
+        current_time: Текущее время
+        weights: Веса факторов в порядке FACTORS
+
+    Returns:
+        {'score', 'total_signals', 'extreme_count', 'very_strong_count', 'strong_count',
+         'critical_window_signals', 'strength_counts', 'type_counts', <FACTORS>}: массивы [S]
+        (strength_counts/type_counts - [S, кодов])
+    """
+    current_us = to_epoch_us(current_time)
+    total = columns.counts
+
+    strength_counts = columns.code_counts(columns.strengths, columns.strength_names)
+    type_counts = columns.code_counts(columns.types, columns.type_names)
+    extreme = columns.name_count(strength_counts, columns.strength_names, 'EXTREME')
+    very_strong = columns.name_count(strength_counts, columns.strength_names, 'VERY_STRONG')
+    strong = columns.name_count(strength_counts, columns.strength_names, 'STRONG')
+
+    windows = window_histogram(columns, current_us)
+
+    factors = {
+        'signal_count': np.minimum(100, (total / ACTIONABLE_AVG_SIGNALS) * 100),
+        'time_distribution': time_distribution_scores(windows),
+        'signal_strength': strength_scores(extreme, very_strong, strong, total),
+        'escalation': escalation_scores(columns),
+        'spot_futures_balance': balance_scores(
+            columns.name_count(type_counts, columns.type_names, 'SPOT'),
+            columns.name_count(type_counts, columns.type_names, 'FUTURES'),
+        ),
+    }
+
+    # Слева направо, как сумма в прежней реализации
+    score = factors[FACTORS[0]] * weights[0]
+    for name, weight in zip(FACTORS[1:], weights[1:]):
+        score = score + factors[name] * weight
+
+    result = {
+        'score': score,
+        'total_signals': total,
+        'extreme_count': extreme,
+        'very_strong_count': very_strong,
+        'strong_count': strong,
+        'critical_window_signals': windows[:, CRITICAL_WINDOW],
+        'strength_counts': strength_counts,
+        'type_counts': type_counts,
+    }
+    result.update(factors)
+    return result
+
+
+def price_points(columns: SignalColumns, current_time: datetime, hours: int = 24) -> Dict[str, np.ndarray]:
+    """
+    Цены для фазы пампа по сигналам с ценой, упорядоченным по времени
+
+    Сортировка устойчивая: при равном времени сохраняется порядок сигналов на входе.
+
+    Returns:
+        {'first_price', 'current_price', 'price_ago'}: float64 [S]
+        (первая и последняя цена, последняя цена не позже current_time - hours; NaN если нет)
+    """
+    n_symbols = len(columns)
+    nan = np.full(n_symbols, np.nan)
+    valid = ~np.isnan(columns.prices)
+    if not valid.any():
+        return {'first_price': nan, 'current_price': nan.copy(), 'price_ago': nan.copy()}
+
+    positions = np.flatnonzero(valid)
+    segments = columns.segments[positions]
+    times = columns.times[positions]
+    order = np.lexsort((positions, times, segments))
+    prices = columns.prices[positions][order]
+    times = times[order]
+    segments = segments[order]
+
+    counts = np.bincount(segments, minlength=n_symbols)
+    ends = np.cumsum(counts)
+    starts = ends - counts
+    has = counts > 0
+    last = len(prices) - 1
+
+    cutoff_us = to_epoch_us(current_time) - hours * US_PER_HOUR
+    before = np.bincount(segments[times <= cutoff_us], minlength=n_symbols)
+
+    return {
+        'first_price': np.where(has, prices[np.minimum(starts, last)], np.nan),
+        'current_price': np.where(has, prices[np.clip(ends - 1, 0, last)], np.nan),
+        'price_ago': np.where(before > 0, prices[np.clip(starts + before - 1, 0, last)], np.nan),
+    }
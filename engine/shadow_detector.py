@@ -0,0 +1,203 @@
+"""
+Shadow Detector для Pump Detection System V2.0
+Альтернативная конфигурация детектора рядом с production в том же цикле
+
+Shadow вариант - переопределения ключей DETECTION, влияющих на отбор и
+классификацию (min_spike_ratio, *_spike_ratio, robust_baselines,
+robust_min_spike_ratio). Он считается по тем же загруженным свечам
+(матрицы numpy backend или свечи/baselines incremental пути), поэтому
+лишних запросов к БД почти нет. Сигналы варианта пишутся в
+pump.shadow_signals, различия с production - в JSONL отчет и лог.
+"""
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import json
+import logging
+
+from psycopg2.extras import execute_values
+
+from engine.robust_baselines import ROBUST_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# Ключи DETECTION, которые может переопределить shadow вариант
+SHADOW_KEYS = ('min_spike_ratio', 'extreme_spike_ratio', 'very_strong_spike_ratio',
+               'strong_spike_ratio', 'medium_spike_ratio', 'robust_baselines', 'robust_min_spike_ratio')
+
+DEFAULT_VARIANT = 'shadow'
+
+
+def shadow_config(base: Dict, overrides: Optional[Dict]) -> Optional[Tuple[str, Dict]]:
+    """
+    Конфигурация shadow варианта
+
+    Args:
+        base: DETECTION
+        overrides: {'name': 'robust_v1', 'min_spike_ratio': 2.0, ...} или None
+
+    Returns:
+        (имя варианта, DETECTION с переопределениями) или None, если shadow выключен
+    """
+    if not overrides:
+        return None
+    overrides = dict(overrides)
+    name = str(overrides.pop('name', DEFAULT_VARIANT))
+    unknown = sorted(set(overrides) - set(SHADOW_KEYS))
+    if unknown:
+        raise ValueError(f"Shadow mode cannot override {unknown}, supported: {', '.join(SHADOW_KEYS)}")
+    return name, dict(base, **overrides)
+
+
+def parse_overrides(items: List[str]) -> Dict:
+    """['min_spike_ratio=2', 'name=robust'] -> {'min_spike_ratio': 2, 'name': 'robust'}"""
+    overrides = {}
+    for item in items:
+        key, sep, value = item.partition('=')
+        if not sep:
+            raise ValueError(f"Expected KEY=VALUE, got {item!r}")
+        try:
+            overrides[key.strip()] = json.loads(value)
+        except ValueError:
+            overrides[key.strip()] = value
+    return overrides
+
+
+def signal_key(anomaly: Dict) -> Tuple:
+    return (anomaly['trading_pair_id'], anomaly['candle_time'], anomaly['signal_type'],
+            anomaly.get('interval', '4h'))
+
+
+def _describe(anomaly: Dict) -> Dict:
+    candle_time = anomaly['candle_time']
+    return {
+        'trading_pair_id': anomaly['trading_pair_id'],
+        'pair_symbol': anomaly['pair_symbol'],
+        'signal_type': anomaly['signal_type'],
+        'interval': anomaly.get('interval', '4h'),
+        'candle_time': candle_time.isoformat() if hasattr(candle_time, 'isoformat') else candle_time,
+        'spike_ratio_7d': float(anomaly['spike_ratio_7d']),
+        'signal_strength': anomaly.get('signal_strength'),
+    }
+
+
+def diff_signals(production: List[Dict], shadow: List[Dict], tolerance: float = 1e-9) -> Dict:
+    """
+    Различия сигналов production и shadow варианта за цикл
+
+    Returns:
+        {'added': [...], 'removed': [...], 'changed': [...],
+         'per_pair': {pair_symbol: {'added': n, 'removed': n, 'changed': n}},
+         'counts': {'production': n, 'shadow': m, 'added': .., 'removed': .., 'changed': ..}}
+        added - только в shadow, removed - только в production, changed - в обоих,
+        но с другим spike_ratio_7d или signal_strength
+    """
+    prod_by_key = {signal_key(a): a for a in production}
+    shadow_by_key = {signal_key(a): a for a in shadow}
+
+    added = [_describe(shadow_by_key[k]) for k in shadow_by_key.keys() - prod_by_key.keys()]
+    removed = [_describe(prod_by_key[k]) for k in prod_by_key.keys() - shadow_by_key.keys()]
+
+    changed = []
+    for key in prod_by_key.keys() & shadow_by_key.keys():
+        prod, shad = prod_by_key[key], shadow_by_key[key]
+        delta = float(shad['spike_ratio_7d']) - float(prod['spike_ratio_7d'])
+        if abs(delta) > tolerance or prod.get('signal_strength') != shad.get('signal_strength'):
+            entry = _describe(shad)
+            entry.update({
+                'production_ratio': float(prod['spike_ratio_7d']),
+                'shadow_ratio': float(shad['spike_ratio_7d']),
+                'ratio_delta': delta,
+                'production_strength': prod.get('signal_strength'),
+                'shadow_strength': shad.get('signal_strength'),
+            })
+            changed.append(entry)
+
+    per_pair = {}
+    for kind, entries in (('added', added), ('removed', removed), ('changed', changed)):
+        entries.sort(key=lambda e: (e['pair_symbol'], e['candle_time'], e['signal_type']))
+        for entry in entries:
+            pair = per_pair.setdefault(entry['pair_symbol'], {'added': 0, 'removed': 0, 'changed': 0})
+            pair[kind] += 1
+
+    return {
+        'added': added,
+        'removed': removed,
+        'changed': changed,
+        'per_pair': dict(sorted(per_pair.items())),
+        'counts': {'production': len(prod_by_key), 'shadow': len(shadow_by_key),
+                   'added': len(added), 'removed': len(removed), 'changed': len(changed)},
+    }
+
+
+def format_summary(variant: str, diff: Dict, max_pairs: int = 10) -> str:
+    """Строка для лога: счетчики и пары с наибольшим числом различий"""
+    counts = diff['counts']
+    text = (f"Shadow [{variant}]: production {counts['production']}, shadow {counts['shadow']}, "
+            f"+{counts['added']} / -{counts['removed']} / ~{counts['changed']}")
+    pairs = sorted(diff['per_pair'].items(), key=lambda item: -sum(item[1].values()))[:max_pairs]
+    if pairs:
+        text += " (" + ", ".join(f"{symbol} +{c['added']}/-{c['removed']}/~{c['changed']}"
+                                 for symbol, c in pairs) + ")"
+    return text
+
+
+def save_shadow_signals(conn, variant: str, anomalies: List[Dict]) -> int:
+    """
+    Записать сигналы shadow варианта в pump.shadow_signals (без commit)
+
+    Повторно найденные свечи пропускаются по уникальному ключу, как в pump.raw_signals.
+    """
+    if not anomalies:
+        return 0
+
+    rows = [(
+        variant,
+        a['trading_pair_id'],
+        a['pair_symbol'],
+        a['candle_time'],
+        a['signal_type'],
+        a.get('interval', '4h'),
+        a['volume'],
+        a['baseline_7d'],
+        a['baseline_14d'],
+        a['baseline_30d'],
+        a['spike_ratio_7d'],
+        a['spike_ratio_14d'],
+        a['spike_ratio_30d'],
+        a['signal_strength'],
+        a.get('close_price'),
+        *(a.get(field) for field in ROBUST_FIELDS),
+    ) for a in anomalies]
+
+    with conn.cursor() as cur:
+        inserted = execute_values(cur, """
+            INSERT INTO pump.shadow_signals (
+                variant, trading_pair_id, pair_symbol, signal_timestamp, signal_type, interval,
+                volume, baseline_7d, baseline_14d, baseline_30d,
+                spike_ratio_7d, spike_ratio_14d, spike_ratio_30d,
+                signal_strength, price_at_signal,
+                median_7d, median_14d, median_30d, mad_7d, mad_14d, mad_30d
+            ) VALUES %s
+            ON CONFLICT (variant, trading_pair_id, signal_timestamp, signal_type, interval) DO NOTHING
+            RETURNING id
+        """, rows, page_size=1000, fetch=True)
+
+    return len(inserted)
+
+
+def write_report(report_dir, variant: str, diff: Dict, cycle_at: datetime = None) -> Path:
+    """
+    Дописать различия цикла в <report_dir>/shadow_<variant>_<YYYYMMDD>.jsonl (строка на цикл)
+    """
+    cycle_at = cycle_at or datetime.now(timezone.utc)
+    report_dir = Path(report_dir)
+    report_dir.mkdir(parents=True, exist_ok=True)
+    path = report_dir / f"shadow_{variant}_{cycle_at:%Y%m%d}.jsonl"
+
+    record = {'cycle_at': cycle_at.isoformat(), 'variant': variant}
+    record.update(diff)
+    with open(path, 'a') as f:
+        f.write(json.dumps(record, default=str) + '\n')
+    return path
@@ -0,0 +1,172 @@
+"""
+Signal Store для Pump Detection System V2.0
+pump.raw_signals и pump.known_pump_events в памяти для time-travel анализа
+
+Бэктест вызывает analyze_symbol(symbol, current_time=...) для сотен моментов
+времени; каждый вызов - запросы к Postgres за окном 7 дней и последним пампом.
+SignalStore загружает обе таблицы одним проходом в отсортированные по времени
+массивы на символ и отвечает на "сигналы в [t-7d, t]" и "последний памп до t"
+бинарным поиском. Интерфейс тот же, что у PumpDatabaseHelper
+(get_signals_last_n_days, get_last_pump_info и их _bulk версии), поэтому
+PumpDetectionEngine(db_helper, signal_source=store) работает без изменений.
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence
+import logging
+
+from engine.database_helper import pump_info_from_row
+from engine.scoring_core import to_epoch_us
+
+logger = logging.getLogger(__name__)
+
+SIGNAL_COLUMNS = ('id', 'signal_type', 'signal_timestamp', 'spike_ratio_7d', 'signal_strength', 'volume',
+                  'price_at_signal', 'baseline_7d', 'baseline_14d', 'baseline_30d')
+
+
+class _Series:
+    """Строки одного символа, отсортированные по времени (и id для сигналов)"""
+
+    __slots__ = ('times', 'rows')
+
+    def __init__(self):
+        self.times: List[int] = []
+        self.rows: List[Dict] = []
+
+
+class SignalStore:
+    """
+    Сигналы и известные пампы в памяти
+
+    Использование:
+        store = SignalStore.load(conn, since=first_pump - timedelta(days=10))
+        engine = PumpDetectionEngine(db_helper, signal_source=store)
+        engine.analyze_symbol('BTCUSDT', current_time=t)
+
+    Возвращаемые сигналы - общие для store словари: вызывающий код не должен их менять.
+    """
+
+    def __init__(self):
+        self.signals: Dict[tuple, _Series] = {}   # (pair_symbol, interval) -> _Series
+        self.pumps: Dict[str, _Series] = {}       # pair_symbol -> _Series
+
+    @classmethod
+    def from_rows(cls, signals: Iterable[Dict], pumps: Iterable[Dict] = ()) -> 'SignalStore':
+        """
+        Построить store из строк
+
+        Args:
+            signals: строки pump.raw_signals с pair_symbol, interval и SIGNAL_COLUMNS
+            pumps: строки pump.known_pump_events с pair_symbol, pump_start, start_price
+        """
+        store = cls()
+        for row in signals:
+            series = store.signals.get((row['pair_symbol'], row['interval']))
+            if series is None:
+                series = store.signals[(row['pair_symbol'], row['interval'])] = _Series()
+            series.rows.append({column: row[column] for column in SIGNAL_COLUMNS})
+        for series in store.signals.values():
+            # Порядок запроса PumpDatabaseHelper наоборот: signal_timestamp, id по возрастанию
+            series.rows.sort(key=lambda r: (r['signal_timestamp'], r['id']))
+            series.times = [to_epoch_us(r['signal_timestamp']) for r in series.rows]
+
+        for row in pumps:
+            series = store.pumps.setdefault(row['pair_symbol'], _Series())
+            series.rows.append({'pump_start': row['pump_start'], 'start_price': row['start_price']})
+        for series in store.pumps.values():
+            series.rows.sort(key=lambda r: r['pump_start'])
+            series.times = [to_epoch_us(r['pump_start']) for r in series.rows]
+
+        return store
+
+    @classmethod
+    def load(cls, conn, intervals: Sequence[str] = ('4h',), since: datetime = None,
+             until: datetime = None) -> 'SignalStore':
+        """
+        Загрузить pump.raw_signals (интервалы intervals, опционально [since, until])
+        и все pump.known_pump_events
+
+        conn: соединение с RealDictCursor (PumpDatabaseHelper.conn)
+        """
+        conditions = ["interval = ANY(%s)"]
+        params = [list(intervals)]
+        if since is not None:
+            conditions.append("signal_timestamp >= %s")
+            params.append(since)
+        if until is not None:
+            conditions.append("signal_timestamp <= %s")
+            params.append(until)
+
+        # Именованный курсор: таблица сигналов читается порциями, а не одним fetchall
+        with conn.cursor(name='signal_store') as cur:
+            cur.itersize = 20000
+            cur.execute(f"""
+                SELECT pair_symbol, interval, {', '.join(SIGNAL_COLUMNS)}
+                FROM pump.raw_signals
+                WHERE {' AND '.join(conditions)}
+            """, params)
+            store_signals = list(cur)
+
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT pair_symbol, pump_start, start_price
+                FROM pump.known_pump_events
+            """)
+            pumps = cur.fetchall()
+        conn.commit()
+
+        store = cls.from_rows(store_signals, pumps)
+        logger.info(f"SignalStore loaded: {len(store_signals)} signals for "
+                    f"{len({key[0] for key in store.signals})} symbols, {len(pumps)} known pumps")
+        return store
+
+    def get_signals_last_n_days(self, symbol: str, days: int = 7,
+                                current_time: datetime = None, interval: str = '4h') -> List[Dict]:
+        """Сигналы в [current_time - days, current_time], как PumpDatabaseHelper (новые первыми)"""
+        if current_time is None:
+            current_time = datetime.now()
+
+        series = self.signals.get((symbol, interval))
+        if series is None:
+            return []
+
+        end_us = to_epoch_us(current_time)
+        start_us = to_epoch_us(current_time - timedelta(days=days))
+        lo = bisect_left(series.times, start_us)
+        hi = bisect_right(series.times, end_us)
+        return series.rows[lo:hi][::-1]
+
+    def get_signals_last_n_days_bulk(self, symbols: List[str], days: int = 7,
+                                     current_time: datetime = None,
+                                     interval: str = '4h') -> Dict[str, List[Dict]]:
+        """{symbol: сигналы} для набора символов (символы без сигналов отсутствуют)"""
+        grouped = {}
+        for symbol in symbols:
+            rows = self.get_signals_last_n_days(symbol, days=days, current_time=current_time, interval=interval)
+            if rows:
+                grouped[symbol] = rows
+        return grouped
+
+    def get_last_pump_info(self, symbol: str, current_time: datetime = None) -> Optional[Dict]:
+        """Последний памп с pump_start <= current_time, как PumpDatabaseHelper"""
+        if current_time is None:
+            current_time = datetime.now()
+
+        series = self.pumps.get(symbol)
+        if series is None:
+            return None
+
+        i = bisect_right(series.times, to_epoch_us(current_time)) - 1
+        if i < 0:
+            return None
+        return pump_info_from_row(series.rows[i], current_time)
+
+    def get_last_pump_info_bulk(self, symbols: List[str], current_time: datetime = None) -> Dict[str, Dict]:
+        """{symbol: последний памп} для набора символов (символы без пампа отсутствуют)"""
+        pumps = {}
+        for symbol in symbols:
+            info = self.get_last_pump_info(symbol, current_time)
+            if info:
+                pumps[symbol] = info
+        return pumps
@@ -6,10 +6,19 @@ Sends notifications for actionable pump candidates
 import requests
 import logging
 from datetime import datetime
-from typing import Optional, Dict
+from typing import NamedTuple, Optional, Dict
 
 logger = logging.getLogger(__name__)
 
+TELEGRAM_API_URL = 'https://api.telegram.org'
+
+
+class DeliveryResult(NamedTuple):
+    """Результат одного sendMessage"""
+    ok: bool
+    retry_after: Optional[float] = None  # 429: секунд до повтора по ответу Telegram
+    error: Optional[str] = None
+
 
 class TelegramAlerter:
     """
@@ -18,17 +27,25 @@ class TelegramAlerter:
     Sends formatted messages to Telegram for HIGH confidence actionable candidates
     """
 
-    def __init__(self, bot_token: str, chat_id: str):
+    def __init__(self, bot_token: str, chat_id: str, api_url: str = TELEGRAM_API_URL, timeout: float = 10):
         """
         Args:
             bot_token: Telegram bot token
             chat_id: Telegram chat/channel ID to send alerts to
+                     (None: only post_message with an explicit chat_id, e.g. alert outbox delivery)
+            api_url: Telegram Bot API base URL (a local stub in tests)
+            timeout: HTTP timeout in seconds
         """
         self.bot_token = bot_token
         self.chat_id = chat_id
-        self.base_url = f"https://api.telegram.org/bot{bot_token}"
+        self.base_url = f"{api_url.rstrip('/')}/bot{bot_token}"
+        self.timeout = timeout
+        # Keep-alive connection reuse between messages
+        self.session = requests.Session()
 
-        if not bot_token or not chat_id:
+        if bot_token and chat_id is None:
+            self.enabled = False
+        elif not bot_token or not chat_id:
             logger.warning("Telegram bot_token or chat_id not configured. Alerts disabled.")
             self.enabled = False
         else:
@@ -102,27 +119,49 @@ class TelegramAlerter:
             logger.debug("Telegram alerts disabled, skipping message")
             return False
 
+        return self.post_message(message, parse_mode).ok
+
+    def post_message(self, message: str, parse_mode: Optional[str] = 'HTML',
+                     chat_id: Optional[str] = None) -> DeliveryResult:
+        """
+        Один запрос sendMessage (без проверки enabled)
+
+        Args:
+            message: Текст сообщения
+            parse_mode: Режим парсинга (HTML, Markdown, None)
+            chat_id: Чат (по умолчанию self.chat_id)
+
+        Returns:
+            DeliveryResult: ok, retry_after (429), error
+        """
+        chat_id = chat_id or self.chat_id
         try:
             url = f"{self.base_url}/sendMessage"
             payload = {
-                'chat_id': self.chat_id,
+                'chat_id': chat_id,
                 'text': message,
                 'parse_mode': parse_mode,
                 'disable_web_page_preview': True
             }
 
-            response = requests.post(url, json=payload, timeout=10)
+            response = self.session.post(url, json=payload, timeout=self.timeout)
 
             if response.status_code == 200:
-                logger.info(f"Telegram message sent successfully to {self.chat_id}")
-                return True
-            else:
-                logger.error(f"Telegram API error: {response.status_code} - {response.text}")
-                return False
+                logger.info(f"Telegram message sent successfully to {chat_id}")
+                return DeliveryResult(True)
+
+            retry_after = None
+            if response.status_code == 429:
+                try:
+                    retry_after = float(response.json()['parameters']['retry_after'])
+                except (ValueError, KeyError, TypeError):
+                    retry_after = None
+            logger.error(f"Telegram API error: {response.status_code} - {response.text}")
+            return DeliveryResult(False, retry_after, f"HTTP {response.status_code}: {response.text[:200]}")
 
         except Exception as e:
             logger.error(f"Error sending Telegram message: {e}")
-            return False
+            return DeliveryResult(False, None, str(e))
 
     def send_candidate_alert(self, candidate: Dict) -> bool:
         """
@@ -189,7 +228,7 @@ Actionable: {actionable_count} pump candidates
 
         try:
             url = f"{self.base_url}/getMe"
-            response = requests.get(url, timeout=10)
+            response = self.session.get(url, timeout=self.timeout)
 
             if response.status_code == 200:
                 bot_info = response.json()
@@ -0,0 +1,339 @@
+"""
+Vectorized Detector для Pump Detection System V2.0
+NumPy backend детектора: baselines, spike ratios и классы силы по матрице пары x время
+
+Свечи истории (30 дней) всех eligible пар загружаются одним запросом и
+раскладываются в матрицу, выровненную по правому краю (последняя свеча пары
+в последней колонке). Baselines - скользящие средние по предыдущим 42/84/180
+свечам - считаются через кумулятивные суммы, что повторяет семантику SQL пути
+(AVG OVER ROWS BETWEEN k PRECEDING AND 1 PRECEDING): окно считается в строках,
+NULL объемы не входят в среднее. Медиана/MAD (robust baselines) считаются
+только для свечей окна сигналов (см. engine/robust_baselines.py).
+"""
+
+from typing import Dict, List, Optional, Sequence
+import logging
+
+import numpy as np
+import psycopg2.extensions
+
+from engine.baseline_state import BASELINE_WINDOWS
+from engine.candle_access import from_ms, open_time_predicate
+from engine.robust_baselines import robust_baselines_at
+
+logger = logging.getLogger(__name__)
+
+STRENGTH_CLASSES = ('EXTREME', 'VERY_STRONG', 'STRONG', 'MEDIUM')
+
+
+class CandleMatrix:
+    """Свечи пар в виде матриц [pairs x time], выровненных по правому краю"""
+
+    __slots__ = ('pair_ids', 'pair_symbols', 'signal_types', 'open_times',
+                 'volumes', 'close_prices', 'present')
+
+    def __init__(self, pair_ids, pair_symbols, signal_types, open_times, volumes, close_prices, present):
+        self.pair_ids = pair_ids          # int64 [P]
+        self.pair_symbols = pair_symbols  # object [P]
+        self.signal_types = signal_types  # object [P]: FUTURES / SPOT
+        self.open_times = open_times      # int64 [P, T] (0 где свечи нет)
+        self.volumes = volumes            # float64 [P, T] (NaN: нет свечи или NULL объем)
+        self.close_prices = close_prices  # float64 [P, T]
+        self.present = present            # bool [P, T]: строка свечи существует
+
+    @property
+    def shape(self):
+        return self.volumes.shape
+
+
+def build_matrix(rows: Sequence[Sequence]) -> CandleMatrix:
+    """
+    Собрать CandleMatrix из строк, упорядоченных по (trading_pair_id, open_time)
+
+    Args:
+        rows: (trading_pair_id, pair_symbol, contract_type_id, open_time, volume, close_price)
+    """
+    if not rows:
+        empty_i = np.zeros((0, 0), dtype=np.int64)
+        empty_f = np.zeros((0, 0), dtype=np.float64)
+        return CandleMatrix(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=object),
+                            np.zeros(0, dtype=object), empty_i, empty_f, empty_f.copy(),
+                            np.zeros((0, 0), dtype=bool))
+
+    n = len(rows)
+    pair_col = np.fromiter((r[0] for r in rows), dtype=np.int64, count=n)
+    open_col = np.fromiter((r[3] for r in rows), dtype=np.int64, count=n)
+    volume_col = np.fromiter((np.nan if r[4] is None else float(r[4]) for r in rows),
+                             dtype=np.float64, count=n)
+    close_col = np.fromiter((np.nan if r[5] is None else float(r[5]) for r in rows),
+                            dtype=np.float64, count=n)
+
+    pair_ids, starts, counts = np.unique(pair_col, return_index=True, return_counts=True)
+    if not np.all(np.diff(starts) > 0):
+        raise ValueError("rows must be ordered by trading_pair_id, open_time")
+
+    num_pairs, depth = len(pair_ids), int(counts.max())
+
+    # Строка r пары g -> колонка depth - count[g] + (r - start[g])
+    group = np.repeat(np.arange(num_pairs), counts)
+    cols = depth - counts[group] + (np.arange(n) - starts[group])
+
+    open_times = np.zeros((num_pairs, depth), dtype=np.int64)
+    volumes = np.full((num_pairs, depth), np.nan)
+    close_prices = np.full((num_pairs, depth), np.nan)
+    present = np.zeros((num_pairs, depth), dtype=bool)
+
+    open_times[group, cols] = open_col
+    volumes[group, cols] = volume_col
+    close_prices[group, cols] = close_col
+    present[group, cols] = True
+
+    pair_symbols = np.array([rows[s][1] for s in starts], dtype=object)
+    signal_types = np.array(['FUTURES' if rows[s][2] == 1 else 'SPOT' for s in starts], dtype=object)
+
+    return CandleMatrix(pair_ids, pair_symbols, signal_types, open_times, volumes, close_prices, present)
+
+
+def load_candle_matrix(conn, since_ms: int, interval_id: int = 4,
+                       pair_ids: Optional[Sequence[int]] = None) -> CandleMatrix:
+    """Загрузить свечи одного интервала (см. load_candle_matrices)"""
+    matrices = load_candle_matrices(conn, since_ms, [interval_id], pair_ids)
+    return matrices[interval_id] if interval_id in matrices else build_matrix([])
+
+
+def load_candle_matrices(conn, since_ms: int, interval_ids: Sequence[int] = (4,),
+                         pair_ids: Optional[Sequence[int]] = None,
+                         end_ms: Optional[int] = None) -> Dict[int, CandleMatrix]:
+    """
+    Загрузить свечи eligible SPOT/FUTURES пар с open_time >= since_ms
+    (и < end_ms, если задан) одним запросом для всех интервалов
+
+    Использует обычный (tuple) курсор: на ~180 свечей x все пары
+    RealDictCursor заметно дороже самих вычислений.
+
+    Returns:
+        {interval_id: CandleMatrix} (интервалы без свечей отсутствуют)
+    """
+    time_condition, params = open_time_predicate('c', start_ms=since_ms, end_ms=end_ms)
+    pair_filter = ""
+    if pair_ids:
+        pair_filter = "AND c.trading_pair_id = ANY(%s)"
+        params.append(list(pair_ids))
+
+    # interval_id первым столбцом - для разбиения по интервалам, в build_matrix не передается
+    query = """
+    SELECT
+        c.interval_id,
+        c.trading_pair_id,
+        tp.pair_symbol,
+        tp.contract_type_id,
+        c.open_time,
+        c.quote_asset_volume,
+        c.close_price
+    FROM public.candles c
+    -- FILTERS: eligible universe snapshot (no meme coins, stablecoins, market cap < $100M)
+    INNER JOIN pump.eligible_pairs tp ON tp.trading_pair_id = c.trading_pair_id
+        AND tp.is_eligible
+    WHERE tp.contract_type_id IN (1, 2)  -- Futures, Spot
+      AND c.interval_id = ANY(%s)
+      {time_condition}
+      {pair_filter}
+    ORDER BY c.interval_id, c.trading_pair_id, c.open_time
+    """.format(time_condition=time_condition, pair_filter=pair_filter)
+
+    with conn.cursor(cursor_factory=psycopg2.extensions.cursor) as cur:
+        cur.execute(query, [list(interval_ids)] + params)
+        rows = cur.fetchall()
+
+    matrices = {}
+    start = 0
+    for end in range(1, len(rows) + 1):
+        if end == len(rows) or rows[end][0] != rows[start][0]:
+            matrices[rows[start][0]] = build_matrix([r[1:] for r in rows[start:end]])
+            start = end
+    return matrices
+
+
+def rolling_baselines(volumes: np.ndarray, present: np.ndarray,
+                      windows: Dict[str, int] = None) -> Dict[str, np.ndarray]:
+    """
+    Средний объем предыдущих k строк для каждой ячейки (ROWS k PRECEDING .. 1 PRECEDING)
+
+    Матрица выровнена по правому краю, поэтому "k предыдущих колонок"
+    совпадает с "k предыдущих свечей пары". NaN объемы не входят ни в сумму,
+    ни в количество (как AVG в SQL).
+
+    Returns:
+        {'7d': float64 [P, T], '14d': ..., '30d': ...} (NaN где окно пустое)
+    """
+    windows = windows or BASELINE_WINDOWS
+    num_pairs, depth = volumes.shape
+
+    has_volume = present & ~np.isnan(volumes)
+    prefix_sum = np.zeros((num_pairs, depth + 1))
+    prefix_cnt = np.zeros((num_pairs, depth + 1), dtype=np.int64)
+    np.cumsum(np.where(has_volume, volumes, 0.0), axis=1, out=prefix_sum[:, 1:])
+    np.cumsum(has_volume, axis=1, out=prefix_cnt[:, 1:])
+
+    cols = np.arange(depth)
+    result = {}
+    for name, length in windows.items():
+        lo = np.maximum(cols - length, 0)
+        sums = prefix_sum[:, cols] - prefix_sum[:, lo]
+        cnts = prefix_cnt[:, cols] - prefix_cnt[:, lo]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result[name] = np.where(cnts > 0, sums / np.maximum(cnts, 1), np.nan)
+    return result
+
+
+def spike_ratios(volumes: np.ndarray, baselines: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """volume / baseline, 0 если baseline пуст или <= 0 (как CASE в SQL пути)"""
+    ratios = {}
+    for name, baseline in baselines.items():
+        positive = baseline > 0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ratios[name] = np.where(positive, volumes / np.where(positive, baseline, 1.0), 0.0)
+    return ratios
+
+
+def classify_strength(spike_7d: np.ndarray, spike_14d: np.ndarray, config: Dict) -> np.ndarray:
+    """Векторная версия PumpDetectorDaemon.classify_signal_strength"""
+    max_spike = np.fmax(np.nan_to_num(spike_7d), np.nan_to_num(spike_14d))
+    thresholds = [
+        config.get('extreme_spike_ratio', 5.0),
+        config.get('very_strong_spike_ratio', 3.0),
+        config.get('strong_spike_ratio', 2.0),
+        config.get('medium_spike_ratio', 1.5),
+    ]
+    return np.select([max_spike >= t for t in thresholds], STRENGTH_CLASSES, default='WEAK')
+
+
+def detect_matrix(matrix: CandleMatrix, signal_since_ms: int, config: Dict,
+                  windows: Dict[str, int] = None, robust: bool = False) -> List[Dict]:
+    """
+    Найти аномалии в матрице свечей
+
+    Args:
+        matrix: CandleMatrix (история 30 дней)
+        signal_since_ms: Отчитываться только о свечах с open_time >= signal_since_ms
+        config: DETECTION (min_spike_ratio, robust_min_spike_ratio и пороги классов силы)
+        windows: Окна baseline в свечах интервала (по умолчанию 4h: 42/84/180)
+        robust: Добавить median_*/mad_* (и отбор по robust_min_spike_ratio)
+
+    Returns:
+        Строки в формате SQL пути детектора (+ signal_strength),
+        по убыванию spike_ratio_7d
+    """
+    if matrix.volumes.size == 0:
+        return []
+
+    windows = windows or BASELINE_WINDOWS
+    baselines = rolling_baselines(matrix.volumes, matrix.present, windows)
+    ratios = spike_ratios(matrix.volumes, baselines)
+
+    min_spike = config.get('min_spike_ratio', 1.5)
+    with np.errstate(invalid='ignore'):
+        candidates = (matrix.present
+                      & ~np.isnan(baselines['7d'])
+                      & (matrix.open_times >= signal_since_ms))
+        hits = candidates & (ratios['7d'] >= min_spike)
+
+    robust_values = None
+    if robust:
+        # Медиана/MAD только для свечей окна сигналов, а не для всей матрицы
+        rows, cols = np.nonzero(candidates)
+        robust_values = robust_baselines_at(matrix.volumes, matrix.present, rows, cols, windows)
+        robust_min = config.get('robust_min_spike_ratio')
+        if robust_min is not None:
+            median = robust_values['median_7d']
+            with np.errstate(invalid='ignore', divide='ignore'):
+                robust_hit = (median > 0) & (matrix.volumes[rows, cols] / median >= robust_min)
+            hits[rows[robust_hit], cols[robust_hit]] = True
+        # Ячейка -> значения robust_values
+        robust_index = np.full(matrix.shape, -1, dtype=np.int64)
+        robust_index[rows, cols] = np.arange(rows.size)
+
+    rows, cols = np.nonzero(hits)
+    if rows.size == 0:
+        return []
+
+    order = np.argsort(-ratios['7d'][rows, cols], kind='stable')
+    rows, cols = rows[order], cols[order]
+
+    strengths = classify_strength(ratios['7d'][rows, cols], ratios['14d'][rows, cols], config)
+
+    def column(values):
+        return values[rows, cols].tolist()
+
+    def nullable(values):
+        return [None if np.isnan(v) else v for v in values[rows, cols].tolist()]
+
+    open_times = column(matrix.open_times)
+    volumes = column(matrix.volumes)
+    close_prices = nullable(matrix.close_prices)
+    base = {name: nullable(values) for name, values in baselines.items()}
+    spikes = {name: column(values) for name, values in ratios.items()}
+
+    robust_columns = {}
+    if robust_values is not None:
+        picked = robust_index[rows, cols]
+        robust_columns = {field: [None if np.isnan(v) else v for v in values[picked].tolist()]
+                          for field, values in robust_values.items()}
+
+    anomalies = []
+    for i, (r, open_time) in enumerate(zip(rows.tolist(), open_times)):
+        anomalies.append({
+            'trading_pair_id': int(matrix.pair_ids[r]),
+            'pair_symbol': matrix.pair_symbols[r],
+            'signal_type': matrix.signal_types[r],
+            'open_time': open_time,
+            # to_timestamp(open_time / 1000) in SQL: integer seconds
+            'candle_time': from_ms(open_time - open_time % 1000),
+            'close_price': close_prices[i],
+            'volume': volumes[i],
+            'baseline_7d': base['7d'][i],
+            'baseline_14d': base['14d'][i],
+            'baseline_30d': base['30d'][i],
+            'spike_ratio_7d': spikes['7d'][i],
+            'spike_ratio_14d': spikes['14d'][i],
+            'spike_ratio_30d': spikes['30d'][i],
+            'signal_strength': str(strengths[i]),
+        })
+        for field, values in robust_columns.items():
+            anomalies[-1][field] = values[i]
+
+    return anomalies
+
+
+def attach_robust_baselines(matrix: CandleMatrix, anomalies: List[Dict],
+                            windows: Dict[str, int] = None) -> List[Dict]:
+    """
+    Добавить median_*/mad_* к строкам SQL пути детектора (по trading_pair_id, open_time)
+
+    matrix должна начинаться с той же границы истории, что и SQL окно,
+    иначе окна в строках не совпадут.
+    """
+    windows = windows or BASELINE_WINDOWS
+    row_of = {int(pair_id): r for r, pair_id in enumerate(matrix.pair_ids.tolist())}
+
+    found, rows, cols = [], [], []
+    for anomaly in anomalies:
+        r = row_of.get(anomaly['trading_pair_id'])
+        if r is None:
+            continue
+        # open_times строки по возрастанию (нули слева)
+        c = int(np.searchsorted(matrix.open_times[r], anomaly['open_time']))
+        if c < matrix.shape[1] and matrix.open_times[r, c] == anomaly['open_time']:
+            found.append(anomaly)
+            rows.append(r)
+            cols.append(c)
+
+    if not found:
+        return anomalies
+
+    values = robust_baselines_at(matrix.volumes, matrix.present,
+                                 np.array(rows), np.array(cols), windows)
+    for field, column in values.items():
+        for anomaly, value in zip(found, column.tolist()):
+            anomaly[field] = None if np.isnan(value) else value
+    return anomalies
@@ -0,0 +1,27 @@
+-- Migration: Detector baseline state
+-- Description: Snapshot инкрементальных baseline (7d/14d/30d) детектора для warm restart
+-- Date: 2026-10-16
+
+BEGIN;
+
+-- ============================================================================
+-- STEP 1: Таблица состояния baseline по парам
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS pump.detector_baseline_state (
+    trading_pair_id INTEGER NOT NULL REFERENCES public.trading_pairs(id),
+    interval_id INTEGER NOT NULL DEFAULT 4,
+    last_open_time BIGINT NOT NULL,            -- open_time (ms) последней учтенной закрытой свечи
+    open_times BIGINT[] NOT NULL,              -- open_time последних 180 свечей (старые -> новые)
+    volumes DOUBLE PRECISION[] NOT NULL,       -- quote_asset_volume тех же свечей
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (trading_pair_id, interval_id)
+);
+
+COMMENT ON TABLE pump.detector_baseline_state IS 'Incremental rolling-baseline state of detector_daemon_v2 (per trading pair and interval)';
+COMMENT ON COLUMN pump.detector_baseline_state.last_open_time IS 'Watermark: open_time (ms) of the last closed candle folded into the state';
+
+COMMIT;
+
+-- Verification
+SELECT 'Migration 008 completed: detector_baseline_state created!' as status;
@@ -0,0 +1,47 @@
+-- Migration: Unique key for pump.raw_signals
+-- Description: Дедупликация сигналов через уникальный индекс (trading_pair_id, signal_timestamp, signal_type)
+--              вместо NOT EXISTS в запросе детектора. Детектор пишет пачкой с ON CONFLICT DO NOTHING.
+-- Date: 2026-10-16
+
+BEGIN;
+
+-- ============================================================================
+-- STEP 1: Убрать существующие дубликаты (оставляем самый ранний id)
+-- ============================================================================
+
+CREATE TEMP TABLE raw_signal_duplicates ON COMMIT DROP AS
+SELECT id, keep_id
+FROM (
+    SELECT
+        id,
+        MIN(id) OVER (PARTITION BY trading_pair_id, signal_timestamp, signal_type) as keep_id
+    FROM pump.raw_signals
+) d
+WHERE id <> keep_id;
+
+-- Перенести связи кандидатов на оставляемый сигнал
+INSERT INTO pump.candidate_signals (candidate_id, signal_id, relevance_score)
+SELECT cs.candidate_id, d.keep_id, cs.relevance_score
+FROM pump.candidate_signals cs
+JOIN raw_signal_duplicates d ON d.id = cs.signal_id
+ON CONFLICT (candidate_id, signal_id) DO NOTHING;
+
+DELETE FROM pump.candidate_signals cs
+USING raw_signal_duplicates d
+WHERE cs.signal_id = d.id;
+
+DELETE FROM pump.raw_signals rs
+USING raw_signal_duplicates d
+WHERE rs.id = d.id;
+
+-- ============================================================================
+-- STEP 2: Уникальный индекс для ON CONFLICT
+-- ============================================================================
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_raw_signals_pair_time_type
+ON pump.raw_signals (trading_pair_id, signal_timestamp, signal_type);
+
+COMMIT;
+
+-- Verification
+SELECT 'Migration 009 completed: raw_signals unique key created!' as status;
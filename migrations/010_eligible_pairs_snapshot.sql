@@ -0,0 +1,35 @@
+-- Migration: Eligible pairs snapshot
+-- Description: Материализованный список пар, прошедших фильтры детектора
+--              (не мем-коин, не стейблкоин, market cap >= $100M).
+--              Заменяет вызовы is_meme_coin/is_stablecoin_pair/EXISTS(cmc) на каждую свечу.
+--              Пересобирается scripts/rebuild_eligible_pairs.py после обновления CMC (04:07).
+-- Date: 2026-10-16
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS pump.eligible_pairs (
+    trading_pair_id INTEGER PRIMARY KEY REFERENCES public.trading_pairs(id),
+    pair_symbol VARCHAR(20) NOT NULL,
+    contract_type_id INTEGER NOT NULL,          -- 1 = Futures, 2 = Spot
+    token_id INTEGER,
+    market_cap NUMERIC(30,2),
+    market_cap_tier VARCHAR(10) NOT NULL,       -- MEGA / LARGE / MID / SMALL / UNKNOWN
+    filter_reasons TEXT[] NOT NULL DEFAULT '{}', -- meme / stablecoin / low_market_cap / no_market_cap
+    is_eligible BOOLEAN NOT NULL,
+    built_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_eligible_pairs_eligible
+ON pump.eligible_pairs (trading_pair_id)
+WHERE is_eligible;
+
+CREATE INDEX IF NOT EXISTS idx_eligible_pairs_symbol
+ON pump.eligible_pairs (pair_symbol);
+
+COMMENT ON TABLE pump.eligible_pairs IS 'Daily snapshot of active Binance pairs with detector filter results';
+COMMENT ON COLUMN pump.eligible_pairs.filter_reasons IS 'Why the pair is excluded (empty when is_eligible)';
+
+COMMIT;
+
+-- Verification
+SELECT 'Migration 010 completed: eligible_pairs snapshot created! Run scripts/rebuild_eligible_pairs.py' as status;
@@ -0,0 +1,16 @@
+-- Migration: Covering index for detector candle access
+-- Description: Индекс под запросы детектора с условиями на open_time в миллисекундах
+--              (engine/candle_access.py). INCLUDE-колонки позволяют Index Only Scan
+--              без чтения heap для объема, цены закрытия и флага is_closed.
+--              CREATE INDEX CONCURRENTLY нельзя выполнять внутри транзакции,
+--              поэтому миграция без BEGIN/COMMIT.
+-- Date: 2026-10-16
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_candles_pair_interval_open_time_cov
+ON public.candles (trading_pair_id, interval_id, open_time)
+INCLUDE (quote_asset_volume, close_price, is_closed);
+
+ANALYZE public.candles;
+
+-- Verification (run scripts/check_detector_plan.py to verify the detector plans)
+SELECT 'Migration 011 completed: candles covering index created!' as status;
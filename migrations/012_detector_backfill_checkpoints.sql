@@ -0,0 +1,30 @@
+-- Migration: Detector backfill checkpoints
+-- Description: Состояние чанков параллельного backfill детектора (detector_daemon_v2.py --backfill).
+--              Чанк = окно времени x партиция пар (trading_pair_id % partitions).
+--              DONE записывается в одной транзакции с сигналами чанка, поэтому
+--              повторный запуск с тем же --from (--to может быть позже) продолжает с места остановки.
+-- Date: 2026-10-16
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS pump.detector_backfill_chunks (
+    run_key VARCHAR(100) NOT NULL,             -- interval, range start, chunk size and partitions
+    chunk_start_ms BIGINT NOT NULL,            -- open_time window start (inclusive)
+    chunk_end_ms BIGINT NOT NULL,              -- open_time window end (exclusive)
+    partition_id INTEGER NOT NULL,
+    partitions INTEGER NOT NULL,
+    status VARCHAR(10) NOT NULL,               -- DONE / FAILED
+    candles_scanned INTEGER NOT NULL DEFAULT 0,
+    signals_found INTEGER NOT NULL DEFAULT 0,
+    duration_seconds NUMERIC(10,3),
+    error TEXT,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (run_key, chunk_start_ms, partition_id)
+);
+
+COMMENT ON TABLE pump.detector_backfill_chunks IS 'Per-chunk checkpoints of resumable detector backfills';
+
+COMMIT;
+
+-- Verification
+SELECT 'Migration 012 completed: detector backfill checkpoints created!' as status;
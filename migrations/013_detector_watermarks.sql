@@ -0,0 +1,22 @@
+-- Migration: Detector candle watermarks
+-- Description: Последний обработанный закрытый open_time по паре и интервалу.
+--              Детектор сравнивает его с последней закрытой свечей пары и пропускает
+--              цикл (или ограничивает его продвинувшимися парами), если новых свечей нет.
+-- Date: 2026-10-16
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS pump.detector_watermarks (
+    trading_pair_id INTEGER NOT NULL REFERENCES public.trading_pairs(id),
+    interval_id INTEGER NOT NULL,               -- 4 = 4h, 3 = 1h
+    last_open_time BIGINT NOT NULL,             -- open_time (ms) of the last processed closed candle
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (trading_pair_id, interval_id)
+);
+
+COMMENT ON TABLE pump.detector_watermarks IS 'Last closed candle processed by the detector per pair and interval';
+
+COMMIT;
+
+-- Verification
+SELECT 'Migration 013 completed: detector watermarks created!' as status;
@@ -0,0 +1,59 @@
+-- Migration: Candle closed notifications
+-- Description: NOTIFY candle_closed с payload 'interval_id:trading_pair_id' при вставке
+--              закрытой 1h/4h свечи или при закрытии сформированной (is_closed false -> true).
+--              Триггеры уровня statement с transition tables: одна выборка DISTINCT на пачку
+--              свечей сборщика, одинаковые payload в транзакции PostgreSQL схлопывает сам.
+--              Слушатель: detector_daemon_v2.py --listen (engine/candle_listener.py).
+-- Date: 2026-10-16
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION pump.notify_candles_inserted()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('candle_closed', n.interval_id || ':' || n.trading_pair_id)
+    FROM (
+        SELECT DISTINCT interval_id, trading_pair_id
+        FROM new_candles
+        WHERE is_closed AND interval_id IN (3, 4)  -- 1h, 4h
+    ) n;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION pump.notify_candles_closed()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('candle_closed', n.interval_id || ':' || n.trading_pair_id)
+    FROM (
+        SELECT DISTINCT nc.interval_id, nc.trading_pair_id
+        FROM new_candles nc
+        JOIN old_candles oc
+            ON oc.trading_pair_id = nc.trading_pair_id
+            AND oc.interval_id = nc.interval_id
+            AND oc.open_time = nc.open_time
+        WHERE nc.is_closed AND NOT COALESCE(oc.is_closed, false)
+          AND nc.interval_id IN (3, 4)  -- 1h, 4h
+    ) n;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_candles_notify_insert ON public.candles;
+CREATE TRIGGER trg_candles_notify_insert
+AFTER INSERT ON public.candles
+REFERENCING NEW TABLE AS new_candles
+FOR EACH STATEMENT
+EXECUTE FUNCTION pump.notify_candles_inserted();
+
+DROP TRIGGER IF EXISTS trg_candles_notify_close ON public.candles;
+CREATE TRIGGER trg_candles_notify_close
+AFTER UPDATE ON public.candles
+REFERENCING OLD TABLE AS old_candles NEW TABLE AS new_candles
+FOR EACH STATEMENT
+EXECUTE FUNCTION pump.notify_candles_closed();
+
+COMMIT;
+
+-- Verification
+SELECT 'Migration 014 completed: candle_closed notifications enabled!' as status;
@@ -0,0 +1,28 @@
+-- Migration: Candle interval for pump.raw_signals
+-- Description: Детектор обрабатывает несколько интервалов за цикл (DETECTION['intervals']: 4h, 1h).
+--              Колонка interval различает сигналы разных интервалов, уникальный ключ
+--              дополняется интервалом (свечи 1h и 4h могут иметь одинаковый signal_timestamp).
+--              Существующие сигналы - 4h.
+-- Date: 2026-10-16
+
+BEGIN;
+
+ALTER TABLE pump.raw_signals
+ADD COLUMN IF NOT EXISTS interval VARCHAR(5) NOT NULL DEFAULT '4h';
+
+COMMENT ON COLUMN pump.raw_signals.interval IS 'Candle interval of the signal (4h, 1h, ...)';
+
+-- Уникальный ключ для ON CONFLICT детектора
+CREATE UNIQUE INDEX IF NOT EXISTS uq_raw_signals_pair_time_type_interval
+ON pump.raw_signals (trading_pair_id, signal_timestamp, signal_type, interval);
+
+DROP INDEX IF EXISTS pump.uq_raw_signals_pair_time_type;
+
+-- Выборки движка и мониторов по интервалу
+CREATE INDEX IF NOT EXISTS idx_raw_signals_interval_timestamp
+ON pump.raw_signals (interval, signal_timestamp DESC);
+
+COMMIT;
+
+-- Verification
+SELECT 'Migration 015 completed: raw_signals.interval added!' as status;
@@ -0,0 +1,28 @@
+-- Migration: Robust baselines (median/MAD) for pump.raw_signals
+-- Description: Средние baseline_7d/14d/30d завышаются прошлыми спайками пары.
+--              Медиана и MAD объема по тем же окнам (42/84/180 свечей для 4h)
+--              записываются рядом со средними при DETECTION['robust_baselines'].
+--              Для существующих сигналов - NULL.
+-- Date: 2026-10-16
+
+BEGIN;
+
+ALTER TABLE pump.raw_signals
+ADD COLUMN IF NOT EXISTS median_7d NUMERIC(20,2),
+ADD COLUMN IF NOT EXISTS median_14d NUMERIC(20,2),
+ADD COLUMN IF NOT EXISTS median_30d NUMERIC(20,2),
+ADD COLUMN IF NOT EXISTS mad_7d NUMERIC(20,2),
+ADD COLUMN IF NOT EXISTS mad_14d NUMERIC(20,2),
+ADD COLUMN IF NOT EXISTS mad_30d NUMERIC(20,2);
+
+COMMENT ON COLUMN pump.raw_signals.median_7d IS 'Медиана объема за 7 дней (предыдущие свечи)';
+COMMENT ON COLUMN pump.raw_signals.median_14d IS 'Медиана объема за 14 дней';
+COMMENT ON COLUMN pump.raw_signals.median_30d IS 'Медиана объема за 30 дней';
+COMMENT ON COLUMN pump.raw_signals.mad_7d IS 'MAD объема за 7 дней (median |v - median|, без масштабирования)';
+COMMENT ON COLUMN pump.raw_signals.mad_14d IS 'MAD объема за 14 дней';
+COMMENT ON COLUMN pump.raw_signals.mad_30d IS 'MAD объема за 30 дней';
+
+COMMIT;
+
+-- Verification
+SELECT 'Migration 016 completed: raw_signals robust baselines added!' as status;
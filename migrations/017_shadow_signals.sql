@@ -0,0 +1,47 @@
+-- Migration: Shadow detector signals
+-- Description: Сигналы альтернативной конфигурации детектора (shadow mode,
+--              DETECTION['shadow'] / --shadow), посчитанные в том же цикле по тем же
+--              свечам, что и production. Production сигналы остаются в pump.raw_signals.
+-- Date: 2026-10-16
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS pump.shadow_signals (
+    id BIGSERIAL PRIMARY KEY,
+    variant VARCHAR(50) NOT NULL,
+    trading_pair_id INTEGER NOT NULL,
+    pair_symbol VARCHAR(50) NOT NULL,
+    signal_timestamp TIMESTAMPTZ NOT NULL,
+    detected_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    signal_type VARCHAR(10) NOT NULL,
+    interval VARCHAR(5) NOT NULL DEFAULT '4h',
+    volume NUMERIC(20,2),
+    baseline_7d NUMERIC(20,2),
+    baseline_14d NUMERIC(20,2),
+    baseline_30d NUMERIC(20,2),
+    spike_ratio_7d NUMERIC(10,2),
+    spike_ratio_14d NUMERIC(10,2),
+    spike_ratio_30d NUMERIC(10,2),
+    signal_strength VARCHAR(20),
+    price_at_signal NUMERIC(20,8),
+    median_7d NUMERIC(20,2),
+    median_14d NUMERIC(20,2),
+    median_30d NUMERIC(20,2),
+    mad_7d NUMERIC(20,2),
+    mad_14d NUMERIC(20,2),
+    mad_30d NUMERIC(20,2)
+);
+
+COMMENT ON TABLE pump.shadow_signals IS 'Сигналы shadow варианта детектора (сравнение с pump.raw_signals)';
+COMMENT ON COLUMN pump.shadow_signals.variant IS 'Имя shadow конфигурации (DETECTION[''shadow''][''name''])';
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_shadow_signals_variant_pair_time_type_interval
+ON pump.shadow_signals (variant, trading_pair_id, signal_timestamp, signal_type, interval);
+
+CREATE INDEX IF NOT EXISTS idx_shadow_signals_variant_timestamp
+ON pump.shadow_signals (variant, signal_timestamp DESC);
+
+COMMIT;
+
+-- Verification
+SELECT 'Migration 017 completed: pump.shadow_signals created!' as status;
@@ -0,0 +1,27 @@
+-- Migration: Detector config change notifications
+-- Description: NOTIFY detector_config_changed после INSERT/UPDATE/DELETE в pump.detector_config.
+--              PumpDatabaseHelper кэширует все ключи (один запрос, TTL
+--              ENGINE_CONFIG['cache_ttl_seconds']) и по уведомлению перезагружает кэш,
+--              PumpDetectionEngine.refresh_config подхватывает новые пороги/веса без перезапуска.
+-- Date: 2026-10-16
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION pump.notify_detector_config_changed()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('detector_config_changed', TG_OP);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_detector_config_notify ON pump.detector_config;
+CREATE TRIGGER trg_detector_config_notify
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON pump.detector_config
+FOR EACH STATEMENT
+EXECUTE FUNCTION pump.notify_detector_config_changed();
+
+COMMIT;
+
+-- Verification
+SELECT 'Migration 018 completed: detector_config notifications enabled!' as status;
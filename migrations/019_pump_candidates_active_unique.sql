@@ -0,0 +1,36 @@
+-- Migration: One ACTIVE pump candidate per symbol
+-- Description: Частичный уникальный индекс pump.pump_candidates (pair_symbol) WHERE status = 'ACTIVE'
+--              для ON CONFLICT: analysis runner пишет кандидатов цикла одним INSERT ... ON CONFLICT DO UPDATE
+--              (PumpDatabaseHelper.upsert_candidates) вместо SELECT + UPDATE/INSERT на символ.
+-- Date: 2026-10-16
+
+BEGIN;
+
+-- ============================================================================
+-- STEP 1: Лишние ACTIVE кандидаты символа -> EXPIRED (оставляем самый поздний)
+-- ============================================================================
+
+UPDATE pump.pump_candidates pc
+SET status = 'EXPIRED'
+FROM (
+    SELECT
+        id,
+        ROW_NUMBER() OVER (PARTITION BY pair_symbol ORDER BY first_detected_at DESC, id DESC) as rn
+    FROM pump.pump_candidates
+    WHERE status = 'ACTIVE'
+) d
+WHERE pc.id = d.id
+  AND d.rn > 1;
+
+-- ============================================================================
+-- STEP 2: Частичный уникальный индекс для ON CONFLICT (pair_symbol) WHERE status = 'ACTIVE'
+-- ============================================================================
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_pump_candidates_active_symbol
+ON pump.pump_candidates (pair_symbol)
+WHERE status = 'ACTIVE';
+
+COMMIT;
+
+-- Verification
+SELECT 'Migration 019 completed: one ACTIVE candidate per symbol enforced!' as status;
@@ -0,0 +1,51 @@
+-- Migration: Deduplicated analysis snapshot history
+-- Description: pump.analysis_snapshot_history - snapshot анализа кандидата пишется только при изменении
+--              content_hash (engine/analysis_snapshots.py), в компактной кодировке, с помесячными партициями.
+--              Партиции вперед, rollup и удаление старых месяцев - scripts/snapshot_retention.py.
+--              pump.analysis_snapshots больше не пополняется (можно удалить после проверки).
+-- Date: 2026-10-16
+
+BEGIN;
+
+-- ============================================================================
+-- STEP 1: Партиционированная таблица
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS pump.analysis_snapshot_history (
+    candidate_id INTEGER NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    content_hash BYTEA NOT NULL,
+    data JSONB NOT NULL,
+    PRIMARY KEY (candidate_id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- Страховка от отсутствующей партиции (в норме пустая: партиции создаются заранее)
+CREATE TABLE IF NOT EXISTS pump.analysis_snapshot_history_default
+PARTITION OF pump.analysis_snapshot_history DEFAULT;
+
+-- ============================================================================
+-- STEP 2: Партиция месяца (UTC): pump.analysis_snapshot_history_YYYYMM
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION pump.create_analysis_snapshot_partition(p_month DATE)
+RETURNS TEXT AS $$
+DECLARE
+    v_start TIMESTAMPTZ := date_trunc('month', p_month::timestamp) AT TIME ZONE 'UTC';
+    v_end TIMESTAMPTZ := (date_trunc('month', p_month::timestamp) + INTERVAL '1 month') AT TIME ZONE 'UTC';
+    v_name TEXT := 'analysis_snapshot_history_' || to_char(date_trunc('month', p_month::timestamp), 'YYYYMM');
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS pump.%I PARTITION OF pump.analysis_snapshot_history FOR VALUES FROM (%L) TO (%L)',
+        v_name, v_start, v_end
+    );
+    RETURN v_name;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT pump.create_analysis_snapshot_partition(((NOW() AT TIME ZONE 'UTC')::date + make_interval(months => m))::date)
+FROM generate_series(0, 2) m;
+
+COMMIT;
+
+-- Verification
+SELECT 'Migration 020 completed: analysis snapshot history partitioned!' as status;
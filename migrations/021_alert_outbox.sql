@@ -0,0 +1,60 @@
+-- Migration: Alert outbox
+-- Description: pump.alert_outbox - Telegram alerts пишутся в той же транзакции, что и кандидат/сигнал
+--              (engine/alert_outbox.py), и доставляются отдельным воркером
+--              (daemons/alert_delivery_worker.py): keep-alive соединения, параллельно по чатам,
+--              повторы с backoff, лимит сообщений на чат. NOTIFY alert_outbox будит воркер сразу.
+-- Date: 2026-10-16
+
+BEGIN;
+
+-- ============================================================================
+-- STEP 1: Таблица outbox
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS pump.alert_outbox (
+    id BIGSERIAL PRIMARY KEY,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    source VARCHAR(50) NOT NULL,                -- analysis_runner / pump_start_monitor / extreme_alert_monitor
+    chat_id TEXT NOT NULL,
+    message TEXT NOT NULL,
+    parse_mode VARCHAR(20) DEFAULT 'HTML',
+    dedup_key TEXT,                             -- повторный alert с тем же ключом не добавляется
+    status VARCHAR(10) NOT NULL DEFAULT 'PENDING'
+        CHECK (status IN ('PENDING', 'SENT', 'FAILED')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    last_error TEXT,
+    sent_at TIMESTAMPTZ
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_alert_outbox_dedup_key
+ON pump.alert_outbox (dedup_key)
+WHERE dedup_key IS NOT NULL;
+
+-- Очередь воркера: только неотправленные
+CREATE INDEX IF NOT EXISTS idx_alert_outbox_pending
+ON pump.alert_outbox (next_attempt_at, id)
+WHERE status = 'PENDING';
+
+-- ============================================================================
+-- STEP 2: NOTIFY после вставки (на statement - один на транзакцию продюсера)
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION pump.notify_alert_outbox()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('alert_outbox', TG_OP);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_alert_outbox_notify ON pump.alert_outbox;
+CREATE TRIGGER trg_alert_outbox_notify
+AFTER INSERT ON pump.alert_outbox
+FOR EACH STATEMENT
+EXECUTE FUNCTION pump.notify_alert_outbox();
+
+COMMIT;
+
+-- Verification
+SELECT 'Migration 021 completed: alert outbox created!' as status;
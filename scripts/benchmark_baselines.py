@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк baseline детектора: среднее vs медиана/MAD (robust baselines)
+Стоимость одного цикла детекции на синтетических свечах (без БД):
+
+- incremental: BaselineStateStore.update для одной новой свечи каждой пары
+  (mean-only / robust с отсортированными окнами / robust с пересортировкой окна)
+- numpy: detect_matrix по матрице 30 дней (mean-only / robust)
+
+    python3 scripts/benchmark_baselines.py --pairs 600 --cycles 50
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from engine.baseline_state import BaselineStateStore, baseline_windows
+from engine.candle_access import INTERVAL_IDS, INTERVAL_MS
+from engine.robust_baselines import mad_of_sorted, median_of_sorted
+from engine.vectorized_detector import build_matrix, detect_matrix
+
+
+def make_volumes(pairs, depth, seed=42):
+    """Логнормальные объемы со случайными спайками"""
+    rng = np.random.default_rng(seed)
+    volumes = rng.lognormal(mean=10, sigma=0.5, size=(pairs, depth))
+    spikes = rng.random((pairs, depth)) < 0.02
+    volumes[spikes] *= rng.uniform(3, 10, size=spikes.sum())
+    return volumes
+
+
+def seeded_store(volumes, interval_id, interval_ms, robust):
+    store = BaselineStateStore.for_interval(interval_id, interval_ms, robust=robust)
+    for pair_id, row in enumerate(volumes):
+        for i, volume in enumerate(row):
+            store.update(pair_id, i * interval_ms, volume)
+    return store
+
+
+def resort_baselines(store, pair_id):
+    """Наивный вариант: сортировка каждого окна заново"""
+    pair = store.pairs[pair_id]
+    volumes = [v for _, v in pair.candles]
+    result = {}
+    for name, length in store.windows.items():
+        window = sorted(volumes[-length:])
+        result[f'median_{name}'] = median_of_sorted(window)
+        result[f'mad_{name}'] = mad_of_sorted(window)
+    return result
+
+
+def bench_incremental(history, cycles_volumes, interval_id, interval_ms, mode):
+    store = seeded_store(history, interval_id, interval_ms, robust=(mode == 'robust'))
+    depth = history.shape[1]
+    started = time.perf_counter()
+    for cycle, volumes in enumerate(cycles_volumes):
+        open_time = (depth + cycle) * interval_ms
+        for pair_id, volume in enumerate(volumes):
+            if mode == 'resort':
+                resort_baselines(store, pair_id)
+            store.update(pair_id, open_time, volume)
+    return (time.perf_counter() - started) / len(cycles_volumes)
+
+
+def bench_numpy(volumes, interval_ms, windows, robust, repeats):
+    pairs, depth = volumes.shape
+    rows = [(pair_id, f'P{pair_id}USDT', 1, i * interval_ms, volumes[pair_id, i], 1.0)
+            for pair_id in range(pairs) for i in range(depth)]
+    matrix = build_matrix(rows)
+    signal_since_ms = (depth - 2) * interval_ms  # lookback 8h = 2 свечи 4h
+    config = {'min_spike_ratio': 1.5}
+
+    started = time.perf_counter()
+    for _ in range(repeats):
+        detect_matrix(matrix, signal_since_ms, config, windows=windows, robust=robust)
+    return (time.perf_counter() - started) / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-cycle cost of mean vs median/MAD baselines')
+    parser.add_argument('--pairs', type=int, default=600, help='Number of pairs')
+    parser.add_argument('--cycles', type=int, default=50, help='Detection cycles to time')
+    parser.add_argument('--interval', choices=sorted(INTERVAL_IDS), default='4h')
+    args = parser.parse_args()
+
+    interval_id = INTERVAL_IDS[args.interval]
+    interval_ms = INTERVAL_MS[interval_id]
+    windows = baseline_windows(interval_ms)
+    depth = windows['30d']
+
+    history = make_volumes(args.pairs, depth)
+    cycles_volumes = make_volumes(args.cycles, args.pairs, seed=7)
+
+    print(f"📊 Бенчмарк baseline: {args.pairs} пар, интервал {args.interval}, "
+          f"окна {'/'.join(str(v) for v in windows.values())} свечей, {args.cycles} циклов")
+    print()
+
+    results = {}
+    for mode in ('mean', 'robust', 'resort'):
+        results[mode] = bench_incremental(history, cycles_volumes, interval_id, interval_ms, mode)
+    for robust in (False, True):
+        results[f'numpy_{"robust" if robust else "mean"}'] = bench_numpy(
+            history, interval_ms, windows, robust, repeats=max(1, args.cycles // 5))
+
+    labels = [
+        ('mean', 'incremental, только среднее'),
+        ('robust', 'incremental, медиана/MAD (отсортированные окна)'),
+        ('resort', 'incremental, медиана/MAD (пересортировка окна)'),
+        ('numpy_mean', 'numpy, только среднее'),
+        ('numpy_robust', 'numpy, медиана/MAD (окно сигналов)'),
+    ]
+    for key, label in labels:
+        base = results['numpy_mean' if key.startswith('numpy') else 'mean']
+        print(f"  {label:<50} {results[key] * 1000:9.2f} мс/цикл  (x{results[key] / base:.1f})")
+
+    print()
+    print("✅ Готово")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Проверка дрейфа инкрементальных baseline детектора
+Сравнивает pump.detector_baseline_state с результатом SQL окна AVG() OVER (...)
+по тем же свечам. Код возврата 1, если найдены расхождения.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config.settings import DATABASE
+from engine.baseline_state import BaselineStateStore, MAX_HISTORY_MS
+from engine.candle_access import INTERVAL_MS
+
+
+def get_sql_reference(conn, store):
+    """
+    Baseline по SQL окну для последней учтенной свечи каждой пары
+
+    AVG по N свечам включая last_open_time = baseline для следующей свечи,
+    т.е. ровно то, что возвращает PairBaseline.baselines()
+    """
+    window_columns = ",\n".join(
+        f"""AVG(c.quote_asset_volume) OVER (
+                PARTITION BY c.trading_pair_id
+                ORDER BY c.open_time
+                ROWS BETWEEN {length - 1} PRECEDING AND CURRENT ROW
+            ) as baseline_{name}"""
+        for name, length in store.windows.items()
+    )
+
+    query = f"""
+    WITH state AS (
+        SELECT trading_pair_id, last_open_time
+        FROM pump.detector_baseline_state
+        WHERE interval_id = %s
+    ),
+    windowed AS (
+        SELECT
+            c.trading_pair_id,
+            c.open_time,
+            s.last_open_time,
+            {window_columns}
+        FROM public.candles c
+        INNER JOIN state s ON s.trading_pair_id = c.trading_pair_id
+        WHERE c.interval_id = %s
+          AND c.is_closed = true
+          AND c.open_time <= s.last_open_time
+          AND c.open_time >= s.last_open_time + %s - %s
+    )
+    SELECT *
+    FROM windowed
+    WHERE open_time = last_open_time
+    """
+
+    with conn.cursor() as cur:
+        cur.execute(query, (store.interval_id, store.interval_id, store.interval_ms, MAX_HISTORY_MS))
+        rows = cur.fetchall()
+
+    return {row['trading_pair_id']: row for row in rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check incremental baseline state against SQL windows')
+    parser.add_argument('--interval-id', type=int, default=4,
+                        choices=sorted(INTERVAL_MS),
+                        help='Candle interval id (default: 4 = 4h, 3 = 1h)')
+    parser.add_argument('--tolerance', type=float, default=1e-6,
+                        help='Max relative difference (default: 1e-6)')
+    parser.add_argument('--repair', action='store_true',
+                        help='Delete drifting pairs from the state (detector re-seeds them)')
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**DATABASE, cursor_factory=RealDictCursor)
+
+    try:
+        store = BaselineStateStore.for_interval(args.interval_id, INTERVAL_MS[args.interval_id])
+        store.load(conn)
+
+        if not len(store):
+            print("Состояние baseline пустое - нечего проверять")
+            return 0
+
+        reference = get_sql_reference(conn, store)
+        drifts = store.check_drift(reference, tolerance=args.tolerance)
+
+        # Пары в состоянии, для которых SQL не нашел свечу с last_open_time
+        for pair_id in set(store.pairs) - set(reference):
+            drifts.append({'trading_pair_id': pair_id, 'reason': 'no candle for watermark'})
+
+        print(f"Проверено пар: {len(store)}")
+        print(f"Расхождений: {len(drifts)}")
+
+        for drift in drifts[:50]:
+            print(f"  ❌ pair {drift['trading_pair_id']}: {drift['reason']} "
+                  f"state={drift.get('state')} sql={drift.get('sql')}")
+
+        if drifts and args.repair:
+            pair_ids = sorted({d['trading_pair_id'] for d in drifts})
+            with conn.cursor() as cur:
+                cur.execute("""
+                    DELETE FROM pump.detector_baseline_state
+                    WHERE interval_id = %s AND trading_pair_id = ANY(%s)
+                """, (args.interval_id, pair_ids))
+            conn.commit()
+            print(f"🔧 Удалено состояние {len(pair_ids)} пар - детектор пересоберет их из свечей")
+
+        if not drifts:
+            print("✅ Инкрементальные baseline совпадают с SQL окнами")
+
+        return 1 if drifts else 0
+
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
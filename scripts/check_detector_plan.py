@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Проверка планов запросов детектора
+Выполняет EXPLAIN для запросов detector_daemon_v2 и завершается с кодом 1,
+если планировщик читает public.candles через Seq Scan
+(например, после потери индекса или возврата к to_timestamp(open_time / 1000)).
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from daemons.detector_daemon_v2 import PumpDetectorDaemon
+from engine.candle_access import explain_plan, find_seq_scans, ms_ago
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fail if detector queries fall back to a Seq Scan on candles')
+    parser.add_argument('--verbose', action='store_true', help='Print full JSON plans')
+    args = parser.parse_args()
+
+    daemon = PumpDetectorDaemon(once_mode=True)
+    daemon.connect()
+
+    queries = {
+        'combined (monitoring)': daemon.build_combined_query(),
+        'closed candles (incremental)': daemon.build_closed_candles_query(
+            ms_ago(hours=daemon.lookback_hours)
+        ),
+    }
+
+    failed = False
+
+    try:
+        for name, (query, params) in queries.items():
+            plan = explain_plan(daemon.conn, query, params)
+            seq_scans = find_seq_scans(plan, relation='candles')
+
+            if seq_scans:
+                failed = True
+                print(f"❌ {name}: Seq Scan on candles "
+                      f"(estimated rows: {', '.join(str(n.get('Plan Rows')) for n in seq_scans)})")
+            else:
+                print(f"✅ {name}: index access on candles")
+
+            if args.verbose:
+                print(json.dumps(plan, indent=2))
+    finally:
+        daemon.conn.rollback()
+        daemon.conn.close()
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
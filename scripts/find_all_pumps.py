@@ -2,6 +2,12 @@
 """
 Find All Pumps in 30-Day Period
 Detects sustained pumps (+20% in a day) for all symbols, excluding flash crash period
+
+Futures pairs are taken from the detector's pump.eligible_pairs snapshot
+(scripts/rebuild_eligible_pairs.py). Besides the meme coin and $100M market cap
+filters this script always applied, the snapshot also excludes stablecoin pairs
+and keeps only pairs that are currently active on Binance: pumps of pairs
+delisted since are not found, so results differ from runs made before the snapshot.
 """
 
 import psycopg2
@@ -45,7 +51,7 @@ def find_pumps_for_all_symbols(conn):
     query = """
     WITH daily_changes AS (
         SELECT
-            tp.id as trading_pair_id,
+            tp.trading_pair_id,
             tp.pair_symbol as symbol,
             c.open_time,
             c.open_price,
@@ -55,27 +61,22 @@ def find_pumps_for_all_symbols(conn):
             -- Price change within the candle
             ((c.high_price - c.open_price) / c.open_price * 100) as intra_candle_gain,
             -- Look ahead to next candles for sustained movement
-            LEAD(c.close_price, 1) OVER (PARTITION BY tp.id ORDER BY c.open_time) as next_close_1,
-            LEAD(c.close_price, 2) OVER (PARTITION BY tp.id ORDER BY c.open_time) as next_close_2,
-            LEAD(c.close_price, 3) OVER (PARTITION BY tp.id ORDER BY c.open_time) as next_close_3,
-            LEAD(c.close_price, 6) OVER (PARTITION BY tp.id ORDER BY c.open_time) as next_close_6
+            LEAD(c.close_price, 1) OVER (PARTITION BY tp.trading_pair_id ORDER BY c.open_time) as next_close_1,
+            LEAD(c.close_price, 2) OVER (PARTITION BY tp.trading_pair_id ORDER BY c.open_time) as next_close_2,
+            LEAD(c.close_price, 3) OVER (PARTITION BY tp.trading_pair_id ORDER BY c.open_time) as next_close_3,
+            LEAD(c.close_price, 6) OVER (PARTITION BY tp.trading_pair_id ORDER BY c.open_time) as next_close_6
         FROM candles c
-        JOIN trading_pairs tp ON c.trading_pair_id = tp.id
+        -- FILTERS: Only quality tokens (same snapshot as detector)
+        JOIN pump.eligible_pairs tp ON c.trading_pair_id = tp.trading_pair_id
+            AND tp.is_eligible
         WHERE c.interval_id = 4  -- 4h candles
           AND c.open_time >= %s
           AND c.open_time <= %s
           -- Exclude flash crash period
           AND NOT (c.open_time >= %s AND c.open_time <= %s)
           AND c.is_closed = true
-          -- FILTERS: Only quality tokens (same as detector)
           AND tp.contract_type_id = 1  -- Futures only
-          AND NOT public.is_meme_coin(tp.id)  -- No meme coins
-          AND EXISTS (
-              SELECT 1 FROM public.tokens t
-              JOIN public.cmc_crypto cmc ON t.cmc_token_id = cmc.cmc_token_id
-              WHERE t.id = tp.token_id AND cmc.market_cap >= 100000000  -- >= $100M market cap
-          )
-        ORDER BY tp.id, c.open_time
+        ORDER BY tp.trading_pair_id, c.open_time
     ),
     pump_candidates AS (
         SELECT
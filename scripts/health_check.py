@@ -11,6 +11,11 @@ from datetime import datetime, timedelta
 import subprocess
 import json
 import os
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config.settings import METRICS
+from engine.cycle_metrics import read_metrics_dir
 
 # Цвета для вывода
 class Colors:
@@ -247,6 +252,46 @@ def check_disk_space():
 
     return True, {'status': 'UNKNOWN'}
 
+def check_daemon_metrics():
+    """Проверка метрик циклов демонов (<METRICS['dir']>/*.prom)"""
+    try:
+        summary = read_metrics_dir()
+    except Exception as e:
+        return False, {'status': 'ERROR', 'message': str(e)}
+
+    if not summary:
+        return True, {'status': 'NO_DATA', 'dir': str(METRICS['dir'])}
+
+    stale_seconds = METRICS.get('stale_after_hours', 6) * 3600
+    now = datetime.now().timestamp()
+    results = {}
+    all_good = True
+
+    for daemon, info in summary.items():
+        age = now - info['finished'] if info['finished'] else None
+        stale = age is None or age > stale_seconds
+        failed = info['status'] == 'error'
+        if failed:
+            all_good = False
+
+        # Стадия, которая съела больше всего времени цикла
+        stages = info['stages']
+        slowest = max(stages, key=lambda s: stages[s].get('seconds', 0), default=None)
+
+        results[daemon] = {
+            'status': 'ERROR' if failed else 'STALE' if stale else 'OK',
+            'last_cycle': info['status'],
+            'age_minutes': round(age / 60, 1) if age is not None else None,
+            'duration_s': round(info['duration'], 2) if info['duration'] is not None else None,
+            'slowest_stage': (f"{slowest} {stages[slowest].get('seconds', 0):.2f}s"
+                              if slowest else None),
+            'stages': ', '.join(
+                f"{s}={v.get('seconds', 0):.2f}s/{int(v.get('rows', 0))} rows/{int(v.get('bytes', 0))} B"
+                for s, v in sorted(stages.items())),
+        }
+
+    return all_good, results
+
 def print_results(check_name, passed, details):
     """Красиво выводит результаты проверки"""
     if passed:
@@ -276,6 +321,7 @@ def main():
         ("PROCESSES", check_processes),
         ("WEB API", check_api),
         ("LOGS", check_logs),
+        ("DAEMON METRICS", check_daemon_metrics),
         ("DISK SPACE", check_disk_space)
     ]
 
@@ -318,6 +364,9 @@ def main():
         if not results['LOGS']['passed']:
             print(f"  • Review error logs for critical issues")
 
+        if not results['DAEMON METRICS']['passed']:
+            print(f"  • Last cycle of a daemon failed: check its log and the slowest stage")
+
         exit_code = 1
 
     print(f"{Colors.BOLD}{'='*60}{Colors.ENDC}\n")
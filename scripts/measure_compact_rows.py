@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Измерение compact rows (engine/compact_rows.py) для цикла analysis runner
+Сравнивает RealDictCursor + Decimal и RecordCursor + NUMERIC как float:
+CPU на цикл (time.process_time, медиана) и память (tracemalloc:
+пик за цикл и сколько осталось занято результатами цикла)
+
+Цикл - то же, что делает AnalysisRunner: символы для анализа,
+engine.analyze_symbols по ним и чтение активных кандидатов (без записи).
+
+    python3 scripts/measure_compact_rows.py --cycles 5
+    python3 scripts/measure_compact_rows.py --synthetic --symbols 300 --signals 40   # без БД
+"""
+
+import argparse
+import gc
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from engine.compact_rows import record_type
+from engine.pump_detection_engine import PumpDetectionEngine
+
+NUMERIC_COLUMNS = {'spike_ratio_7d', 'volume', 'price_at_signal', 'baseline_7d', 'baseline_14d', 'baseline_30d'}
+SIGNAL_COLUMNS = ('pair_symbol', 'id', 'signal_type', 'signal_timestamp', 'spike_ratio_7d', 'signal_strength',
+                  'volume', 'price_at_signal', 'baseline_7d', 'baseline_14d', 'baseline_30d')
+
+
+def measure(cycle, cycles):
+    """CPU (медиана по cycles) и память одного цикла"""
+    cpu = []
+    for _ in range(cycles):
+        gc.collect()
+        started = time.process_time()
+        cycle()
+        cpu.append(time.process_time() - started)
+
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    result = cycle()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    return {'cpu': statistics.median(cpu), 'peak': peak - base, 'retained': current - base}
+
+
+class SyntheticConfig:
+    config_version = 1
+
+    def get_config_value(self, key, default=None):
+        return default
+
+    def refresh_config(self):
+        return False
+
+
+class SyntheticSource:
+    """
+    Строки как после fetchall, строятся заново на каждый запрос: NUMERIC приходит
+    текстом и разбирается в Decimal (dict строки) или float (Record строки)
+    """
+
+    def __init__(self, raw_rows, compact):
+        self.raw_rows = raw_rows
+        self.compact = compact
+
+    def get_signals_last_n_days_bulk(self, symbols, days=7, current_time=None, interval='4h'):
+        grouped = {}
+        parse = float if self.compact else Decimal
+        numeric = [column in NUMERIC_COLUMNS for column in SIGNAL_COLUMNS]
+        make = record_type(SIGNAL_COLUMNS)._make
+        for raw in self.raw_rows:
+            values = [parse(v) if is_num and v is not None else v for v, is_num in zip(raw, numeric)]
+            if self.compact:
+                row = make(values)
+                grouped.setdefault(row.pair_symbol, []).append(row)
+            else:
+                row = dict(zip(SIGNAL_COLUMNS, values))
+                grouped.setdefault(row.pop('pair_symbol'), []).append(row)
+        return grouped
+
+    def get_last_pump_info_bulk(self, symbols, current_time=None):
+        return {}
+
+
+def synthetic_cycles(args):
+    rng = random.Random(42)
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    raw_rows, signal_id = [], 1
+    symbols = [f'S{i}USDT' for i in range(args.symbols)]
+    for symbol in symbols:
+        for _ in range(args.signals):
+            raw_rows.append((
+                symbol, signal_id, rng.choice(['SPOT', 'FUTURES']),
+                now - timedelta(hours=4 * rng.randint(0, 41)),
+                f'{rng.uniform(1.5, 8):.2f}', rng.choice(['EXTREME', 'VERY_STRONG', 'STRONG', 'MEDIUM']),
+                f'{rng.uniform(1e4, 1e7):.8f}', f'{rng.uniform(0.01, 3):.8f}',
+                f'{rng.uniform(1e4, 1e6):.8f}', f'{rng.uniform(1e4, 1e6):.8f}',
+                f'{rng.uniform(1e4, 1e6):.8f}',
+            ))
+            signal_id += 1
+
+    cycles = {}
+    for compact in (False, True):
+        engine = PumpDetectionEngine(SyntheticConfig(), signal_source=SyntheticSource(raw_rows, compact))
+        cycles['compact' if compact else 'dict'] = lambda engine=engine: engine.analyze_symbols(symbols, now)
+    return cycles, f"синтетика: {args.symbols} символов x {args.signals} сигналов (строки строятся в Python, без psycopg2)"
+
+
+def database_cycles(args):
+    from config.settings import DATABASE
+    from daemons.analysis_runner_v2 import AnalysisRunner
+    from engine.database_helper import PumpDatabaseHelper
+
+    cycles = {}
+    for compact in (False, True):
+        runner = AnalysisRunner(once_mode=True)
+        runner.db = PumpDatabaseHelper(DATABASE, compact_rows=compact)
+        runner.db.connect()
+        runner.engine = PumpDetectionEngine(runner.db)
+
+        def cycle(runner=runner):
+            symbols = runner.get_symbols_to_analyze()
+            results = runner.engine.analyze_symbols([s['pair_symbol'] for s in symbols])
+            candidates = runner.db.get_active_candidates()
+            runner.db.conn.rollback()
+            return symbols, results, candidates
+
+        cycles['compact' if compact else 'dict'] = cycle
+    return cycles, "БД: цикл analysis runner без записи"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-cycle CPU and allocation: dict rows vs compact rows')
+    parser.add_argument('--cycles', type=int, default=5, help='Cycles per mode for the CPU median')
+    parser.add_argument('--synthetic', action='store_true', help='Synthetic rows instead of the database')
+    parser.add_argument('--symbols', type=int, default=300, help='--synthetic: number of symbols')
+    parser.add_argument('--signals', type=int, default=40, help='--synthetic: signals per symbol')
+    args = parser.parse_args()
+
+    cycles, description = synthetic_cycles(args) if args.synthetic else database_cycles(args)
+    print(f"📊 Compact rows, {description}, {args.cycles} циклов на режим")
+    print()
+
+    results = {mode: measure(cycle, args.cycles) for mode, cycle in cycles.items()}
+    labels = {'dict': 'RealDictCursor + Decimal', 'compact': 'RecordCursor + float'}
+    for mode, r in results.items():
+        print(f"  {labels[mode]:<26} CPU {r['cpu'] * 1000:8.1f} мс/цикл   "
+              f"пик {r['peak'] / 1024:9.1f} KiB   занято результатом {r['retained'] / 1024:9.1f} KiB")
+
+    dict_r, compact_r = results['dict'], results['compact']
+    print()
+    print(f"  Экономия: CPU {1 - compact_r['cpu'] / dict_r['cpu']:.0%}, "
+          f"пик памяти {1 - compact_r['peak'] / dict_r['peak']:.0%}, "
+          f"результат цикла {1 - compact_r['retained'] / dict_r['retained']:.0%}")
+    print()
+    print("✅ Готово")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Пересборка pump.eligible_pairs (снимок пар, прошедших фильтры детектора)
+Запускать после обновления CMC (04:07), например:
+
+    12 4 * * * /home/elcrypto/pump_detector/venv/bin/python3 /home/elcrypto/pump_detector/scripts/rebuild_eligible_pairs.py
+
+Детектор также пересобирает снимок сам, если он старше 24 часов.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config.settings import DATABASE
+from engine.eligible_universe import rebuild_eligible_pairs
+
+
+def print_changes(title, rows, show_reasons=False):
+    print(f"{title}: {len(rows)}")
+    for row in rows:
+        market = 'FUTURES' if row['contract_type_id'] == 1 else 'SPOT'
+        line = f"  {row['pair_symbol']:14s} {market:8s}"
+        if row['old_tier'] or row['new_tier']:
+            line += f" tier: {row['old_tier'] or '-'} → {row['new_tier'] or '-'}"
+        if show_reasons and row['filter_reasons']:
+            line += f" ({', '.join(row['filter_reasons'])})"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild pump.eligible_pairs snapshot')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Only report what would change')
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**DATABASE, cursor_factory=RealDictCursor)
+
+    try:
+        result = rebuild_eligible_pairs(conn, dry_run=args.dry_run)
+    finally:
+        conn.close()
+
+    print("=" * 60)
+    print(f"ELIGIBLE PAIRS {'(DRY RUN)' if args.dry_run else 'REBUILT'}")
+    print("=" * 60)
+    print(f"Активных пар Binance: {result['total']}")
+    print(f"Прошли фильтры: {result['eligible']}")
+    print()
+    print_changes("➕ Добавлены", result['added'])
+    print_changes("➖ Исключены", result['removed'], show_reasons=True)
+    print_changes("🔄 Смена market cap tier", result['tier_changed'])
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
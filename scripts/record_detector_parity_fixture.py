@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Запись датасета для parity-теста NumPy backend детектора
+Берет историю свечей нескольких пар и результат SQL пути детектора
+(build_combined_query, все свечи с baseline - min_spike_ratio = 0)
+и сохраняет в tests/fixtures/detector_parity.json
+
+    python3 scripts/record_detector_parity_fixture.py --pairs 8 --lookback-hours 240
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import psycopg2.extensions
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from daemons.detector_daemon_v2 import PumpDetectorDaemon
+
+FIXTURE = Path(__file__).resolve().parent.parent / 'tests' / 'fixtures' / 'detector_parity.json'
+
+
+def as_number(value):
+    return None if value is None else str(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Record SQL-path detector output for the parity test')
+    parser.add_argument('--pairs', type=int, default=8, help='Number of eligible pairs to record')
+    parser.add_argument('--lookback-hours', type=int, default=240, help='Signal window to record')
+    parser.add_argument('--output', default=str(FIXTURE))
+    args = parser.parse_args()
+
+    daemon = PumpDetectorDaemon(once_mode=True, full_scan=True)
+    daemon.detection_config = dict(daemon.detection_config, min_spike_ratio=0)
+    daemon.lookback_hours = args.lookback_hours
+    daemon.connect()
+
+    try:
+        with daemon.conn.cursor() as cur:
+            # Spread the sample over FUTURES and SPOT pairs
+            cur.execute("""
+                SELECT tp.trading_pair_id
+                FROM pump.eligible_pairs tp
+                WHERE tp.is_eligible AND tp.contract_type_id IN (1, 2)
+                ORDER BY tp.contract_type_id, tp.trading_pair_id
+            """)
+            all_pairs = [r['trading_pair_id'] for r in cur.fetchall()]
+        pair_ids = all_pairs[::max(1, len(all_pairs) // args.pairs)][:args.pairs]
+
+        query, params = daemon.build_combined_query(pair_ids=pair_ids)
+        # params: [history_since_ms, pair_ids, signal_since_ms, min_spike_ratio]
+        history_since_ms, signal_since_ms = params[0], params[-2]
+
+        with daemon.conn.cursor() as cur:
+            cur.execute(query, params)
+            expected = cur.fetchall()
+
+        with daemon.conn.cursor(cursor_factory=psycopg2.extensions.cursor) as cur:
+            cur.execute("""
+                SELECT c.trading_pair_id, tp.pair_symbol, tp.contract_type_id,
+                       c.open_time, c.quote_asset_volume, c.close_price
+                FROM public.candles c
+                JOIN pump.eligible_pairs tp ON tp.trading_pair_id = c.trading_pair_id
+                WHERE c.trading_pair_id = ANY(%s)
+                  AND c.interval_id = 4
+                  AND c.open_time >= %s
+                ORDER BY c.trading_pair_id, c.open_time
+            """, (pair_ids, history_since_ms))
+            candles = cur.fetchall()
+    finally:
+        daemon.conn.rollback()
+        daemon.conn.close()
+
+    fixture = {
+        'description': f'SQL path output for {len(pair_ids)} pairs, recorded by scripts/record_detector_parity_fixture.py',
+        'history_since_ms': history_since_ms,
+        'signal_since_ms': signal_since_ms,
+        'candles': [[r[0], r[1], r[2], r[3], as_number(r[4]), as_number(r[5])] for r in candles],
+        'expected': [{
+            'trading_pair_id': r['trading_pair_id'],
+            'candle_time': int(r['candle_time'].timestamp()),
+            'volume': as_number(r['volume']),
+            'baseline_7d': as_number(r['baseline_7d']),
+            'baseline_14d': as_number(r['baseline_14d']),
+            'baseline_30d': as_number(r['baseline_30d']),
+            'spike_ratio_7d': as_number(r['spike_ratio_7d']),
+            'spike_ratio_14d': as_number(r['spike_ratio_14d']),
+            'spike_ratio_30d': as_number(r['spike_ratio_30d']),
+        } for r in expected],
+    }
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(fixture, f)
+
+    print(f"✅ Записано: {len(candles)} свечей, {len(expected)} строк SQL пути -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
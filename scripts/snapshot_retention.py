@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Обслуживание pump.analysis_snapshot_history (migrations/020): партиции вперед,
+rollup старых snapshots до одного на кандидата за день, удаление старых месяцев
+Параметры - SNAPSHOT_CONFIG (config/settings.py). Раз в сутки, например:
+
+    23 3 * * * /home/elcrypto/pump_detector/venv/bin/python3 /home/elcrypto/pump_detector/scripts/snapshot_retention.py
+"""
+
+import argparse
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config.settings import DATABASE, SNAPSHOT_CONFIG
+from engine.analysis_snapshots import drop_expired_partitions, ensure_partitions, rollup_snapshots
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Partitions, rollup and retention of analysis snapshot history')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Run everything in a transaction and roll it back')
+    parser.add_argument('--rollup-after-days', type=int, default=SNAPSHOT_CONFIG['rollup_after_days'])
+    parser.add_argument('--retention-months', type=int, default=SNAPSHOT_CONFIG['retention_months'])
+    args = parser.parse_args()
+
+    now = datetime.now(timezone.utc)
+    conn = psycopg2.connect(**DATABASE, cursor_factory=RealDictCursor)
+
+    try:
+        partitions = ensure_partitions(conn, SNAPSHOT_CONFIG['partitions_ahead'], now)
+        rolled_up = rollup_snapshots(conn, now - timedelta(days=args.rollup_after_days))
+        dropped = drop_expired_partitions(conn, args.retention_months, now)
+        if args.dry_run:
+            conn.rollback()
+        else:
+            conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    print("=" * 60)
+    print(f"ANALYSIS SNAPSHOT RETENTION {'(DRY RUN)' if args.dry_run else ''}")
+    print("=" * 60)
+    print(f"📅 Партиции: {', '.join(partitions)}")
+    print(f"🗜  Rollup старше {args.rollup_after_days} дней: удалено {rolled_up} snapshots")
+    print(f"🗑  Удалены партиции старше {args.retention_months} мес.: {', '.join(dropped) or '-'}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Tests for alert outbox delivery (engine/alert_outbox.py) against a local HTTP stub
+of the Telegram Bot API: per-chat order and rate limit, concurrency across chats,
+keep-alive connection reuse, 429 retry_after, errors and retry backoff
+"""
+
+import json
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from engine.alert_outbox import (AlertDelivery, ChatRateLimiter, enqueue_alerts, outcome,
+                                 retry_delay)
+from engine.telegram_alerts import DeliveryResult, TelegramAlerter
+
+TOKEN = '123:test'
+
+
+class TelegramStub(ThreadingHTTPServer):
+    """sendMessage endpoint: records requests, replies from per-chat scripted responses"""
+
+    daemon_threads = True
+
+    def __init__(self, delay=0.0):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.delay = delay
+        self.requests = []   # (chat_id, text, arrived_at, client_port)
+        self.scripted = {}   # chat_id -> [(status, body), ...]
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        assert self.path == f"/bot{TOKEN}/sendMessage"
+
+        with server.lock:
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+            server.requests.append((payload['chat_id'], payload['text'], time.monotonic(),
+                                    self.client_address[1]))
+            scripted = server.scripted.get(payload['chat_id'])
+            status, body = scripted.pop(0) if scripted else (200, {'ok': True, 'result': {}})
+        time.sleep(server.delay)
+        with server.lock:
+            server.active -= 1
+
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def stub():
+    servers = []
+
+    def start(delay=0.0):
+        server = TelegramStub(delay)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def outbox_rows(chats, per_chat):
+    rows, next_id = [], 1
+    for i in range(per_chat):
+        for chat in chats:
+            rows.append({'id': next_id, 'chat_id': chat, 'message': f"{chat}-{i}",
+                         'parse_mode': 'HTML', 'attempts': 0})
+            next_id += 1
+    return rows
+
+
+def test_order_rate_limit_and_connection_reuse(stub):
+    server = stub()
+    delivery = AlertDelivery.for_telegram(TOKEN, server.url, workers=3, per_chat_interval=0.05)
+    chats = ['-1001', '-1002', '-1003']
+    try:
+        delivered = delivery.deliver(outbox_rows(chats, per_chat=4))
+    finally:
+        delivery.close()
+
+    assert len(delivered) == 12
+    assert all(result.ok for _, result in delivered)
+    for chat in chats:
+        arrivals = [(text, at) for c, text, at, _ in server.requests if c == chat]
+        assert [text for text, _ in arrivals] == [f"{chat}-{i}" for i in range(4)]
+        gaps = [b - a for (_, a), (_, b) in zip(arrivals, arrivals[1:])]
+        assert min(gaps) >= 0.04
+    # One keep-alive connection per delivery thread, not one per message
+    assert len({port for *_, port in server.requests}) <= 3
+
+
+def test_chats_delivered_concurrently(stub):
+    server = stub(delay=0.2)
+    delivery = AlertDelivery.for_telegram(TOKEN, server.url, workers=4, per_chat_interval=0)
+    try:
+        started = time.monotonic()
+        delivered = delivery.deliver(outbox_rows(['1', '2', '3', '4'], per_chat=1))
+        elapsed = time.monotonic() - started
+    finally:
+        delivery.close()
+
+    assert all(result.ok for _, result in delivered)
+    assert server.max_active > 1
+    assert elapsed < 0.6
+
+
+def test_failures_stop_the_chat(stub):
+    server = stub()
+    server.scripted = {
+        'limited': [(429, {'ok': False, 'error_code': 429,
+                           'description': 'Too Many Requests: retry after 7',
+                           'parameters': {'retry_after': 7}})],
+        'broken': [(500, {'ok': False, 'description': 'Internal Server Error'})],
+    }
+    delivery = AlertDelivery.for_telegram(TOKEN, server.url, workers=2, per_chat_interval=0)
+    try:
+        delivered = delivery.deliver(outbox_rows(['limited', 'broken', 'fine'], per_chat=3))
+    finally:
+        delivery.close()
+
+    by_chat = {}
+    for row, result in delivered:
+        by_chat.setdefault(row['chat_id'], []).append(result)
+
+    # The rest of a failed chat stays PENDING behind the failed message
+    assert len(by_chat['limited']) == 1 and by_chat['limited'][0].retry_after == 7
+    assert len(by_chat['broken']) == 1 and 'HTTP 500' in by_chat['broken'][0].error
+    assert by_chat['broken'][0].retry_after is None
+    assert [r.ok for r in by_chat['fine']] == [True, True, True]
+
+
+def test_unreachable_api():
+    delivery = AlertDelivery.for_telegram(TOKEN, 'http://127.0.0.1:9', workers=1,
+                                          per_chat_interval=0, timeout=1)
+    try:
+        (row, result), = delivery.deliver(outbox_rows(['1'], per_chat=1))
+    finally:
+        delivery.close()
+    assert not result.ok and result.retry_after is None and result.error
+
+
+def test_outcome_and_backoff():
+    now = datetime(2026, 10, 16, tzinfo=timezone.utc)
+    kwargs = dict(now=now, max_attempts=3, backoff_base=5, backoff_max=12)
+
+    assert [retry_delay(n, 5, 12) for n in range(1, 5)] == [5, 10, 12, 12]
+    assert outcome(0, DeliveryResult(True), **kwargs) == ('SENT', 1, now, None, now)
+    assert outcome(0, DeliveryResult(False, None, 'HTTP 500'), **kwargs) == \
+        ('PENDING', 1, now + timedelta(seconds=5), 'HTTP 500', None)
+    assert outcome(1, DeliveryResult(False, None, 'HTTP 500'), **kwargs)[:3] == \
+        ('PENDING', 2, now + timedelta(seconds=10))
+    assert outcome(2, DeliveryResult(False, None, 'HTTP 500'), **kwargs)[:2] == ('FAILED', 3)
+    # 429 waits retry_after and never exhausts attempts
+    assert outcome(2, DeliveryResult(False, 30, 'HTTP 429'), **kwargs)[:3] == \
+        ('PENDING', 2, now + timedelta(seconds=30))
+
+
+def test_chat_rate_limiter():
+    slept = []
+    limiter = ChatRateLimiter(1.0, clock=lambda: 100.0, sleep=slept.append)
+    for chat in ['a', 'a', 'b', 'a']:
+        limiter.wait(chat)
+    assert slept == [1.0, 2.0]
+
+
+def test_alerter_send_message(stub):
+    server = stub()
+    alerter = TelegramAlerter(TOKEN, '-1001', api_url=server.url)
+    assert alerter.send_message('hello')
+    assert server.requests[0][:2] == ('-1001', 'hello')
+
+    assert not TelegramAlerter(TOKEN, '', api_url=server.url).send_message('skipped')
+    assert len(server.requests) == 1
+
+
+def test_enqueue_skips_unconfigured_chats():
+    assert enqueue_alerts(None, [{'source': 'test', 'chat_id': '', 'message': 'x'}]) == 0
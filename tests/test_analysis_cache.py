@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Tests for the analysis runner memoization (engine/analysis_cache.py): an unchanged
+fingerprint must imply an unchanged PumpDetectionEngine result, results of a cycle
+whose signal reads failed are never cached
+"""
+
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from daemons.analysis_runner_v2 import AnalysisRunner
+from engine.analysis_cache import AnalysisCache, window_bucket
+from engine.cycle_metrics import CycleMetrics
+from engine.database_helper import PumpDatabaseHelper
+from engine.pump_detection_engine import PumpDetectionEngine
+from engine.signal_store import SignalStore
+from test_signal_store import START, ConfigHelper, make_rows
+
+
+def symbol_row(store_rows, pumps, symbol, current_time):
+    """What get_symbols_to_analyze returns for the symbol at current_time"""
+    past = [p for p in pumps if p['pair_symbol'] == symbol and p['pump_start'] <= current_time]
+    last = max(past, key=lambda p: p['pump_start']) if past else None
+    return {
+        'pair_symbol': symbol,
+        'signal_count': len(store_rows),
+        'max_signal_id': max((r['id'] for r in store_rows), default=None),
+        'last_pump_id': id(last) if last else None,
+        'last_pump_start': last['pump_start'] if last else None,
+    }
+
+
+def test_window_bucket():
+    edge = datetime(2026, 10, 16, 8, tzinfo=timezone.utc)
+    inside = window_bucket(edge + timedelta(microseconds=1))
+    assert inside == window_bucket(edge + timedelta(hours=3, minutes=59)) == window_bucket(edge) + 1
+    assert window_bucket(edge + timedelta(hours=4)) == inside + 1
+    assert window_bucket(edge - timedelta(microseconds=1)) == window_bucket(edge) - 1
+
+
+def test_same_fingerprint_same_result():
+    signals, pumps = make_rows(seed=7, n_symbols=15)
+    store = SignalStore.from_rows(signals, pumps)
+    engine = PumpDetectionEngine(ConfigHelper(), signal_source=store)
+    symbols = sorted({r['pair_symbol'] for r in signals})
+    cache = AnalysisCache()
+
+    # Runner cadence: every 30 minutes, with a few odd offsets
+    times = [START + timedelta(days=7, minutes=30 * i + (i % 7)) for i in range(0, 600)]
+    for current_time in times:
+        cache.start_cycle()
+        results = engine.analyze_symbols(symbols, current_time=current_time)
+        for symbol in symbols:
+            rows = store.get_signals_last_n_days(symbol, current_time=current_time)
+            key = cache.fingerprint(symbol_row(rows, pumps, symbol, current_time),
+                                    engine.config_version, current_time)
+            hit, cached = cache.lookup(symbol, key)
+            result = results.get(symbol)
+            if result is not None:
+                result = {k: v for k, v in result.items() if k != 'signals'}
+            if hit:
+                assert cached == result
+            cache.store(symbol, key, result)
+
+    # Most half-hour cycles fall into an unchanged 4h bucket
+    assert cache.hits > cache.misses
+
+
+def test_config_change_and_invalidate_miss():
+    cache = AnalysisCache()
+    now = datetime(2026, 10, 16, 12, 30, tzinfo=timezone.utc)
+    row = {'max_signal_id': 10, 'signal_count': 12, 'last_pump_id': None, 'last_pump_start': None}
+
+    key = cache.fingerprint(row, 1, now)
+    cache.store('AUSDT', key, {'score': 1.0, 'signals': [1, 2]})
+    assert cache.lookup('AUSDT', key) == (True, {'score': 1.0})
+    assert cache.lookup('AUSDT', cache.fingerprint(row, 2, now))[0] is False
+    assert cache.lookup('AUSDT', cache.fingerprint(dict(row, max_signal_id=11), 1, now))[0] is False
+
+    cache.invalidate(['AUSDT'])
+    assert cache.lookup('AUSDT', key)[0] is False
+    assert (cache.hits, cache.misses) == (1, 3)
+
+    cache.store('BUSDT', key, None)
+    cache.retain(['CUSDT'])
+    assert cache.entries == {}
+
+
+class FailingConnection:
+    """Connection whose queries fail (e.g. statement timeout)"""
+
+    def __init__(self):
+        self.rollbacks = 0
+
+    def cursor(self, **kwargs):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        raise RuntimeError('canceling statement due to statement timeout')
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def test_failed_reads_not_cached():
+    helper = PumpDatabaseHelper({'dbname': 'test'})
+    helper.conn = FailingConnection()
+
+    # Bulk readers roll back and raise instead of returning "no signals"
+    with pytest.raises(RuntimeError):
+        helper.get_signals_last_n_days_bulk(['AUSDT'])
+    with pytest.raises(RuntimeError):
+        helper.get_last_pump_info_bulk(['AUSDT'])
+    assert helper.conn.rollbacks == 2
+
+    engine = PumpDetectionEngine(ConfigHelper(), signal_source=helper)
+    runner = AnalysisRunner.__new__(AnalysisRunner)
+    runner.engine = runner.analyzer = engine
+    runner.pool, runner.workers = None, 1
+    runner.cache = AnalysisCache()
+    runner.metrics = CycleMetrics('analysis_test', enabled=False)
+    runner.write_detections = lambda pending, alerts=None: pytest.fail('nothing to write')
+    rows = [{'pair_symbol': symbol, 'trading_pair_id': i, 'signal_count': 12, 'max_signal_id': 100 + i,
+             'last_pump_id': None, 'last_pump_start': None} for i, symbol in enumerate(['AUSDT', 'BUSDT'])]
+    runner.get_symbols_to_analyze = lambda: rows
+
+    with pytest.raises(RuntimeError):
+        runner.run_analysis_cycle()
+
+    # The next cycle analyzes both symbols again
+    now = datetime.now(timezone.utc)
+    for row in rows:
+        key = runner.cache.fingerprint(row, engine.config_version, now)
+        assert runner.cache.lookup(row['pair_symbol'], key) == (False, None)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests for the process-pool analysis (engine/analysis_pool.py): partitioned results
+must match an in-process PumpDetectionEngine.analyze_symbols call
+"""
+
+import pickle
+import sys
+from datetime import timedelta
+from functools import partial
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from engine.analysis_pool import AnalysisPool
+from engine.compact_rows import record_type
+from engine.pump_detection_engine import PumpDetectionEngine
+from engine.signal_store import SIGNAL_COLUMNS, SignalStore
+from test_signal_store import START, ConfigHelper, make_rows
+
+
+class WorkerConfig(ConfigHelper):
+    def load_config(self):
+        return False
+
+
+def store_engine(compact=False):
+    """Engine factory for the workers: the same rows in every process"""
+    signals, pumps = make_rows(seed=5, n_symbols=20)
+    if compact:
+        Record = record_type(('pair_symbol', 'interval') + SIGNAL_COLUMNS)
+        signals = [Record._make(r[c] for c in Record._fields) for r in signals]
+    return PumpDetectionEngine(WorkerConfig(), signal_source=SignalStore.from_rows(signals, pumps))
+
+
+def test_records_pickle():
+    Record = record_type(('id', 'signal_strength'))
+    row = pickle.loads(pickle.dumps(Record(7, 'EXTREME')))
+    assert type(row) is Record
+    assert row['signal_strength'] == 'EXTREME'
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_pool_matches_in_process(compact):
+    engine = store_engine(compact)
+    symbols = sorted({r['pair_symbol'] for r in make_rows(seed=5, n_symbols=20)[0]}) + ['MISSINGUSDT']
+    pool = AnalysisPool(3, partial(store_engine, compact))
+    try:
+        detected = 0
+        for hours in (200, 400, 600):
+            current_time = START + timedelta(hours=hours)
+            expected = engine.analyze_symbols(symbols, current_time=current_time)
+            assert pool.analyze_symbols(symbols, current_time) == expected
+            detected += sum(r is not None for r in expected.values())
+        assert detected > 0
+        assert pool.analyze_symbols([], START) == {}
+    finally:
+        pool.close()
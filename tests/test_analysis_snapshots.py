@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests for deduplicated analysis snapshots (engine/analysis_snapshots.py): lossless
+compact encoding, content hashing and history rebuild from change rows
+"""
+
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from engine.analysis_snapshots import (content_hash, decode_analysis, encode_analysis,
+                                       history_from_rows, month_start)
+from engine.pump_detection_engine import PumpDetectionEngine
+from engine.signal_store import SignalStore
+from test_signal_store import START, ConfigHelper, make_rows
+
+
+def engine_analyses():
+    signals, pumps = make_rows(seed=9, n_symbols=20)
+    engine = PumpDetectionEngine(ConfigHelper(), signal_source=SignalStore.from_rows(signals, pumps))
+    symbols = sorted({r['pair_symbol'] for r in signals})
+    analyses = []
+    for hours in range(200, 700, 50):
+        results = engine.analyze_symbols(symbols, current_time=START + timedelta(hours=hours))
+        analyses += [r['analysis_details'] for r in results.values() if r]
+    return analyses
+
+
+def test_round_trip_and_size():
+    analyses = engine_analyses()
+    assert analyses
+    for analysis in analyses:
+        encoded = encode_analysis(analysis)
+        stored = json.loads(json.dumps(encoded))  # as read back from JSONB
+        assert decode_analysis(stored) == analysis
+        assert 'x' not in encoded
+        assert len(json.dumps(encoded)) < len(json.dumps(analysis)) / 2
+
+
+def test_unknown_values_kept():
+    analysis = engine_analyses()[0]
+    analysis = dict(analysis, new_metric=1.5,
+                    strength_distribution=dict(analysis['strength_distribution'], ULTRA=2))
+    assert decode_analysis(json.loads(json.dumps(encode_analysis(analysis)))) == analysis
+
+    odd = {'score': 1.0, 'note': 'no factors'}
+    assert decode_analysis(encode_analysis(odd)) == odd
+
+
+def test_content_hash():
+    analysis = engine_analyses()[0]
+    same = json.loads(json.dumps(analysis))
+    assert content_hash(encode_analysis(analysis)) == content_hash(encode_analysis(same))
+    changed = dict(analysis, score=analysis['score'] + 1e-9)
+    assert content_hash(encode_analysis(analysis)) != content_hash(encode_analysis(changed))
+
+
+def test_history_from_rows():
+    a, b = engine_analyses()[:2]
+    t0 = datetime(2026, 10, 16, tzinfo=timezone.utc)
+    rows = [{'created_at': t0, 'data': encode_analysis(a)},
+            {'created_at': t0 + timedelta(hours=4), 'data': encode_analysis(b)},
+            {'created_at': t0 + timedelta(hours=9), 'data': encode_analysis(a)}]
+    history = history_from_rows(rows)
+    assert [h['analysis'] for h in history] == [a, b, a]
+    assert [h['valid_until'] for h in history] == [t0 + timedelta(hours=4), t0 + timedelta(hours=9), None]
+    assert history_from_rows([]) == []
+
+
+def test_month_start():
+    now = datetime(2026, 12, 31, 23, 59, tzinfo=timezone.utc)
+    assert month_start(now) == datetime(2026, 12, 1, tzinfo=timezone.utc)
+    assert month_start(now, 1) == datetime(2027, 1, 1, tzinfo=timezone.utc)
+    assert month_start(now, -12) == datetime(2025, 12, 1, tzinfo=timezone.utc)
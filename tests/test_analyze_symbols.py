@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tests for the batch PumpDetectionEngine.analyze_symbols API: results must be
+identical to calling analyze_symbol for every symbol, with two DB queries per set
+"""
+
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from engine.pump_detection_engine import PumpDetectionEngine
+
+NOW = datetime(2026, 10, 16, 12, tzinfo=timezone.utc)
+STRENGTHS = ['EXTREME', 'VERY_STRONG', 'STRONG', 'MEDIUM']
+
+
+class FakeDatabaseHelper:
+    """In-memory stand-in for PumpDatabaseHelper with the same query semantics"""
+
+    def __init__(self, signals, pumps):
+        self.signals = signals  # {symbol: [signal dicts]}
+        self.pumps = pumps      # {symbol: [(pump_start, start_price)]}
+        self.calls = []
+        self.config_version = 1
+
+    def get_config_value(self, key, default=None):
+        return default
+
+    def refresh_config(self):
+        return False
+
+    def _signals(self, symbol, days, current_time):
+        since = current_time - timedelta(days=days)
+        rows = [dict(s) for s in self.signals.get(symbol, []) if since <= s['signal_timestamp'] <= current_time]
+        return sorted(rows, key=lambda s: (s['signal_timestamp'], s['id']), reverse=True)
+
+    def _pump(self, symbol, current_time):
+        events = [e for e in self.pumps.get(symbol, []) if e[0] <= current_time]
+        if not events:
+            return None
+        pump_start, start_price = max(events)
+        return {'pump_start': pump_start, 'start_price': start_price,
+                'hours_since_pump': int((current_time - pump_start).total_seconds() / 3600)}
+
+    def get_signals_last_n_days(self, symbol, days=7, current_time=None, interval='4h'):
+        self.calls.append('signals')
+        return self._signals(symbol, days, current_time)
+
+    def get_last_pump_info(self, symbol, current_time=None):
+        self.calls.append('pump')
+        return self._pump(symbol, current_time)
+
+    def get_signals_last_n_days_bulk(self, symbols, days=7, current_time=None, interval='4h'):
+        self.calls.append('signals_bulk')
+        grouped = {s: self._signals(s, days, current_time) for s in symbols}
+        return {s: rows for s, rows in grouped.items() if rows}
+
+    def get_last_pump_info_bulk(self, symbols, current_time=None):
+        self.calls.append('pump_bulk')
+        pumps = {s: self._pump(s, current_time) for s in symbols}
+        return {s: info for s, info in pumps.items() if info}
+
+
+def make_db(n_symbols=30, seed=7):
+    rng = random.Random(seed)
+    signals, pumps = {}, {}
+    next_id = 1
+    for i in range(n_symbols):
+        symbol = f'SYM{i}USDT'
+        rows = []
+        for _ in range(rng.randint(0, 40)):
+            rows.append({
+                'id': next_id,
+                'signal_type': rng.choice(['SPOT', 'FUTURES']),
+                # 4h candle boundaries, so SPOT and FUTURES often share a timestamp
+                'signal_timestamp': NOW - timedelta(hours=4 * rng.randint(0, 50)),
+                'spike_ratio_7d': round(rng.uniform(1.5, 8.0), 2),
+                'signal_strength': rng.choice(STRENGTHS),
+                'volume': rng.uniform(1e4, 1e6),
+                'price_at_signal': rng.uniform(0.5, 2.0) if rng.random() > 0.1 else None,
+            })
+            next_id += 1
+        signals[symbol] = rows
+        if rng.random() < 0.5:
+            pumps[symbol] = [(NOW - timedelta(hours=rng.randint(1, 400)), rng.choice([None, rng.uniform(0.5, 2.0)]))
+                             for _ in range(rng.randint(1, 3))]
+    return FakeDatabaseHelper(signals, pumps)
+
+
+def test_analyze_symbols_matches_per_symbol_path():
+    db = make_db()
+    engine = PumpDetectionEngine(db)
+    symbols = sorted(db.signals)
+
+    expected = {symbol: engine.analyze_symbol(symbol, current_time=NOW) for symbol in symbols}
+    assert any(expected.values()), "fixture should produce some detections"
+
+    db.calls.clear()
+    batch = engine.analyze_symbols(symbols, current_time=NOW)
+
+    assert batch == expected
+    assert db.calls == ['signals_bulk', 'pump_bulk']
+
+
+def test_analyze_symbols_empty_and_unknown():
+    db = make_db(n_symbols=3)
+    engine = PumpDetectionEngine(db)
+
+    assert engine.analyze_symbols([], current_time=NOW) == {}
+    assert engine.analyze_symbols(['MISSINGUSDT'], current_time=NOW) == {'MISSINGUSDT': None}
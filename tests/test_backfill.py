@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Tests for the detector backfill plan (engine/backfill.py): chunks on the candle grid,
+resume from checkpoints (also with a later --to), progress and throughput
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from engine.backfill import (BackfillProgress, chunk_key, load_completed_chunks, make_run_key,
+                             pending_chunks, plan_chunks)
+from engine.candle_access import HOUR_MS, INTERVAL_MS
+
+H4 = INTERVAL_MS[4]
+START = 1_788_220_800_000  # 2026-09-01 00:00 UTC, on the 4h grid
+
+
+def test_chunks_aligned_to_interval_grid():
+    # --from in the middle of a 4h candle, 10h chunks -> rounded down to 8h windows
+    chunks = plan_chunks(START + 3 * HOUR_MS, START + 30 * HOUR_MS, chunk_hours=10, partitions=2)
+
+    windows = sorted({(c['chunk_start_ms'], c['chunk_end_ms']) for c in chunks})
+    assert windows == [(START, START + 8 * HOUR_MS), (START + 8 * HOUR_MS, START + 16 * HOUR_MS),
+                       (START + 16 * HOUR_MS, START + 24 * HOUR_MS), (START + 24 * HOUR_MS, START + 30 * HOUR_MS)]
+    assert all(start % H4 == 0 for start, _ in windows)
+    # Windows are contiguous: no candle in two windows, none skipped
+    assert all(a[1] == b[0] for a, b in zip(windows, windows[1:]))
+    assert [c['partition'] for c in chunks[:2]] == [0, 1]
+    assert len(chunks) == 8
+
+
+def test_chunk_at_least_one_candle():
+    chunks = plan_chunks(START, START + 3 * H4, chunk_hours=1, partitions=1)
+    assert [c['chunk_end_ms'] - c['chunk_start_ms'] for c in chunks] == [H4, H4, H4]
+
+    with pytest.raises(ValueError):
+        plan_chunks(START, START, chunk_hours=48, partitions=1)
+    with pytest.raises(ValueError):
+        plan_chunks(START, START + H4, chunk_hours=48, partitions=0)
+
+
+def test_run_key_does_not_depend_on_end():
+    assert make_run_key(START, 48, 4) == f'i4:{START}:48h:p4'
+    assert make_run_key(START, 48, 4) != make_run_key(START, 24, 4)
+    assert make_run_key(START, 48, 4) != make_run_key(START, 48, 8)
+
+
+def test_resume_skips_completed_chunks():
+    chunks = plan_chunks(START, START + 96 * HOUR_MS, chunk_hours=48, partitions=2)
+    # Crash after three of four chunks
+    completed = {chunk_key(c): c['chunk_end_ms'] for c in chunks[:3]}
+    assert pending_chunks(chunks, completed) == chunks[3:]
+    assert pending_chunks(chunks, {}) == chunks
+
+
+def test_resume_with_later_end():
+    # First run without --to stopped at "now", in the middle of the second window
+    first = plan_chunks(START, START + 60 * HOUR_MS, chunk_hours=48, partitions=1)
+    completed = {chunk_key(c): c['chunk_end_ms'] for c in first}
+
+    # Re-run later: the full first window is skipped, the partial one is extended
+    second = plan_chunks(START, START + 130 * HOUR_MS, chunk_hours=48, partitions=1)
+    assert [(c['chunk_start_ms'], c['chunk_end_ms']) for c in pending_chunks(second, completed)] == [
+        (START + 48 * HOUR_MS, START + 96 * HOUR_MS), (START + 96 * HOUR_MS, START + 130 * HOUR_MS)]
+
+    # An earlier end is already covered
+    shorter = plan_chunks(START, START + 40 * HOUR_MS, chunk_hours=48, partitions=1)
+    assert pending_chunks(shorter, completed) == []
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.params = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        self.params = params
+
+    def fetchall(self):
+        return self.rows
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.cur = FakeCursor(rows)
+        self.rolled_back = 0
+
+    def cursor(self):
+        return self.cur
+
+    def rollback(self):
+        self.rolled_back += 1
+
+
+def test_load_completed_chunks():
+    conn = FakeConnection([{'chunk_start_ms': START, 'partition_id': 1, 'chunk_end_ms': START + H4}])
+    assert load_completed_chunks(conn, 'key') == {(START, 1): START + H4}
+    assert conn.cur.params == ('key',)
+    assert conn.rolled_back == 1
+
+
+def test_progress_counts_skipped_chunks():
+    progress = BackfillProgress(total_chunks=10, skipped_chunks=4, started_at=100.0)
+    progress.add({'candles': 1000, 'signals': 5, 'error': None})
+    progress.add({'candles': 500, 'signals': 1, 'error': None})
+    progress.add({'candles': 0, 'signals': 0, 'error': 'timeout'})
+
+    rates = progress.rates(now=110.0)
+    assert (progress.done, progress.failed) == (2, 1)
+    assert rates['candles_per_sec'] == 150.0
+    assert rates['signals_per_sec'] == 0.6
+    # 3 chunks in 10s, 3 of the 6 pending left
+    assert rates['eta'] == pytest.approx(10.0)
+    assert progress.format(110.0).startswith('7/10 chunks (1 failed)')
+
+
+def test_progress_before_first_chunk():
+    progress = BackfillProgress(total_chunks=4, skipped_chunks=4, started_at=0.0)
+    assert progress.rates(now=1.0)['eta'] is None
+    assert 'ETA ?' in progress.format(1.0)
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental baseline state (engine/baseline_state.py) against a Python
+version of the SQL window of build_combined_query: 42/84/180-candle windows, 30-day
+eviction, periodic rebase, re-seeding of stale pairs and the drift check
+"""
+
+import random
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from daemons.detector_daemon_v2 import PumpDetectorDaemon
+from engine.baseline_state import (BASELINE_WINDOWS, INTERVAL_MS_4H, MAX_HISTORY_MS,
+                                   BaselineStateStore, PairBaseline)
+from engine.cycle_metrics import CycleMetrics
+
+START = 1_780_000_000_000 - 1_780_000_000_000 % INTERVAL_MS_4H
+
+
+def make_candles(count, seed=1, gaps=()):
+    """(open_time, volume) 4h candles, skipping the candle numbers in gaps"""
+    rng = random.Random(seed)
+    return [(START + i * INTERVAL_MS_4H, rng.uniform(1e5, 5e6)) for i in range(count) if i not in gaps]
+
+
+def sql_baselines(candles, index, now=None, windows=BASELINE_WINDOWS, interval_ms=INTERVAL_MS_4H):
+    """
+    Reference: AVG(volume) OVER (ROWS BETWEEN N PRECEDING AND 1 PRECEDING) for candle
+    index over the candles of the last 30 days before now (default: when it has just closed)
+    """
+    open_time = candles[index][0]
+    since = (now if now is not None else open_time + interval_ms) - MAX_HISTORY_MS
+    history = [v for t, v in candles[:index] if t >= since]
+    return {name: (sum(history[-length:]) / len(history[-length:]) if history else None)
+            for name, length in windows.items()}
+
+
+def assert_baselines(actual, expected):
+    for name, value in expected.items():
+        if value is None:
+            assert actual[name] is None, name
+        else:
+            assert actual[name] == pytest.approx(value, rel=1e-9), name
+
+
+def test_matches_sql_window():
+    # 30 days of 4h candles = 180: history longer than the 30d window, with gaps
+    candles = make_candles(400, gaps={5, 6, 7, 150, 151, 299})
+    store = BaselineStateStore()
+    for index, (open_time, volume) in enumerate(candles):
+        assert_baselines(store.update(1, open_time, volume), sql_baselines(candles, index))
+
+    # Already folded candles are skipped
+    assert store.update(1, *candles[-1]) is None
+    assert store.update(1, *candles[-2]) is None
+
+
+def test_window_eviction():
+    pair = PairBaseline(BASELINE_WINDOWS)
+    candles = make_candles(200, seed=2)
+    for open_time, volume in candles:
+        pair.push(open_time, volume)
+
+    volumes = [v for _, v in candles]
+    assert len(pair.candles) == 180
+    for name, length in BASELINE_WINDOWS.items():
+        assert pair.sums[name] == pytest.approx(sum(volumes[-length:]), rel=1e-12)
+        assert pair.baselines()[name] == pytest.approx(sum(volumes[-length:]) / length, rel=1e-12)
+
+
+def test_short_history_and_30_day_cutoff():
+    pair = PairBaseline(BASELINE_WINDOWS)
+    assert pair.baselines() == {'7d': None, '14d': None, '30d': None}
+
+    pair.push(START, 100.0)
+    pair.push(START + INTERVAL_MS_4H, 300.0)
+    assert pair.baselines() == {'7d': 200.0, '14d': 200.0, '30d': 200.0}
+
+    # The window ends with the candle's close: 30 days later only the first one drops out
+    pair.push(START + MAX_HISTORY_MS, 50.0)
+    assert [v for _, v in pair.candles] == [300.0, 50.0]
+    assert pair.baselines() == {'7d': 175.0, '14d': 175.0, '30d': 175.0}
+
+
+def test_periodic_rebase():
+    pair = PairBaseline(BASELINE_WINDOWS)
+    # A huge volume leaves float error in the running sums once it is subtracted
+    pair.push(START, 1e17)
+    candles = make_candles(180, seed=3)[1:]
+    for open_time, volume in candles:
+        pair.push(open_time, volume)
+
+    # 180 pushes: sums were recomputed from the window contents
+    assert pair._pushes == 0
+    volumes = [v for _, v in pair.candles]
+    for name, length in BASELINE_WINDOWS.items():
+        assert pair.sums[name] == float(sum(volumes[-length:]))
+
+
+def make_daemon(history):
+    """Detector with only what fold_closed_candles uses; history is what a re-seed fetches"""
+    daemon = PumpDetectorDaemon.__new__(PumpDetectorDaemon)
+    daemon.metrics = CycleMetrics('detector_test', enabled=False)
+    daemon.seeded = []
+
+    def fetch_closed_candles(since_ms, pair_ids=None, interval_ids=(4,)):
+        daemon.seeded.append(set(pair_ids))
+        return [c for c in history if c['trading_pair_id'] in pair_ids and c['open_time'] >= since_ms]
+
+    daemon.fetch_closed_candles = fetch_closed_candles
+    return daemon
+
+
+def candle_rows(candles, pair_id=1):
+    return [{'trading_pair_id': pair_id, 'pair_symbol': 'AAAUSDT', 'signal_type': 'SPOT',
+             'open_time': t, 'candle_time': datetime.fromtimestamp(t / 1000, tz=timezone.utc),
+             'close_price': 1.0, 'volume': v} for t, v in candles]
+
+
+def test_stale_pair_is_reseeded():
+    candles = make_candles(220, seed=4)
+    current_ms = candles[-1][0] + INTERVAL_MS_4H
+    since_ms = candles[-3][0]
+
+    # State stops 10 candles before the lookback window: the daemon was down
+    store = BaselineStateStore()
+    for open_time, volume in candles[:-13]:
+        store.update(1, open_time, volume)
+
+    daemon = make_daemon(candle_rows(candles))
+    rows, _ = daemon.fold_closed_candles(store, candle_rows(candles[-3:]), since_ms, current_ms)
+
+    assert daemon.seeded == [{1}]
+    assert store.last_open_time(1) == candles[-1][0]
+    assert [r['candle_time'] for r in rows] == [row['candle_time'] for row in candle_rows(candles[-3:])]
+    for row, index in zip(rows, range(len(candles) - 3, len(candles))):
+        # Seeded from the query's 30 days before now, like the SQL path in the same cycle
+        expected = sql_baselines(candles, index, now=current_ms)
+        assert row['baseline_7d'] == pytest.approx(expected['7d'], rel=1e-9)
+        assert row['baseline_30d'] == pytest.approx(expected['30d'], rel=1e-9)
+
+
+def test_contiguous_pair_is_not_reseeded():
+    candles = make_candles(220, seed=5)
+    store = BaselineStateStore()
+    for open_time, volume in candles[:-3]:
+        store.update(1, open_time, volume)
+
+    daemon = make_daemon(candle_rows(candles))
+    _, folded = daemon.fold_closed_candles(store, candle_rows(candles[-3:]), candles[-3][0],
+                                           candles[-1][0] + INTERVAL_MS_4H)
+    assert daemon.seeded == []
+    assert folded == 3
+
+
+def sql_reference(candles):
+    """check_drift reference: AVG over the last N candles up to and including the last one"""
+    volumes = [v for _, v in candles]
+    reference = {'last_open_time': candles[-1][0]}
+    for name, length in BASELINE_WINDOWS.items():
+        reference[f'baseline_{name}'] = sum(volumes[-length:]) / len(volumes[-length:])
+    return reference
+
+
+def test_check_drift():
+    candles = make_candles(190, seed=6)
+    store = BaselineStateStore()
+    for open_time, volume in candles:
+        store.update(1, open_time, volume)
+
+    reference = sql_reference(candles)
+    assert store.check_drift({1: reference}) == []
+
+    drifted = store.check_drift({1: dict(reference, baseline_14d=reference['baseline_14d'] * 1.01)})
+    assert [d['reason'] for d in drifted] == ['baseline_14d']
+    assert drifted[0]['relative_diff'] == pytest.approx(0.01 / 1.01, rel=1e-6)
+
+    behind = store.check_drift({1: dict(reference, last_open_time=candles[-1][0] + INTERVAL_MS_4H)})
+    assert [d['reason'] for d in behind] == ['watermark']
+
+    assert store.check_drift({2: reference}) == [{'trading_pair_id': 2, 'reason': 'missing'}]
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Tests for diff-based candidate-signal linking (candidate_links_diff): applying the
+diff to the stored links must give exactly the current signal sets; sync_candidate_signals
+writes only that diff
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from engine.database_helper import SIGNAL_RELEVANCE, PumpDatabaseHelper, candidate_links_diff
+
+
+def signal(signal_id, strength='STRONG'):
+    return {'id': signal_id, 'signal_strength': strength}
+
+
+def test_only_changes_are_written():
+    existing = [(1, 10), (1, 11), (1, 12), (2, 20)]
+    links = {
+        1: [signal(11), signal(12), signal(13, 'EXTREME')],  # 10 left the window, 13 arrived
+        2: [signal(20)],                                       # unchanged
+        3: [signal(30, 'UNKNOWN')],                            # new candidate
+    }
+    added, removed = candidate_links_diff(existing, links)
+    assert sorted(added) == [(1, 13, 1.0), (3, 30, 0.5)]
+    assert removed == [(1, 10)]
+
+    assert candidate_links_diff(existing, {1: [signal(10), signal(11), signal(12)], 2: [signal(20)]}) == ([], [])
+
+
+def test_applying_diff_reaches_desired_state():
+    rng = random.Random(4)
+    strengths = list(SIGNAL_RELEVANCE)
+    for _ in range(50):
+        existing = {(c, s) for c in range(1, 6) for s in rng.sample(range(100), rng.randint(0, 20))}
+        links = {c: [signal(s, rng.choice(strengths)) for s in rng.sample(range(100), rng.randint(1, 20))]
+                 for c in range(1, 6)}
+        added, removed = candidate_links_diff(existing, links)
+
+        stored = (existing - set(removed)) | {(c, s) for c, s, _ in added}
+        assert stored == {(c, sig['id']) for c, signals in links.items() for sig in signals}
+        assert not {(c, s) for c, s, _ in added} & existing
+        assert set(removed) <= existing
+
+
+class LinksCursor:
+    """pump.candidate_signals as a set of (candidate_id, signal_id); rows arrive through mogrify"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.connection = conn
+        self.values = []
+        self.result = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def mogrify(self, template, args):
+        self.values.append(tuple(args))
+        return b'(row)'
+
+    def execute(self, query, params=None):
+        if isinstance(query, bytes):
+            query = query.decode()
+        query = ' '.join(query.split())
+        self.conn.statements.append(query.split()[0])
+        if self.conn.fail_on and query.startswith(self.conn.fail_on):
+            raise RuntimeError('deadlock detected')
+
+        if query.startswith('SELECT'):
+            self.result = [{'candidate_id': c, 'signal_id': s} for c, s in sorted(self.conn.links)
+                           if c in params[0]]
+        elif query.startswith('INSERT'):
+            self.conn.links |= {(c, s) for c, s, _ in self.values}
+        elif query.startswith('DELETE'):
+            self.conn.links -= set(self.values)
+        self.values = []
+
+    def fetchall(self):
+        return self.result
+
+
+class LinksConnection:
+    encoding = 'UTF8'
+
+    def __init__(self, links, fail_on=None):
+        self.links = set(links)
+        self.fail_on = fail_on
+        self.statements = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return LinksCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def make_helper(links, fail_on=None):
+    helper = PumpDatabaseHelper({'dbname': 'test'})
+    helper.conn = LinksConnection(links, fail_on)
+    return helper
+
+
+def test_sync_candidate_signals():
+    helper = make_helper([(1, 10), (1, 11), (2, 20), (9, 90)])
+    links = {1: [signal(11), signal(12)], 2: [signal(20)], 3: [signal(30)]}
+
+    assert helper.sync_candidate_signals(links) == (2, 1)
+    # Candidate 9 is not part of the cycle and keeps its links
+    assert helper.conn.links == {(1, 11), (1, 12), (2, 20), (3, 30), (9, 90)}
+    assert helper.conn.statements == ['SELECT', 'INSERT', 'DELETE']
+    assert helper.conn.commits == 1
+
+    # Nothing changed: only the read
+    assert helper.sync_candidate_signals(links) == (0, 0)
+    assert helper.conn.statements[3:] == ['SELECT']
+    assert helper.sync_candidate_signals({}) == (0, 0)
+
+
+def test_sync_candidate_signals_errors():
+    links = {1: [signal(11)]}
+
+    helper = make_helper([(1, 10)], fail_on='DELETE')
+    assert helper.sync_candidate_signals(links) == (0, 0)
+    assert (helper.conn.commits, helper.conn.rollbacks) == (0, 1)
+
+    # Inside the caller's transaction the error is raised for its rollback
+    helper = make_helper([(1, 10)], fail_on='DELETE')
+    with pytest.raises(RuntimeError):
+        helper.sync_candidate_signals(links, commit=False)
+    assert (helper.conn.commits, helper.conn.rollbacks) == (0, 0)
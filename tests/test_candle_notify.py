@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Tests for candle_closed notifications (migrations/014_candle_closed_notify.sql)
+and the debounced listener used by detector_daemon_v2.py --listen
+
+The database test needs a scratch local Postgres:
+
+    PUMP_TEST_DSN="dbname=pump_test" python -m pytest tests/test_candle_notify.py
+
+It applies the migration to a throwaway schema (not public.candles) and drops it afterwards.
+"""
+
+import os
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from engine.candle_listener import CandleListener, NotificationBatcher, parse_payload
+
+MIGRATION = Path(__file__).resolve().parent.parent / 'migrations' / '014_candle_closed_notify.sql'
+
+
+def test_parse_payload():
+    assert parse_payload('4:123') == (4, 123)
+    assert parse_payload('3:7') == (3, 7)
+    assert parse_payload('garbage') is None
+    assert parse_payload('4:x') is None
+
+
+def test_batcher_waits_for_quiet_period():
+    batcher = NotificationBatcher(debounce_seconds=5, max_wait_seconds=60)
+    assert not batcher.ready(0)
+    assert batcher.time_to_ready(0) is None
+
+    batcher.add('4:1', now=100)
+    batcher.add('4:2', now=103)
+    batcher.add('4:1', now=104)
+    batcher.add('3:9', now=104)
+
+    assert not batcher.ready(108)
+    assert batcher.time_to_ready(108) == pytest.approx(1)
+    assert batcher.ready(109)
+    assert batcher.take() == {4: {1, 2}, 3: {9}}
+    assert not batcher.ready(200)
+
+
+def test_batcher_max_wait_caps_continuous_stream():
+    batcher = NotificationBatcher(debounce_seconds=5, max_wait_seconds=10)
+    for t in range(0, 12, 2):
+        batcher.add(f'4:{t}', now=t)
+        if t < 10:
+            assert not batcher.ready(t)
+    assert batcher.ready(10)
+
+
+def test_batcher_ignores_malformed_payload():
+    batcher = NotificationBatcher()
+    assert not batcher.add('oops', now=0)
+    assert batcher.time_to_ready(0) is None
+
+
+@pytest.fixture
+def notify_schema():
+    dsn = os.environ.get('PUMP_TEST_DSN')
+    if not dsn:
+        pytest.skip('PUMP_TEST_DSN not set (local Postgres required)')
+
+    psycopg2 = pytest.importorskip('psycopg2')
+    try:
+        conn = psycopg2.connect(dsn)
+    except psycopg2.OperationalError as e:
+        pytest.skip(f'Postgres not available: {e}')
+    conn.autocommit = True
+
+    suffix = uuid.uuid4().hex[:8]
+    schema = f'notify_test_{suffix}'
+    channel = f'candle_closed_{suffix}'
+
+    sql = (MIGRATION.read_text()
+           .replace('public.candles', f'{schema}.candles')
+           .replace('pump.', f'{schema}.')
+           .replace("'candle_closed'", f"'{channel}'"))
+
+    with conn.cursor() as cur:
+        cur.execute(f'CREATE SCHEMA {schema}')
+        cur.execute(f"""
+            CREATE TABLE {schema}.candles (
+                trading_pair_id INTEGER NOT NULL,
+                interval_id INTEGER NOT NULL,
+                open_time BIGINT NOT NULL,
+                quote_asset_volume NUMERIC,
+                close_price NUMERIC,
+                is_closed BOOLEAN NOT NULL DEFAULT false,
+                PRIMARY KEY (trading_pair_id, interval_id, open_time)
+            )
+        """)
+        cur.execute(sql)
+
+    yield dsn, conn, schema, channel
+
+    with conn.cursor() as cur:
+        cur.execute(f'DROP SCHEMA {schema} CASCADE')
+    conn.close()
+
+
+def test_closed_candles_notify_listener(notify_schema):
+    dsn, conn, schema, channel = notify_schema
+    conn.autocommit = False
+
+    listener = CandleListener({'dsn': dsn}, channel=channel,
+                              debounce_seconds=0.3, max_wait_seconds=5)
+    listener.connect()
+
+    try:
+        with conn.cursor() as cur:
+            # One collector transaction: closed 4h for pairs 1 and 2 (pair 1 twice),
+            # forming 4h for pair 3, closed 1h for pair 5, closed 15m (interval 2) for pair 4
+            cur.execute(f"""
+                INSERT INTO {schema}.candles
+                    (trading_pair_id, interval_id, open_time, quote_asset_volume, close_price, is_closed)
+                VALUES
+                    (1, 4, 1000, 10, 1, true),
+                    (1, 4, 2000, 10, 1, true),
+                    (2, 4, 2000, 10, 1, true),
+                    (3, 4, 2000, 10, 1, false),
+                    (5, 3, 2000, 10, 1, true),
+                    (4, 2, 2000, 10, 1, true)
+            """)
+        conn.commit()
+
+        # Pair 3 candle closes (upsert path of the collector)
+        with conn.cursor() as cur:
+            cur.execute(f"""
+                INSERT INTO {schema}.candles
+                    (trading_pair_id, interval_id, open_time, quote_asset_volume, close_price, is_closed)
+                VALUES (3, 4, 2000, 12, 1, true)
+                ON CONFLICT (trading_pair_id, interval_id, open_time) DO UPDATE SET
+                    quote_asset_volume = EXCLUDED.quote_asset_volume,
+                    is_closed = EXCLUDED.is_closed
+            """)
+        conn.commit()
+
+        batch = listener.wait(timeout=5)
+        assert batch == {4: {1, 2, 3}, 3: {5}}
+
+        # Updating an already closed candle does not notify
+        with conn.cursor() as cur:
+            cur.execute(f"UPDATE {schema}.candles SET quote_asset_volume = 20 WHERE trading_pair_id = 1")
+        conn.commit()
+
+        assert listener.wait(timeout=1) == {}
+
+    finally:
+        listener.close()
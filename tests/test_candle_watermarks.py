@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-pair candle watermarks (engine/candle_watermarks.py) and the detector
+cycle around them: skipped without new closed candles, restricted to the pairs that
+advanced, watermarks only move forward and in the transaction of the cycle's signals
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config.settings import DETECTION
+from daemons.detector_daemon_v2 import PumpDetectorDaemon
+from engine.candle_watermarks import find_advanced_pairs, reset_watermarks, save_watermarks
+from engine.cycle_metrics import CycleMetrics
+
+
+class FakeCursor:
+    """Records statements; execute_values rows are collected through mogrify"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.connection = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def mogrify(self, template, args):
+        self.conn.rows.append(tuple(args))
+        return b'(row)'
+
+    def execute(self, query, params=None):
+        if isinstance(query, bytes):
+            query = query.decode()
+        self.conn.queries.append((' '.join(query.split()), params))
+
+    def fetchall(self):
+        return self.conn.result
+
+
+class FakeConnection:
+    encoding = 'UTF8'
+
+    def __init__(self, result=()):
+        self.result = list(result)
+        self.queries = []
+        self.rows = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def test_save_watermarks_only_moves_forward():
+    conn = FakeConnection()
+    assert save_watermarks(conn, 4, {11: 1_000, 12: 2_000}) == 2
+
+    (query, _), = conn.queries
+    assert conn.rows == [(11, 4, 1_000), (12, 4, 2_000)]
+    assert 'ON CONFLICT (trading_pair_id, interval_id) DO UPDATE' in query
+    # A late (older) open_time never replaces a newer watermark
+    assert ('last_open_time = GREATEST(pump.detector_watermarks.last_open_time, '
+            'EXCLUDED.last_open_time)') in query
+    assert conn.commits == 0
+
+    assert save_watermarks(conn, 4, {}) == 0
+    assert len(conn.queries) == 1
+
+
+def test_find_advanced_pairs_query():
+    conn = FakeConnection([{'trading_pair_id': 11, 'open_time': 5_000}])
+    assert find_advanced_pairs(conn, 3, since_ms=1_000.0) == {11: 5_000}
+    query, params = conn.queries[-1]
+    assert params == {'interval_id': 3, 'since_ms': 1_000}
+    assert 'lc.open_time > w.last_open_time' in query and 'c.is_closed = true' in query
+    assert 'ANY(%(pair_ids)s)' not in query
+
+    find_advanced_pairs(conn, 4, since_ms=1_000, pair_ids={11, 12})
+    query, params = conn.queries[-1]
+    assert 'AND tp.trading_pair_id = ANY(%(pair_ids)s)' in query
+    assert sorted(params['pair_ids']) == [11, 12]
+
+
+def test_reset_watermarks():
+    conn = FakeConnection()
+    reset_watermarks(conn, 4)
+    reset_watermarks(conn, 4, [11])
+    assert conn.queries[0][1] == (4,)
+    assert conn.queries[1][1] == (4, [11])
+
+
+def make_daemon(advanced):
+    """SQL-backend detector whose watermark check returns advanced"""
+    daemon = PumpDetectorDaemon.__new__(PumpDetectorDaemon)
+    daemon.detection_config = dict(DETECTION)
+    daemon.conn = FakeConnection()
+    daemon.intervals = [4, 3]
+    daemon.full_scan = True
+    daemon.shadow = None
+    daemon.lookback_hours = 4
+    daemon.cycle_stats = {'executed': 0, 'skipped': 0}
+    daemon.last_cycle_skipped = False
+    daemon.metrics = CycleMetrics('detector_test', enabled=False)
+    daemon.scanned = []
+    daemon.ensure_eligible_pairs = lambda: None
+    daemon.find_advanced_pairs = lambda notified=None: advanced
+    daemon.save_anomalies = lambda anomalies: {'FUTURES': 0, 'SPOT': len(anomalies)}
+
+    def detect_combined_anomalies(time_start=None, time_end=None, pair_ids=None, interval_id=4):
+        daemon.scanned.append((interval_id, sorted(pair_ids) if pair_ids is not None else None))
+        return [{'trading_pair_id': pair_id} for pair_id in pair_ids or []]
+
+    daemon.detect_combined_anomalies = detect_combined_anomalies
+    return daemon
+
+
+def test_cycle_skipped_without_new_candles():
+    daemon = make_daemon(advanced={})
+    assert daemon.run_detection() == 0
+    assert daemon.last_cycle_skipped
+    assert daemon.cycle_stats == {'executed': 0, 'skipped': 1}
+    assert daemon.scanned == []
+    assert daemon.conn.queries == [] and daemon.conn.commits == 0
+
+
+def test_cycle_restricted_to_advanced_pairs():
+    daemon = make_daemon(advanced={4: {11: 5_000, 12: 5_000}})
+    assert daemon.run_detection() == 2
+    assert daemon.cycle_stats == {'executed': 1, 'skipped': 0}
+    # Only the interval and pairs that advanced are scanned
+    assert daemon.scanned == [(4, [11, 12])]
+    # Watermarks are written before the one commit of the cycle's signals
+    assert daemon.conn.rows == [(11, 4, 5_000), (12, 4, 5_000)]
+    assert daemon.conn.commits == 1
+
+
+def test_failed_check_runs_full_cycle():
+    daemon = make_daemon(advanced=None)
+    daemon.run_detection()
+    assert not daemon.last_cycle_skipped
+    assert daemon.scanned == [(4, None), (3, None)]
+    assert daemon.conn.rows == []
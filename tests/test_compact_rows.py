@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for compact result rows (engine/compact_rows.py): dict-style access on tuple
+records, NUMERIC-as-float casting and identical engine scores on record rows
+"""
+
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from engine.compact_rows import NUMERIC_FLOAT, record_type
+from engine.cycle_metrics import estimate_bytes
+from engine.pump_detection_engine import PumpDetectionEngine
+
+COLUMNS = ('id', 'signal_type', 'signal_timestamp', 'spike_ratio_7d', 'signal_strength', 'volume', 'price_at_signal')
+NOW = datetime(2026, 10, 16, 12, tzinfo=timezone.utc)
+
+
+def test_record_access():
+    Record = record_type(COLUMNS)
+    assert record_type(COLUMNS) is Record
+
+    row = Record._make((7, 'SPOT', NOW, 2.5, 'STRONG', 1000.0, None))
+    assert row['id'] == row.id == row[0] == 7
+    assert row.get('price_at_signal', 1.0) is None
+    assert row.get('missing', 'default') == 'default'
+    assert row.get('count') is None  # tuple methods are not columns
+    assert list(row.keys()) == list(COLUMNS)
+    assert dict(row.items())['signal_strength'] == 'STRONG'
+    with pytest.raises(KeyError):
+        row['missing']
+
+    # Tuples are measured by values, like dict rows
+    assert estimate_bytes([row]) == estimate_bytes([dict(zip(COLUMNS, row))])
+
+
+def test_numeric_float_caster():
+    assert NUMERIC_FLOAT('1.23456789', None) == 1.23456789
+    assert NUMERIC_FLOAT(None, None) is None
+
+
+class Source:
+    config_version = 1
+
+    def __init__(self, signals):
+        self.signals = signals
+
+    def get_config_value(self, key, default=None):
+        return default
+
+    def refresh_config(self):
+        return False
+
+    def get_signals_last_n_days(self, symbol, days=7, current_time=None, interval='4h'):
+        return self.signals[symbol]
+
+    def get_last_pump_info(self, symbol, current_time=None):
+        return None
+
+
+def test_engine_scores_identical_on_records():
+    rng = random.Random(3)
+    Record = record_type(COLUMNS)
+    dict_rows, record_rows = {}, {}
+    for i in range(40):
+        symbol = f'S{i}USDT'
+        rows = []
+        for j in range(rng.randint(8, 40)):
+            price = f'{rng.uniform(0.01, 3):.8f}' if rng.random() > 0.1 else None
+            rows.append((i * 1000 + j, rng.choice(['SPOT', 'FUTURES']), NOW - timedelta(hours=4 * rng.randint(0, 41)),
+                         f'{rng.uniform(1.5, 8):.2f}', rng.choice(['EXTREME', 'VERY_STRONG', 'STRONG', 'MEDIUM']),
+                         '1000.5', price))
+        numeric = (3, 5, 6)
+        dict_rows[symbol] = [dict(zip(COLUMNS, (Decimal(v) if k in numeric and v is not None else v
+                                                for k, v in enumerate(r)))) for r in rows]
+        record_rows[symbol] = [Record._make(NUMERIC_FLOAT(v, None) if k in numeric else v
+                                            for k, v in enumerate(r)) for r in rows]
+
+    dict_engine = PumpDetectionEngine(Source(dict_rows))
+    record_engine = PumpDetectionEngine(Source(record_rows))
+    detected = 0
+    for symbol in dict_rows:
+        expected = dict_engine.analyze_symbol(symbol, current_time=NOW)
+        result = record_engine.analyze_symbol(symbol, current_time=NOW)
+        if expected is None:
+            assert result is None
+            continue
+        detected += 1
+        expected.pop('signals')
+        result.pop('signals')
+        assert result == expected
+    assert detected > 0
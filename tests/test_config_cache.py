@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests for the pump.detector_config cache in PumpDatabaseHelper: one query for all
+keys, type conversion, TTL / NOTIFY reload and hot reload in PumpDetectionEngine
+"""
+
+import sys
+from pathlib import Path
+
+from psycopg2.extensions import Notify
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from engine.database_helper import PumpDatabaseHelper
+from engine.pump_detection_engine import PumpDetectionEngine
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        self.conn.queries.append(' '.join(query.split()))
+
+    def fetchall(self):
+        return [{'key': k, 'value': v, 'value_type': t} for k, (v, t) in self.conn.rows.items()]
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+        self.notifies = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def poll(self):
+        pass
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+def make_helper(rows, ttl=300):
+    helper = PumpDatabaseHelper({'dbname': 'test'}, config_ttl=ttl)
+    helper.conn = FakeConnection(rows)
+    return helper
+
+
+def config_queries(helper):
+    return [q for q in helper.conn.queries if 'detector_config' in q]
+
+
+def test_single_query_and_types():
+    helper = make_helper({
+        'min_signal_count': ('12', 'integer'),
+        'high_confidence_threshold': ('80.5', 'float'),
+        'enabled': ('yes', 'boolean'),
+        'mode': ('strict', 'string'),
+    })
+    engine = PumpDetectionEngine(helper)
+
+    assert len(config_queries(helper)) == 1
+    assert engine.min_signal_count == 12
+    assert engine.high_conf_threshold == 80.5
+    assert engine.medium_conf_threshold == 50.0  # default for a missing key
+    assert helper.get_config_value('enabled') is True
+    assert helper.get_config_value('mode') == 'strict'
+    assert len(config_queries(helper)) == 1
+
+
+def test_ttl_reload_updates_engine():
+    helper = make_helper({'min_signal_count': ('10', 'integer')}, ttl=0)
+    engine = PumpDetectionEngine(helper)
+    version = helper.config_version
+
+    # Same values: reloaded by TTL, but the engine keeps its attributes
+    assert engine.refresh_config() is False
+    assert helper.config_version == version
+
+    helper.conn.rows['min_signal_count'] = ('15', 'integer')
+    assert engine.refresh_config() is True
+    assert engine.min_signal_count == 15
+    assert helper.config_version == version + 1
+
+
+def test_notify_triggers_reload_before_ttl():
+    helper = make_helper({'weight_escalation': ('0.10', 'float')})
+    helper.listen_config_changes()
+    engine = PumpDetectionEngine(helper)
+    queries = len(config_queries(helper))
+
+    helper.conn.rows['weight_escalation'] = ('0.20', 'float')
+    assert engine.refresh_config() is False  # no NOTIFY yet, TTL not expired
+    assert len(config_queries(helper)) == queries
+
+    other = Notify(1, 'candle_closed', '4:1')
+    helper.conn.notifies.extend([other, Notify(1, helper.config_channel, 'UPDATE')])
+    assert engine.refresh_config() is True
+    assert engine.weight_escalation == 0.20
+    assert helper.conn.notifies == [other]
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Tests for per-stage cycle metrics (engine/cycle_metrics.py): the Prometheus
+text file written by the daemons and its summary read by scripts/health_check.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from engine.cycle_metrics import CycleMetrics, estimate_bytes, parse_metrics, read_metrics_dir
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def fetchall(self):
+        return self.rows
+
+
+def test_estimate_bytes():
+    assert estimate_bytes([]) == 0
+    assert estimate_bytes([{'a': 'xyz', 'b': None}, {'a': 'x', 'b': 10}]) == 6
+    # Sampled rows are scaled to the full result
+    assert estimate_bytes([(1,)] * 1000) == 1000
+
+
+def test_cycle_written_and_summarized(tmp_path):
+    metrics = CycleMetrics('detector_daemon_v2', metrics_dir=tmp_path)
+
+    metrics.start_cycle()
+    with metrics.stage('query'):
+        pass
+    rows = metrics.fetchall(FakeCursor([(1, 'ABCUSDT'), (2, 'XYZUSDT')]))
+    with metrics.stage('write'):
+        pass
+    with metrics.stage('write'):
+        pass
+    metrics.count('write', rows=2)
+    metrics.finish_cycle()
+
+    assert len(rows) == 2
+    text = (tmp_path / 'detector_daemon_v2.prom').read_text()
+    samples = {(name, labels.get('stage'), labels.get('status')): value
+               for name, labels, value in parse_metrics(text)}
+
+    assert samples[('pump_cycle_stage_rows', 'fetch', None)] == 2
+    assert samples[('pump_cycle_stage_bytes', 'fetch', None)] == 16
+    assert samples[('pump_cycle_stage_calls_total', 'write', None)] == 2
+    assert samples[('pump_cycles_total', None, 'ok')] == 1
+    assert all(labels['daemon'] == 'detector_daemon_v2' for _, labels, _ in parse_metrics(text))
+
+    summary = read_metrics_dir(tmp_path)
+    info = summary['detector_daemon_v2']
+    assert info['status'] == 'ok'
+    assert set(info['stages']) == {'query', 'fetch', 'write'}
+    assert info['stages']['write']['rows'] == 2
+
+
+def test_error_cycle_and_totals(tmp_path):
+    metrics = CycleMetrics('price_updater', metrics_dir=tmp_path)
+
+    for _ in range(2):
+        metrics.start_cycle()
+        metrics.count('fetch', rows=5, size=100)
+        metrics.finish_cycle()
+
+    metrics.start_cycle()
+    metrics.record_error()
+    metrics.finish_cycle()
+
+    samples = {(name, labels.get('stage'), labels.get('status')): value
+               for name, labels, value in parse_metrics(metrics.path.read_text())}
+    assert samples[('pump_cycles_total', None, 'ok')] == 2
+    assert samples[('pump_cycles_total', None, 'error')] == 1
+    assert samples[('pump_cycle_stage_rows_total', 'fetch', None)] == 10
+    # Last cycle had no stages
+    assert ('pump_cycle_stage_rows', 'fetch', None) not in samples
+    assert read_metrics_dir(tmp_path)['price_updater']['status'] == 'error'
+
+
+def test_finish_without_start_is_noop(tmp_path):
+    metrics = CycleMetrics('pump_start_monitor', metrics_dir=tmp_path)
+    metrics.finish_cycle()
+    assert not metrics.path.exists()
+    assert read_metrics_dir(tmp_path / 'missing') == {}
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQL built by the detector (daemons/detector_daemon_v2.py): one candle
+scan for both contract types, parameters matching the placeholders, millisecond
+open_time bounds (engine/candle_access.py)
+"""
+
+import re
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config.settings import DETECTION
+from daemons.detector_daemon_v2 import PumpDetectorDaemon
+from engine.candle_access import DAY_MS, HOUR_MS, ms_ago, open_time_predicate, to_ms, window_bounds_ms
+
+
+def make_daemon(lookback_hours=4):
+    daemon = PumpDetectorDaemon.__new__(PumpDetectorDaemon)
+    daemon.detection_config = dict(DETECTION)
+    daemon.lookback_hours = lookback_hours
+    return daemon
+
+
+def placeholders(query):
+    return len(re.findall(r'(?<!%)%s', query))
+
+
+def test_single_pass_for_both_contract_types():
+    query, params = make_daemon().build_combined_query()
+    assert query.count('FROM public.candles') == 1
+    assert "contract_type_id IN (1, 2)" in query
+    assert "WHEN tp.contract_type_id = 1 THEN 'FUTURES' ELSE 'SPOT'" in query
+    # Windows per contract type and pair; existing signals are skipped on insert, not anti-joined
+    assert query.count('PARTITION BY tp.contract_type_id, c.trading_pair_id') == 3
+    assert 'raw_signals' not in query.split('-- Existing signals')[0]
+    assert params[-1] == DETECTION.get('min_spike_ratio', 1.5)
+
+
+def test_parameters_match_placeholders():
+    daemon = make_daemon()
+    batch = (datetime(2026, 9, 1, tzinfo=timezone.utc), datetime(2026, 9, 3, tzinfo=timezone.utc))
+    for kwargs in ({}, {'partition': (1, 4)}, {'pair_ids': [7, 9]},
+                   {'time_start': batch[0], 'time_end': batch[1], 'partition': (0, 2), 'pair_ids': [7]},
+                   {'interval_id': 3}):
+        query, params = daemon.build_combined_query(**kwargs)
+        assert placeholders(query) == len(params), kwargs
+
+
+def test_open_time_predicate_bounds():
+    assert open_time_predicate('c') == ("", [])
+    assert open_time_predicate('c', start_ms=1000) == ("AND c.open_time >= %s", [1000])
+    # Half-open window [start, end): a candle opening at end_ms belongs to the next window
+    sql, params = open_time_predicate('rc', start_ms=1000.7, end_ms=5000)
+    assert sql.split('\n') == ["AND rc.open_time >= %s", "AND rc.open_time < %s"]
+    assert params == [1000, 5000]
+    assert 'to_timestamp' not in sql
+
+
+def test_millisecond_conversion():
+    start = datetime(2026, 9, 1, tzinfo=timezone.utc)
+    end = datetime(2026, 9, 3, 8, tzinfo=timezone.utc)
+    assert window_bounds_ms(start, end) == (1788220800000, 1788220800000 + 56 * HOUR_MS)
+    assert to_ms(start) == int(start.timestamp()) * 1000
+    assert ms_ago(hours=4, now=to_ms(end)) == to_ms(end) - 4 * HOUR_MS
+    assert ms_ago(days=30, now=to_ms(end)) == to_ms(end) - 30 * DAY_MS
+
+
+def test_batch_query_bounds():
+    start = datetime(2026, 9, 1, tzinfo=timezone.utc)
+    end = datetime(2026, 9, 3, tzinfo=timezone.utc)
+    query, params = make_daemon().build_combined_query(time_start=start, time_end=end)
+
+    # Baseline history: 30 days before the batch up to its end; signals: inside the batch
+    assert params[:4] == [to_ms(start) - 30 * DAY_MS, to_ms(end), to_ms(start), to_ms(end)]
+    assert 'AND c.open_time >= %s\nAND c.open_time < %s' in query
+    assert 'AND recent_candles.open_time >= %s\nAND recent_candles.open_time < %s' in query
+    assert 'to_timestamp(c.open_time / 1000) >=' not in query
+
+
+def test_relative_query_bounds():
+    daemon = make_daemon(lookback_hours=8)
+    before = ms_ago()
+    query, params = daemon.build_combined_query()
+    after = ms_ago()
+
+    history_ms, signal_ms = params[0], params[1]
+    assert before - 30 * DAY_MS <= history_ms <= after - 30 * DAY_MS
+    assert before - 8 * HOUR_MS <= signal_ms <= after - 8 * HOUR_MS
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests for the pump.eligible_pairs rebuild (engine/eligible_universe.py): changes are
+reported as added / removed / tier changes, --dry-run leaves the snapshot untouched
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from engine.eligible_universe import DIFF_QUERY, rebuild_eligible_pairs
+
+
+def change(symbol, was_eligible, is_eligible, old_tier=None, new_tier=None, reasons=()):
+    return {'trading_pair_id': 1, 'pair_symbol': symbol, 'contract_type_id': 1,
+            'was_eligible': was_eligible, 'is_eligible': is_eligible,
+            'old_tier': old_tier, 'new_tier': new_tier, 'filter_reasons': list(reasons)}
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.result = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        query = ' '.join(query.split())
+        self.conn.queries.append(query)
+        if self.conn.fail_on and self.conn.fail_on in query:
+            raise RuntimeError('relation does not exist')
+        if query == ' '.join(DIFF_QUERY.split()):
+            self.result = self.conn.changes
+        elif 'COUNT(*) as total' in query:
+            self.result = [{'total': 500, 'eligible': 320}]
+
+    def fetchall(self):
+        return self.result
+
+    def fetchone(self):
+        return self.result[0]
+
+
+class FakeConnection:
+    def __init__(self, changes, fail_on=None):
+        self.changes = changes
+        self.fail_on = fail_on
+        self.queries = []
+        self.committed = 0
+        self.rolled_back = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.committed += 1
+
+    def rollback(self):
+        self.rolled_back += 1
+
+
+CHANGES = [
+    change('AAAUSDT', False, True, new_tier='MID'),                          # passed the filters
+    change('BBBUSDT', True, False, 'MID', 'SMALL', reasons=['low_market_cap']),
+    change('CCCUSDT', True, False, 'LARGE', None),                           # delisted / inactive
+    change('DDDUSDT', True, True, 'MID', 'LARGE'),                           # tier change only
+]
+
+
+def symbols(rows):
+    return [r['pair_symbol'] for r in rows]
+
+
+def test_changes_are_split():
+    conn = FakeConnection(CHANGES)
+    result = rebuild_eligible_pairs(conn)
+
+    assert (result['total'], result['eligible']) == (500, 320)
+    assert symbols(result['added']) == ['AAAUSDT']
+    assert symbols(result['removed']) == ['BBBUSDT', 'CCCUSDT']
+    assert symbols(result['tier_changed']) == ['DDDUSDT']
+
+    # Snapshot replaced in the same transaction
+    assert any(q.startswith('DELETE FROM pump.eligible_pairs') for q in conn.queries)
+    assert any(q.startswith('INSERT INTO pump.eligible_pairs') for q in conn.queries)
+    assert (conn.committed, conn.rolled_back) == (1, 0)
+
+
+def test_dry_run_keeps_snapshot():
+    conn = FakeConnection(CHANGES)
+    result = rebuild_eligible_pairs(conn, dry_run=True)
+
+    assert symbols(result['removed']) == ['BBBUSDT', 'CCCUSDT']
+    assert not any('pump.eligible_pairs (' in q or q.startswith('DELETE') for q in conn.queries)
+    assert (conn.committed, conn.rolled_back) == (0, 1)
+
+
+def test_failed_rebuild_rolls_back():
+    conn = FakeConnection(CHANGES, fail_on='INSERT INTO pump.eligible_pairs')
+    with pytest.raises(RuntimeError):
+        rebuild_eligible_pairs(conn)
+    assert (conn.committed, conn.rolled_back) == (0, 1)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for the in-memory Double EXTREME check of the pipeline (engine/extreme_pairs.py):
+same rows as the extreme alert monitor query, last candle only, pairs split across cycles,
+pairs returned again until they are marked reported
+"""
+
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from engine.extreme_pairs import ExtremePairTracker
+
+CANDLE = datetime(2026, 10, 16, 8, tzinfo=timezone.utc)
+
+
+def signal(symbol, signal_type, strength='EXTREME', candle_time=CANDLE, interval='4h', spike=6.0):
+    return {'pair_symbol': symbol, 'signal_type': signal_type, 'signal_strength': strength,
+            'candle_time': candle_time, 'interval': interval, 'spike_ratio_7d': spike,
+            'volume': 1000.0 * spike, 'trading_pair_id': 1, 'signal_id': 1}
+
+
+def test_double_extreme_rows():
+    tracker = ExtremePairTracker()
+    rows = tracker.add([
+        signal('AAAUSDT', 'SPOT', spike=7.0), signal('AAAUSDT', 'FUTURES', spike=5.5),
+        signal('BBBUSDT', 'SPOT'), signal('BBBUSDT', 'FUTURES', strength='VERY_STRONG'),
+        signal('CCCUSDT', 'SPOT', interval='1h'), signal('CCCUSDT', 'FUTURES', interval='1h'),
+    ])
+    assert rows == [{'pair_symbol': 'AAAUSDT', 'signal_timestamp': CANDLE,
+                     'spot_spike': 7.0, 'futures_spike': 5.5,
+                     'spot_volume': 7000.0, 'futures_volume': 5500.0}]
+
+
+def test_pair_split_across_cycles_reported_once():
+    tracker = ExtremePairTracker()
+    assert tracker.add([signal('AAAUSDT', 'SPOT')]) == []
+    rows = tracker.add([signal('AAAUSDT', 'FUTURES')])
+    assert [r['pair_symbol'] for r in rows] == ['AAAUSDT']
+    tracker.mark_reported(rows)
+    assert tracker.add([signal('AAAUSDT', 'FUTURES')]) == []
+
+
+def test_pair_returned_until_reported():
+    tracker = ExtremePairTracker()
+    rows = tracker.add([signal('AAAUSDT', 'SPOT'), signal('AAAUSDT', 'FUTURES')])
+    # Write failed: the pair comes back on the next cycle, also one without its signals
+    assert tracker.add([signal('BBBUSDT', 'SPOT')]) == rows
+    assert tracker.pending() == rows
+    tracker.mark_reported(rows)
+    assert tracker.add([]) == [] and tracker.pending() == []
+
+
+def test_only_last_candle():
+    tracker = ExtremePairTracker()
+    later = CANDLE + timedelta(hours=4)
+    assert tracker.add([signal('AAAUSDT', 'SPOT'), signal('BBBUSDT', 'SPOT', candle_time=later)]) == []
+    # The older candle is no longer checked once a newer one was seen
+    assert tracker.add([signal('AAAUSDT', 'FUTURES')]) == []
+    rows = tracker.add([signal('BBBUSDT', 'FUTURES', candle_time=later)])
+    assert [(r['pair_symbol'], r['signal_timestamp']) for r in rows] == [('BBBUSDT', later)]
+    tracker.mark_reported(rows)
+    assert tracker.add([]) == []
+    # An unreported pair of the older candle is dropped with it
+    tracker.add([signal('CCCUSDT', 'SPOT', candle_time=later + timedelta(hours=4)),
+                 signal('CCCUSDT', 'FUTURES', candle_time=later + timedelta(hours=4))])
+    tracker.mark_reported(rows)
+    assert [r['pair_symbol'] for r in tracker.pending()] == ['CCCUSDT']
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Tests for the pipeline step after detection (daemons/pipeline_daemon.py
+PumpPipeline.process_signals): only 4h symbols go to the engine, new candidates get
+the smallest trading_pair_id, detections and Double EXTREME alerts share one write,
+a Double EXTREME is marked reported only after that write commits
+"""
+
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from daemons.pipeline_daemon import PumpPipeline
+from engine.cycle_metrics import CycleMetrics
+from engine.extreme_pairs import ExtremePairTracker
+
+CANDLE = datetime(2026, 10, 16, 8, tzinfo=timezone.utc)
+
+
+def signal(symbol, signal_type, pair_id, strength='EXTREME', interval='4h'):
+    return {'pair_symbol': symbol, 'signal_type': signal_type, 'signal_strength': strength,
+            'candle_time': CANDLE, 'interval': interval, 'spike_ratio_7d': 6.0,
+            'volume': 6000.0, 'trading_pair_id': pair_id, 'signal_id': pair_id}
+
+
+class EngineStub:
+    def __init__(self, detected):
+        self.detected = detected
+        self.calls = []
+
+    def analyze_symbols(self, symbols, current_time=None):
+        self.calls.append(list(symbols))
+        return {symbol: ({'pair_symbol': symbol, 'confidence': 'HIGH', 'score': 80.0,
+                          'pattern_type': 'ACCUMULATION', 'is_actionable': True}
+                         if symbol in self.detected else None)
+                for symbol in symbols}
+
+
+class RunnerStub:
+    def __init__(self, engine):
+        self.engine = engine
+        self.writes = []
+        self.fail = False
+
+    def write_detections(self, detections, alerts=None):
+        self.writes.append((detections, alerts))
+        if self.fail:
+            raise RuntimeError('connection lost')  # after rollback, as the runner does
+        return {result['pair_symbol']: i + 1 for i, (result, _) in enumerate(detections)}
+
+
+class ExtremeStub:
+    telegram = SimpleNamespace(enabled=True)
+
+    def alert_row(self, row):
+        return {'source': 'extreme_alert_monitor', 'dedup_key': f"double_extreme:{row['pair_symbol']}"}
+
+
+def make_pipeline(detected):
+    # Components without connections: only what process_signals touches
+    pipeline = PumpPipeline.__new__(PumpPipeline)
+    pipeline.tracker = ExtremePairTracker('4h')
+    pipeline.extreme = ExtremeStub()
+    pipeline.runner = RunnerStub(EngineStub(detected))
+    pipeline.metrics = CycleMetrics('pipeline_test', enabled=False)
+    return pipeline
+
+
+def test_process_signals():
+    pipeline = make_pipeline(detected={'AAAUSDT', 'CCCUSDT'})
+    signals = [
+        signal('AAAUSDT', 'SPOT', pair_id=12), signal('AAAUSDT', 'FUTURES', pair_id=7),
+        signal('BBBUSDT', 'SPOT', pair_id=3, strength='STRONG'),
+        signal('CCCUSDT', 'FUTURES', pair_id=9, interval='1h'),
+        signal('DDDUSDT', 'SPOT', pair_id=5, interval='1h'),
+    ]
+
+    analyzed, detected, alerts = pipeline.process_signals(signals)
+
+    # 1h-only symbols are not analyzed
+    assert pipeline.runner.engine.calls == [['AAAUSDT', 'BBBUSDT']]
+    assert (analyzed, detected, alerts) == (2, 1, 1)
+
+    (detections, alert_rows), = pipeline.runner.writes
+    assert [(result['pair_symbol'], pair_id) for result, pair_id in detections] == [('AAAUSDT', 7)]
+    assert alert_rows == [{'source': 'extreme_alert_monitor', 'dedup_key': 'double_extreme:AAAUSDT'}]
+
+    stages = pipeline.metrics.current
+    assert stages['extreme'].calls == 1 and stages['classify'].calls == 1
+
+
+def test_nothing_to_write():
+    pipeline = make_pipeline(detected=set())
+    pipeline.process_signals([signal('BBBUSDT', 'SPOT', pair_id=3, strength='STRONG')])
+    assert pipeline.runner.engine.calls == [['BBBUSDT']]
+    assert pipeline.runner.writes == []
+
+
+def test_failed_write_reports_double_again():
+    pipeline = make_pipeline(detected=set())
+    doubles = [signal('AAAUSDT', 'SPOT', pair_id=12), signal('AAAUSDT', 'FUTURES', pair_id=7)]
+
+    pipeline.runner.fail = True
+    with pytest.raises(RuntimeError):
+        pipeline.process_signals(doubles)
+    assert [r['pair_symbol'] for r in pipeline.tracker.pending()] == ['AAAUSDT']
+
+    # Next cycle, without new signals of the pair: the alert is written again
+    pipeline.runner.fail = False
+    pipeline.process_signals([])
+    assert [alerts for _, alerts in pipeline.runner.writes] == [
+        [{'source': 'extreme_alert_monitor', 'dedup_key': 'double_extreme:AAAUSDT'}]] * 2
+    assert pipeline.tracker.pending() == []
+
+    pipeline.process_signals([signal('BBBUSDT', 'SPOT', pair_id=3, strength='STRONG')])
+    assert len(pipeline.runner.writes) == 2
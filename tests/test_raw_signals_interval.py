@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Tests for the interval in the pump.raw_signals unique key (save_raw_signals_bulk):
+4h and 1h signals of the same candle time are both stored and mapped back to their
+anomalies, repeated signals are skipped
+"""
+
+import re
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config.settings import DETECTION
+from daemons.detector_daemon_v2 import PumpDetectorDaemon
+from engine.cycle_metrics import CycleMetrics
+
+MIGRATION = Path(__file__).resolve().parent.parent / 'migrations' / '015_raw_signals_interval.sql'
+CANDLE = datetime(2026, 10, 16, 8, tzinfo=timezone.utc)
+
+
+class RawSignalsTable:
+    """pump.raw_signals with ON CONFLICT DO NOTHING on the key the statement names"""
+
+    def __init__(self):
+        self.rows = {}
+        self.queries = []
+        self.encoding = 'UTF8'
+
+    def cursor(self):
+        return FakeCursor(self)
+
+
+class FakeCursor:
+    def __init__(self, table):
+        self.table = table
+        self.connection = table
+        self.values = []
+        self.result = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def mogrify(self, template, args):
+        # Row as {column position: value}; literals (NOW(), '2.0') take no argument
+        if isinstance(template, bytes):
+            template = template.decode()
+        fields = template.strip('()').split(', ')
+        args = iter(args)
+        self.values.append([next(args) if field == '%s' else field for field in fields])
+        return b'(row)'
+
+    def execute(self, query, params=None):
+        query = query.decode()
+        self.table.queries.append(query)
+        columns = [c.strip() for c in re.search(r'INSERT INTO pump\.raw_signals \((.*?)\)', query, re.S)
+                   .group(1).split(',')]
+        key = [c.strip() for c in re.search(r'ON CONFLICT \((.*?)\) DO NOTHING', query).group(1).split(',')]
+        returning = [c.strip() for c in re.search(r'RETURNING (.*)', query).group(1).split(',')]
+
+        self.result = []
+        for values in self.values:
+            row = dict(zip(columns, values))
+            unique = tuple(row[c] for c in key)
+            if unique in self.table.rows:
+                continue
+            row['id'] = len(self.table.rows) + 1
+            self.table.rows[unique] = row
+            self.result.append({c: row[c] for c in returning})
+        self.values = []
+
+    def fetchall(self):
+        return self.result
+
+
+def anomaly(interval, signal_type='SPOT', spike=2.5):
+    return {'trading_pair_id': 7, 'pair_symbol': 'AAAUSDT', 'signal_type': signal_type,
+            'interval': interval, 'candle_time': CANDLE, 'close_price': 1.0, 'volume': 2500.0,
+            'baseline_7d': 1000.0, 'baseline_14d': 1000.0, 'baseline_30d': 1000.0,
+            'spike_ratio_7d': spike, 'spike_ratio_14d': spike, 'spike_ratio_30d': spike}
+
+
+def make_daemon():
+    daemon = PumpDetectorDaemon.__new__(PumpDetectorDaemon)
+    daemon.detection_config = dict(DETECTION)
+    daemon.conn = RawSignalsTable()
+    daemon.metrics = CycleMetrics('detector_test', enabled=False)
+    daemon._cycle_signals = []
+    return daemon
+
+
+def test_intervals_of_same_candle_both_stored():
+    daemon = make_daemon()
+    signals = [anomaly('4h'), anomaly('1h'), anomaly('1h', 'FUTURES')]
+    assert daemon.save_anomalies(signals) == {'FUTURES': 1, 'SPOT': 2}
+
+    assert sorted(daemon.conn.rows) == [
+        (7, CANDLE, 'FUTURES', '1h'), (7, CANDLE, 'SPOT', '1h'), (7, CANDLE, 'SPOT', '4h')]
+    # Every anomaly got the id of its own row
+    for signal in signals:
+        key = (7, CANDLE, signal['signal_type'], signal['interval'])
+        assert signal['signal_id'] == daemon.conn.rows[key]['id']
+    assert daemon._cycle_signals == signals
+
+
+def test_repeated_signals_skipped():
+    daemon = make_daemon()
+    daemon.save_anomalies([anomaly('4h')])
+    daemon._cycle_signals = []
+
+    again = [anomaly('4h', spike=3.0), anomaly('1h')]
+    assert daemon.save_anomalies(again) == {'FUTURES': 0, 'SPOT': 1}
+    assert 'signal_id' not in again[0]
+    assert daemon._cycle_signals == [again[1]]
+
+
+def test_conflict_key_matches_unique_index():
+    sql = MIGRATION.read_text()
+    index = re.search(r'uq_raw_signals_pair_time_type_interval\s+ON pump\.raw_signals \((.*?)\)', sql).group(1)
+
+    daemon = make_daemon()
+    daemon.save_raw_signals_bulk([dict(anomaly('4h'), signal_strength='STRONG')])
+
+    key = re.search(r'ON CONFLICT \((.*?)\)', daemon.conn.queries[0]).group(1)
+    assert key == index == 'trading_pair_id, signal_timestamp, signal_type, interval'
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for median/MAD baselines (engine/robust_baselines.py): the sorted sliding
+window of the incremental path and the vectorized version must match a plain
+re-sort of each window
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from engine.baseline_state import BaselineStateStore
+from engine.robust_baselines import SortedWindow, mad_of_sorted, robust_baselines_at
+from engine.vectorized_detector import build_matrix, detect_matrix
+
+WINDOWS = {'7d': 5, '14d': 9, '30d': 16}
+HOUR_MS = 3600 * 1000
+
+
+def reference(values):
+    """Median and MAD by sorting the window"""
+    if not values:
+        return None, None
+    median = float(np.median(values))
+    return median, float(np.median(np.abs(np.array(values) - median)))
+
+
+def test_mad_of_sorted_matches_sort():
+    rng = random.Random(7)
+    for _ in range(2000):
+        values = sorted(rng.choice([rng.randint(0, 5), rng.random() * 100]) for _ in range(rng.randint(1, 30)))
+        assert mad_of_sorted(values) == pytest.approx(reference(values)[1])
+
+
+def test_sorted_window_add_remove():
+    window = SortedWindow()
+    for v in (3.0, 1.0, 2.0, 10.0):
+        window.add(v)
+    window.remove(10.0)
+    window.remove(42.0)  # not present: ignored
+    assert window.values == [1.0, 2.0, 3.0]
+    assert window.median() == 2.0
+    assert window.mad() == 1.0
+
+
+def test_incremental_store_matches_reference():
+    rng = random.Random(11)
+    store = BaselineStateStore(interval_id=3, windows=WINDOWS, interval_ms=HOUR_MS, robust=True)
+    history = []
+
+    for i in range(60):
+        volume = rng.choice([rng.random() * 10, 100.0, 1.0])
+        baselines = store.update(1, i * HOUR_MS, volume)
+        for name, length in WINDOWS.items():
+            median, mad = reference(history[-length:])
+            assert baselines[f'median_{name}'] == pytest.approx(median)
+            assert baselines[f'mad_{name}'] == pytest.approx(mad)
+        history.append(volume)
+
+
+def test_mean_only_store_has_no_robust_fields():
+    store = BaselineStateStore(interval_id=3, windows=WINDOWS, interval_ms=HOUR_MS)
+    store.update(1, 0, 1.0)
+    assert set(store.update(1, HOUR_MS, 2.0)) == set(WINDOWS)
+
+
+def test_vectorized_matches_reference():
+    rng = np.random.default_rng(3)
+    volumes = rng.lognormal(size=(4, 40))
+    present = np.ones_like(volumes, dtype=bool)
+    present[0, :12] = False  # short history pair (left padding)
+    volumes[2, 20] = np.nan  # NULL volume: excluded from the window
+
+    rows, cols = np.nonzero(present)
+    values = robust_baselines_at(volumes, present, rows, cols, WINDOWS)
+
+    for i, (r, c) in enumerate(zip(rows, cols)):
+        for name, length in WINDOWS.items():
+            window = [v for v, p in zip(volumes[r, max(0, c - length):c], present[r, max(0, c - length):c])
+                      if p and not np.isnan(v)]
+            median, mad = reference(window)
+            for field, expected in ((f'median_{name}', median), (f'mad_{name}', mad)):
+                if expected is None:
+                    assert np.isnan(values[field][i])
+                else:
+                    assert values[field][i] == pytest.approx(expected)
+
+
+def test_robust_threshold_catches_spike_hidden_by_mean():
+    # Two earlier spikes inflate the 5-candle mean: the third spike is below
+    # min_spike_ratio against the mean but far above the median
+    volumes = [10, 10, 300, 10, 300, 10, 300]
+    rows = [(1, 'AAAUSDT', 1, i * HOUR_MS, v, 1.0) for i, v in enumerate(volumes)]
+    matrix = build_matrix(rows)
+    config = {'min_spike_ratio': 2.5}
+
+    assert detect_matrix(matrix, 6 * HOUR_MS, config, windows=WINDOWS) == []
+
+    anomalies = detect_matrix(matrix, 6 * HOUR_MS, dict(config, robust_min_spike_ratio=5),
+                              windows=WINDOWS, robust=True)
+    assert len(anomalies) == 1
+    assert anomalies[0]['median_7d'] == 10
+    assert anomalies[0]['spike_ratio_7d'] < 2.5
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for shadow-mode detector comparison (engine/shadow_detector.py):
+variant config, per-cycle diff against production and the JSONL report
+"""
+
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config.settings import DETECTION
+from engine.shadow_detector import (diff_signals, format_summary, parse_overrides, shadow_config,
+                                    write_report)
+from engine.vectorized_detector import build_matrix, detect_matrix
+
+HOUR_MS = 3600 * 1000
+WINDOWS = {'7d': 5, '14d': 9, '30d': 16}
+
+
+def signal(pair_id, symbol, hour, ratio, strength, signal_type='SPOT'):
+    return {
+        'trading_pair_id': pair_id,
+        'pair_symbol': symbol,
+        'candle_time': datetime(2026, 10, 16, hour, tzinfo=timezone.utc),
+        'signal_type': signal_type,
+        'interval': '4h',
+        'spike_ratio_7d': ratio,
+        'signal_strength': strength,
+    }
+
+
+def test_shadow_config():
+    assert shadow_config(DETECTION, None) is None
+    name, config = shadow_config(DETECTION, {'name': 'strict', 'min_spike_ratio': 2.0})
+    assert name == 'strict'
+    assert config['min_spike_ratio'] == 2.0
+    assert config['lookback_hours'] == DETECTION['lookback_hours']
+    assert shadow_config(DETECTION, {'robust_baselines': True})[0] == 'shadow'
+
+    with pytest.raises(ValueError):
+        shadow_config(DETECTION, {'lookback_hours': 1})
+
+
+def test_parse_overrides():
+    assert parse_overrides(['name=strict', 'min_spike_ratio=2.5', 'robust_baselines=true']) == {
+        'name': 'strict', 'min_spike_ratio': 2.5, 'robust_baselines': True}
+    with pytest.raises(ValueError):
+        parse_overrides(['min_spike_ratio'])
+
+
+def test_diff_signals():
+    production = [signal(1, 'AAAUSDT', 0, 1.6, 'MEDIUM'),
+                  signal(2, 'BBBUSDT', 0, 6.0, 'EXTREME'),
+                  signal(2, 'BBBUSDT', 0, 2.2, 'STRONG', signal_type='FUTURES')]
+    shadow = [signal(2, 'BBBUSDT', 0, 6.0, 'EXTREME'),
+              signal(2, 'BBBUSDT', 0, 2.2, 'MEDIUM', signal_type='FUTURES'),
+              signal(3, 'CCCUSDT', 4, 1.2, 'WEAK')]
+
+    diff = diff_signals(production, shadow)
+
+    assert diff['counts'] == {'production': 3, 'shadow': 3, 'added': 1, 'removed': 1, 'changed': 1}
+    assert [e['pair_symbol'] for e in diff['added']] == ['CCCUSDT']
+    assert [e['pair_symbol'] for e in diff['removed']] == ['AAAUSDT']
+    changed = diff['changed'][0]
+    assert (changed['production_strength'], changed['shadow_strength']) == ('STRONG', 'MEDIUM')
+    assert changed['ratio_delta'] == 0
+    assert diff['per_pair'] == {'AAAUSDT': {'added': 0, 'removed': 1, 'changed': 0},
+                                'BBBUSDT': {'added': 0, 'removed': 0, 'changed': 1},
+                                'CCCUSDT': {'added': 1, 'removed': 0, 'changed': 0}}
+    assert '+1 / -1 / ~1' in format_summary('strict', diff)
+
+
+def test_shadow_variant_on_same_matrix():
+    # Production (mean, 1.5x) and a robust shadow variant on the same loaded candles
+    volumes = [10, 10, 300, 10, 300, 10, 300]
+    matrix = build_matrix([(1, 'AAAUSDT', 1, i * HOUR_MS, v, 1.0) for i, v in enumerate(volumes)])
+    production = detect_matrix(matrix, 6 * HOUR_MS, {'min_spike_ratio': 2.5}, windows=WINDOWS)
+
+    _, config = shadow_config(DETECTION, {'min_spike_ratio': 2.5, 'robust_baselines': True,
+                                          'robust_min_spike_ratio': 5})
+    shadow = detect_matrix(matrix, 6 * HOUR_MS, config, windows=WINDOWS, robust=True)
+
+    diff = diff_signals(production, shadow)
+    assert diff['counts']['added'] == 1
+    assert diff['added'][0]['pair_symbol'] == 'AAAUSDT'
+
+
+def test_write_report_appends_jsonl(tmp_path):
+    diff = diff_signals([signal(1, 'AAAUSDT', 0, 1.6, 'MEDIUM')], [])
+    cycle_at = datetime(2026, 10, 16, 8, tzinfo=timezone.utc)
+
+    path = write_report(tmp_path, 'strict', diff, cycle_at)
+    write_report(tmp_path, 'strict', diff, cycle_at)
+
+    assert path.name == 'shadow_strict_20261016.jsonl'
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(records) == 2
+    assert records[0]['variant'] == 'strict'
+    assert records[0]['removed'][0]['candle_time'] == '2026-10-16T00:00:00+00:00'
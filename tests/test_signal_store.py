@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tests for the in-memory SignalStore (engine/signal_store.py): time-travel queries
+must match the PumpDatabaseHelper SQL semantics and plug into PumpDetectionEngine
+"""
+
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from engine.pump_detection_engine import PumpDetectionEngine
+from engine.signal_store import SIGNAL_COLUMNS, SignalStore
+
+START = datetime(2026, 9, 1, tzinfo=timezone.utc)
+
+
+class ConfigHelper:
+    """detector_config defaults only; signals come from the store"""
+
+    config_version = 1
+
+    def get_config_value(self, key, default=None):
+        return default
+
+    def refresh_config(self):
+        return False
+
+
+def make_rows(seed=11, n_symbols=12):
+    rng = random.Random(seed)
+    signals, pumps = [], []
+    signal_id = 1
+    for i in range(n_symbols):
+        symbol = f'S{i}USDT'
+        for _ in range(rng.randint(0, 150)):
+            signals.append({
+                'pair_symbol': symbol,
+                'interval': rng.choice(['4h', '4h', '1h']),
+                'id': signal_id,
+                'signal_type': rng.choice(['SPOT', 'FUTURES']),
+                'signal_timestamp': START + timedelta(hours=4 * rng.randint(0, 180)),
+                'spike_ratio_7d': Decimal('2.50'),
+                'signal_strength': rng.choice(['EXTREME', 'VERY_STRONG', 'STRONG', 'MEDIUM']),
+                'volume': Decimal('1000'),
+                'price_at_signal': Decimal(str(round(rng.uniform(0.5, 2.0), 4))),
+                'baseline_7d': None, 'baseline_14d': None, 'baseline_30d': None,
+            })
+            signal_id += 1
+        for _ in range(rng.randint(0, 3)):
+            pumps.append({'pair_symbol': symbol,
+                          'pump_start': START + timedelta(hours=rng.randint(0, 720)),
+                          'start_price': Decimal(str(round(rng.uniform(0.5, 2.0), 4)))})
+    rng.shuffle(signals)
+    return signals, pumps
+
+
+def expected_signals(signals, symbol, current_time, days=7, interval='4h'):
+    since = current_time - timedelta(days=days)
+    rows = [r for r in signals if r['pair_symbol'] == symbol and r['interval'] == interval
+            and since <= r['signal_timestamp'] <= current_time]
+    rows.sort(key=lambda r: (r['signal_timestamp'], r['id']), reverse=True)
+    return [{c: r[c] for c in SIGNAL_COLUMNS} for r in rows]
+
+
+def expected_pump(pumps, symbol, current_time):
+    rows = [p for p in pumps if p['pair_symbol'] == symbol and p['pump_start'] <= current_time]
+    if not rows:
+        return None
+    last = max(rows, key=lambda p: p['pump_start'])
+    return {'pump_start': last['pump_start'], 'start_price': float(last['start_price']),
+            'hours_since_pump': int((current_time - last['pump_start']).total_seconds() / 3600)}
+
+
+def test_queries_match_sql_semantics():
+    signals, pumps = make_rows()
+    store = SignalStore.from_rows(signals, pumps)
+    symbols = sorted({r['pair_symbol'] for r in signals} | {'MISSINGUSDT'})
+
+    # Whole hours (window edges hit candle times exactly) and odd offsets
+    times = [START + timedelta(hours=h) for h in range(0, 760, 4)]
+    times += [START + timedelta(hours=h, minutes=13, microseconds=5) for h in range(0, 760, 37)]
+
+    for current_time in times:
+        for symbol in symbols:
+            assert store.get_signals_last_n_days(symbol, current_time=current_time) == \
+                expected_signals(signals, symbol, current_time)
+            assert store.get_signals_last_n_days(symbol, days=3, current_time=current_time, interval='1h') == \
+                expected_signals(signals, symbol, current_time, days=3, interval='1h')
+            assert store.get_last_pump_info(symbol, current_time) == expected_pump(pumps, symbol, current_time)
+
+        bulk = store.get_signals_last_n_days_bulk(symbols, current_time=current_time)
+        assert bulk == {s: rows for s in symbols if (rows := expected_signals(signals, s, current_time))}
+
+
+def test_engine_uses_store_as_data_source():
+    signals, pumps = make_rows(seed=5, n_symbols=20)
+    store = SignalStore.from_rows(signals, pumps)
+    engine = PumpDetectionEngine(ConfigHelper(), signal_source=store)
+    symbols = sorted({r['pair_symbol'] for r in signals})
+
+    detected = 0
+    for hours in range(168, 760, 24):
+        current_time = START + timedelta(hours=hours)
+        batch = engine.analyze_symbols(symbols, current_time=current_time)
+        for symbol in symbols:
+            result = engine.analyze_symbol(symbol, current_time=current_time)
+            assert batch[symbol] == result
+            detected += result is not None
+    assert detected > 0
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Parity test: NumPy detection backend (engine/vectorized_detector.py) vs the SQL path
+of detector_daemon_v2 on tests/fixtures/detector_parity.json
+
+The committed fixture is synthetic: its expected rows were computed in Python following
+the SQL window semantics of build_combined_query, not returned by PostgreSQL. Until it
+is re-recorded against a live database (scripts/record_detector_parity_fixture.py,
+which stores real query output), these tests do not check against real SQL output.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config.settings import DETECTION
+from engine.vectorized_detector import build_matrix, detect_matrix, classify_strength
+
+FIXTURE = Path(__file__).resolve().parent / 'fixtures' / 'detector_parity.json'
+
+NUMERIC_FIELDS = ('volume', 'baseline_7d', 'baseline_14d', 'baseline_30d',
+                  'spike_ratio_7d', 'spike_ratio_14d', 'spike_ratio_30d')
+
+
+@pytest.fixture(scope='module')
+def dataset():
+    with open(FIXTURE) as f:
+        return json.load(f)
+
+
+def classify_signal_strength(spike_ratio_7d, spike_ratio_14d, config=DETECTION):
+    """Scalar reference: PumpDetectorDaemon.classify_signal_strength"""
+    max_spike = max(spike_ratio_7d or 0, spike_ratio_14d or 0)
+    if max_spike >= config.get('extreme_spike_ratio', 5.0):
+        return 'EXTREME'
+    elif max_spike >= config.get('very_strong_spike_ratio', 3.0):
+        return 'VERY_STRONG'
+    elif max_spike >= config.get('strong_spike_ratio', 2.0):
+        return 'STRONG'
+    elif max_spike >= config.get('medium_spike_ratio', 1.5):
+        return 'MEDIUM'
+    return 'WEAK'
+
+
+def run_vectorized(dataset, min_spike_ratio):
+    matrix = build_matrix(dataset['candles'])
+    config = dict(DETECTION, min_spike_ratio=min_spike_ratio)
+    return detect_matrix(matrix, dataset['signal_since_ms'], config)
+
+
+def test_same_rows_and_values_as_sql_path(dataset):
+    # Expected rows: the fixture's 'expected' (synthetic unless re-recorded, see module docstring)
+    rows = run_vectorized(dataset, min_spike_ratio=0)
+    expected = dataset['expected']
+
+    actual = {(r['trading_pair_id'], int(r['candle_time'].timestamp())): r for r in rows}
+    wanted = {(e['trading_pair_id'], e['candle_time']): e for e in expected}
+    assert actual.keys() == wanted.keys()
+
+    for key, e in wanted.items():
+        a = actual[key]
+        for field in NUMERIC_FIELDS:
+            if e[field] is None:
+                assert a[field] is None, (key, field)
+            else:
+                assert a[field] == pytest.approx(float(e[field]), rel=1e-9, abs=1e-12), (key, field)
+
+
+def test_min_spike_filter_and_order(dataset):
+    rows = run_vectorized(dataset, min_spike_ratio=1.5)
+    expected = [e for e in dataset['expected'] if float(e['spike_ratio_7d']) >= 1.5]
+
+    assert len(rows) == len(expected) > 0
+    ratios = [r['spike_ratio_7d'] for r in rows]
+    assert ratios == sorted(ratios, reverse=True)
+
+
+def test_strength_matches_scalar_classification(dataset):
+    for row in run_vectorized(dataset, min_spike_ratio=0):
+        assert row['signal_strength'] == classify_signal_strength(
+            row['spike_ratio_7d'], row['spike_ratio_14d'])
+
+
+def test_classify_strength_boundaries():
+    spikes = np.array([0.0, 1.49, 1.5, 2.0, 2.99, 3.0, 5.0, np.nan])
+    classes = classify_strength(spikes, np.zeros_like(spikes), DETECTION)
+    assert classes.tolist() == ['WEAK', 'WEAK', 'MEDIUM', 'STRONG', 'STRONG',
+                                'VERY_STRONG', 'EXTREME', 'WEAK']
+    # 14d ratio counts too
+    assert classify_strength(np.array([1.0]), np.array([5.5]), DETECTION).tolist() == ['EXTREME']
+
+
+def test_empty_input():
+    assert detect_matrix(build_matrix([]), 0, DETECTION) == []